@@ -12,9 +12,14 @@ import os
 import sys
 import argparse
 from pathlib import Path
-from dotenv import load_dotenv
 
-load_dotenv()
+from doe_bootstrap import lazy_import, load_env, profile_startup
+from doe_trace import Trace, add_trace_arguments
+
+# Heavy third-party modules: import lazily so --help stays fast
+requests = lazy_import("requests")
+
+load_env()
 
 # =============================================================================
 # VERSION - Must match directive
@@ -32,9 +37,12 @@ API_KEY = os.getenv("SERVICE_API_KEY")
 # =============================================================================
 
 def main():
+    profile_startup()
+
     parser = argparse.ArgumentParser(description="[Brief description]")
     parser.add_argument("input", help="Input file or value")
     parser.add_argument("--flag", default="default", help="Optional flag")
+    add_trace_arguments(parser)
     args = parser.parse_args()
 
     # Validate environment
@@ -49,10 +57,19 @@ def main():
     # =========================================================================
     # YOUR LOGIC HERE
     # =========================================================================
+    # Wrap each step in trace.span(). Steps are timed into
+    # .tmp/traces/[workflow_name].jsonl and the run is logged with its
+    # costs through log_cost() when the block exits, even on errors.
+    # Add --profile cpu|memory|all to any run to see where time goes.
 
     try:
-        # TODO: Implement
-        pass
+        with Trace.from_args("[workflow_name]", args) as trace:
+            with trace.span("step_one"):
+                # TODO: Implement
+                pass
+
+            # Record API spend as it happens
+            # trace.add_cost("anthropic", 0.15)
 
         print("✅ Done!")
         return 0
@@ -68,27 +85,3 @@ def main():
 
 if __name__ == "__main__":
     sys.exit(main())
-
-
-# =============================================================================
-# OPTIONAL: Cost tracking (uncomment if needed)
-# =============================================================================
-# 
-# import json
-# from datetime import datetime
-# 
-# def log_cost(workflow: str, costs: dict):
-#     """Log API costs to .tmp/cost_log.jsonl"""
-#     log_path = Path(".tmp/cost_log.jsonl")
-#     log_path.parent.mkdir(parents=True, exist_ok=True)
-#     entry = {
-#         "timestamp": datetime.now().isoformat(),
-#         "workflow": workflow,
-#         "costs": costs,
-#         "total": sum(costs.values())
-#     }
-#     with open(log_path, "a") as f:
-#         f.write(json.dumps(entry) + "\n")
-#
-# # Call at end of main():
-# # log_cost("workflow_name", {"anthropic": 0.15})
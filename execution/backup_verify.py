@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+Script: backup_verify.py
+Directive: directives/backup_verify.md
+DOE Framework: v2.0.0
+
+Purpose:
+    Check that the backups in backups/ (zips and exploded folders written
+    by backup-listmonk.ps1) are intact and would restore.
+
+    Every member of every archive is streamed and checksummed in parallel.
+    The SQL dump is parsed while it is hashed, in the same pass, to count
+    rows per table. It is read in fixed-size blocks, so memory stays bounded
+    on multi-GB dumps. PowerShell's UTF-16 output is handled. Optionally the
+    subscribers and/or campaigns tables are restored on their own into a
+    scratch database and their row counts compared.
+
+Cost:
+    Free
+
+Usage:
+    # Verify every backup in backups/
+    python execution/backup_verify.py
+
+    # One archive, more parallelism
+    python execution/backup_verify.py backups/listmonk-backup-2026-01-12_21-43-18.zip --workers 8
+
+    # Restore only subscribers into a scratch database and compare counts
+    python execution/backup_verify.py backups/listmonk-backup-2026-01-12_21-43-18.zip --restore subscribers
+"""
+
+import io
+import re
+import sys
+import json
+import codecs
+import hashlib
+import zipfile
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from listmonk_backup import DB_CONTAINER, DB_NAME, DB_USER, psql_command
+
+# =============================================================================
+# VERSION - Must match directive version
+# =============================================================================
+DOE_VERSION = "2026.10.19"
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+BACKUP_DIR = "backups"
+REPORT_DIR = ".tmp/backup_verify"
+DUMP_NAME = "database.sql"
+
+READ_BLOCK = 1024 * 1024
+RESTORABLE_TABLES = ("subscribers", "campaigns")
+SCRATCH_DB = "listmonk_verify"
+
+# Tables shown in the summary (all tables are in the JSON report)
+KEY_TABLES = ("subscribers", "lists", "subscriber_lists", "campaigns", "templates")
+
+COPY_RE = re.compile(r"^COPY (\S+) \([^\n]*\) FROM stdin;\n", re.M)
+
+
+# =============================================================================
+# STREAMING HELPERS
+# =============================================================================
+
+class HashingReader(io.RawIOBase):
+    """Wrap a binary stream; every byte read also feeds a SHA-256."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self.raw.read(len(buffer))
+        n = len(data)
+        buffer[:n] = data
+        self.sha256.update(data)
+        self.size += n
+        return n
+
+    def drain(self):
+        """Hash whatever the consumer did not read."""
+        while self.read(READ_BLOCK):
+            pass
+
+
+def detect_encoding(head: bytes) -> str:
+    """PowerShell `>` writes UTF-16LE with a BOM; pg_dump itself writes UTF-8."""
+    if head.startswith(codecs.BOM_UTF16_LE):
+        return "utf-16"
+    if head.startswith(codecs.BOM_UTF16_BE):
+        return "utf-16"
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    return "utf-8"
+
+
+def open_text(binary) -> io.TextIOWrapper:
+    """Text view of a dump stream with the encoding sniffed from its first bytes."""
+    buffered = io.BufferedReader(binary, READ_BLOCK)
+    encoding = detect_encoding(buffered.peek(4)[:4])
+    # newline=None folds the CRLFs PowerShell adds back to \n
+    return io.TextIOWrapper(buffered, encoding=encoding, errors="replace", newline=None)
+
+
+def count_table_rows(text) -> dict[str, int]:
+    """
+    Count data rows per table in a plain-format pg_dump.
+
+    Works block by block: outside a COPY block it searches for the next
+    COPY header, inside one it counts newlines up to the `\\.` terminator.
+    Only the current block plus one partial line is held in memory.
+    """
+    counts = {}
+    table = None
+    pending = ""
+    while True:
+        block = text.read(READ_BLOCK)
+        data = pending + block
+        pending = ""
+        pos = 0
+        while pos < len(data):
+            if table is None:
+                match = COPY_RE.search(data, pos)
+                if match is None:
+                    # Keep the trailing partial line; a COPY header may continue in the next block
+                    cut = data.rfind("\n", pos) + 1
+                    pending = data[max(cut, pos):] if block else ""
+                    break
+                table = match.group(1).removeprefix("public.")
+                counts.setdefault(table, 0)
+                pos = match.end()
+            else:
+                if data.startswith("\\.\n", pos):
+                    end = pos
+                else:
+                    found = data.find("\n\\.\n", pos)
+                    end = found + 1 if found >= 0 else -1
+                if end >= 0:
+                    counts[table] += data.count("\n", pos, end)
+                    table = None
+                    pos = end + 3
+                else:
+                    # Count complete rows; keep the last newline so the terminator search still matches
+                    last = data.rfind("\n", pos)
+                    if last < pos or not block:
+                        pending = data[pos:] if block else ""
+                        break
+                    counts[table] += data.count("\n", pos, last)
+                    pending = data[last:]
+                    break
+        if not block:
+            return counts
+
+
+# =============================================================================
+# VERIFICATION
+# =============================================================================
+
+class Backup:
+    """A zip or folder in backups/, with uniform member access."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.is_zip = path.suffix.lower() == ".zip"
+
+    @property
+    def name(self) -> str:
+        return self.path.stem if self.is_zip else self.path.name
+
+    def members(self) -> list[str]:
+        if self.is_zip:
+            with zipfile.ZipFile(self.path) as z:
+                return [i.filename for i in z.infolist() if not i.is_dir()]
+        return sorted(str(p.relative_to(self.path)) for p in self.path.rglob("*") if p.is_file())
+
+    def open_dump(self):
+        """Binary stream of the SQL dump."""
+        dump = next((m for m in self.members() if Path(m).name == DUMP_NAME), None)
+        if dump is None:
+            raise FileNotFoundError(f"No {DUMP_NAME} in {self.path}")
+        if self.is_zip:
+            return zipfile.ZipFile(self.path).open(dump)
+        return open(self.path / dump, "rb")
+
+    def check_member(self, member: str) -> dict:
+        """Checksum one member; parse it too if it is the SQL dump or a JSON file."""
+        result = {"member": member, "ok": True}
+        try:
+            if self.is_zip:
+                # One ZipFile per worker thread; zipfile also checks the CRC as it reads
+                with zipfile.ZipFile(self.path) as z, z.open(member) as raw:
+                    self._scan(member, raw, result)
+            else:
+                with open(self.path / member, "rb") as raw:
+                    self._scan(member, raw, result)
+        except (zipfile.BadZipFile, OSError, EOFError, ValueError) as e:
+            result["ok"] = False
+            result["error"] = str(e)
+        return result
+
+    @staticmethod
+    def _scan(member: str, raw, result: dict):
+        reader = HashingReader(raw)
+        name = Path(member).name
+        if name == DUMP_NAME:
+            text = open_text(reader)
+            result["table_rows"] = count_table_rows(text)
+            if not result["table_rows"]:
+                result["ok"] = False
+                result["error"] = "No COPY blocks found"
+        elif name.endswith(".json"):
+            text = open_text(reader)
+            try:
+                json.loads(text.read())
+            except ValueError as e:
+                result["ok"] = False
+                result["error"] = f"Invalid JSON: {e}"
+        reader.drain()
+        result["sha256"] = reader.sha256.hexdigest()
+        result["size"] = reader.size
+
+
+def verify_backup(backup: Backup, pool: ThreadPoolExecutor) -> dict:
+    members = backup.members()
+    results = list(pool.map(backup.check_member, members))
+    report = {
+        "backup": backup.name,
+        "path": str(backup.path),
+        "kind": "zip" if backup.is_zip else "folder",
+        "ok": all(r["ok"] for r in results) and DUMP_NAME in [Path(m).name for m in members],
+        "members": results,
+    }
+    if DUMP_NAME not in [Path(m).name for m in members]:
+        report["error"] = f"No {DUMP_NAME} in backup"
+    for r in results:
+        if "table_rows" in r:
+            report["table_rows"] = r["table_rows"]
+    return report
+
+
+def compare_copies(zip_report: dict, folder_report: dict, folder: Path) -> list[str]:
+    """Differences between a zip and its exploded folder."""
+    notes = []
+    folder_members = {r["member"]: r for r in folder_report["members"]}
+    for r in zip_report["members"]:
+        other = folder_members.get(r["member"])
+        if other is None:
+            notes.append(f"{r['member']}: only in zip")
+        elif r.get("sha256") != other.get("sha256"):
+            with zipfile.ZipFile(zip_report["path"]) as z:
+                zipped = z.read(r["member"]).replace(b"\r\n", b"\n")
+            if zipped == (folder / r["member"]).read_bytes().replace(b"\r\n", b"\n"):
+                notes.append(f"{r['member']}: line endings differ only")
+            else:
+                notes.append(f"{r['member']}: contents differ")
+    return notes
+
+
+# =============================================================================
+# SELECTIVE RESTORE
+# =============================================================================
+
+def filtered_dump(text, tables: set[str]):
+    """
+    Yield the dump with data for every table except `tables` removed, and
+    without foreign-key constraints (their target tables are empty).
+    Schema statements are kept so types, sequences and defaults exist.
+    """
+    skipping_copy = False
+    skipping_fk = False
+    for line in text:
+        if skipping_copy:
+            if line == "\\.\n":
+                skipping_copy = False
+            continue
+        if skipping_fk:
+            if line.rstrip().endswith(";"):
+                skipping_fk = False
+            continue
+        if line.startswith("COPY "):
+            table = line.split(" ", 2)[1].removeprefix("public.")
+            if table not in tables:
+                skipping_copy = True
+                continue
+        elif line.startswith("-- Name: ") and "; Type: FK CONSTRAINT;" in line:
+            skipping_fk = True
+            continue
+        yield line
+
+
+def load_dump(backup: Backup, database: str, args, tables: set[str] | None = None):
+    """
+    (Re)create `database` and stream the backup's dump into it with psql.
+    With `tables`, only those tables get data (see filtered_dump).
+    """
+    subprocess.run(psql_command(args, "dropdb", "--if-exists", database), capture_output=True)
+    created = subprocess.run(psql_command(args, "createdb", database), capture_output=True, text=True)
+    if created.returncode != 0:
+        raise RuntimeError(f"createdb failed: {created.stderr.strip()}")
+
+    # stderr goes to a file: NOTICEs from a long restore would fill a pipe nobody reads until the end
+    with tempfile.TemporaryFile() as errors:
+        process = subprocess.Popen(
+            psql_command(args, "psql", "-q", "-v", "ON_ERROR_STOP=1", "-d", database, interactive=True),
+            stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=errors)
+        try:
+            with backup.open_dump() as raw:
+                text = open_text(raw)
+                for line in (filtered_dump(text, tables) if tables is not None else text):
+                    process.stdin.write(line.encode("utf-8"))
+        except BrokenPipeError:
+            # psql stopped on an error; its exit code and stderr say which
+            pass
+        except BaseException:
+            # Unreadable dump: don't let psql commit a partial load
+            process.kill()
+            raise
+        finally:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+            code = process.wait()
+        errors.seek(0)
+        err = errors.read().decode("utf-8", "replace")
+    if code != 0:
+        raise RuntimeError(f"psql failed: {err.strip()}")
+
+
+def selective_restore(backup: Backup, tables: set[str], expected: dict, args) -> dict:
+    """Restore only `tables` into a fresh scratch database and compare row counts."""
+    load_dump(backup, args.scratch_db, args, tables)
+
+    results = {}
+    for table in sorted(tables):
+        query = subprocess.run(
+            psql_command(args, "psql", "-At", "-d", args.scratch_db, "-c", f"SELECT count(*) FROM public.{table}"),
+            capture_output=True, text=True)
+        restored = int(query.stdout.strip()) if query.returncode == 0 else None
+        results[table] = {"expected": expected.get(table), "restored": restored,
+                          "ok": restored is not None and restored == expected.get(table)}
+
+    if not args.keep_scratch:
+        subprocess.run(psql_command(args, "dropdb", "--if-exists", args.scratch_db), capture_output=True)
+    return results
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def find_backups(paths: list[str]) -> list[Backup]:
+    if paths:
+        return [Backup(Path(p)) for p in paths]
+    root = Path(BACKUP_DIR)
+    found = sorted(root.glob("listmonk-backup-*.zip")) + sorted(p for p in root.glob("listmonk-backup-*") if p.is_dir())
+    return [Backup(p) for p in found]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Verify Listmonk backups and optionally test-restore key tables.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("backups", nargs="*", help=f"Zips or folders (default: everything in {BACKUP_DIR}/)")
+    parser.add_argument("--workers", type=int, default=4, help="Parallel member checks (default: 4)")
+    parser.add_argument("--restore", help=f"Comma-separated tables to test-restore: {', '.join(RESTORABLE_TABLES)}")
+    parser.add_argument("--scratch-db", default=SCRATCH_DB, help=f"Scratch database (default: {SCRATCH_DB})")
+    parser.add_argument("--keep-scratch", action="store_true", help="Leave the scratch database for inspection")
+    parser.add_argument("--container", default=DB_CONTAINER, help=f"Postgres container (default: {DB_CONTAINER})")
+    parser.add_argument("--no-docker", action="store_true", help="Use local psql instead of the container")
+    parser.add_argument("--pg-host", default="localhost", help="Postgres host with --no-docker")
+    parser.add_argument("--pg-port", type=int, default=5432, help="Postgres port with --no-docker")
+    parser.add_argument("--pg-user", default=DB_USER, help=f"Postgres user (default: {DB_USER})")
+    parser.add_argument("--pg-db", default=DB_NAME, help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    print(f"[backup_verify] v{DOE_VERSION}")
+    print()
+
+    try:
+        tables = set()
+        if args.restore:
+            tables = {t.strip() for t in args.restore.split(",") if t.strip()}
+            unknown = tables - set(RESTORABLE_TABLES)
+            if unknown:
+                print(f"ERROR: Can only restore {', '.join(RESTORABLE_TABLES)} (got {', '.join(sorted(unknown))})")
+                return 1
+
+        backups = find_backups(args.backups)
+        if not backups:
+            print(f"No backups found in {BACKUP_DIR}/")
+            return 1
+
+        reports = []
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            for backup in backups:
+                report = verify_backup(backup, pool)
+                reports.append(report)
+                size = sum(m.get("size", 0) for m in report["members"])
+                status = "✅" if report["ok"] else "❌"
+                print(f"{status} {backup.path} ({len(report['members'])} files, {size / 1024 / 1024:.1f} MB)")
+                for m in report["members"]:
+                    if not m["ok"]:
+                        print(f"     {m['member']}: {m.get('error')}")
+                if report.get("error"):
+                    print(f"     {report['error']}")
+                rows = report.get("table_rows", {})
+                if rows:
+                    print("     rows: " + ", ".join(f"{t}={rows.get(t, 0):,}" for t in KEY_TABLES))
+
+        by_name = {}
+        for report in reports:
+            by_name.setdefault(report["backup"], {})[report["kind"]] = report
+        for name, pair in by_name.items():
+            if "zip" in pair and "folder" in pair:
+                notes = compare_copies(pair["zip"], pair["folder"], Path(pair["folder"]["path"]))
+                pair["zip"]["folder_comparison"] = notes
+                if notes:
+                    print(f"ℹ️  {name}: zip vs folder")
+                    for note in notes:
+                        print(f"     {note}")
+
+        if tables:
+            target = next((r for r in reports if r["ok"]), None)
+            if target is None:
+                print("❌ No intact backup to restore from")
+                return 1
+            backup = Backup(Path(target["path"]))
+            print()
+            print(f"📥 Restoring {', '.join(sorted(tables))} from {backup.path} into {args.scratch_db}...")
+            target["restore"] = selective_restore(backup, tables, target["table_rows"], args)
+            for table, r in target["restore"].items():
+                print(f"  {'✅' if r['ok'] else '❌'} {table}: {r['restored']} restored, {r['expected']} in dump")
+
+        Path(REPORT_DIR).mkdir(parents=True, exist_ok=True)
+        report_path = Path(REPORT_DIR) / f"report-{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json"
+        report_path.write_text(json.dumps(reports, indent=2))
+        print()
+        print(f"Report: {report_path}")
+
+        failed = [r for r in reports if not r["ok"] or not all(t["ok"] for t in r.get("restore", {}).values())]
+        print("✅ All backups verified" if not failed else f"❌ {len(failed)} backup(s) failed verification")
+        return 1 if failed else 0
+
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted")
+        return 130
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
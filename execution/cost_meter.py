@@ -0,0 +1,592 @@
+#!/usr/bin/env python3
+"""
+Script: cost_meter.py
+Directive: directives/cost_meter.md
+DOE Framework: v2.0.0
+
+Purpose:
+    Meter API spend per request and stop a runaway send or loop before it
+    goes over budget, instead of finding out from log_cost() afterwards.
+
+    Scripts call meter.guard(service) before each request and
+    meter.charge(service, usd) after it (meter.release(service) if the
+    request failed and costs nothing). Charges accumulate in memory and
+    are flushed every few seconds into SQLite rollups: one row per
+    (day or month, workflow, service), plus rows for "all workflows" and
+    "all services". Runs that only call log_cost() are added by reading
+    the cost log from where the last read stopped. Current spend for any
+    budget is therefore one primary-key lookup, never a rescan of
+    cost_log.jsonl.
+
+    Budgets (cost_budgets.json) cap USD and/or request counts per workflow
+    and service for a day or a month. An `abort` budget raises
+    BudgetExceeded before the request that would cross it. A `throttle`
+    budget also spaces out requests once `throttle_at` of it is spent, so
+    what is left lasts until the window resets.
+
+Cost:
+    Free
+
+Usage:
+    # In a script
+    from cost_meter import CostMeter, BudgetExceeded
+
+    with CostMeter("daily_report") as meter:
+        for item in items:
+            meter.guard("anthropic", estimate=0.01)   # raises before overspending
+            try:
+                response = call_api(item)
+            except ApiError:
+                meter.release("anthropic")
+                raise
+            meter.charge("anthropic", usage_cost(response))
+
+    # Spend against each budget, today and this month
+    python execution/cost_meter.py status
+
+    # Rebuild the rollups from .tmp/cost_log.jsonl
+    python execution/cost_meter.py rebuild
+
+    # guard()+charge() and lookup speed
+    python execution/cost_meter.py benchmark
+"""
+
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import tempfile
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# =============================================================================
+# VERSION - Must match directive version
+# =============================================================================
+DOE_VERSION = "2026.10.19"
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DB_PATH = ".tmp/cost_meter.db"
+BUDGETS_FILE = "cost_budgets.json"
+COST_LOG = ".tmp/cost_log.jsonl"
+
+FLUSH_INTERVAL = 5.0   # seconds between flushes
+FLUSH_EVERY = 200      # ... or after this many charges
+MAX_THROTTLE_DELAY = 60.0
+
+ALL = "*"
+WINDOWS = ("day", "month")
+ACTIONS = ("abort", "throttle")
+
+
+# =============================================================================
+# BUDGETS
+# =============================================================================
+
+class BudgetExceeded(Exception):
+    """A request would take spend over an abort/throttle budget."""
+
+    def __init__(self, budget: "Budget", spent_usd: float, spent_requests: int):
+        self.budget = budget
+        self.spent_usd = spent_usd
+        self.spent_requests = spent_requests
+        super().__init__(f"{budget.label()} reached: ${spent_usd:.2f}, {spent_requests:,} requests")
+
+
+@dataclass
+class Budget:
+    window: str
+    workflow: str = ALL
+    service: str = ALL
+    limit_usd: float | None = None
+    limit_requests: int | None = None
+    action: str = "abort"
+    throttle_at: float = 0.8
+
+    def __post_init__(self):
+        if self.window not in WINDOWS:
+            raise ValueError(f"budget window must be one of {', '.join(WINDOWS)}")
+        if self.action not in ACTIONS:
+            raise ValueError(f"budget action must be one of {', '.join(ACTIONS)}")
+        if self.limit_usd is None and self.limit_requests is None:
+            raise ValueError("budget needs limit_usd and/or limit_requests")
+
+    def applies_to(self, workflow: str, service: str | None = None) -> bool:
+        return self.workflow in (ALL, workflow) and (service is None or self.service in (ALL, service))
+
+    def label(self) -> str:
+        limits = []
+        if self.limit_usd is not None:
+            limits.append(f"${self.limit_usd:g}")
+        if self.limit_requests is not None:
+            limits.append(f"{self.limit_requests:,} requests")
+        return f"{self.window} budget {self.workflow}/{self.service} ({' / '.join(limits)})"
+
+
+def load_budgets(path: str = BUDGETS_FILE) -> list[Budget]:
+    """Budgets from a JSON list; none if the file does not exist."""
+    if not Path(path).exists():
+        return []
+    return [Budget(**b) for b in json.loads(Path(path).read_text())]
+
+
+def period_key(window: str, now: datetime) -> str:
+    return f"day:{now:%Y-%m-%d}" if window == "day" else f"month:{now:%Y-%m}"
+
+
+def period_end(window: str, now: datetime) -> datetime:
+    if window == "day":
+        return datetime(now.year, now.month, now.day) + timedelta(days=1)
+    return datetime(now.year + now.month // 12, now.month % 12 + 1, 1)
+
+
+# =============================================================================
+# ROLLUPS
+# =============================================================================
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollups (
+    period TEXT NOT NULL,
+    workflow TEXT NOT NULL,
+    service TEXT NOT NULL,
+    usd REAL NOT NULL DEFAULT 0,
+    requests INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (period, workflow, service)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+UPSERT = (
+    "INSERT INTO rollups (period, workflow, service, usd, requests) VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT (period, workflow, service) DO UPDATE SET "
+    "usd = usd + excluded.usd, requests = requests + excluded.requests"
+)
+
+
+class Rollups:
+    """Day and month spend per workflow/service, with ALL rows for each wildcard."""
+
+    def __init__(self, path: str = DB_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def _upsert(self, workflow: str, charges: dict[str, tuple[float, int]], when: datetime):
+        rows = []
+        for service, (usd, requests) in charges.items():
+            for window in WINDOWS:
+                period = period_key(window, when)
+                for w, s in ((workflow, service), (workflow, ALL), (ALL, service), (ALL, ALL)):
+                    rows.append((period, w, s, usd, requests))
+        self.conn.executemany(UPSERT, rows)
+
+    def add(self, workflow: str, charges: dict[str, tuple[float, int]], when: datetime | None = None):
+        """Add {service: (usd, requests)} for one workflow, in one transaction."""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._upsert(workflow, charges, when or datetime.now())
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def sync_log(self, log_path: str = COST_LOG, include_metered: bool = False) -> int:
+        """
+        Add cost log entries written since the last sync.
+
+        Entries a CostMeter wrote are already in the rollups and are skipped,
+        unless rebuilding. Returns entries added.
+        """
+        path = Path(log_path)
+        if not path.exists():
+            return 0
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'log_offset'").fetchone()
+            offset = int(row[0]) if row else 0
+            if path.stat().st_size < offset:
+                # Log was replaced or truncated; read the new one from the start
+                offset = 0
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+            # A line without its newline is still being written
+            end = data.rfind(b"\n") + 1
+            count = 0
+            for line in data[:end].splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry.get("metered") and not include_metered:
+                    continue
+                requests = entry.get("requests") if isinstance(entry.get("requests"), dict) else {}
+                charges = {s: (usd, requests.get(s, 0)) for s, usd in entry["costs"].items() if usd}
+                if charges:
+                    self._upsert(entry["workflow"], charges, datetime.fromisoformat(entry["timestamp"]))
+                count += 1
+            self.conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('log_offset', ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (str(offset + end),),
+            )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return count
+
+    def spent(self, period: str, workflow: str = ALL, service: str = ALL) -> tuple[float, int]:
+        """(usd, requests) for one period/workflow/service: a single primary-key lookup."""
+        row = self.conn.execute(
+            "SELECT usd, requests FROM rollups WHERE period = ? AND workflow = ? AND service = ?",
+            (period, workflow, service),
+        ).fetchone()
+        return (row[0], row[1]) if row else (0.0, 0)
+
+    def period_rows(self, period: str) -> list[tuple]:
+        return self.conn.execute(
+            "SELECT workflow, service, usd, requests FROM rollups WHERE period = ? "
+            "AND workflow != ? AND service != ? ORDER BY usd DESC, requests DESC",
+            (period, ALL, ALL),
+        ).fetchall()
+
+    def clear(self):
+        self.conn.execute("DELETE FROM rollups")
+        self.conn.execute("DELETE FROM meta")
+
+    def close(self):
+        self.conn.close()
+
+
+# =============================================================================
+# METER
+# =============================================================================
+
+class CostMeter:
+    """
+    Per-request metering for one workflow. Thread-safe.
+
+    guard() only touches memory: spend already in the rollups (refreshed on
+    each flush, which also picks up other processes and new cost log
+    entries) plus this process's
+    unflushed charges, plus requests guarded but not yet charged. Counting
+    the last ones keeps concurrent workers from all passing the check for
+    the final request of a budget.
+    """
+
+    def __init__(self, workflow: str, budgets: list[Budget] | None = None, db_path: str = DB_PATH,
+                 flush_interval: float = FLUSH_INTERVAL, flush_every: int = FLUSH_EVERY,
+                 log: bool = True):
+        self.workflow = workflow
+        all_budgets = load_budgets() if budgets is None else budgets
+        self.budgets = [b for b in all_budgets if b.applies_to(workflow)]
+        self.rollups = Rollups(db_path)
+        self.flush_interval = flush_interval
+        self.flush_every = flush_every
+        self.log = log
+
+        self.lock = threading.Lock()
+        self.pending: dict[str, list] = {}      # service -> [usd, requests] not yet flushed
+        self.pending_at = None                  # when the first pending charge was made
+        self.pending_until = None               # ... and the end of its day
+        self.totals: dict[str, list] = {}       # service -> [usd, requests] this run
+        self.reserved: dict[str, list] = {}     # service -> [usd, requests] guarded, not yet charged
+        self.base: dict[tuple, tuple] = {}      # (period, workflow, service) -> flushed (usd, requests)
+        self.charges_since_flush = 0
+        self.last_flush = time.monotonic()
+        self.periods_until = None
+        self._refresh_base()
+
+    def __enter__(self) -> "CostMeter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    # -------------------------------------------------------------------------
+    # Hot path
+    # -------------------------------------------------------------------------
+
+    def guard(self, service: str, estimate: float = 0.0) -> float:
+        """
+        Check the budgets before a request.
+
+        Raises BudgetExceeded if the request would cross a budget. For
+        throttle budgets past `throttle_at`, sleeps to pace the remainder
+        over the rest of the window.
+
+        Returns:
+            Seconds slept
+        """
+        if not self.budgets:
+            return 0.0
+        delay = 0.0
+        with self.lock:
+            now = datetime.now()
+            if self.periods_until is None or now >= self.periods_until:
+                self._flush()
+            for budget in self.budgets:
+                if not budget.applies_to(self.workflow, service):
+                    continue
+                usd, requests = self._spent(budget, now)
+                over_usd = budget.limit_usd is not None and usd + estimate > budget.limit_usd
+                over_requests = budget.limit_requests is not None and requests + 1 > budget.limit_requests
+                if over_usd or over_requests:
+                    raise BudgetExceeded(budget, usd, requests)
+                if budget.action == "throttle":
+                    delay = max(delay, self._throttle_delay(budget, usd, requests, estimate, service, now))
+            reserved = self.reserved.setdefault(service, [0.0, 0])
+            reserved[0] += estimate
+            reserved[1] += 1
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    def charge(self, service: str, usd: float = 0.0, requests: int = 1):
+        """Record a request's cost. Flushes to the rollups every few seconds."""
+        with self.lock:
+            self._unreserve(service)
+            now = datetime.now()
+            if self.pending_until is not None and now >= self.pending_until:
+                # Yesterday's charges go into yesterday's rollups
+                self._flush()
+            if self.pending_at is None:
+                self.pending_at = now
+                self.pending_until = period_end("day", now)
+            pending = self.pending.setdefault(service, [0.0, 0])
+            pending[0] += usd
+            pending[1] += requests
+            total = self.totals.setdefault(service, [0.0, 0])
+            total[0] += usd
+            total[1] += requests
+            self.charges_since_flush += 1
+            due = (self.charges_since_flush >= self.flush_every
+                   or time.monotonic() - self.last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def release(self, service: str):
+        """Drop the reservation of a guarded request that was not sent."""
+        with self.lock:
+            self._unreserve(service)
+
+    # -------------------------------------------------------------------------
+    # Internals
+    # -------------------------------------------------------------------------
+
+    def _unreserve(self, service: str):
+        reserved = self.reserved.get(service)
+        if reserved and reserved[1]:
+            reserved[0] -= reserved[0] / reserved[1]
+            reserved[1] -= 1
+
+    def _spent(self, budget: Budget, now: datetime) -> tuple[float, int]:
+        period = period_key(budget.window, now)
+        usd, requests = self.base.get((period, budget.workflow, budget.service), (0.0, 0))
+        for counters in (self.pending, self.reserved):
+            for service, (p_usd, p_requests) in counters.items():
+                if budget.service in (ALL, service):
+                    usd += p_usd
+                    requests += p_requests
+        return usd, requests
+
+    def _throttle_delay(self, budget: Budget, usd: float, requests: int, estimate: float,
+                        service: str, now: datetime) -> float:
+        """Seconds to wait so the rest of the budget lasts until the window resets."""
+        seconds_left = (period_end(budget.window, now) - now).total_seconds()
+        requests_left = []
+        if budget.limit_requests is not None and requests >= budget.throttle_at * budget.limit_requests:
+            requests_left.append(budget.limit_requests - requests)
+        if budget.limit_usd is not None and usd >= budget.throttle_at * budget.limit_usd:
+            total = self.totals.get(service)
+            per_request = estimate or (total[0] / total[1] if total and total[1] else 0.0)
+            if per_request > 0:
+                requests_left.append((budget.limit_usd - usd) / per_request)
+        if not requests_left:
+            return 0.0
+        return min(MAX_THROTTLE_DELAY, seconds_left / max(1.0, min(requests_left)))
+
+    def _refresh_base(self):
+        now = datetime.now()
+        self.rollups.sync_log()
+        self.base = {}
+        for budget in self.budgets:
+            key = (period_key(budget.window, now), budget.workflow, budget.service)
+            if key not in self.base:
+                self.base[key] = self.rollups.spent(*key)
+        # Recompute when the day (and possibly month) rolls over
+        self.periods_until = period_end("day", now)
+
+    def flush(self):
+        """Write pending charges to the rollups and pick up other processes' spend."""
+        with self.lock:
+            self._flush()
+
+    def _flush(self):
+        # All pending charges fall on one day: charge() flushes when the day changes
+        pending = {s: (v[0], v[1]) for s, v in self.pending.items() if v[0] or v[1]}
+        if pending:
+            self.rollups.add(self.workflow, pending, self.pending_at)
+        self.pending = {}
+        self.pending_at = self.pending_until = None
+        self.charges_since_flush = 0
+        self.last_flush = time.monotonic()
+        self._refresh_base()
+
+    def spend(self) -> dict[str, dict]:
+        """This run's {service: {"usd", "requests"}}."""
+        with self.lock:
+            return {s: {"usd": v[0], "requests": v[1]} for s, v in self.totals.items()}
+
+    def close(self):
+        """Flush and log this run's totals through log_cost()."""
+        if self.rollups is None:
+            return
+        self.flush()
+        self.rollups.close()
+        self.rollups = None
+        if self.log and self.totals:
+            from doe_utils import log_cost
+            # Already in the rollups; "metered" keeps sync_log() from adding it again
+            log_cost(self.workflow, {s: v[0] for s, v in self.totals.items()},
+                     extra={"metered": True, "requests": {s: v[1] for s, v in self.totals.items()}})
+
+
+# =============================================================================
+# REPORTING
+# =============================================================================
+
+def budget_status(budgets: list[Budget], db_path: str = DB_PATH) -> list[dict]:
+    rollups = Rollups(db_path)
+    rollups.sync_log()
+    now = datetime.now()
+    status = []
+    for budget in budgets:
+        usd, requests = rollups.spent(period_key(budget.window, now), budget.workflow, budget.service)
+        used = max(
+            usd / budget.limit_usd if budget.limit_usd else 0.0,
+            requests / budget.limit_requests if budget.limit_requests else 0.0,
+        )
+        status.append({"budget": budget, "usd": usd, "requests": requests, "used": used})
+    rollups.close()
+    return status
+
+
+def rebuild(db_path: str = DB_PATH, log_path: str = COST_LOG) -> int:
+    """Recompute the rollups from the cost log. Returns entries read."""
+    rollups = Rollups(db_path)
+    rollups.clear()
+    count = rollups.sync_log(log_path, include_metered=True)
+    rollups.close()
+    return count
+
+
+def run_benchmark(charges: int) -> dict:
+    # A scratch database, so benchmark spend never counts toward real budgets
+    with tempfile.TemporaryDirectory() as tmp:
+        return _benchmark(charges, str(Path(tmp) / "bench.db"))
+
+
+def _benchmark(charges: int, db_path: str) -> dict:
+    budgets = [Budget("day", limit_usd=1e12), Budget("month", service="bench", limit_requests=10 ** 12)]
+    with CostMeter("cost_meter_benchmark", budgets, db_path=db_path, log=False) as meter:
+        start = time.perf_counter()
+        for _ in range(charges):
+            meter.guard("bench", 0.001)
+            meter.charge("bench", 0.001)
+        per_call = (time.perf_counter() - start) / charges
+
+    rollups = Rollups(db_path)
+    period = period_key("day", datetime.now())
+    start = time.perf_counter()
+    for _ in range(1000):
+        rollups.spent(period, "cost_meter_benchmark", "bench")
+    lookup = (time.perf_counter() - start) / 1000
+    rollups.close()
+    return {"guard_and_charge_us": per_call * 1e6, "lookup_us": lookup * 1e6}
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-request cost metering and budgets")
+    parser.add_argument("--db", default=DB_PATH, help=f"Rollup database (default: {DB_PATH})")
+    parser.add_argument("--budgets", default=BUDGETS_FILE, help=f"Budget file (default: {BUDGETS_FILE})")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    subparsers.add_parser("status", help="Spend against each budget, and today's top spenders")
+    subparsers.add_parser("rebuild", help=f"Recompute rollups from {COST_LOG}")
+    bench_parser = subparsers.add_parser("benchmark", help="Time guard()+charge() and rollup lookups")
+    bench_parser.add_argument("--charges", type=int, default=100_000, help="Charges to meter (default: 100000)")
+
+    args = parser.parse_args()
+
+    print(f"[cost_meter] v{DOE_VERSION}")
+    print()
+
+    try:
+        if args.command == "status":
+            budgets = load_budgets(args.budgets)
+            if not budgets:
+                print(f"No budgets configured ({args.budgets} not found)")
+            for s in budget_status(budgets, args.db):
+                budget = s["budget"]
+                icon = "❌" if s["used"] >= 1 else "⚠️" if s["used"] >= budget.throttle_at else "✅"
+                bar = "█" * min(20, round(20 * s["used"]))
+                print(f"{icon} {budget.label()} [{budget.action}]")
+                print(f"   ${s['usd']:.2f}, {s['requests']:,} requests  {bar} {s['used']:.0%}")
+
+            rollups = Rollups(args.db)
+            now = datetime.now()
+            rows = rollups.period_rows(period_key("day", now))
+            total_usd, total_requests = rollups.spent(period_key("month", now))
+            rollups.close()
+            print()
+            print(f"TODAY ({now:%Y-%m-%d})")
+            print("-" * 40)
+            if not rows:
+                print("  No metered spend today")
+            for workflow, service, usd, requests in rows[:15]:
+                print(f"  {workflow}/{service}: ${usd:.2f}" + (f", {requests:,} requests" if requests else ""))
+            print()
+            print(f"This month: ${total_usd:.2f}" + (f", {total_requests:,} metered requests" if total_requests else ""))
+
+        elif args.command == "rebuild":
+            count = rebuild(args.db)
+            print(f"✅ Rebuilt rollups from {count:,} cost log entries")
+
+        elif args.command == "benchmark":
+            print(f"⏱️  Metering {args.charges:,} requests against two budgets...")
+            result = run_benchmark(args.charges)
+            print(f"  guard() + charge(): {result['guard_and_charge_us']:.2f} µs per request")
+            print(f"  Current spend lookup: {result['lookup_us']:.1f} µs (rollup primary key)")
+
+        else:
+            parser.print_help()
+        return 0
+
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted")
+        return 130
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
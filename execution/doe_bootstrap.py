@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+DOE Framework Bootstrap
+Version: 2.0.0
+
+Fast-startup helpers shared by execution scripts. Agents run these scripts
+many times per session, often just for --help or a quick status check, so
+startup has to stay cheap:
+
+- lazy_import(): defer heavy third-party imports (requests, numpy, ...)
+  until the first attribute access
+- load_env(): parse .env without importing python-dotenv, once per process
+  no matter how many modules ask for it
+- profile_startup(): a --startup-profile flag that re-runs the command
+  under `python -X importtime` and prints the slowest imports
+- serve_from_daemon(): answer a command from doe_server.py if it is
+  running, so the caller can skip the work
+
+Usage:
+    # First lines of a script
+    from doe_bootstrap import lazy_import, load_env, profile_startup
+    profile_startup()
+    requests = lazy_import("requests")
+    load_env()
+
+    # Any script: where does startup time go?
+    python execution/doe_utils.py list --startup-profile
+
+    # Enforce the startup budget
+    python execution/doe_bootstrap.py --benchmark
+"""
+
+import os
+import sys
+
+# =============================================================================
+# VERSION
+# =============================================================================
+DOE_VERSION = "2026.10.19"
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+ENV_FILE = ".env"
+PROFILE_FLAG = "--startup-profile"
+DAEMON_SOCKET = ".tmp/doe.sock"
+
+# Escapes resolved inside double-quoted .env values
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r"}
+
+# Total cold-start target on a normal install (python itself starts in ~15-25 ms)
+STARTUP_TARGET_MS = 50
+# What the benchmark enforces: time added on top of `python -c pass`,
+# which keeps the gate stable across machines with slow site-packages
+OVERHEAD_BUDGET_MS = 30
+
+BENCHMARK_TARGETS = [
+    ["execution/doe_utils.py", "list"],
+    ["execution/sync_agent_files.py", "--check"],
+    ["execution/setup-resend-integration.py", "--help"],
+]
+
+
+# =============================================================================
+# LAZY IMPORTS
+# =============================================================================
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access."""
+
+    def __init__(self, name: str):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            __import__(self._name)
+            module = sys.modules[self._name]
+            self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name: str):
+    """
+    Return `name` if it is already imported, otherwise a LazyModule.
+
+    Args:
+        name: Dotted module name, e.g. "requests" or "email.mime.text"
+
+    Returns:
+        The module, or a proxy that imports it on first use
+    """
+    return sys.modules.get(name) or LazyModule(name)
+
+
+# =============================================================================
+# ENVIRONMENT
+# =============================================================================
+
+_env_cache: dict[str, dict[str, str]] = {}
+
+
+def find_env_file(filename: str = ENV_FILE) -> str | None:
+    """Look for .env in the working directory, then up from the running script."""
+    candidates = [os.getcwd()]
+    if sys.argv and sys.argv[0]:
+        directory = os.path.dirname(os.path.abspath(sys.argv[0]))
+        while True:
+            candidates.append(directory)
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                break
+            directory = parent
+    for directory in candidates:
+        path = os.path.join(directory, filename)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def _expand(value: str, values: dict[str, str]) -> str:
+    """Expand ${VAR} from earlier .env entries or the environment, like python-dotenv."""
+    if "${" not in value:
+        return value
+    out = []
+    i = 0
+    while i < len(value):
+        start = value.find("${", i)
+        end = value.find("}", start + 2) if start >= 0 else -1
+        if start < 0 or end < 0:
+            out.append(value[i:])
+            break
+        out.append(value[i:start])
+        name, _, default = value[start + 2:end].partition(":-")
+        out.append(os.environ.get(name) or values.get(name) or default)
+        i = end + 1
+    return "".join(out)
+
+
+def parse_env(text: str) -> dict[str, str]:
+    """
+    Parse .env text the way python-dotenv does for the files we use:
+    KEY=VALUE lines, optional `export`, # comments, quoted values (double
+    quotes also take \\n escapes, either may span lines), trailing
+    ` # comments` on unquoted values, and ${VAR} / ${VAR:-default}.
+    """
+    values: dict[str, str] = {}
+    lines = text.splitlines()
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+        i += 1
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("export "):
+            line = line[7:].lstrip()
+        key, sep, raw = line.partition("=")
+        key = key.strip()
+        if not sep or not key:
+            continue
+        raw = raw.strip()
+        if raw[:1] in ("'", '"'):
+            quote = raw[0]
+            body = raw[1:]
+            # Quoted values may span lines
+            while not _closes(body, quote) and i < len(lines):
+                body += "\n" + lines[i]
+                i += 1
+            body = body[:_closing_index(body, quote)]
+            if quote == '"' and "\\" in body:
+                body = _unescape(body)
+            values[key] = _expand(body, values)
+        else:
+            hash_at = raw.find(" #")
+            if hash_at >= 0:
+                raw = raw[:hash_at].rstrip()
+            values[key] = _expand(raw, values)
+    return values
+
+
+def _unescape(body: str) -> str:
+    """Resolve backslash escapes in one pass, so `\\\\n` stays a backslash and an n."""
+    import re
+    return re.sub(r"\\(.)", lambda m: _ESCAPES.get(m.group(1), m.group(1)), body, flags=re.DOTALL)
+
+
+def _closing_index(body: str, quote: str) -> int:
+    escaped = False
+    for index, char in enumerate(body):
+        if escaped:
+            escaped = False
+        elif char == "\\" and quote == '"':
+            escaped = True
+        elif char == quote:
+            return index
+    return -1
+
+
+def _closes(body: str, quote: str) -> bool:
+    return _closing_index(body, quote) >= 0
+
+
+def load_env(path: str | None = None, override: bool = False) -> dict[str, str]:
+    """
+    Load .env into os.environ, parsing each file at most once per process.
+
+    Drop-in for `load_dotenv()`: existing environment variables win unless
+    `override` is set.
+
+    Args:
+        path: .env path (default: found with find_env_file)
+        override: Replace variables that are already set
+
+    Returns:
+        The values read from the file ({} if there is none)
+    """
+    path = str(path) if path else find_env_file()
+    if path is None:
+        return {}
+    key = os.path.abspath(path)
+    values = _env_cache.get(key)
+    if values is None:
+        try:
+            with open(key, encoding="utf-8") as f:
+                values = parse_env(f.read())
+        except OSError:
+            values = {}
+        _env_cache[key] = values
+    for name, value in values.items():
+        if override or name not in os.environ:
+            os.environ[name] = value
+    return values
+
+
+# =============================================================================
+# COMMAND SERVER CLIENT
+# =============================================================================
+
+def daemon_request(request: dict, timeout: float = 5.0) -> dict | None:
+    """
+    Send one JSON request to doe_server.py over its Unix socket.
+
+    Returns:
+        The response dict, or None if no server is listening
+    """
+    if not os.path.exists(DAEMON_SOCKET):
+        return None
+    import json
+    import socket
+
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(DAEMON_SOCKET)
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            chunks = []
+            while chunk := sock.recv(65536):
+                chunks.append(chunk)
+        return json.loads(b"".join(chunks))
+    except (OSError, ValueError):
+        return None
+
+
+def serve_from_daemon(request: dict) -> int | None:
+    """
+    Print the server's answer to `request` and return its exit code.
+
+    Returns None when there is no server, it cannot answer, or
+    DOE_NO_DAEMON is set; the caller then runs the command in-process.
+    """
+    if os.environ.get("DOE_NO_DAEMON"):
+        return None
+    response = daemon_request(request)
+    if not response or not response.get("ok"):
+        return None
+    sys.stdout.write(response["output"])
+    return response.get("exit", 0)
+
+
+# =============================================================================
+# STARTUP PROFILING
+# =============================================================================
+
+def profile_startup(top: int = 15):
+    """
+    If --startup-profile is on the command line, re-run the same command
+    under `python -X importtime`, print where startup went, and exit.
+    Otherwise return immediately.
+    """
+    if PROFILE_FLAG not in sys.argv:
+        return
+    import time
+    import subprocess
+
+    argv = [a for a in sys.argv if a != PROFILE_FLAG]
+    started = time.perf_counter()
+    child = subprocess.run([sys.executable, "-X", "importtime", *argv],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    wall_ms = (time.perf_counter() - started) * 1000
+
+    imports = []
+    for line in child.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            depth = (len(name) - len(name.lstrip())) // 2
+            imports.append((int(cumulative) / 1000, depth, name.strip()))
+    top_level = sum(ms for ms, depth, _ in imports if depth == 0)
+
+    print(f"[startup-profile] {' '.join(argv)}")
+    print(f"  Wall time: {wall_ms:.1f} ms (exit {child.returncode}), imports: {top_level:.1f} ms")
+    print()
+    print("  SLOWEST TOP-LEVEL IMPORTS (cumulative)")
+    for ms, _, name in sorted((i for i in imports if i[1] == 0), reverse=True)[:top]:
+        print(f"  {ms:>8.1f} ms  {name}")
+    sys.exit(0)
+
+
+def run_benchmark(runs: int, budget_ms: float) -> bool:
+    """Median cold start of each target vs a bare interpreter; True if all are within budget."""
+    import time
+    import statistics
+    import subprocess
+
+    def measure(command: list[str]) -> float:
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)  # warm .pyc
+        samples = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            samples.append((time.perf_counter() - started) * 1000)
+        return statistics.median(samples)
+
+    baseline = measure([sys.executable, "-c", "pass"])
+    print(f"  {'python -c pass':<48} {baseline:>7.1f} ms")
+    ok = True
+    for target in BENCHMARK_TARGETS:
+        total = measure([sys.executable, *target])
+        overhead = total - baseline
+        passed = overhead <= budget_ms
+        ok &= passed
+        mark = "✅" if passed else "❌"
+        print(f"{mark} {' '.join(target):<48} {total:>7.1f} ms  (+{overhead:.1f} ms over python)")
+    print()
+    print(f"  Budget: +{budget_ms:g} ms over the interpreter (target {STARTUP_TARGET_MS} ms total)")
+    if baseline > STARTUP_TARGET_MS - budget_ms:
+        print(f"  ⚠️ The interpreter alone takes {baseline:.0f} ms here; check site-packages .pth files")
+    if sys.dont_write_bytecode:
+        print("  ⚠️ PYTHONDONTWRITEBYTECODE is set, so every run recompiles the scripts")
+    return ok
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="DOE startup helpers and startup-time benchmark")
+    parser.add_argument("--benchmark", action="store_true", help="Measure cold start of the core scripts")
+    parser.add_argument("--runs", type=int, default=15, help="Runs per command (default: 15)")
+    parser.add_argument("--budget", type=float, default=OVERHEAD_BUDGET_MS,
+                        help=f"Allowed ms over a bare interpreter (default: {OVERHEAD_BUDGET_MS})")
+    args = parser.parse_args()
+
+    print(f"[doe_bootstrap] v{DOE_VERSION}")
+    print()
+
+    if args.benchmark:
+        return 0 if run_benchmark(args.runs, args.budget) else 1
+    parser.print_help()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
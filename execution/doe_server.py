@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Script: doe_server.py
+Directive: directives/doe_server.md
+DOE Framework: v2.0.0
+
+Purpose:
+    Optional long-lived command server for the framework utilities. Agents
+    call `doe_utils.py list|costs|check-versions` and
+    `sync_agent_files.py --check` many times per session; each call globs
+    and re-reads the same files. The server keeps the results in memory
+    and answers over a Unix socket (.tmp/doe.sock) with one JSON line per
+    request and one per response.
+
+    Cached answers are checked against the size and mtime of every file
+    they were built from, so they are never stale. The cost log is read
+    incrementally: only lines appended since the last request are parsed.
+
+    The scripts stay the entry point. They ask the server first and fall
+    back to doing the work in-process when it is not running (or when
+    DOE_NO_DAEMON is set), with identical output.
+
+Cost:
+    Free
+
+Usage:
+    # Start in the background (stops itself after 30 min idle)
+    python execution/doe_server.py start
+
+    # Is it running? What has it served?
+    python execution/doe_server.py status
+
+    # Stop it
+    python execution/doe_server.py stop
+
+    # Compare CLI latency with and without the server
+    python execution/doe_server.py benchmark
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import subprocess
+from contextlib import redirect_stdout
+from datetime import date
+from pathlib import Path
+
+from doe_bootstrap import DAEMON_SOCKET, daemon_request
+import doe_utils
+import sync_agent_files
+
+# =============================================================================
+# VERSION - Must match directive version
+# =============================================================================
+DOE_VERSION = "2026.10.19"
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DIRECTIVES_DIR = "directives"
+EXECUTION_DIR = "execution"
+COST_LOG = ".tmp/cost_log.jsonl"
+LOG_FILE = ".tmp/doe_server.log"
+
+DEFAULT_IDLE_TIMEOUT = 1800
+START_TIMEOUT = 5
+
+# A server answering from old code would be wrong, so it exits when any of
+# these change and the next call falls back to in-process
+SOURCE_FILES = ["doe_server.py", "doe_utils.py", "sync_agent_files.py", "doe_bootstrap.py"]
+
+
+# =============================================================================
+# FILE STATE
+# =============================================================================
+
+def file_state(path: str) -> tuple:
+    """(path, mtime_ns, size), or (path, None, None) if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return (path, None, None)
+    return (path, st.st_mtime_ns, st.st_size)
+
+
+def tree_state(directory: str, suffix: str) -> tuple:
+    """file_state of every `*suffix` file in `directory`, in name order."""
+    try:
+        names = sorted(e.name for e in os.scandir(directory) if e.name.endswith(suffix))
+    except OSError:
+        return ()
+    return tuple(file_state(os.path.join(directory, name)) for name in names)
+
+
+class CostLog:
+    """The cost log in memory, extended with only the lines appended since the last refresh."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = []
+        self.offset = 0
+        self.inode = None
+
+    def refresh(self) -> tuple:
+        """Read new lines. Returns a key that changes whenever the entries do."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self.entries, self.offset, self.inode = [], 0, None
+            return (None, 0)
+
+        # Replaced or truncated: start over
+        if st.st_ino != self.inode or st.st_size < self.offset:
+            self.entries, self.offset, self.inode = [], 0, st.st_ino
+
+        if st.st_size > self.offset:
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                data = f.read()
+            # Leave a partly written last line for the next refresh
+            end = data.rfind(b"\n") + 1
+            for line in data[:end].splitlines():
+                if line.strip():
+                    self.entries.append(json.loads(line))
+            self.offset += end
+
+        return (self.inode, self.offset)
+
+
+# =============================================================================
+# SERVER
+# =============================================================================
+
+class CommandServer:
+    """Answers list / costs / check-versions / check from memory."""
+
+    def __init__(self, idle_timeout: float):
+        self.idle_timeout = idle_timeout
+        self.cache = {}
+        self.cost_log = CostLog(COST_LOG)
+        self.sources = tuple(file_state(os.path.join(EXECUTION_DIR, name)) for name in SOURCE_FILES)
+        self.started = time.time()
+        self.last_request = time.monotonic()
+        self.stats = {"requests": 0, "hits": 0, "misses": 0}
+        self.stopping = None
+
+    def render(self, key: tuple, state: tuple, function, *args) -> tuple[str, int]:
+        """Output and exit code of `function(*args)`, reused while `state` is unchanged."""
+        cached = self.cache.get(key)
+        if cached and cached[0] == state:
+            self.stats["hits"] += 1
+            return cached[1], cached[2]
+
+        self.stats["misses"] += 1
+        buffer = io.StringIO()
+        with redirect_stdout(buffer):
+            exit_code = function(*args) or 0
+        self.cache[key] = (state, buffer.getvalue(), exit_code)
+        return buffer.getvalue(), exit_code
+
+    def handle(self, request: dict) -> dict:
+        command = request.get("command")
+        self.stats["requests"] += 1
+
+        if command == "stop":
+            self.stopping.set()
+            return {"ok": True, "output": "", "exit": 0}
+
+        current = tuple(file_state(os.path.join(EXECUTION_DIR, name)) for name in SOURCE_FILES)
+        if current != self.sources:
+            self.stopping.set()
+            return {"ok": False, "error": "scripts changed, server is exiting"}
+
+        if command == "ping":
+            return {"ok": True, "output": "", "exit": 0, "pid": os.getpid(),
+                    "root": os.getcwd(), "started": self.started, "stats": self.stats,
+                    "cost_entries": len(self.cost_log.entries), "version": DOE_VERSION}
+
+        if command == "list":
+            output, exit_code = self.render(
+                ("list",), tree_state(DIRECTIVES_DIR, ".md"), doe_utils.list_directives)
+
+        elif command == "check-versions":
+            state = tree_state(DIRECTIVES_DIR, ".md") + tree_state(EXECUTION_DIR, ".py")
+            output, exit_code = self.render(("check-versions",), state, doe_utils.check_versions)
+
+        elif command == "costs":
+            filter_type = request.get("filter", "all")
+            filter_value = request.get("value")
+            if filter_type not in ("all", "month", "today", "workflow"):
+                return {"ok": False, "error": f"unknown cost filter: {filter_type}"}
+            # "today" moves at midnight even if the log does not
+            state = (self.cost_log.refresh(), date.today().isoformat())
+            output, exit_code = self.render(("costs", filter_type, filter_value), state,
+                                            doe_utils.cost_report, filter_type, filter_value,
+                                            self.cost_log.entries)
+
+        elif command == "check":
+            state = tuple(file_state(name) for name in sync_agent_files.AGENT_FILES)
+            output, exit_code = self.render(("check",), state, sync_agent_files.report_check)
+
+        else:
+            return {"ok": False, "error": f"unknown command: {command}"}
+
+        return {"ok": True, "output": output, "exit": exit_code}
+
+    async def on_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.last_request = time.monotonic()
+        try:
+            line = await reader.readline()
+            try:
+                response = self.handle(json.loads(line))
+            except Exception as e:
+                # The client falls back to in-process, which reports the error properly
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self):
+        self.stopping = asyncio.Event()
+        Path(DAEMON_SOCKET).parent.mkdir(parents=True, exist_ok=True)
+        server = await asyncio.start_unix_server(self.on_client, path=DAEMON_SOCKET)
+        os.chmod(DAEMON_SOCKET, 0o600)
+        socket_inode = os.stat(DAEMON_SOCKET).st_ino
+        print(f"🟢 Listening on {DAEMON_SOCKET} (pid {os.getpid()}, root {os.getcwd()})", flush=True)
+
+        try:
+            while not self.stopping.is_set():
+                idle = time.monotonic() - self.last_request
+                if idle >= self.idle_timeout:
+                    print(f"💤 Idle for {idle:.0f}s, exiting", flush=True)
+                    break
+                try:
+                    await asyncio.wait_for(self.stopping.wait(), timeout=min(60, self.idle_timeout - idle))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            server.close()
+            await server.wait_closed()
+            # A replacement server may already own the path
+            try:
+                if os.stat(DAEMON_SOCKET).st_ino == socket_inode:
+                    os.unlink(DAEMON_SOCKET)
+            except OSError:
+                pass
+        print(f"🔴 Stopped after {self.stats['requests']} requests "
+              f"({self.stats['hits']} from cache)", flush=True)
+
+
+# =============================================================================
+# CONTROL
+# =============================================================================
+
+def ping() -> dict | None:
+    response = daemon_request({"command": "ping"}, timeout=2)
+    return response if response and response.get("ok") else None
+
+
+def serve(idle_timeout: float):
+    """Run the server in the foreground."""
+    if ping():
+        raise RuntimeError(f"A server is already listening on {DAEMON_SOCKET}")
+    # Left behind by a server that was killed
+    if os.path.exists(DAEMON_SOCKET):
+        os.unlink(DAEMON_SOCKET)
+    asyncio.run(CommandServer(idle_timeout).serve())
+
+
+def start(idle_timeout: float) -> dict:
+    """Start the server in the background and wait until it answers."""
+    running = ping()
+    if running:
+        return running
+
+    Path(LOG_FILE).parent.mkdir(parents=True, exist_ok=True)
+    with open(LOG_FILE, "a") as log:
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "serve", "--idle-timeout", str(idle_timeout)],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        running = ping()
+        if running:
+            return running
+    raise RuntimeError(f"Server did not start within {START_TIMEOUT}s, see {LOG_FILE}")
+
+
+def stop() -> bool:
+    """Ask the server to exit. Returns False if none was running."""
+    if not ping():
+        return False
+    daemon_request({"command": "stop"})
+    deadline = time.monotonic() + START_TIMEOUT
+    while os.path.exists(DAEMON_SOCKET) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return True
+
+
+def benchmark(runs: int) -> list[dict]:
+    """Median wall time of each CLI command without and with the server."""
+    import statistics
+
+    commands = [
+        [os.path.join(EXECUTION_DIR, "doe_utils.py"), "list"],
+        [os.path.join(EXECUTION_DIR, "doe_utils.py"), "costs"],
+        [os.path.join(EXECUTION_DIR, "doe_utils.py"), "check-versions"],
+        [os.path.join(EXECUTION_DIR, "sync_agent_files.py"), "--check"],
+    ]
+
+    def run(command: list[str], env: dict) -> float:
+        started = time.perf_counter()
+        subprocess.run([sys.executable, *command], env=env,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return (time.perf_counter() - started) * 1000
+
+    direct_env = {**os.environ, "DOE_NO_DAEMON": "1"}
+    served_env = {k: v for k, v in os.environ.items() if k != "DOE_NO_DAEMON"}
+    results = []
+    for command in commands:
+        # Warm up both paths, then alternate so drift hits both equally
+        run(command, direct_env)
+        run(command, served_env)
+        direct, served = [], []
+        for _ in range(runs):
+            direct.append(run(command, direct_env))
+            served.append(run(command, served_env))
+        results.append({"command": " ".join(command),
+                        "in_process_ms": statistics.median(direct),
+                        "server_ms": statistics.median(served)})
+    return results
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-lived server for the DOE utility commands")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    for name, help_text in (("start", "Start in the background"), ("serve", "Run in the foreground")):
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument("--idle-timeout", type=float, default=DEFAULT_IDLE_TIMEOUT,
+                         help=f"Exit after this many idle seconds (default: {DEFAULT_IDLE_TIMEOUT})")
+
+    subparsers.add_parser("stop", help="Stop the running server")
+    subparsers.add_parser("status", help="Show whether a server is running")
+
+    bench_parser = subparsers.add_parser("benchmark", help="CLI latency with and without the server")
+    bench_parser.add_argument("--runs", type=int, default=10, help="Runs per command (default: 10)")
+
+    args = parser.parse_args()
+
+    print(f"[doe_server] v{DOE_VERSION}")
+    print()
+
+    if not hasattr(socket, "AF_UNIX"):
+        print("❌ Error: Unix sockets are not available on this platform; the scripts run in-process")
+        return 1
+
+    try:
+        if args.command == "serve":
+            serve(args.idle_timeout)
+
+        elif args.command == "start":
+            info = start(args.idle_timeout)
+            print(f"✅ Server running (pid {info['pid']}) on {DAEMON_SOCKET}")
+
+        elif args.command == "stop":
+            print("✅ Server stopped" if stop() else "Server was not running")
+
+        elif args.command == "status":
+            info = ping()
+            if not info:
+                print("Server is not running; commands run in-process")
+                return 1
+            stats = info["stats"]
+            uptime = time.time() - info["started"]
+            print(f"🟢 Running (pid {info['pid']}, v{info['version']}, up {uptime / 60:.0f} min)")
+            print(f"   Root: {info['root']}")
+            print(f"   Requests: {stats['requests']} ({stats['hits']} cached, {stats['misses']} rebuilt)")
+            print(f"   Cost log entries in memory: {info['cost_entries']}")
+
+        elif args.command == "benchmark":
+            started_here = not ping()
+            if started_here:
+                start(DEFAULT_IDLE_TIMEOUT)
+            try:
+                results = benchmark(args.runs)
+            finally:
+                if started_here:
+                    stop()
+            print(f"  {'Command':<40} {'In-process':>11} {'Server':>9}")
+            for r in results:
+                print(f"  {r['command']:<40} {r['in_process_ms']:>8.1f} ms {r['server_ms']:>6.1f} ms")
+
+        else:
+            parser.print_help()
+        return 0
+
+    except KeyboardInterrupt:
+        print("\n⚠️ Stopped")
+        return 130
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
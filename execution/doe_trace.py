@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+DOE Framework Tracing
+Version: 2.0.0
+
+Instrumentation for execution scripts, wired into _TEMPLATE.py:
+
+- Trace(workflow): one per run. Times named steps with trace.span(),
+  writes them as JSONL to .tmp/traces/<workflow>.jsonl and logs the run
+  (costs, duration, status) through doe_utils.log_cost() when it ends,
+  including runs that fail or are interrupted
+- --profile cpu|memory|all: cProfile and/or tracemalloc for the whole run,
+  added to any script with add_trace_arguments(parser)
+- report: slowest steps per workflow across recent runs
+
+Usage:
+    # In a script
+    from doe_trace import Trace, add_trace_arguments
+
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    with Trace.from_args("daily_report", args) as trace:
+        with trace.span("fetch", rows=500):
+            ...
+        trace.add_cost("anthropic", 0.15)
+
+    # Profile a run without editing code
+    python execution/daily_report.py --profile cpu
+
+    # Which steps are slow?
+    python execution/doe_trace.py report --workflow daily_report --last 20
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+# =============================================================================
+# VERSION
+# =============================================================================
+DOE_VERSION = "2026.10.19"
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+TRACE_DIR = ".tmp/traces"
+PROFILE_MODES = ("cpu", "memory", "all")
+PROFILE_TOP = 15
+
+
+# =============================================================================
+# TRACE
+# =============================================================================
+
+class Trace:
+    """Spans, costs and optional profiling for one run of a workflow."""
+
+    def __init__(self, workflow: str, profile: str | None = None,
+                 trace_dir: str = TRACE_DIR, log_costs: bool = True):
+        if profile and profile not in PROFILE_MODES:
+            raise ValueError(f"profile must be one of {', '.join(PROFILE_MODES)}")
+        self.workflow = workflow
+        self.profile = profile
+        self.trace_dir = Path(trace_dir)
+        self.log_costs = log_costs
+        self.run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        self.costs: dict[str, float] = {}
+        self.spans: list[dict] = []
+        self.stack: list[str] = []
+        self.started = None
+        self.profiler = None
+        self.finished = False
+
+    @classmethod
+    def from_args(cls, workflow: str, args, **kwargs) -> "Trace":
+        """Trace configured from the flags added by add_trace_arguments()."""
+        return cls(workflow, profile=getattr(args, "profile", None), **kwargs)
+
+    # -------------------------------------------------------------------------
+    # Run lifetime
+    # -------------------------------------------------------------------------
+
+    def start(self) -> "Trace":
+        self.started = time.perf_counter()
+        self.wall_started = time.time()
+        if self.profile in ("memory", "all"):
+            import tracemalloc
+            tracemalloc.start()
+        if self.profile in ("cpu", "all"):
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        return self
+
+    def __enter__(self) -> "Trace":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.finish("ok", 0)
+        elif issubclass(exc_type, SystemExit):
+            code = exc.code if isinstance(exc.code, int) else (0 if exc.code is None else 1)
+            self.finish("ok" if code == 0 else "error", code)
+        elif issubclass(exc_type, KeyboardInterrupt):
+            self.finish("interrupted", 130)
+        else:
+            self.finish("error", 1, error=f"{exc_type.__name__}: {exc}")
+        return False
+
+    def finish(self, status: str = "ok", exit_code: int = 0, error: str | None = None) -> dict:
+        """Stop profiling, write the trace and log the run. Safe to call twice."""
+        if self.finished:
+            return {}
+        self.finished = True
+        duration_ms = (time.perf_counter() - self.started) * 1000
+
+        run = {
+            "type": "run",
+            "run_id": self.run_id,
+            "workflow": self.workflow,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.wall_started)),
+            "argv": sys.argv[1:],
+            "status": status,
+            "exit_code": exit_code,
+            "duration_ms": round(duration_ms, 2),
+            "costs": self.costs,
+            "spans": len(self.spans),
+        }
+        if error:
+            run["error"] = error
+
+        self.trace_dir.mkdir(parents=True, exist_ok=True)
+        if self.profiler:
+            self.profiler.disable()
+            run["cpu_profile"] = str(self.trace_dir / f"{self.workflow}-{self.run_id}.prof")
+            self.profiler.dump_stats(run["cpu_profile"])
+        if self.profile in ("memory", "all"):
+            run["memory"] = self._memory_summary()
+
+        import json
+        with open(self.trace_dir / f"{self.workflow}.jsonl", "a") as f:
+            for span in self.spans:
+                f.write(json.dumps(span) + "\n")
+            f.write(json.dumps(run) + "\n")
+
+        if self.log_costs:
+            from doe_utils import log_cost
+            extra = {
+                "run_id": self.run_id,
+                "status": status,
+                "duration_s": round(duration_ms / 1000, 3),
+            }
+            # Set by pipeline_runner.py for the scripts it runs
+            if os.environ.get("DOE_PIPELINE_STAGE"):
+                extra["pipeline_stage"] = os.environ["DOE_PIPELINE_STAGE"]
+            log_cost(self.workflow, self.costs, extra=extra)
+
+        self._print_summary(run)
+        return run
+
+    # -------------------------------------------------------------------------
+    # Recording
+    # -------------------------------------------------------------------------
+
+    def span(self, name: str, **attrs) -> "Span":
+        """Time a named step: `with trace.span("fetch", rows=500): ...`"""
+        return Span(self, name, attrs)
+
+    def add_cost(self, service: str, usd: float):
+        """Add to this run's cost for a service (logged when the run ends)."""
+        self.costs[service] = self.costs.get(service, 0.0) + usd
+
+    # -------------------------------------------------------------------------
+    # Output
+    # -------------------------------------------------------------------------
+
+    def _memory_summary(self) -> dict:
+        import tracemalloc
+
+        # Leave out the profilers' own allocations
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "*/cProfile.py"),
+            tracemalloc.Filter(False, "*/profile.py"),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        top = [
+            {"where": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+             "kb": round(stat.size / 1024, 1), "blocks": stat.count}
+            for stat in snapshot.statistics("lineno")[:PROFILE_TOP]
+        ]
+        return {"peak_kb": round(peak / 1024, 1), "top": top}
+
+    def _print_summary(self, run: dict):
+        top_level = [s for s in self.spans if s["depth"] == 0]
+        line = f"⏱️ {self.workflow}: {run['duration_ms'] / 1000:.2f}s {run['status']}"
+        if top_level:
+            slowest = max(top_level, key=lambda s: s["duration_ms"])
+            line += f", slowest step: {slowest['name']} ({slowest['duration_ms'] / 1000:.2f}s)"
+        print(line)
+
+        if not self.profile:
+            return
+        print()
+        print("  STEPS")
+        for span in self.spans:
+            indent = "  " * span["depth"]
+            mark = "" if span["status"] == "ok" else f"  [{span['status']}]"
+            print(f"  {span['duration_ms']:>10.1f} ms  {indent}{span['name']}{mark}")
+        if "cpu_profile" in run:
+            import io
+            import pstats
+
+            out = io.StringIO()
+            pstats.Stats(run["cpu_profile"], stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP)
+            print()
+            print(f"  CPU PROFILE (top {PROFILE_TOP} cumulative, full: {run['cpu_profile']})")
+            body = out.getvalue()
+            print(body[body.find("   ncalls"):].rstrip())
+        if "memory" in run:
+            print()
+            print(f"  MEMORY (peak {run['memory']['peak_kb']:,.0f} KB)")
+            for stat in run["memory"]["top"]:
+                print(f"  {stat['kb']:>10,.1f} KB  {stat['where']}")
+        print()
+
+
+class Span:
+    """Context manager recorded by Trace.span()."""
+
+    def __init__(self, trace: Trace, name: str, attrs: dict):
+        self.trace = trace
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self) -> "Span":
+        trace = self.trace
+        self.parent = trace.stack[-1] if trace.stack else None
+        self.depth = len(trace.stack)
+        trace.stack.append(self.name)
+        self.memory = None
+        if trace.profile in ("memory", "all"):
+            import tracemalloc
+            self.memory = tracemalloc.get_traced_memory()[0]
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ended = time.perf_counter()
+        trace = self.trace
+        trace.stack.pop()
+
+        if exc_type is None or (issubclass(exc_type, SystemExit) and not exc.code):
+            status = "ok"
+        elif issubclass(exc_type, KeyboardInterrupt):
+            status = "interrupted"
+        else:
+            status = "error"
+
+        span = {
+            "type": "span",
+            "run_id": trace.run_id,
+            "workflow": trace.workflow,
+            "name": self.name,
+            "parent": self.parent,
+            "depth": self.depth,
+            "start_ms": round((self.started - trace.started) * 1000, 2),
+            "duration_ms": round((ended - self.started) * 1000, 2),
+            "status": status,
+        }
+        if self.attrs:
+            span["attrs"] = self.attrs
+        if exc_type is not None and status == "error" and not issubclass(exc_type, SystemExit):
+            span["error"] = f"{exc_type.__name__}: {exc}"
+        if self.memory is not None:
+            import tracemalloc
+            span["memory_delta_kb"] = round((tracemalloc.get_traced_memory()[0] - self.memory) / 1024, 1)
+        trace.spans.append(span)
+        return False
+
+    def set(self, **attrs):
+        """Attach attributes known only after the step started (counts, sizes)."""
+        self.attrs.update(attrs)
+
+
+def add_trace_arguments(parser):
+    """Add --profile to a script's argparse parser."""
+    parser.add_argument("--profile", choices=PROFILE_MODES,
+                        help="Profile this run: cpu (cProfile), memory (tracemalloc) or all")
+
+
+# =============================================================================
+# REPORT
+# =============================================================================
+
+def read_runs(trace_dir: str = TRACE_DIR, workflow: str | None = None, last: int = 20) -> dict:
+    """
+    Spans of the most recent runs, grouped by workflow.
+
+    Returns:
+        {workflow: [{"run": run_record, "spans": [span, ...]}, ...]} oldest first
+    """
+    import json
+
+    runs = {}
+    for path in sorted(Path(trace_dir).glob("*.jsonl")):
+        if workflow and path.stem != workflow:
+            continue
+        pending: dict[str, list] = {}
+        finished = []
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record["type"] == "span":
+                    pending.setdefault(record["run_id"], []).append(record)
+                elif record["type"] == "run":
+                    finished.append({"run": record, "spans": pending.pop(record["run_id"], [])})
+        if finished:
+            runs[path.stem] = finished[-last:]
+    return runs
+
+
+def step_stats(runs: list[dict]) -> list[dict]:
+    """p50/p95/max duration of each step across runs, slowest p50 first."""
+    import statistics
+
+    durations: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    for run in runs:
+        for span in run["spans"]:
+            key = f"{span['parent']} > {span['name']}" if span["parent"] else span["name"]
+            durations.setdefault(key, []).append(span["duration_ms"])
+            if span["status"] != "ok":
+                errors[key] = errors.get(key, 0) + 1
+
+    stats = []
+    for key, values in durations.items():
+        values.sort()
+        stats.append({
+            "step": key,
+            "count": len(values),
+            "p50_ms": statistics.median(values),
+            "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))],
+            "max_ms": values[-1],
+            "errors": errors.get(key, 0),
+        })
+    return sorted(stats, key=lambda s: s["p50_ms"], reverse=True)
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarise execution-script traces")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    report_parser = subparsers.add_parser("report", help="Slowest steps per workflow")
+    report_parser.add_argument("--workflow", help="Only this workflow")
+    report_parser.add_argument("--last", type=int, default=20, help="Runs per workflow (default: 20)")
+    report_parser.add_argument("--dir", default=TRACE_DIR, help=f"Trace directory (default: {TRACE_DIR})")
+
+    args = parser.parse_args()
+
+    print(f"[doe_trace] v{DOE_VERSION}")
+    print()
+
+    if args.command != "report":
+        parser.print_help()
+        return 0
+
+    runs = read_runs(args.dir, args.workflow, args.last)
+    if not runs:
+        print(f"No traces in {args.dir}")
+        return 1
+
+    for workflow, workflow_runs in runs.items():
+        durations = sorted(r["run"]["duration_ms"] for r in workflow_runs)
+        failed = sum(1 for r in workflow_runs if r["run"]["status"] != "ok")
+        cost = sum(sum(r["run"]["costs"].values()) for r in workflow_runs)
+        print(f"📄 {workflow}")
+        print(f"   Runs: {len(workflow_runs)} ({failed} failed), "
+              f"median {durations[len(durations) // 2] / 1000:.2f}s, cost ${cost:.2f}")
+        print(f"   {'Step':<44} {'Count':>5} {'p50':>10} {'p95':>10} {'max':>10}")
+        for s in step_stats(workflow_runs):
+            errors = f"  ({s['errors']} failed)" if s["errors"] else ""
+            print(f"   {s['step'][:44]:<44} {s['count']:>5} {s['p50_ms']:>8.1f}ms "
+                  f"{s['p95_ms']:>8.1f}ms {s['max_ms']:>8.1f}ms{errors}")
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -21,33 +21,38 @@ Usage:
     python execution/doe_utils.py check-versions
 """
 
-import os
-import sys
-import json
 import argparse
 import re
-from datetime import datetime, timedelta
 from pathlib import Path
-from collections import defaultdict
+
+from doe_bootstrap import profile_startup, serve_from_daemon
+
+# Cost-only modules (json, datetime, collections) are imported inside the
+# functions that use them, so `list` and `check-versions` start faster
 
 
 # =============================================================================
 # COST TRACKING
 # =============================================================================
 
-def log_cost(workflow: str, costs: dict):
+def log_cost(workflow: str, costs: dict, extra: dict | None = None):
     """
     Log API costs to .tmp/cost_log.jsonl
     
     Call this at the end of any script that incurs API costs.
+    Scripts using doe_trace.Trace get this call automatically.
     
     Args:
         workflow: Name of the workflow (should match directive name)
         costs: Dict of {service_name: cost_in_usd}
+        extra: Additional fields for the entry (e.g. run_id, status, duration_s)
         
     Example:
         log_cost("daily_report", {"anthropic": 0.15, "openai": 0.05})
     """
+    import json
+    from datetime import datetime
+
     log_path = Path(".tmp/cost_log.jsonl")
     log_path.parent.mkdir(parents=True, exist_ok=True)
     
@@ -57,6 +62,9 @@ def log_cost(workflow: str, costs: dict):
         "costs": costs,
         "total": sum(costs.values())
     }
+    if extra:
+        # Never let extra fields overwrite the ones cost_report reads
+        entry.update({k: v for k, v in extra.items() if k not in entry})
     
     with open(log_path, "a") as f:
         f.write(json.dumps(entry) + "\n")
@@ -64,6 +72,8 @@ def log_cost(workflow: str, costs: dict):
 
 def read_cost_log():
     """Read all entries from cost log."""
+    import json
+
     log_path = Path(".tmp/cost_log.jsonl")
     if not log_path.exists():
         return []
@@ -76,15 +86,20 @@ def read_cost_log():
     return entries
 
 
-def cost_report(filter_type: str = "all", filter_value: str = None):
+def cost_report(filter_type: str = "all", filter_value: str = None, entries: list | None = None):
     """
     Generate cost report.
     
     Args:
         filter_type: "all", "month", "today", "workflow"
         filter_value: For month: "2025-12", for workflow: "workflow_name"
+        entries: Parsed cost log (default: read .tmp/cost_log.jsonl)
     """
-    entries = read_cost_log()
+    from datetime import datetime
+    from collections import defaultdict
+
+    if entries is None:
+        entries = read_cost_log()
     
     if not entries:
         print("No cost data found. Run some workflows first.")
@@ -199,6 +214,16 @@ def check_versions():
     print()
     
     issues = []
+
+    # Read each script once, not once per directive
+    scripts = {}
+    for script_path in sorted(execution_dir.glob("*.py")):
+        if script_path.name.startswith("_"):
+            continue
+        try:
+            scripts[script_path.name] = script_path.read_text()
+        except Exception:
+            pass
     
     for directive_path in sorted(directives_dir.glob("*.md")):
         if directive_path.name.startswith("_"):
@@ -209,16 +234,11 @@ def check_versions():
         
         # Look for matching script(s)
         script_versions = {}
-        for script_path in execution_dir.glob("*.py"):
-            if script_path.name.startswith("_"):
-                continue
+        for script_name, content in scripts.items():
             # Check if script mentions this directive
-            try:
-                content = script_path.read_text()
-                if workflow_name in content or directive_path.name in content:
-                    script_versions[script_path.name] = extract_script_version(script_path)
-            except Exception:
-                pass
+            if workflow_name in content or directive_path.name in content:
+                match = re.search(r'DOE_VERSION\s*=\s*["\']([^"\']+)["\']', content)
+                script_versions[script_name] = match.group(1) if match else "NOT_FOUND"
         
         # Report
         print(f"📄 {directive_path.name}")
@@ -296,6 +316,8 @@ def list_directives():
 # =============================================================================
 
 def main():
+    profile_startup()
+
     parser = argparse.ArgumentParser(
         description="DOE Framework Utilities",
         formatter_class=argparse.RawDescriptionHelpFormatter
@@ -318,21 +340,28 @@ def main():
     
     args = parser.parse_args()
     
+    # Each command is answered by the DOE command server when it is running,
+    # in-process otherwise
     if args.command == "costs":
         if args.today:
-            cost_report("today")
+            filter_type, filter_value = "today", None
         elif args.month:
-            cost_report("month", args.month)
+            filter_type, filter_value = "month", args.month
         elif args.workflow:
-            cost_report("workflow", args.workflow)
+            filter_type, filter_value = "workflow", args.workflow
         else:
-            cost_report("all")
+            filter_type, filter_value = "all", None
+        request = {"command": "costs", "filter": filter_type, "value": filter_value}
+        if serve_from_daemon(request) is None:
+            cost_report(filter_type, filter_value)
     
     elif args.command == "list":
-        list_directives()
+        if serve_from_daemon({"command": "list"}) is None:
+            list_directives()
     
     elif args.command == "check-versions":
-        check_versions()
+        if serve_from_daemon({"command": "check-versions"}) is None:
+            check_versions()
     
     else:
         parser.print_help()
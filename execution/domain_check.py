@@ -0,0 +1,890 @@
+#!/usr/bin/env python3
+"""
+Script: domain_check.py
+Directive: directives/domain_check.md
+DOE Framework: v2.0.0
+
+Purpose:
+    Find recipient domains that can no longer receive mail before anything
+    is sent to them. Dormant lists collected years ago carry plenty of
+    domains that have since expired or stopped taking mail, and every send
+    to one is a bounce against the sending domain's reputation.
+
+    Addresses are reduced to their unique domains, and each domain is
+    resolved once: MX first, then A/AAAA (the implicit MX of RFC 5321).
+    Lookups run concurrently on asyncio over a single UDP socket, through a
+    small built-in DNS client. Results go into a SQLite cache with a TTL, so
+    later imports only resolve domains they have not seen.
+
+    A stub DNS server serving a JSON zone is built in, for trying the check
+    (and the benchmark) without touching real DNS.
+
+Cost:
+    Free (DNS lookups only)
+
+Usage:
+    # Check the domains of one or more lists
+    python execution/domain_check.py check .tmp/hygiene/clean.csv
+
+    # Look up single domains (cached results are reused)
+    python execution/domain_check.py lookup example.com gone-since-2019.com
+
+    # Serve a zone file locally and check against it
+    python execution/domain_check.py stub --zone zone.json --port 5353
+    python execution/domain_check.py --nameserver 127.0.0.1:5353 check list.csv
+
+    # 20k contacts: per-contact sequential vs unique + concurrent + cached
+    python execution/domain_check.py benchmark
+
+    # From other scripts
+    from domain_check import check_domains
+    results, stats = check_domains(["example.com", "gone.com"])
+    dead = [d for d, r in results.items() if r.dead]
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import random
+import socket
+import struct
+import sqlite3
+import asyncio
+import argparse
+import tempfile
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+# =============================================================================
+# VERSION - Must match directive version
+# =============================================================================
+DOE_VERSION = "2026.10.19"
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+CACHE_PATH = ".tmp/domain_cache.db"
+OUTPUT_DIR = ".tmp/domains"
+
+# Resolver to ask; defaults to the first nameserver in /etc/resolv.conf
+NAMESERVER = os.getenv("DNS_NAMESERVER")
+FALLBACK_NAMESERVER = "1.1.1.1"
+
+# Resolved alongside every batch; if it has no MX, the resolver is broken or
+# filtered (no network, captive portal) and nothing is cached or marked dead
+CANARY_DOMAIN = "gmail.com"
+
+DEFAULT_CONCURRENCY = 50
+DEFAULT_TIMEOUT = 2.0
+DEFAULT_ATTEMPTS = 3
+
+# DNS TTLs are often minutes; imports are days apart. Answers are kept at
+# least a day and at most 30 days, whatever TTL the zone publishes.
+# Lookups that fail (timeout, SERVFAIL) are not cached.
+MIN_CACHE_TTL = 86400
+MAX_CACHE_TTL = 30 * 86400
+
+# EDNS0 UDP payload size (DNS flag day 2020 value)
+EDNS_PAYLOAD = 1232
+
+# Record types and response codes
+A, NS, CNAME, SOA, MX, AAAA, OPT = 1, 2, 5, 6, 15, 28, 41
+NOERROR, SERVFAIL, NXDOMAIN = 0, 2, 3
+RCODE_NAMES = {"NOERROR": NOERROR, "SERVFAIL": SERVFAIL, "NXDOMAIN": NXDOMAIN, "REFUSED": 5}
+
+# Domain statuses. The first two can receive mail; "error" means the
+# lookup failed and says nothing about the domain.
+STATUS_MX = "mx"              # MX records
+STATUS_A = "a"                # No MX, but an address (implicit MX)
+STATUS_NXDOMAIN = "nxdomain"  # Domain does not exist
+STATUS_NULL_MX = "null_mx"    # "MX 0 ." - declares it accepts no mail (RFC 7505)
+STATUS_NO_MAIL = "no_mail"    # Exists, but no MX and no address
+STATUS_ERROR = "error"        # Timeout or server failure
+
+DEAD_STATUSES = frozenset({STATUS_NXDOMAIN, STATUS_NULL_MX, STATUS_NO_MAIL})
+
+
+# =============================================================================
+# ERRORS
+# =============================================================================
+
+class ResolverError(Exception):
+    """The resolver gives answers that cannot be trusted."""
+
+
+# =============================================================================
+# DNS MESSAGES
+# =============================================================================
+
+def encode_name(name: str) -> bytes:
+    """Encode a domain name as DNS labels (no compression)."""
+    out = bytearray()
+    for label in name.rstrip(".").split("."):
+        if label:
+            raw = label.encode("ascii")
+            if len(raw) > 63:
+                raise ValueError(f"Label too long: {label[:20]}...")
+            out.append(len(raw))
+            out += raw
+    out.append(0)
+    return bytes(out)
+
+
+def read_name(msg: bytes, pos: int) -> tuple[str, int]:
+    """
+    Read a (possibly compressed) name at pos.
+
+    Returns:
+        Tuple of (lowercased name without trailing dot, position after the name)
+    """
+    labels = []
+    end = None
+    for _ in range(128):
+        length = msg[pos]
+        if length & 0xC0 == 0xC0:
+            if end is None:
+                end = pos + 2
+            pos = ((length & 0x3F) << 8) | msg[pos + 1]
+        elif length == 0:
+            return ".".join(labels).lower(), end if end is not None else pos + 1
+        else:
+            labels.append(msg[pos + 1:pos + 1 + length].decode("ascii", "replace"))
+            pos += 1 + length
+    raise ValueError("Compression loop in DNS name")
+
+
+def build_query(qid: int, name: str, qtype: int) -> bytes:
+    """Recursive query with an EDNS0 OPT record advertising EDNS_PAYLOAD."""
+    header = struct.pack("!HHHHHH", qid, 0x0100, 1, 0, 0, 1)
+    question = encode_name(name) + struct.pack("!HH", qtype, 1)
+    opt = b"\x00" + struct.pack("!HHIH", OPT, EDNS_PAYLOAD, 0, 0)
+    return header + question + opt
+
+
+@dataclass
+class DnsAnswer:
+    """Parsed response: rcode, answer records and the negative-caching TTL."""
+    rcode: int
+    records: list[tuple[int, int, object]] = field(default_factory=list)  # (type, ttl, value)
+    negative_ttl: int = 0
+    truncated: bool = False
+
+    def values(self, rtype: int) -> list:
+        return [value for t, _, value in self.records if t == rtype]
+
+    def ttl(self, rtype: int) -> int:
+        return min((ttl for t, ttl, _ in self.records if t == rtype), default=0)
+
+
+def parse_response(msg: bytes) -> DnsAnswer:
+    """Parse the answer and authority sections of a response."""
+    _, flags, qdcount, ancount, nscount, _ = struct.unpack_from("!HHHHHH", msg)
+    answer = DnsAnswer(rcode=flags & 0x0F, truncated=bool(flags & 0x0200))
+
+    pos = 12
+    for _ in range(qdcount):
+        _, pos = read_name(msg, pos)
+        pos += 4
+
+    for index in range(ancount + nscount):
+        _, pos = read_name(msg, pos)
+        rtype, _, ttl, rdlength = struct.unpack_from("!HHIH", msg, pos)
+        pos += 10
+        rdata = pos
+        pos += rdlength
+
+        if index < ancount:
+            if rtype == MX:
+                preference = struct.unpack_from("!H", msg, rdata)[0]
+                answer.records.append((MX, ttl, (preference, read_name(msg, rdata + 2)[0])))
+            elif rtype == A and rdlength == 4:
+                answer.records.append((A, ttl, socket.inet_ntop(socket.AF_INET, msg[rdata:pos])))
+            elif rtype == AAAA and rdlength == 16:
+                answer.records.append((AAAA, ttl, socket.inet_ntop(socket.AF_INET6, msg[rdata:pos])))
+            elif rtype == CNAME:
+                answer.records.append((CNAME, ttl, read_name(msg, rdata)[0]))
+        elif rtype == SOA:
+            # Negative answers are cached for min(SOA TTL, SOA MINIMUM) (RFC 2308)
+            _, p = read_name(msg, rdata)
+            _, p = read_name(msg, p)
+            minimum = struct.unpack_from("!I", msg, p + 16)[0]
+            answer.negative_ttl = min(ttl, minimum)
+    return answer
+
+
+# =============================================================================
+# RESOLVER
+# =============================================================================
+
+def parse_nameserver(value: str | None) -> tuple[str, int]:
+    """'1.1.1.1', '127.0.0.1:5353', '::1' or '[::1]:5353' -> (host, port)."""
+    if not value:
+        value = NAMESERVER or system_nameserver()
+    if value.startswith("["):
+        host, _, port = value[1:].partition("]")
+        return host, int(port.lstrip(":") or 53)
+    if value.count(":") == 1:
+        host, port = value.split(":")
+        return host, int(port)
+    return value, 53
+
+
+def system_nameserver() -> str:
+    """First nameserver from /etc/resolv.conf, or FALLBACK_NAMESERVER."""
+    try:
+        for line in Path("/etc/resolv.conf").read_text().splitlines():
+            parts = line.split()
+            if len(parts) >= 2 and parts[0] == "nameserver":
+                return parts[1].split("%")[0]
+    except OSError:
+        pass
+    return FALLBACK_NAMESERVER
+
+
+class _ResolverProtocol(asyncio.DatagramProtocol):
+    def __init__(self, pending: dict):
+        self.pending = pending
+
+    def datagram_received(self, data, addr):
+        if len(data) < 12:
+            return
+        entry = self.pending.get(int.from_bytes(data[:2], "big"))
+        if entry is None:
+            return
+        future, question = entry
+        # Only accept a reply to the question that was asked
+        if data[12:12 + len(question)].lower() == question and not future.done():
+            future.set_result(data)
+
+    def error_received(self, exc):
+        pass
+
+
+class AsyncResolver:
+    """
+    Stub resolver: many queries in flight on one UDP socket, matched to
+    their replies by query id and question. Timeouts are retried; truncated
+    replies are repeated over TCP.
+    """
+
+    def __init__(self, nameserver: str | None = None, timeout: float = DEFAULT_TIMEOUT,
+                 attempts: int = DEFAULT_ATTEMPTS):
+        self.nameserver = parse_nameserver(nameserver)
+        self.timeout = timeout
+        self.attempts = attempts
+        self.pending: dict[int, tuple[asyncio.Future, bytes]] = {}
+        self.transport = None
+        self.queries = 0
+        self.timeouts = 0
+
+    async def open(self):
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(
+            lambda: _ResolverProtocol(self.pending), remote_addr=self.nameserver)
+
+    def close(self):
+        if self.transport:
+            self.transport.close()
+
+    async def query(self, name: str, qtype: int) -> DnsAnswer:
+        """Resolve one name/type. Raises asyncio.TimeoutError after all attempts."""
+        loop = asyncio.get_running_loop()
+        for _ in range(self.attempts):
+            qid = random.getrandbits(16)
+            while qid in self.pending:
+                qid = random.getrandbits(16)
+            message = build_query(qid, name, qtype)
+            future = loop.create_future()
+            self.pending[qid] = (future, message[12:-11].lower())
+            self.queries += 1
+            try:
+                self.transport.sendto(message)
+                data = await asyncio.wait_for(future, self.timeout)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                continue
+            finally:
+                self.pending.pop(qid, None)
+
+            answer = parse_response(data)
+            if answer.truncated:
+                answer = parse_response(await self._query_tcp(message))
+            return answer
+        raise asyncio.TimeoutError(f"No answer for {name} after {self.attempts} attempts")
+
+    async def _query_tcp(self, message: bytes) -> bytes:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(*self.nameserver), self.timeout)
+        try:
+            writer.write(struct.pack("!H", len(message)) + message)
+            length = struct.unpack("!H", await asyncio.wait_for(reader.readexactly(2), self.timeout))[0]
+            return await asyncio.wait_for(reader.readexactly(length), self.timeout)
+        finally:
+            writer.close()
+
+
+# =============================================================================
+# DOMAIN CHECK
+# =============================================================================
+
+@dataclass
+class DomainResult:
+    domain: str
+    status: str
+    detail: str = ""       # Best MX host, or the address for STATUS_A
+    ttl: int = 0
+    cached: bool = False
+
+    @property
+    def dead(self) -> bool:
+        return self.status in DEAD_STATUSES
+
+
+async def resolve_domain(resolver: AsyncResolver, domain: str) -> DomainResult:
+    """
+    Decide whether a domain can receive mail: MX records, else an A/AAAA
+    address (implicit MX, RFC 5321 5.1). A single "MX 0 ." is a null MX.
+    """
+    try:
+        answer = await resolver.query(domain, MX)
+        if answer.rcode == NXDOMAIN:
+            return DomainResult(domain, STATUS_NXDOMAIN, ttl=answer.negative_ttl)
+        if answer.rcode != NOERROR:
+            return DomainResult(domain, STATUS_ERROR, f"rcode {answer.rcode}")
+
+        hosts = sorted(answer.values(MX))
+        if len(hosts) == 1 and hosts[0][1] in ("", "."):
+            return DomainResult(domain, STATUS_NULL_MX, ttl=answer.ttl(MX))
+        if hosts:
+            return DomainResult(domain, STATUS_MX, hosts[0][1], ttl=answer.ttl(MX))
+
+        negative_ttl = answer.negative_ttl
+        for qtype in (A, AAAA):
+            answer = await resolver.query(domain, qtype)
+            if answer.rcode not in (NOERROR, NXDOMAIN):
+                return DomainResult(domain, STATUS_ERROR, f"rcode {answer.rcode}")
+            addresses = answer.values(qtype)
+            if addresses:
+                return DomainResult(domain, STATUS_A, addresses[0], ttl=answer.ttl(qtype))
+            negative_ttl = answer.negative_ttl or negative_ttl
+        return DomainResult(domain, STATUS_NO_MAIL, ttl=negative_ttl)
+
+    except asyncio.TimeoutError:
+        return DomainResult(domain, STATUS_ERROR, "timeout")
+    except (ValueError, struct.error, IndexError, UnicodeError) as e:
+        return DomainResult(domain, STATUS_ERROR, f"bad reply: {e}")
+    except OSError as e:
+        return DomainResult(domain, STATUS_ERROR, str(e))
+
+
+async def resolve_domains(domains: list[str], nameserver: str | None = None,
+                          concurrency: int = DEFAULT_CONCURRENCY, timeout: float = DEFAULT_TIMEOUT,
+                          attempts: int = DEFAULT_ATTEMPTS) -> tuple[list[DomainResult], int]:
+    """
+    Resolve many domains with at most `concurrency` in flight.
+
+    Returns:
+        Tuple of (results in input order, DNS queries sent)
+    """
+    resolver = AsyncResolver(nameserver, timeout, attempts)
+    await resolver.open()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(domain):
+        async with semaphore:
+            return await resolve_domain(resolver, domain)
+
+    try:
+        results = await asyncio.gather(*(bounded(d) for d in domains))
+    finally:
+        resolver.close()
+    return list(results), resolver.queries
+
+
+# =============================================================================
+# CACHE
+# =============================================================================
+
+class DomainCache:
+    """Resolved domains with an expiry time, in SQLite."""
+
+    def __init__(self, path: str = CACHE_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS domains (
+                domain TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                detail TEXT NOT NULL,
+                checked_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+
+    def get_many(self, domains: list[str], now: float | None = None) -> dict[str, DomainResult]:
+        """Unexpired entries for the given domains."""
+        now = time.time() if now is None else now
+        found = {}
+        for i in range(0, len(domains), 500):
+            chunk = domains[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT domain, status, detail, expires_at FROM domains "
+                f"WHERE domain IN ({','.join('?' * len(chunk))}) AND expires_at > ?",
+                (*chunk, now),
+            )
+            for domain, status, detail, expires_at in rows:
+                found[domain] = DomainResult(domain, status, detail, int(expires_at - now), cached=True)
+        return found
+
+    def put_many(self, results: list[DomainResult], now: float | None = None) -> int:
+        """Store results (failed lookups are skipped). Returns the number stored."""
+        now = time.time() if now is None else now
+        rows = [
+            (r.domain, r.status, r.detail, now, now + min(max(r.ttl, MIN_CACHE_TTL), MAX_CACHE_TTL))
+            for r in results if r.status != STATUS_ERROR
+        ]
+        self.conn.execute("BEGIN")
+        self.conn.executemany("INSERT OR REPLACE INTO domains VALUES (?, ?, ?, ?, ?)", rows)
+        self.conn.execute("DELETE FROM domains WHERE expires_at <= ?", (now,))
+        self.conn.execute("COMMIT")
+        return len(rows)
+
+    def counts(self) -> dict[str, int]:
+        now = time.time()
+        return dict(self.conn.execute(
+            "SELECT status, COUNT(*) FROM domains WHERE expires_at > ? GROUP BY status", (now,)))
+
+    def close(self):
+        self.conn.close()
+
+
+def check_domains(domains, cache_path: str = CACHE_PATH, nameserver: str | None = None,
+                  concurrency: int = DEFAULT_CONCURRENCY, timeout: float = DEFAULT_TIMEOUT,
+                  refresh: bool = False,
+                  canary: str | None = CANARY_DOMAIN) -> tuple[dict[str, DomainResult], dict]:
+    """
+    Check unique domains, resolving only those not in the cache.
+
+    Args:
+        domains: Domain names (ASCII/punycode); duplicates are ignored
+        refresh: Resolve every domain even if cached
+        canary: Domain that must resolve to MX records, or None to skip the check
+
+    Raises:
+        ResolverError: The canary did not resolve, so results would be wrong
+
+    Returns:
+        Tuple of ({domain: DomainResult}, stats dict)
+    """
+    unique = sorted({d.strip().lower().rstrip(".") for d in domains if d and d.strip()})
+    start = time.perf_counter()
+
+    cache = DomainCache(cache_path)
+    try:
+        results = {} if refresh else cache.get_many(unique)
+        missing = [d for d in unique if d not in results]
+        queries = 0
+        if missing:
+            batch = missing + [canary] if canary else missing
+            resolved, queries = asyncio.run(resolve_domains(batch, nameserver, concurrency, timeout))
+            if canary:
+                check = resolved.pop()
+                if check.status != STATUS_MX:
+                    raise ResolverError(f"{canary} resolved as '{check.status}' through "
+                                        f"{':'.join(map(str, parse_nameserver(nameserver)))}; "
+                                        f"is DNS reachable?")
+            cache.put_many(resolved)
+            results.update((r.domain, r) for r in resolved)
+    finally:
+        cache.close()
+
+    stats = {
+        "domains": len(unique),
+        "cached": len(unique) - len(missing),
+        "resolved": len(missing),
+        "queries": queries,
+        "errors": sum(r.status == STATUS_ERROR for r in results.values()),
+        "dead": sum(r.dead for r in results.values()),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    return results, stats
+
+
+# =============================================================================
+# LISTS
+# =============================================================================
+
+def email_domain(email: str) -> str | None:
+    """Lowercased, punycode domain of an address, or None if there is none."""
+    _, at, domain = email.strip().rpartition("@")
+    domain = domain.strip().lower().rstrip(".")
+    if not at or not domain:
+        return None
+    try:
+        return domain if domain.isascii() else domain.encode("idna").decode("ascii")
+    except UnicodeError:
+        return None
+
+
+def read_emails(path: Path) -> list[str]:
+    """Addresses from a CSV with an 'email' column, or one per line."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        rows = [r for r in csv.reader(f) if r]
+    if not rows:
+        return []
+    lowered = [c.strip().lower() for c in rows[0]]
+    if "email" in lowered:
+        col = lowered.index("email")
+        return [r[col] for r in rows[1:] if col < len(r)]
+    return [r[0] for r in rows]
+
+
+def write_report(out_dir: Path, emails: list[str], results: dict[str, DomainResult], stats: dict) -> dict:
+    """Write domains.csv (one row per domain), dead.csv (one row per address) and summary.json."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    domains = [email_domain(e) for e in emails]
+    contacts = Counter(d for d in domains if d)
+
+    with open(out_dir / "domains.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["domain", "status", "detail", "contacts"])
+        for domain, count in contacts.most_common():
+            r = results[domain]
+            writer.writerow([domain, r.status, r.detail, count])
+
+    dead_rows = 0
+    with open(out_dir / "dead.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["email", "domain", "status"])
+        for email, domain in zip(emails, domains):
+            if domain and results[domain].dead:
+                writer.writerow([email.strip(), domain, results[domain].status])
+                dead_rows += 1
+
+    summary = {
+        "timestamp": datetime.now().isoformat(),
+        "contacts": len(emails),
+        "dead_contacts": dead_rows,
+        "statuses": dict(Counter(results[d].status for d in contacts)),
+        "lookup": stats,
+        "files": {"domains": str(out_dir / "domains.csv"), "dead": str(out_dir / "dead.csv")},
+    }
+    (out_dir / "summary.json").write_text(json.dumps(summary, indent=2))
+    return summary
+
+
+# =============================================================================
+# STUB SERVER
+# =============================================================================
+
+class StubDnsServer(asyncio.DatagramProtocol):
+    """
+    Authoritative-style answers from a zone dict, for tests and benchmarks:
+
+        {"example.com": {"MX": [[10, "mx.example.com"]], "A": ["192.0.2.1"]},
+         "broken.com": {"rcode": "SERVFAIL"},
+         "silent.com": {"drop": true}}
+
+    Names not in the zone get NXDOMAIN with an SOA for negative caching.
+    """
+
+    def __init__(self, zone: dict, latency: float = 0.0, ttl: int = 3600):
+        self.zone = {name.lower().rstrip("."): records for name, records in zone.items()}
+        self.latency = latency
+        self.ttl = ttl
+        self.transport = None
+        self.queries = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        try:
+            reply = self.answer(data)
+        except (ValueError, struct.error, IndexError):
+            return
+        if reply is None:
+            return
+        self.queries += 1
+        if self.latency:
+            asyncio.get_running_loop().call_later(self.latency, self.transport.sendto, reply, addr)
+        else:
+            self.transport.sendto(reply, addr)
+
+    def answer(self, query: bytes) -> bytes | None:
+        qid = struct.unpack_from("!H", query)[0]
+        name, pos = read_name(query, 12)
+        qtype = struct.unpack_from("!H", query, pos)[0]
+        question = query[12:pos + 4]
+        entry = self.zone.get(name)
+
+        records = []
+        authority = []
+        if entry is None:
+            rcode = NXDOMAIN
+        elif entry.get("drop"):
+            return None
+        else:
+            rcode = RCODE_NAMES[entry.get("rcode", "NOERROR")]
+            for value in entry.get({MX: "MX", A: "A", AAAA: "AAAA"}.get(qtype, ""), []):
+                if qtype == MX:
+                    rdata = struct.pack("!H", value[0]) + encode_name(value[1])
+                else:
+                    family = socket.AF_INET if qtype == A else socket.AF_INET6
+                    rdata = socket.inet_pton(family, value)
+                records.append(b"\xc0\x0c" + struct.pack("!HHIH", qtype, 1, self.ttl, len(rdata)) + rdata)
+        if not records and rcode in (NOERROR, NXDOMAIN):
+            soa = encode_name("ns.stub") + encode_name("hostmaster.stub") + struct.pack(
+                "!IIIII", 1, 3600, 600, 86400, self.ttl)
+            authority.append(b"\xc0\x0c" + struct.pack("!HHIH", SOA, 1, self.ttl, len(soa)) + soa)
+
+        header = struct.pack("!HHHHHH", qid, 0x8180 | rcode, 1, len(records), len(authority), 0)
+        return header + question + b"".join(records) + b"".join(authority)
+
+
+async def serve_stub(zone: dict, host: str, port: int, latency: float = 0.0):
+    """Run the stub server until cancelled."""
+    loop = asyncio.get_running_loop()
+    transport, server = await loop.create_datagram_endpoint(
+        lambda: StubDnsServer(zone, latency), local_addr=(host, port))
+    try:
+        await asyncio.Event().wait()
+    finally:
+        transport.close()
+
+
+def start_stub_thread(zone: dict, latency: float = 0.0) -> tuple[str, StubDnsServer]:
+    """Run a stub server on a free local port in a background thread. Returns ("127.0.0.1:port", server)."""
+    ready = threading.Event()
+    holder = {}
+
+    def run():
+        loop = asyncio.new_event_loop()
+        transport, server = loop.run_until_complete(loop.create_datagram_endpoint(
+            lambda: StubDnsServer(zone, latency), local_addr=("127.0.0.1", 0)))
+        holder["port"] = transport.get_extra_info("sockname")[1]
+        holder["server"] = server
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    ready.wait()
+    return f"127.0.0.1:{holder['port']}", holder["server"]
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+def synthetic_zone(domains: int, seed: int = 7) -> tuple[dict, dict[str, str]]:
+    """
+    A zone for `domains` names, weighted like an old list: mostly live MX,
+    some address-only, and a tail of expired, null-MX and mail-less domains.
+
+    Returns:
+        Tuple of (zone dict, {domain: expected status})
+    """
+    rng = random.Random(seed)
+    zone, expected = {}, {}
+    for i in range(domains):
+        name = f"company{i}.example"
+        r = rng.random()
+        if r < 0.70:
+            zone[name] = {"MX": [[10, f"mx1.{name}"], [20, f"mx2.{name}"]], "A": ["192.0.2.10"]}
+            expected[name] = STATUS_MX
+        elif r < 0.78:
+            zone[name] = {"A": [f"192.0.2.{i % 250 + 1}"]}
+            expected[name] = STATUS_A
+        elif r < 0.81:
+            zone[name] = {"MX": [[0, "."]]}
+            expected[name] = STATUS_NULL_MX
+        elif r < 0.84:
+            zone[name] = {}
+            expected[name] = STATUS_NO_MAIL
+        else:
+            expected[name] = STATUS_NXDOMAIN
+    zone[CANARY_DOMAIN] = {"MX": [[5, f"mx.{CANARY_DOMAIN}"]]}
+    return zone, expected
+
+
+def synthetic_contacts(contacts: int, domains: list[str], seed: int = 7) -> list[str]:
+    """Contacts spread unevenly over the domains (a few big ones, a long tail)."""
+    rng = random.Random(seed)
+    return [f"user{i}@{domains[int(len(domains) * rng.random() ** 2)]}" for i in range(contacts)]
+
+
+def run_benchmark(contacts: int, domains: int, latency: float, concurrency: int, sample: int) -> dict:
+    """
+    Against a local stub with `latency` per query:
+      1. one lookup per contact, sequentially (timed on `sample` contacts, extrapolated)
+      2. unique domains, concurrently, into an empty cache
+      3. the same list again (a second import), from the cache
+    """
+    zone, expected = synthetic_zone(domains)
+    emails = synthetic_contacts(contacts, sorted(expected))
+    nameserver, server = start_stub_thread(zone, latency)
+
+    async def sequential(batch):
+        resolver = AsyncResolver(nameserver)
+        await resolver.open()
+        try:
+            return [await resolve_domain(resolver, email_domain(e)) for e in batch]
+        finally:
+            resolver.close()
+
+    start = time.perf_counter()
+    asyncio.run(sequential(emails[:sample]))
+    sequential_s = (time.perf_counter() - start) * contacts / sample
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = str(Path(tmp) / "cache.db")
+        list_domains = [email_domain(e) for e in emails]
+        before = server.queries
+        results, cold = check_domains(list_domains, cache_path, nameserver, concurrency, canary=None)
+        cold["server_queries"] = server.queries - before
+        _, warm = check_domains(list_domains, cache_path, nameserver, concurrency, canary=None)
+
+    wrong = [d for d, r in results.items() if r.status != expected[d]]
+    return {
+        "contacts": contacts,
+        "unique_domains": cold["domains"],
+        "sequential_s": sequential_s,
+        "sample": sample,
+        "cold": cold,
+        "warm": warm,
+        "wrong": wrong,
+        "statuses": dict(Counter(r.status for r in results.values())),
+    }
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def print_stats(stats: dict):
+    print(f"  Domains: {stats['domains']:,} ({stats['cached']:,} cached, {stats['resolved']:,} resolved "
+          f"with {stats['queries']:,} queries) in {stats['seconds']:.2f}s")
+    if stats["errors"]:
+        print(f"  ⚠️  {stats['errors']:,} lookups failed (not cached, treated as deliverable)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check recipient domains for MX/A records before sending")
+    parser.add_argument("--nameserver", help="Resolver HOST[:PORT] (default: DNS_NAMESERVER or /etc/resolv.conf)")
+    parser.add_argument("--cache", default=CACHE_PATH, help=f"Cache database (default: {CACHE_PATH})")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Lookups in flight (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help=f"Seconds per query attempt (default: {DEFAULT_TIMEOUT})")
+    parser.add_argument("--refresh", action="store_true", help="Resolve every domain, ignoring the cache")
+    parser.add_argument("--canary", default=CANARY_DOMAIN,
+                        help=f"Domain that must have MX records, '' to skip (default: {CANARY_DOMAIN})")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    check_parser = subparsers.add_parser("check", help="Check the domains of contact lists")
+    check_parser.add_argument("lists", nargs="+", help="CSV (with an email column) or one-address-per-line files")
+    check_parser.add_argument("--out", default=OUTPUT_DIR, help=f"Output directory (default: {OUTPUT_DIR})")
+
+    lookup_parser = subparsers.add_parser("lookup", help="Check single domains")
+    lookup_parser.add_argument("domains", nargs="+", help="Domain names")
+
+    stub_parser = subparsers.add_parser("stub", help="Serve a JSON zone as a local DNS server")
+    stub_parser.add_argument("--zone", help="Zone file (default: a synthetic zone)")
+    stub_parser.add_argument("--host", default="127.0.0.1", help="Listen address (default: 127.0.0.1)")
+    stub_parser.add_argument("--port", type=int, default=5353, help="Listen port (default: 5353)")
+    stub_parser.add_argument("--latency", type=float, default=0.0, help="Seconds before each reply (default: 0)")
+
+    bench_parser = subparsers.add_parser("benchmark", help="Per-contact vs cached concurrent lookups")
+    bench_parser.add_argument("--contacts", type=int, default=20_000, help="Contacts (default: 20000)")
+    bench_parser.add_argument("--domains", type=int, default=4_000, help="Domains in the zone (default: 4000)")
+    bench_parser.add_argument("--latency", type=float, default=0.02, help="Stub reply delay (default: 0.02)")
+    bench_parser.add_argument("--sample", type=int, default=500,
+                              help="Contacts to time sequentially (default: 500)")
+
+    args = parser.parse_args()
+
+    if not args.command:
+        parser.print_help()
+        return 0
+
+    print(f"[domain_check] v{DOE_VERSION}")
+    print()
+
+    try:
+        if args.command == "check":
+            emails = [e for path in args.lists for e in read_emails(Path(path))]
+            domains = [d for d in map(email_domain, emails) if d]
+            print(f"📥 {len(emails):,} contacts, {len(set(domains)):,} domains")
+            results, stats = check_domains(domains, args.cache, args.nameserver, args.concurrency,
+                                           args.timeout, args.refresh, args.canary or None)
+            summary = write_report(Path(args.out), emails, results, stats)
+            print_stats(stats)
+            print()
+            print("RESULTS")
+            print("-" * 40)
+            for status, count in sorted(summary["statuses"].items(), key=lambda kv: -kv[1]):
+                marker = "dead" if status in DEAD_STATUSES else ""
+                print(f"  {status:<9} {count:>7,} domains  {marker}")
+            print(f"  Contacts on dead domains: {summary['dead_contacts']:,} of {summary['contacts']:,}")
+            print()
+            for label, path in summary["files"].items():
+                print(f"  {label}: {path}")
+            print()
+            print("✅ Done!")
+            return 0
+
+        if args.command == "lookup":
+            results, stats = check_domains(args.domains, args.cache, args.nameserver, args.concurrency,
+                                           args.timeout, args.refresh, args.canary or None)
+            for domain in sorted(results):
+                r = results[domain]
+                icon = "❌" if r.dead else "⚠️ " if r.status == STATUS_ERROR else "✅"
+                source = " (cached)" if r.cached else ""
+                print(f"  {icon} {domain}: {r.status} {r.detail}{source}")
+            print()
+            print_stats(stats)
+            return 0
+
+        if args.command == "stub":
+            zone = json.loads(Path(args.zone).read_text()) if args.zone else synthetic_zone(4_000)[0]
+            print(f"🌐 Stub DNS on {args.host}:{args.port} ({len(zone):,} names, latency {args.latency}s)")
+            print(f"  Use: --nameserver {args.host}:{args.port}")
+            asyncio.run(serve_stub(zone, args.host, args.port, args.latency))
+            return 0
+
+        if args.command == "benchmark":
+            print(f"⏱️  {args.contacts:,} contacts over {args.domains:,} domains, "
+                  f"stub latency {args.latency * 1000:.0f} ms, concurrency {args.concurrency}")
+            r = run_benchmark(args.contacts, args.domains, args.latency, args.concurrency, args.sample)
+            cold, warm = r["cold"], r["warm"]
+            print(f"  Per contact, sequential: {r['sequential_s']:8.1f}s  "
+                  f"({r['contacts']:,} lookups; timed on {r['sample']:,}, extrapolated)")
+            print(f"  Unique + concurrent:     {cold['seconds']:8.2f}s  "
+                  f"({r['unique_domains']:,} domains, {cold['server_queries']:,} queries)")
+            print(f"  Second import (cached):  {warm['seconds']:8.2f}s  ({warm['queries']} queries)")
+            print(f"  Speedup (cold):          {r['sequential_s'] / cold['seconds']:8.0f}x")
+            print(f"  Statuses: {', '.join(f'{k} {v:,}' for k, v in sorted(r['statuses'].items()))}")
+            print()
+            if r["wrong"] or warm["queries"]:
+                print(f"❌ {len(r['wrong'])} domains misclassified, {warm['queries']} queries on the cached run")
+                return 1
+            print("✅ Every domain classified as the zone says")
+            return 0
+
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted")
+        return 130
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+"""
+Script: engagement_score.py
+Directive: directives/engagement_score.md
+DOE Framework: v2.0.0
+
+Purpose:
+    Score every subscriber on recent engagement and pick their best send
+    hour, so re-engaging the dormant list starts with the people most
+    likely to open, at the time they usually do.
+
+    Opens and clicks from the mirror (listmonk_mirror.py sync --events)
+    are kept in a columnar cache of flat NumPy arrays, appended
+    incrementally. Scoring is whole-array work: a time-decayed sum of
+    opens and clicks per subscriber (np.bincount), last engagement
+    (maximum.reduceat over events sorted by subscriber), and a 24-bucket
+    hour histogram per subscriber, built in blocks so memory stays bounded.
+
+    Results are written back as flat subscriber attributes
+    (engagement_score, engagement_tier, best_send_hour_utc, ...). Only
+    subscribers whose values changed are written, with one COPY and one
+    UPDATE per 100k rows on Listmonk's Postgres. The mirror gets the same
+    values, so segments can use them (attr:engagement_tier=warm).
+
+Cost:
+    Free (local computation, one bulk write to Listmonk's database)
+
+Usage:
+    # Score and write back (run after listmonk_mirror.py sync --events)
+    python execution/engagement_score.py run
+
+    # Score and show the distribution only
+    python execution/engagement_score.py run --dry-run
+
+    # Keep 1M subscribers x 12 months of events under a minute
+    python execution/engagement_score.py benchmark --subscribers 1000000 --events 20000000
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from listmonk_backup import DB_CONTAINER, DB_NAME, DB_USER, psql_command
+from listmonk_mirror import CLICK, MIRROR_DB, OPEN, Mirror, connect
+
+# =============================================================================
+# VERSION - Must match directive version
+# =============================================================================
+DOE_VERSION = "2026.10.19"
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+CACHE_DIR = ".tmp/engagement"
+
+WINDOW_DAYS = 365
+
+# An event this many days old counts half as much as one today
+HALF_LIFE_DAYS = 30
+
+# A click says more than an open (and opens are inflated by image proxies)
+EVENT_WEIGHTS = {OPEN: 1.0, CLICK: 3.0}
+
+# Decayed weight at which the score reaches 63 (1 - 1/e)
+SCORE_SCALE = 3.0
+
+# Lowest score per tier, highest first; 0 events in the window is "none"
+TIERS = ((60, "active"), (30, "warm"), (10, "cooling"), (0, "lapsed"))
+TIER_NAMES = ["none", "bounced"] + [name for _, name in TIERS]
+
+# Fewer events than this: use the list-wide best hour
+MIN_HOUR_EVENTS = 3
+
+# Subscribers per hour-histogram block (block x 24 counters in memory)
+HOUR_BLOCK = 250_000
+
+# Rows per COPY + UPDATE transaction on Listmonk's database
+WRITE_CHUNK = 100_000
+
+TARGET_SECONDS = 60
+
+
+# =============================================================================
+# EVENT CACHE
+# =============================================================================
+
+class EventCache:
+    """
+    Opens/clicks as three flat binary columns (kind int8, subscriber int32,
+    ts uint32) that load with np.fromfile. New mirror events are appended;
+    the cache is rewritten when over a quarter of it has aged out.
+    """
+
+    COLUMNS = {"kind": np.int8, "subscriber": np.int32, "ts": np.uint32}
+
+    def __init__(self, directory: str = CACHE_DIR):
+        self.dir = Path(directory)
+        self.meta_path = self.dir / "events.json"
+        self.meta = json.loads(self.meta_path.read_text()) if self.meta_path.exists() else {"last": {}, "count": 0}
+
+    def _path(self, column: str) -> Path:
+        return self.dir / f"events.{column}.bin"
+
+    def reset(self):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        for column in self.COLUMNS:
+            self._path(column).write_bytes(b"")
+        self.meta = {"last": {}, "count": 0}
+
+    def append(self, kind: np.ndarray, subscriber: np.ndarray, ts: np.ndarray):
+        for column, values in (("kind", kind), ("subscriber", subscriber), ("ts", ts)):
+            with open(self._path(column), "ab") as f:
+                values.astype(self.COLUMNS[column]).tofile(f)
+        self.meta["count"] += len(kind)
+
+    def update_from_mirror(self, mirror_path: str = MIRROR_DB, batch: int = 500_000) -> int:
+        """Append mirror events newer than the cache. Returns events added."""
+        conn = connect(mirror_path)
+        if not self._consistent():
+            self.reset()
+        # A mirror rebuilt from scratch has lower ids than the cache remembers
+        for kind in (OPEN, CLICK):
+            newest = conn.execute("SELECT MAX(source_id) FROM events WHERE kind = ?", (kind,)).fetchone()[0] or 0
+            if newest < self.meta["last"].get(str(kind), 0):
+                self.reset()
+                break
+
+        added = 0
+        for kind in (OPEN, CLICK):
+            cursor = conn.execute(
+                "SELECT source_id, subscriber_id, ts FROM events WHERE kind = ? AND source_id > ? ORDER BY source_id",
+                (kind, self.meta["last"].get(str(kind), 0)))
+            while True:
+                rows = cursor.fetchmany(batch)
+                if not rows:
+                    break
+                columns = np.array(rows, dtype=np.int64)
+                self.append(np.full(len(rows), kind), columns[:, 1], columns[:, 2])
+                self.meta["last"][str(kind)] = int(columns[-1, 0])
+                added += len(rows)
+        conn.close()
+        self.save_meta()
+        return added
+
+    def _consistent(self) -> bool:
+        """
+        True when every column holds at least the events.json count. Rows
+        past the count (an append cut short) are dropped; a shorter column
+        means the files and events.json disagree and the cache is rebuilt.
+        """
+        count = self.meta["count"]
+        sizes = {}
+        for column, dtype in self.COLUMNS.items():
+            path = self._path(column)
+            if not path.exists():
+                return False
+            sizes[column] = path.stat().st_size // np.dtype(dtype).itemsize
+        if any(n < count for n in sizes.values()):
+            return False
+        for column, dtype in self.COLUMNS.items():
+            if sizes[column] > count:
+                with open(self._path(column), "r+b") as f:
+                    f.truncate(count * np.dtype(dtype).itemsize)
+        return True
+
+    def save_meta(self):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.meta_path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(self.meta))
+        os.replace(tmp, self.meta_path)
+
+    def _compact(self, kind: np.ndarray, subscriber: np.ndarray, ts: np.ndarray):
+        """Replace the columns with the kept events, then record the new count."""
+        for column, values in (("kind", kind), ("subscriber", subscriber), ("ts", ts)):
+            tmp = self._path(column).with_suffix(".bin.tmp")
+            with open(tmp, "wb") as f:
+                values.astype(self.COLUMNS[column]).tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self._path(column))
+        # Until this is saved a crash leaves columns shorter than the count, which _consistent rebuilds from
+        self.meta["count"] = len(kind)
+        self.save_meta()
+
+    def load(self, since_ts: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(kind, subscriber, ts) for events at or after `since_ts`."""
+        count = self.meta["count"]
+        kind, subscriber, ts = (np.fromfile(self._path(c), dtype=t, count=count) for c, t in self.COLUMNS.items())
+        keep = ts >= since_ts
+        if keep.all():
+            return kind, subscriber, ts
+        kind, subscriber, ts = kind[keep], subscriber[keep], ts[keep]
+        if len(keep) and keep.mean() < 0.75:
+            self._compact(kind, subscriber, ts)
+        return kind, subscriber, ts
+
+
+# =============================================================================
+# SCORING
+# =============================================================================
+
+def score(kind: np.ndarray, subscriber: np.ndarray, ts: np.ndarray, size: int, now: int,
+          bounced: np.ndarray | None = None) -> dict[str, np.ndarray]:
+    """
+    Score subscribers 0..size-1 (index = subscriber id) from their events.
+
+    Returns arrays of length `size`: score (0-100), tier (index into
+    TIER_NAMES), opens, clicks, last (epoch seconds, 0 = never) and
+    best_hour (0-23, UTC).
+    """
+    age_days = (now - ts.astype(np.int64)).astype(np.float32) / np.float32(86400)
+    weight = np.where(kind == CLICK, np.float32(EVENT_WEIGHTS[CLICK]), np.float32(EVENT_WEIGHTS[OPEN]))
+    decayed = weight * np.exp2(-np.maximum(age_days, 0) / np.float32(HALF_LIFE_DAYS))
+    raw = np.bincount(subscriber, weights=decayed, minlength=size)[:size]
+
+    is_click = kind == CLICK
+    clicks = np.bincount(subscriber[is_click], minlength=size)[:size]
+    opens = np.bincount(subscriber, minlength=size)[:size] - clicks
+
+    scores = np.rint(100 * (1 - np.exp(-raw / SCORE_SCALE))).astype(np.uint8)
+    has_events = (opens + clicks) > 0
+    # Any engagement in the window keeps a subscriber out of "none", even if it rounds to 0
+    tier = np.zeros(size, dtype=np.uint8)
+    for position, (threshold, _) in reversed(list(enumerate(TIERS))):
+        tier[has_events & (scores >= threshold)] = position + 2
+    if bounced is not None and len(bounced):
+        bounced = bounced[bounced < size]
+        scores[bounced] = 0
+        tier[bounced] = 1
+
+    # Last engagement and hour histograms work on events grouped by subscriber
+    order = np.argsort(subscriber, kind="stable")
+    sub_sorted = subscriber[order]
+    ts_sorted = ts[order]
+    starts = np.flatnonzero(np.r_[True, sub_sorted[1:] != sub_sorted[:-1]]) if len(order) else np.array([], dtype=np.int64)
+    unique = sub_sorted[starts]
+    last = np.zeros(size, dtype=np.uint32)
+    if len(starts):
+        last[unique] = np.maximum.reduceat(ts_sorted, starts)
+
+    hour = ((ts_sorted // 3600) % 24).astype(np.int64)
+    hour_weight = np.where(kind[order] == CLICK, EVENT_WEIGHTS[CLICK], EVENT_WEIGHTS[OPEN])
+    overall = np.bincount(hour, weights=hour_weight, minlength=24)
+    default_hour = int(np.argmax(overall)) if len(hour) else 9
+    best_hour = np.full(size, default_hour, dtype=np.uint8)
+
+    # Compact subscriber index per event, so histograms only cover subscribers with events
+    counts = np.diff(np.r_[starts, len(sub_sorted)])
+    compact = np.repeat(np.arange(len(unique)), counts)
+    bounds = np.r_[starts, len(sub_sorted)]
+    for block_start in range(0, len(unique), HOUR_BLOCK):
+        block_end = min(len(unique), block_start + HOUR_BLOCK)
+        lo, hi = bounds[block_start], bounds[block_end]
+        cells = (compact[lo:hi] - block_start) * 24 + hour[lo:hi]
+        histogram = np.bincount(cells, weights=hour_weight[lo:hi],
+                                minlength=(block_end - block_start) * 24).reshape(-1, 24)
+        # Neighbouring hours count half, so one stray open does not decide
+        smoothed = histogram + 0.5 * (np.roll(histogram, 1, axis=1) + np.roll(histogram, -1, axis=1))
+        enough = counts[block_start:block_end] >= MIN_HOUR_EVENTS
+        best_hour[unique[block_start:block_end][enough]] = np.argmax(smoothed[enough], axis=1)
+
+    return {"score": scores, "tier": tier, "opens": opens.astype(np.uint32), "clicks": clicks.astype(np.uint32),
+            "last": last, "best_hour": best_hour}
+
+
+def load_subscribers(mirror_path: str) -> tuple[np.ndarray, np.ndarray]:
+    """(subscriber ids, hard-bounced ids) from the mirror."""
+    conn = connect(mirror_path)
+    ids = np.fromiter((r[0] for r in conn.execute("SELECT id FROM subscribers")), dtype=np.int64)
+    bounced = np.fromiter((r[0] for r in conn.execute(
+        "SELECT DISTINCT subscriber_id FROM bounces WHERE type = 'hard' AND subscriber_id IS NOT NULL")), dtype=np.int64)
+    conn.close()
+    return ids, bounced
+
+
+def attributes(result: dict, i: int) -> dict:
+    last = int(result["last"][i])
+    return {
+        "engagement_score": int(result["score"][i]),
+        "engagement_tier": TIER_NAMES[result["tier"][i]],
+        "engagement_opens_12m": int(result["opens"][i]),
+        "engagement_clicks_12m": int(result["clicks"][i]),
+        "engagement_last_at": datetime.fromtimestamp(last, timezone.utc).strftime("%Y-%m-%d") if last else None,
+        "best_send_hour_utc": int(result["best_hour"][i]),
+    }
+
+
+def changed_ids(result: dict, ids: np.ndarray, previous_path: Path) -> np.ndarray:
+    """Subscribers whose attributes differ from the last write."""
+    if not previous_path.exists():
+        return ids
+    previous = np.load(previous_path)
+    size = len(previous["score"])
+    new = ids[ids >= size]
+    old = ids[ids < size]
+    differs = np.zeros(len(old), dtype=bool)
+    for name in result:
+        differs |= result[name][old] != previous[name][old]
+    return np.concatenate([old[differs], new])
+
+
+# =============================================================================
+# WRITE-BACK
+# =============================================================================
+
+def write_listmonk(result: dict, ids: np.ndarray, pg_args) -> int:
+    """Merge the attributes into subscribers.attribs on Listmonk's Postgres, in chunks."""
+    written = 0
+    for start in range(0, len(ids), WRITE_CHUNK):
+        chunk = ids[start:start + WRITE_CHUNK]
+        process = subprocess.Popen(
+            psql_command(pg_args, "psql", "-X", "-q", "-v", "ON_ERROR_STOP=1", "-d", pg_args.pg_db, interactive=True),
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+        )
+        lines = ["BEGIN;",
+                 "CREATE TEMP TABLE engagement_scores (id INTEGER PRIMARY KEY, attribs JSONB) ON COMMIT DROP;",
+                 "COPY engagement_scores FROM STDIN;"]
+        # Values are numbers, dates and tier names: no tabs or backslashes to escape
+        lines += [f"{i}\t{json.dumps(attributes(result, i))}" for i in chunk.tolist()]
+        lines += ["\\.",
+                  "UPDATE subscribers s SET attribs = s.attribs || e.attribs "
+                  "FROM engagement_scores e WHERE s.id = e.id;",
+                  "COMMIT;"]
+        output, _ = process.communicate("\n".join(lines) + "\n")
+        if process.returncode != 0:
+            raise RuntimeError(f"psql failed: {output.strip()[:300]}")
+        written += len(chunk)
+    return written
+
+
+def write_mirror(result: dict, ids: np.ndarray, mirror_path: str):
+    mirror = Mirror(mirror_path)
+    mirror.conn.execute("BEGIN")
+    mirror.conn.executemany(
+        "UPDATE subscribers SET attribs = json_patch(COALESCE(attribs, '{}'), ?) WHERE id = ?",
+        ((json.dumps(attributes(result, i)), i) for i in ids.tolist()),
+    )
+    mirror.conn.execute("COMMIT")
+    mirror.close()
+
+
+# =============================================================================
+# RUN
+# =============================================================================
+
+def run(args) -> dict:
+    timings = {}
+    start = time.perf_counter()
+    cache = EventCache(args.cache_dir)
+    added = cache.update_from_mirror(args.mirror)
+    now = int(time.time())
+    kind, subscriber, ts = cache.load(now - WINDOW_DAYS * 86400)
+    ids, bounced = load_subscribers(args.mirror)
+    timings["load"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    size = int(max(ids.max(initial=0), subscriber.max(initial=0))) + 1
+    result = score(kind, subscriber, ts, size, now, bounced)
+    timings["score"] = time.perf_counter() - start
+
+    previous_path = Path(args.cache_dir) / "written.npz"
+    changed = changed_ids(result, ids, previous_path)
+    written = 0
+    if not args.dry_run and len(changed):
+        start = time.perf_counter()
+        written = write_listmonk(result, changed, args)
+        write_mirror(result, changed, args.mirror)
+        np.savez(previous_path, **result)
+        timings["write"] = time.perf_counter() - start
+
+    tiers = np.bincount(result["tier"][ids], minlength=len(TIER_NAMES))
+    return {"events": len(ts), "new_events": added, "subscribers": len(ids), "changed": len(changed),
+            "written": written, "tiers": dict(zip(TIER_NAMES, tiers.tolist())),
+            "best_hours": np.bincount(result["best_hour"][ids], minlength=24).tolist(), "timings": timings}
+
+
+def run_benchmark(subscribers: int, events: int, seed: int = 11) -> dict:
+    """Synthetic year of events through the cache and scoring, timed end to end."""
+    rng = np.random.default_rng(seed)
+    now = int(time.time())
+    # Engagement is skewed: a few subscribers generate most events
+    rank = (subscribers * rng.random(events) ** 3).astype(np.int64)
+    subscriber = ((rank * 2654435761) % subscribers + 1).astype(np.int32)
+    kind = np.where(rng.random(events) < 0.15, CLICK, OPEN).astype(np.int8)
+    hour_bias = (subscriber % 24).astype(np.int64) * 3600 + 1800
+    ts = (now - rng.integers(0, WINDOW_DAYS, events) * 86400 - (now % 86400) + hour_bias
+          + rng.normal(0, 5400, events).astype(np.int64)).astype(np.uint32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = EventCache(tmp)
+        cache.reset()
+        cache.append(kind, subscriber, ts)
+        cache.save_meta()
+        del kind, subscriber, ts
+
+        start = time.perf_counter()
+        kind, subscriber, ts = cache.load(now - WINDOW_DAYS * 86400)
+        load = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = score(kind, subscriber, ts, subscribers + 1, now)
+        compute = time.perf_counter() - start
+
+    sample = np.unique(subscriber[:10_000])
+    sample = sample[np.bincount(subscriber, minlength=subscribers + 1)[sample] >= 10]
+    hour_accuracy = float(np.mean(result["best_hour"][sample] == (sample % 24))) if len(sample) else 0.0
+    return {"load_s": load, "score_s": compute, "total_s": load + compute, "hour_accuracy": hour_accuracy,
+            "scored": int((result["opens"] + result["clicks"] > 0).sum()), "events": int(len(ts))}
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Engagement scores and best send hours from the Listmonk mirror")
+    parser.add_argument("--mirror", default=MIRROR_DB, help=f"Mirror database (default: {MIRROR_DB})")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help=f"Event cache (default: {CACHE_DIR})")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    run_parser = subparsers.add_parser("run", help="Score subscribers and write the attributes back")
+    run_parser.add_argument("--dry-run", action="store_true", help="Score and report, write nothing")
+    run_parser.add_argument("--container", default=DB_CONTAINER, help=f"Postgres container (default: {DB_CONTAINER})")
+    run_parser.add_argument("--no-docker", action="store_true", help="Use local psql instead of the container")
+    run_parser.add_argument("--pg-host", default="localhost", help="Postgres host with --no-docker")
+    run_parser.add_argument("--pg-port", type=int, default=5432, help="Postgres port with --no-docker")
+    run_parser.add_argument("--pg-user", default=DB_USER, help=f"Postgres user (default: {DB_USER})")
+    run_parser.add_argument("--pg-db", default=DB_NAME, help=f"Database (default: {DB_NAME})")
+
+    bench_parser = subparsers.add_parser("benchmark", help=f"Time scoring on synthetic data (target: {TARGET_SECONDS}s)")
+    bench_parser.add_argument("--subscribers", type=int, default=1_000_000, help="Subscribers (default: 1000000)")
+    bench_parser.add_argument("--events", type=int, default=20_000_000, help="Events over 12 months (default: 20000000)")
+
+    args = parser.parse_args()
+
+    if not args.command:
+        parser.print_help()
+        return 0
+
+    print(f"[engagement_score] v{DOE_VERSION}")
+    print()
+
+    try:
+        if args.command == "benchmark":
+            print(f"⏱️  {args.subscribers:,} subscribers, {args.events:,} events over {WINDOW_DAYS} days...")
+            r = run_benchmark(args.subscribers, args.events)
+            print(f"  Load from cache: {r['load_s']:.1f}s")
+            print(f"  Score + send hours: {r['score_s']:.1f}s ({r['scored']:,} subscribers with events)")
+            print(f"  Best hour recovered for {r['hour_accuracy']:.0%} of sampled subscribers with 10+ events")
+            if r["total_s"] > TARGET_SECONDS:
+                print(f"❌ {r['total_s']:.1f}s, over the {TARGET_SECONDS}s target")
+                return 1
+            print(f"✅ {r['total_s']:.1f}s (target: {TARGET_SECONDS}s)")
+            return 0
+
+        r = run(args)
+        t = r["timings"]
+        print(f"📊 {r['subscribers']:,} subscribers, {r['events']:,} events in the last {WINDOW_DAYS} days "
+              f"({r['new_events']:,} new)")
+        print(f"  Loaded in {t['load']:.1f}s, scored in {t['score']:.1f}s")
+        print()
+        print("TIERS")
+        print("-" * 40)
+        for name, n in r["tiers"].items():
+            print(f"  {name:<8} {n:>9,}")
+        top = sorted(range(24), key=lambda h: -r["best_hours"][h])[:3]
+        print()
+        print(f"Most common best hours (UTC): {', '.join(f'{h:02d}:00' for h in top)}")
+        print()
+        if args.dry_run:
+            print(f"Dry run: {r['changed']:,} subscribers would be updated")
+        else:
+            print(f"✅ Wrote attributes for {r['written']:,} changed subscribers" +
+                  (f" in {t['write']:.1f}s" if "write" in t else ""))
+        return 0
+
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return 1
+
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted")
+        return 130
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,849 @@
+#!/usr/bin/env python3
+"""
+Script: list_hygiene.py
+Directive: directives/list_hygiene.md
+DOE Framework: v2.0.0
+
+Purpose:
+    Clean contact lists before they are imported into Listmonk.
+    Validates syntax, normalises case and IDN domains, drops role accounts
+    and disposable domains, deduplicates across every input list, and
+    removes addresses in the bounce/complaint suppression index.
+    Optionally drops addresses whose domain cannot receive mail (no MX or
+    address record, see domain_check.py).
+
+    All rules run as column-wide NumPy operations. Work that depends only
+    on the domain (IDN encoding, label checks, blocklist lookups) runs once
+    per unique domain and is broadcast back to the rows, so a 20k dormant
+    list with 3k distinct domains does 3k domain checks, not 20k.
+
+Cost:
+    No API costs - local file operations only
+
+Usage:
+    # Clean one or more lists (first occurrence wins across lists)
+    python execution/list_hygiene.py warm.csv dormant.csv
+
+    # Custom output directory and an extra disposable-domain blocklist
+    python execution/list_hygiene.py dormant.csv --out .tmp/hygiene --blocklist disposable.txt
+
+    # Also drop dead domains (one cached DNS check per unique domain)
+    python execution/list_hygiene.py dormant.csv --check-domains
+
+    # Benchmark vectorised vs row-by-row on a synthetic list
+    python execution/list_hygiene.py --benchmark 1000000
+"""
+
+import sys
+import csv
+import json
+import time
+import random
+import argparse
+import hashlib
+import re
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from domain_check import check_domains
+from suppression import SUPPRESSION_DIR, SuppressionIndex
+
+# =============================================================================
+# VERSION - Must match directive version
+# =============================================================================
+DOE_VERSION = "2026.10.19"
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+OUTPUT_DIR = ".tmp/hygiene"
+
+# Compiled blocklist indexes are cached here, keyed by blocklist content
+INDEX_CACHE_DIR = ".tmp/hygiene/index"
+
+# Benchmark gate: the required speedup over the per-row loop. Not met yet:
+# about 3x on one core (see list_hygiene.md, Cost & Time)
+MIN_SPEEDUP = 10.0
+
+# RFC 5321 path limit; anything longer is rejected before array building
+MAX_EMAIL_BYTES = 254
+MAX_LOCAL_BYTES = 64
+
+# Rule codes, in the order they are evaluated
+CLEAN = 0
+INVALID_SYNTAX = 1
+ROLE_ACCOUNT = 2
+DISPOSABLE_DOMAIN = 3
+DUPLICATE = 4
+SUPPRESSED = 5
+DEAD_DOMAIN = 6
+
+RULE_NAMES = {
+    CLEAN: "clean",
+    INVALID_SYNTAX: "invalid_syntax",
+    ROLE_ACCOUNT: "role_account",
+    DISPOSABLE_DOMAIN: "disposable_domain",
+    DUPLICATE: "duplicate",
+    SUPPRESSED: "suppressed",
+    DEAD_DOMAIN: "dead_domain",
+}
+
+# Shared mailboxes that rarely belong to a person and attract complaints
+ROLE_ACCOUNTS = frozenset({
+    "abuse", "admin", "administrator", "billing", "compliance", "contact",
+    "customerservice", "devnull", "dns", "enquiries", "ftp", "help",
+    "hostmaster", "hr", "info", "inquiries", "it", "jobs", "legal",
+    "mail", "mailer-daemon", "marketing", "media", "news", "newsletter",
+    "no-reply", "noc", "noreply", "null", "office", "orders", "postmaster",
+    "press", "privacy", "root", "sales", "security", "spam", "support",
+    "sysadmin", "team", "tech", "undisclosed-recipients", "unsubscribe",
+    "usenet", "uucp", "webmaster", "www",
+})
+ROLE_ACCOUNTS_BYTES = frozenset(r.encode() for r in ROLE_ACCOUNTS)
+
+# Built-in disposable providers; extend with --blocklist FILE
+DISPOSABLE_DOMAINS = frozenset({
+    "10minutemail.com", "20minutemail.com", "33mail.com", "anonaddy.me",
+    "burnermail.io", "discard.email", "dispostable.com", "dropmail.me",
+    "emailondeck.com", "fakeinbox.com", "getairmail.com", "getnada.com",
+    "guerrillamail.biz", "guerrillamail.com", "guerrillamail.de",
+    "guerrillamail.net", "guerrillamail.org", "guerrillamailblock.com",
+    "harakirimail.com", "inboxkitten.com", "maildrop.cc", "mailcatch.com",
+    "mailinator.com", "mailinator.net", "mailnesia.com", "mailpoof.com",
+    "mintemail.com", "mohmal.com", "mytemp.email", "sharklasers.com",
+    "spam4.me", "spamgourmet.com", "temp-mail.org", "tempail.com",
+    "tempmail.dev", "tempmailo.com", "tempr.email", "throwawaymail.com",
+    "trashmail.com", "trashmail.de", "yopmail.com", "yopmail.fr",
+})
+
+# Byte classes for the single translate() pass over the whole column.
+# Everything allowed in an unquoted local part (RFC 5322 atext plus '.',
+# and UTF-8 bytes for SMTPUTF8 addresses) maps to 0; only the rare bytes
+# the rules care about get a non-zero class, so they can be located with
+# one flatnonzero() instead of per-row string scans.
+_PLAIN, _AT, _NEWLINE, _SPACE, _OTHER, _PLUS = 0, 1, 2, 3, 4, 5
+
+_CLASS = bytearray([_OTHER]) * 256
+for _byte in b"abcdefghijklmnopqrstuvwxyz0123456789!#$%&'*/=?^_`{|}~.-":
+    _CLASS[_byte] = _PLAIN
+for _byte in range(0x80, 0x100):
+    _CLASS[_byte] = _PLAIN
+for _byte in b" \t\r\x0b\x0c":
+    _CLASS[_byte] = _SPACE
+_CLASS[ord("@")] = _AT
+_CLASS[ord("\n")] = _NEWLINE
+_CLASS[ord("+")] = _PLUS
+_CLASS = bytes(_CLASS)
+
+_ROLE_INDEX = np.array(sorted(ROLE_ACCOUNTS_BYTES), dtype="S")
+
+
+def _role_keys() -> list[tuple[np.uint32, np.ndarray]]:
+    """
+    (mask, sorted keys) pairs over a local part's first four bytes, read as a
+    little-endian uint32: a role's first four bytes, or a shorter role plus
+    the '+' or '@' that must follow it.
+    """
+    by_length = {}
+    for role in ROLE_ACCOUNTS_BYTES:
+        for key in ([role[:4]] if len(role) >= 4 else [role + b"+", role + b"@"]):
+            by_length.setdefault(len(key), set()).add(int.from_bytes(key, "little"))
+    return [(np.uint32((1 << 8 * length) - 1), np.array(sorted(keys), dtype=np.uint32))
+            for length, keys in sorted(by_length.items())]
+
+
+_ROLE_KEYS = _role_keys()
+
+# Seeds for row hashing; the second hash double-checks every group
+_HASH_SEED = 0xCBF29CE484222325
+_CHECK_SEED = 0x84222325CBF29CE4
+
+_LOCAL_RE = re.compile(rb"[a-z0-9!#$%&'*+/=?^_`{|}~.\x80-\xff-]{1,64}")
+_ASCII_DOMAIN_RE = re.compile(r"(?:(?!-)[a-z0-9-]{1,63}(?<!-)\.)+(?:[a-z]{2,63}|xn--[a-z0-9-]{1,59})")
+
+
+# =============================================================================
+# DOMAIN RULES (evaluated once per unique domain)
+# =============================================================================
+
+def normalise_domain(domain: bytes) -> str | None:
+    """
+    Lowercase and IDNA-encode a domain, returning None if it is invalid.
+
+    Args:
+        domain: Raw domain bytes (UTF-8), already ASCII-lowercased
+
+    Returns:
+        ASCII (punycode) domain, or None if it fails syntax checks
+    """
+    try:
+        text = domain.decode("utf-8")
+        if not text.isascii():
+            text = text.encode("idna").decode("ascii")
+    except UnicodeError:
+        return None
+
+    if len(text) > 253 or not _ASCII_DOMAIN_RE.fullmatch(text):
+        return None
+    return text
+
+
+def domain_candidates(domain: str) -> list[str]:
+    """Return the domain and each parent domain (sub.x.com -> x.com)."""
+    labels = domain.split(".")
+    return [".".join(labels[i:]) for i in range(len(labels) - 1)]
+
+
+def compile_blocklist(domains) -> np.ndarray:
+    """
+    Compile a blocklist into a sorted byte-string array for searchsorted lookups.
+
+    The compiled index is cached under INDEX_CACHE_DIR keyed by a hash of its
+    contents, so large blocklists are only encoded and sorted once.
+    """
+    entries = sorted({d.strip().lower() for d in domains if d.strip()})
+    digest = hashlib.sha256("\n".join(entries).encode()).hexdigest()[:16]
+    cache_path = Path(INDEX_CACHE_DIR) / f"blocklist-{digest}.npy"
+
+    if cache_path.exists():
+        return np.load(cache_path)
+
+    index = np.sort(np.array([e.encode("idna") for e in entries], dtype="S"))
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    np.save(cache_path, index)
+    return index
+
+
+def load_blocklist(path: str | None = None) -> np.ndarray:
+    """Load the built-in disposable domains plus an optional one-per-line file."""
+    domains = set(DISPOSABLE_DOMAINS)
+    if path:
+        for line in Path(path).read_text().splitlines():
+            line = line.split("#", 1)[0].strip()
+            if line:
+                domains.add(line)
+    return compile_blocklist(domains)
+
+
+def in_index(index: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Vectorised membership test against a compiled (sorted) index."""
+    if len(index) == 0 or len(values) == 0:
+        return np.zeros(len(values), dtype=bool)
+    pos = np.searchsorted(index, values)
+    pos[pos == len(index)] = 0
+    return index[pos] == values
+
+
+def blocked_domains(domains: np.ndarray, index: np.ndarray) -> np.ndarray:
+    """Vectorised check of each domain and all of its parents against a compiled index."""
+    blocked = np.zeros(len(domains), dtype=bool)
+    rows = np.arange(len(domains))
+    current = domains
+    while len(current):
+        blocked[rows] |= in_index(index, current)
+        parent = np.strings.slice(current, np.strings.find(current, b".") + 1, None)
+        # Stop before the bare TLD
+        keep = np.strings.find(parent, b".") >= 0
+        rows, current = rows[keep], parent[keep]
+    return blocked
+
+
+# =============================================================================
+# VECTORISED PIPELINE
+# =============================================================================
+
+class NormalisedAddresses:
+    """
+    Columnar view of normalised addresses: local parts plus a domain id.
+
+    Strings are only built when a row is read (i.e. when writing output),
+    so the rule pipeline never creates one Python object per row.
+    """
+
+    def __init__(self, locals_: np.ndarray, domain_ids: np.ndarray, domains: list[str]):
+        self._locals = locals_
+        self._domain_ids = domain_ids
+        self._domains = domains
+
+    def __len__(self) -> int:
+        return len(self._locals)
+
+    @property
+    def domain_ids(self) -> np.ndarray:
+        """Per-row index into domains (-1 for rows without a valid domain)."""
+        return self._domain_ids
+
+    @property
+    def domains(self) -> list[str]:
+        """Unique normalised domains."""
+        return self._domains
+
+    def __getitem__(self, i: int) -> str:
+        domain_id = self._domain_ids[i]
+        if domain_id < 0:
+            return ""
+        return self._locals[i].decode("utf-8", "replace") + "@" + self._domains[domain_id]
+
+    def tolist(self) -> list[str]:
+        locals_ = self._locals.tolist()
+        return [
+            (locals_[i].decode("utf-8", "replace") + "@" + self._domains[d]) if d >= 0 else ""
+            for i, d in enumerate(self._domain_ids.tolist())
+        ]
+
+
+def _first_per_row(positions: np.ndarray, rows: np.ndarray, n: int,
+                   missing: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Per-row count and first occurrence of sorted byte positions.
+
+    Args:
+        positions: Sorted buffer positions of one byte class
+        rows: Row index of each position
+        n: Number of rows
+        missing: Value to use as "first" for rows with no occurrence
+
+    Returns:
+        Tuple of (count per row, first position per row)
+    """
+    count = np.bincount(rows, minlength=n)
+    first = missing.copy()
+    has = count > 0
+    first[has] = positions[(np.cumsum(count) - count)[has]]
+    return count, first
+
+
+def _special_bytes(buf: bytes) -> tuple[np.ndarray, np.ndarray]:
+    """Positions and classes of every byte that is not plain local-part text."""
+    byte_class = np.frombuffer(buf.translate(_CLASS), dtype=np.uint8)
+    special = np.flatnonzero(byte_class)
+    return special, byte_class[special]
+
+
+def _hash_rows(arr: np.ndarray, seed: int) -> np.ndarray:
+    """Hash a fixed-width byte-string array to uint64, eight bytes per pass."""
+    arr = np.ascontiguousarray(arr)
+    width = arr.dtype.itemsize
+    padded = -(-width // 8) * 8
+    if padded != width:
+        arr = arr.astype(f"S{padded}")
+    words = arr.view(np.uint64).reshape(len(arr), padded // 8)
+
+    h = np.full(len(arr), seed, dtype=np.uint64)
+    for j in range(words.shape[1]):
+        h ^= words[:, j]
+        h *= np.uint64(0x9E3779B97F4A7C15)
+        h ^= h >> np.uint64(29)
+    return h
+
+
+def _factorize(keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Group equal uint64 keys with one sort.
+
+    Returns:
+        Tuple of (group id per row, first row index of each group)
+    """
+    order = np.argsort(keys)
+    sorted_keys = keys[order]
+    head = np.empty(len(keys), dtype=bool)
+    head[:1] = True
+    head[1:] = sorted_keys[1:] != sorted_keys[:-1]
+
+    first = np.minimum.reduceat(order, np.flatnonzero(head)) if len(keys) else order
+    group = np.empty(len(keys), dtype=np.int64)
+    group[order] = np.cumsum(head) - 1
+    return group, first
+
+
+def _group_rows(*columns: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Group rows by one or more columns via 64-bit hashes.
+
+    A second, independently seeded hash must agree within every group; on
+    the (astronomically rare) collision the rows are regrouped exactly.
+    """
+    def combined(seed):
+        h = np.full(len(columns[0]), seed, dtype=np.uint64)
+        for col in columns:
+            if col.dtype.kind == "S":
+                col = _hash_rows(col, seed)
+            h ^= col.astype(np.uint64) * np.uint64(0xD6E8FEB86659FD93)
+            h ^= h >> np.uint64(31)
+        return h
+
+    group, first = _factorize(combined(_HASH_SEED))
+    check = combined(_CHECK_SEED)
+    if np.array_equal(check, check[first[group]]):
+        return group, first
+
+    seen = {}
+    rows = zip(*(col.tolist() for col in columns))
+    group = np.fromiter(map(seen.setdefault, rows, range(len(columns[0]))), dtype=np.int64)
+    first = np.unique(group)
+    return np.searchsorted(first, group), first
+
+
+def classify(emails: list[str], blocklist: np.ndarray) -> tuple[np.ndarray, NormalisedAddresses]:
+    """
+    Apply every hygiene rule to a column of addresses using batch operations.
+
+    The column is joined into one byte buffer. A translate() pass marks the
+    few bytes the rules care about ('@', '+', whitespace, illegal bytes,
+    row breaks), so row-level checks become searchsorted() lookups over
+    those sparse positions. Local parts and domains are then sliced out as
+    fixed-width byte arrays and grouped by hash.
+
+    Args:
+        emails: Raw address column (all lists concatenated, in priority order)
+        blocklist: Compiled disposable-domain index from compile_blocklist()
+
+    Returns:
+        Tuple of (rule code per row as int8 array, normalised addresses)
+    """
+    n = len(emails)
+    codes = np.zeros(n, dtype=np.int8)
+    if n == 0:
+        return codes, NormalisedAddresses(np.array([], dtype="S1"), np.zeros(0, dtype=np.int64), [])
+
+    buf = "\n".join(emails).encode("utf-8", "replace").lower()
+    special, special_class = _special_bytes(buf)
+    breaks = special[special_class == _NEWLINE]
+    if len(breaks) != n - 1:
+        # An address contains a newline, which would split it into two rows
+        buf = "\n".join(e.replace("\n", " ") for e in emails).encode("utf-8", "replace").lower()
+        special, special_class = _special_bytes(buf)
+        breaks = special[special_class == _NEWLINE]
+    size = len(buf)
+    # Four bytes of padding keep start/at lookups and 4-byte reads in bounds for empty rows
+    data = np.frombuffer(buf + b"\n" * 4, dtype=np.uint8)
+
+    # Row bounds in buffer coordinates, then strip surrounding whitespace
+    row_start = np.concatenate(([0], breaks + 1))
+    row_end = np.concatenate((breaks, [size]))
+
+    rows = buf.split(b"\n")
+    if (row_end - row_start).max() > MAX_EMAIL_BYTES * 2:
+        # Blank oversized junk so it cannot widen the fixed-width array
+        rows = [r if len(r) <= MAX_EMAIL_BYTES * 2 else b"" for r in rows]
+    table = np.array(rows, dtype="S")
+    del rows
+
+    spaces = special[special_class == _SPACE]
+    if len(spaces):
+        run_head = np.concatenate(([True], spaces[1:] != spaces[:-1] + 1))
+        run_id = np.cumsum(run_head) - 1
+        run_first = spaces[run_head]
+        run_last = spaces[np.concatenate((run_head[1:], [True]))]
+
+        k = np.minimum(np.searchsorted(spaces, row_start), len(spaces) - 1)
+        start = np.where(spaces[k] == row_start, run_last[run_id[k]] + 1, row_start)
+
+        k = np.minimum(np.searchsorted(spaces, row_end - 1), len(spaces) - 1)
+        end = np.where(spaces[k] == row_end - 1, run_first[run_id[k]], row_end)
+        end = np.maximum(end, start)
+    else:
+        start, end = row_start, row_end
+
+    # Exactly one '@', no whitespace or illegal bytes before it, dot rules
+    ats = special[special_class == _AT]
+    at_count, at = _first_per_row(ats, np.searchsorted(breaks, ats), n, end)
+
+    bad = special[(special_class == _SPACE) | (special_class == _OTHER)]
+    bad_row = np.searchsorted(breaks, bad)
+    bad_in_local = (bad >= start[bad_row]) & (bad < at[bad_row])
+    bad_count = np.bincount(bad_row[bad_in_local], minlength=n)
+
+    double_dots = np.flatnonzero((data[:-1] == ord(".")) & (data[1:] == ord(".")))
+    dot_row = np.searchsorted(breaks, double_dots)
+    dots_in_local = (double_dots >= start[dot_row]) & (double_dots + 1 < at[dot_row])
+    dot_count = np.bincount(dot_row[dots_in_local], minlength=n)
+
+    valid = (at_count == 1) & (at > start) & (bad_count == 0) & (dot_count == 0)
+    valid &= (at - start <= MAX_LOCAL_BYTES) & (end - start <= MAX_EMAIL_BYTES)
+    valid &= data[start] != ord(".")
+    valid &= data[np.maximum(at - 1, 0)] != ord(".")
+
+    # Slice local part and domain out of each row (row coordinates)
+    lead = np.where(valid, start - row_start, 0)
+    at_offset = np.where(valid, at - row_start, 0)
+    local = np.strings.slice(table, lead, at_offset)
+    domain = np.strings.slice(table, np.where(valid, at_offset + 1, 0), np.where(valid, end - row_start, 0))
+    del table
+
+    # Domain rules run once per unique domain, then broadcast back
+    group, first = _group_rows(domain)
+    names, name_ids = [], {}
+    domain_id = np.full(len(first), -1, dtype=np.int64)
+    for u, raw in enumerate(domain[first].tolist()):
+        name = normalise_domain(raw) if raw else None
+        if name is None:
+            continue
+        if name not in name_ids:
+            name_ids[name] = len(names)
+            names.append(name)
+        domain_id[u] = name_ids[name]
+
+    name_blocked = blocked_domains(np.array([n.encode("ascii") for n in names] or [b""], dtype="S"), blocklist)
+    domain_blocked = (domain_id >= 0) & name_blocked[np.maximum(domain_id, 0)]
+
+    row_domain = np.where(valid, domain_id[group], -1)
+    valid &= row_domain >= 0
+    codes[~valid] = INVALID_SYNTAX
+
+    # Role accounts (sub-addressing ignored: sales+x@ is still sales@). One
+    # 4-byte read per row finds the few locals that start like a role; only
+    # those are sliced and looked up
+    head = np.ndarray((len(data) - 3,), dtype="<u4", buffer=data, strides=(1,))[start]
+    candidate = np.zeros(n, dtype=bool)
+    for mask, keys in _ROLE_KEYS:
+        candidate |= np.isin(head & mask, keys)
+    maybe_role = np.flatnonzero(valid & candidate)
+    plus = np.strings.find(local[maybe_role], b"+")
+    base = np.strings.slice(local[maybe_role], 0, np.where(plus >= 0, plus, at[maybe_role] - start[maybe_role]))
+    role = np.zeros(n, dtype=bool)
+    role[maybe_role[in_index(_ROLE_INDEX, base)]] = True
+    codes[role] = ROLE_ACCOUNT
+
+    codes[valid & ~role & domain_blocked[group]] = DISPOSABLE_DOMAIN
+
+    # Cross-list dedupe on (local part, normalised domain); first row wins
+    clean_rows = np.flatnonzero(codes == CLEAN)
+    key_group, key_first = _group_rows(local[clean_rows], row_domain[clean_rows])
+    duplicate = key_first[key_group] != np.arange(len(clean_rows))
+    codes[clean_rows[duplicate]] = DUPLICATE
+
+    return codes, NormalisedAddresses(local, row_domain, names)
+
+
+# =============================================================================
+# ROW-BY-ROW REFERENCE (benchmark baseline)
+# =============================================================================
+
+def classify_rows(emails: list[str], blocklist: np.ndarray) -> tuple[np.ndarray, list[str]]:
+    """Apply the same rules one row at a time. Used to benchmark and cross-check classify()."""
+    blocked_set = {d.decode("ascii") for d in blocklist.tolist()}
+    codes = np.zeros(len(emails), dtype=np.int8)
+    out = [""] * len(emails)
+    seen = set()
+
+    for i, raw in enumerate(emails):
+        e = raw.replace("\n", " ").encode("utf-8", "replace").lower().strip()
+        if len(e) > MAX_EMAIL_BYTES or e.count(b"@") != 1:
+            codes[i] = INVALID_SYNTAX
+            continue
+        local, domain_bytes = e.split(b"@")
+        if (not _LOCAL_RE.fullmatch(local) or local.startswith(b".")
+                or local.endswith(b".") or b".." in local):
+            codes[i] = INVALID_SYNTAX
+            continue
+        domain = normalise_domain(domain_bytes)
+        if domain is None:
+            codes[i] = INVALID_SYNTAX
+            continue
+
+        address = local.decode("utf-8", "replace") + "@" + domain
+        out[i] = address
+        if local.split(b"+")[0] in ROLE_ACCOUNTS_BYTES:
+            codes[i] = ROLE_ACCOUNT
+        elif any(c in blocked_set for c in domain_candidates(domain)):
+            codes[i] = DISPOSABLE_DOMAIN
+        elif address in seen:
+            codes[i] = DUPLICATE
+        else:
+            seen.add(address)
+
+    return codes, out
+
+
+def apply_suppression(codes: np.ndarray, normalised: NormalisedAddresses, directory: str) -> int:
+    """
+    Mark clean rows whose address is in the suppression index (hard bounces,
+    complaints). One O(1) lookup per clean row; a missing index suppresses nothing.
+
+    Returns:
+        Number of rows marked SUPPRESSED
+    """
+    index = SuppressionIndex.open_readonly(directory)
+    try:
+        if index.count == 0:
+            return 0
+        hits = [i for i in np.flatnonzero(codes == CLEAN).tolist() if index.is_suppressed(normalised[i])]
+    finally:
+        index.close()
+    codes[hits] = SUPPRESSED
+    return len(hits)
+
+
+def apply_domain_check(codes: np.ndarray, normalised: NormalisedAddresses, **options) -> tuple[int, dict]:
+    """
+    Mark clean rows whose domain cannot receive mail (NXDOMAIN, null MX, no
+    MX or address). Each unique domain is looked up once, through the
+    domain_check cache; failed lookups mark nothing.
+
+    Returns:
+        Tuple of (rows marked DEAD_DOMAIN, lookup stats)
+    """
+    clean = codes == CLEAN
+    used = np.unique(normalised.domain_ids[clean])
+    names = [normalised.domains[i] for i in used.tolist()]
+    results, stats = check_domains(names, **options)
+
+    # One spare slot so rows without a domain (id -1) read False
+    dead = np.zeros(len(normalised.domains) + 1, dtype=bool)
+    dead[used] = [results[name].dead for name in names]
+    hits = clean & dead[normalised.domain_ids]
+    codes[hits] = DEAD_DOMAIN
+    return int(hits.sum()), stats
+
+
+# =============================================================================
+# FILE I/O
+# =============================================================================
+
+def read_list(path: Path) -> tuple[list[str] | None, list[list[str]], int]:
+    """
+    Read a CSV (Listmonk import format or any CSV with an 'email' column)
+    or a plain one-address-per-line file.
+
+    Returns:
+        Tuple of (header or None, rows, index of the email column)
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        rows = list(csv.reader(f))
+
+    rows = [r for r in rows if r]
+    if not rows:
+        return None, [], 0
+
+    lowered = [c.strip().lower() for c in rows[0]]
+    if "email" in lowered:
+        return rows[0], rows[1:], lowered.index("email")
+    return None, rows, 0
+
+
+def write_outputs(out_dir: Path, sources: list[dict], codes: np.ndarray,
+                  normalised: list[str]) -> dict:
+    """
+    Write clean, rejected and duplicate files plus summary.json.
+
+    clean.csv keeps every input column (union across lists, email first) so it
+    can go straight into Listmonk's CSV import.
+
+    Returns:
+        Summary dict with per-rule and per-source counts
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    columns = ["email"]
+    for source in sources:
+        for col in source["header"] or []:
+            if col.strip().lower() not in [c.lower() for c in columns]:
+                columns.append(col.strip())
+    if len(columns) == 1:
+        columns += ["name", "attributes"]
+    positions = {c.lower(): i for i, c in enumerate(columns)}
+
+    paths = {
+        "clean": out_dir / "clean.csv",
+        "rejected": out_dir / "rejected.csv",
+        "duplicates": out_dir / "duplicates.csv",
+    }
+    first_seen = {}
+    code_list = codes.tolist()
+
+    with open(paths["clean"], "w", newline="", encoding="utf-8") as clean_f, \
+         open(paths["rejected"], "w", newline="", encoding="utf-8") as rejected_f, \
+         open(paths["duplicates"], "w", newline="", encoding="utf-8") as dup_f:
+        clean = csv.writer(clean_f)
+        rejected = csv.writer(rejected_f)
+        dups = csv.writer(dup_f)
+        clean.writerow(columns)
+        rejected.writerow(["email", "source", "reason"])
+        dups.writerow(["email", "source", "first_seen_in"])
+
+        i = 0
+        for source in sources:
+            col = source["email_col"]
+            mapping = [positions[c.strip().lower()] for c in source["header"] or []]
+            for row in source["rows"]:
+                code = code_list[i]
+                if code == CLEAN:
+                    first_seen[normalised[i]] = source["name"]
+                    out_row = [""] * len(columns)
+                    for value, pos in zip(row, mapping):
+                        out_row[pos] = value
+                    out_row[0] = normalised[i]
+                    clean.writerow(out_row)
+                elif code == DUPLICATE:
+                    dups.writerow([normalised[i], source["name"], first_seen.get(normalised[i], "")])
+                else:
+                    raw = row[col] if col < len(row) else ""
+                    rejected.writerow([raw.strip(), source["name"], RULE_NAMES[code]])
+                i += 1
+
+    by_source = {}
+    offset = 0
+    for source in sources:
+        chunk = codes[offset:offset + len(source["rows"])]
+        by_source[source["name"]] = {name: int((chunk == code).sum()) for code, name in RULE_NAMES.items()}
+        offset += len(source["rows"])
+
+    summary = {
+        "timestamp": datetime.now().isoformat(),
+        "total": len(code_list),
+        "counts": {name: int((codes == code).sum()) for code, name in RULE_NAMES.items()},
+        "by_source": by_source,
+        "files": {label: str(path) for label, path in paths.items()},
+    }
+    (out_dir / "summary.json").write_text(json.dumps(summary, indent=2))
+    return summary
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+def synthetic_list(n: int, seed: int = 42) -> list[str]:
+    """Generate a dirty list: mixed case, whitespace, IDN, roles, disposables, dupes."""
+    rng = random.Random(seed)
+    domains = [f"company{i}.com" for i in range(max(n // 20, 50))]
+    domains += ["gmail.com", "yahoo.com", "outlook.com", "Büro-Müller.de", "mail.example.co.uk"]
+    disposable = sorted(DISPOSABLE_DOMAINS)
+    roles = sorted(ROLE_ACCOUNTS)
+    emails = []
+    for i in range(n):
+        r = rng.random()
+        if r < 0.02:
+            emails.append(rng.choice(["no-at-sign.com", "a@@b.com", "x@localhost", " @y.com", "a..b@c.com"]))
+        elif r < 0.03:
+            emails.append(f"{rng.choice(roles)}@{rng.choice(domains)}")
+        elif r < 0.06:
+            emails.append(f"user{i}@{rng.choice(disposable)}")
+        elif r < 0.16 and emails:
+            emails.append(f"  {rng.choice(emails).upper()} ")
+        else:
+            emails.append(f"First.Last{rng.randrange(n * 2)}+tag@{rng.choice(domains)}")
+    return emails
+
+
+def run_benchmark(n: int, min_speedup: float) -> int:
+    """Time classify() against classify_rows() on a synthetic list."""
+    print(f"[list_hygiene] v{DOE_VERSION} benchmark")
+    print(f"  Rows: {n:,}")
+    print()
+
+    emails = synthetic_list(n)
+    blocklist = load_blocklist()
+
+    start = time.perf_counter()
+    codes_v, out_v = classify(emails, blocklist)
+    vector_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    codes_r, out_r = classify_rows(emails, blocklist)
+    row_secs = time.perf_counter() - start
+
+    if not np.array_equal(codes_v, codes_r) or out_v.tolist() != out_r:
+        mismatches = int((codes_v != codes_r).sum())
+        print(f"❌ Vectorised and row-by-row results differ ({mismatches} rule mismatches)")
+        return 1
+
+    speedup = row_secs / vector_secs if vector_secs else float("inf")
+    print(f"  Vectorised:  {vector_secs:7.3f}s  ({n / vector_secs:,.0f} rows/s)")
+    print(f"  Row-by-row:  {row_secs:7.3f}s  ({n / row_secs:,.0f} rows/s)")
+    print(f"  Speedup:     {speedup:7.1f}x")
+    for code, name in RULE_NAMES.items():
+        print(f"    {name}: {int((codes_v == code).sum()):,}")
+    print()
+
+    if speedup < min_speedup:
+        print(f"⚠️  Speedup below required {min_speedup:g}x")
+        return 1
+    print("✅ Benchmark passed")
+    return 0
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Validate, normalise, filter and deduplicate contact lists before Listmonk import.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("lists", nargs="*", help="CSV or plain-text lists, in priority order")
+    parser.add_argument("--out", default=OUTPUT_DIR, help=f"Output directory (default: {OUTPUT_DIR})")
+    parser.add_argument("--blocklist", help="Extra disposable domains, one per line")
+    parser.add_argument("--suppression-dir", default=SUPPRESSION_DIR,
+                        help=f"Bounce/complaint suppression index (default: {SUPPRESSION_DIR})")
+    parser.add_argument("--check-domains", action="store_true",
+                        help="Reject addresses whose domain has no MX or address record")
+    parser.add_argument("--nameserver", help="DNS resolver HOST[:PORT] for --check-domains")
+    parser.add_argument("--benchmark", type=int, metavar="ROWS", help="Benchmark on a synthetic list")
+    parser.add_argument("--min-speedup", type=float, default=MIN_SPEEDUP, help=f"Required benchmark speedup (default: {MIN_SPEEDUP:g})")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        return run_benchmark(args.benchmark, args.min_speedup)
+
+    if not args.lists:
+        parser.print_help()
+        return 1
+
+    print(f"[list_hygiene] v{DOE_VERSION}")
+    print(f"  Inputs: {', '.join(args.lists)}")
+    print()
+
+    try:
+        sources = []
+        for path in args.lists:
+            header, rows, email_col = read_list(Path(path))
+            sources.append({"name": Path(path).name, "header": header, "rows": rows, "email_col": email_col})
+            print(f"📥 {Path(path).name}: {len(rows):,} rows")
+
+        emails = [row[s["email_col"]] if s["email_col"] < len(row) else ""
+                  for s in sources for row in s["rows"]]
+
+        start = time.perf_counter()
+        codes, normalised = classify(emails, load_blocklist(args.blocklist))
+        apply_suppression(codes, normalised, args.suppression_dir)
+        elapsed = time.perf_counter() - start
+
+        if args.check_domains:
+            _, stats = apply_domain_check(codes, normalised, nameserver=args.nameserver)
+            print(f"🌐 {stats['domains']:,} domains checked ({stats['cached']:,} cached, "
+                  f"{stats['queries']:,} DNS queries) in {stats['seconds']:.2f}s")
+            if stats["errors"]:
+                print(f"⚠️  {stats['errors']:,} domain lookups failed; their addresses were kept")
+
+        summary = write_outputs(Path(args.out), sources, codes, normalised)
+
+        print()
+        print("RESULTS")
+        print("-" * 40)
+        for name, count in summary["counts"].items():
+            print(f"  {name}: {count:,}")
+        print()
+        print(f"  Rules applied in {elapsed:.2f}s")
+        for label, path in summary["files"].items():
+            print(f"  {label}: {path}")
+        print()
+        print("✅ Done!")
+        return 0
+
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted")
+        return 130
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,644 @@
+#!/usr/bin/env python3
+"""
+Script: listmonk_backup.py
+Directive: directives/listmonk_backup.md
+DOE Framework: v2.0.0
+
+Purpose:
+    Cross-platform, incremental replacement for backup-listmonk.ps1.
+    Streams `pg_dump -Fc -Z0` straight into content-defined chunks, so
+    nothing is staged on disk uncompressed. Chunks are compressed once (zstd
+    when the `zstandard` package is installed, gzip otherwise) and stored by
+    content hash. A chunk that an earlier run already stored is not written
+    again, so a nightly backup only costs the data that changed.
+
+    Each run writes a manifest listing its chunks plus the config files.
+    Retention is time-based (daily/weekly/monthly). Restores re-hash every
+    chunk and the whole stream before handing it to pg_restore.
+
+Cost:
+    Free (local disk only)
+
+Usage:
+    # Back up the running stack (docker exec listmonk-db pg_dump ...)
+    python execution/listmonk_backup.py backup
+
+    # Back up a local Postgres instead of the container
+    python execution/listmonk_backup.py backup --no-docker --pg-host localhost --pg-port 5432
+
+    # List, verify, restore, prune
+    python execution/listmonk_backup.py list
+    python execution/listmonk_backup.py verify --all
+    python execution/listmonk_backup.py restore latest --output listmonk.pgdump
+    python execution/listmonk_backup.py restore latest --database listmonk_restore
+    python execution/listmonk_backup.py prune --keep-daily 7 --keep-weekly 4 --keep-monthly 6
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# =============================================================================
+# VERSION - Must match directive version
+# =============================================================================
+DOE_VERSION = "2026.10.19"
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+STORE_DIR = "backups/store"
+
+DB_CONTAINER = "listmonk-db"
+DB_USER = "listmonk"
+DB_NAME = "listmonk"
+
+# Same files backup-listmonk.ps1 copies
+CONFIG_FILES = ["docker-compose.yml", "config.toml", "tunnel-config.yml", "tunnel-credentials.json", ".env"]
+CONTAINERS = ["listmonk-app", "listmonk-db", "cloudflared-tunnel"]
+
+# Content-defined chunking: cut where the rolling hash of the last WINDOW
+# bytes has its low bits zero, within [MIN_CHUNK, MAX_CHUNK]
+WINDOW = 48
+MIN_CHUNK = 32 * 1024
+MAX_CHUNK = 512 * 1024
+CUT_MASK = (1 << 17) - 1   # ~128 KiB average past MIN_CHUNK
+READ_SIZE = 2 * 1024 * 1024
+
+# Per-byte values for the rolling hash. Derived from SHA-256 so chunk
+# boundaries (and therefore deduplication) never change between versions.
+_GEAR = np.array(
+    [int.from_bytes(hashlib.sha256(b"listmonk-cdc" + bytes([i])).digest()[:4], "little") for i in range(256)],
+    dtype=np.uint64,
+)
+
+DEFAULT_RETENTION = {"last": 3, "daily": 7, "weekly": 4, "monthly": 6}
+
+
+# =============================================================================
+# CHUNKING
+# =============================================================================
+
+def cut_points(data: bytes, final: bool) -> tuple[list[int], int]:
+    """
+    Find chunk boundaries in `data`, which starts at a chunk boundary.
+
+    The rolling hash at byte i is the sum of _GEAR values over the WINDOW
+    bytes ending at i, computed for the whole buffer with one cumulative sum.
+
+    Returns:
+        (chunk end offsets, offset where the unfinished remainder starts)
+    """
+    n = len(data)
+    if n == 0:
+        return [], 0
+    sums = np.zeros(n + 1, dtype=np.uint64)
+    np.cumsum(_GEAR[np.frombuffer(data, dtype=np.uint8)], out=sums[1:])
+    window = sums[1:]
+    if n >= WINDOW:
+        window[WINDOW - 1:] -= sums[:n - WINDOW + 1]
+    candidates = np.flatnonzero((window & np.uint64(CUT_MASK)) == 0) + 1
+
+    cuts = []
+    start = 0
+    while True:
+        i = np.searchsorted(candidates, start + MIN_CHUNK)
+        if i < len(candidates) and candidates[i] <= start + MAX_CHUNK:
+            end = int(candidates[i])
+        elif n >= start + MAX_CHUNK:
+            end = start + MAX_CHUNK
+        elif final and start < n:
+            end = n
+        else:
+            break
+        cuts.append(end)
+        start = end
+    return cuts, start
+
+
+def iter_chunks(stream):
+    """Yield content-defined chunks from a binary stream in bounded memory."""
+    carry = b""
+    while True:
+        block = stream.read(READ_SIZE)
+        final = not block
+        data = carry + block
+        cuts, rest = cut_points(data, final)
+        start = 0
+        for end in cuts:
+            yield data[start:end]
+            start = end
+        carry = data[rest:]
+        if final:
+            return
+
+
+# =============================================================================
+# CHUNK STORE
+# =============================================================================
+
+class ChunkStore:
+    """Content-addressed, compressed chunk files plus per-run manifests."""
+
+    def __init__(self, root: str = STORE_DIR):
+        self.root = Path(root)
+        self.chunks = self.root / "chunks"
+        self.manifests = self.root / "manifests"
+        self.chunks.mkdir(parents=True, exist_ok=True)
+        self.manifests.mkdir(parents=True, exist_ok=True)
+        self.ext = ".zst" if zstandard else ".gz"
+        self._compressor = zstandard.ZstdCompressor(level=6) if zstandard else None
+
+    def _path(self, digest: str, ext: str) -> Path:
+        return self.chunks / digest[:2] / f"{digest}{ext}"
+
+    def find(self, digest: str) -> Path | None:
+        for ext in (".zst", ".gz"):
+            path = self._path(digest, ext)
+            if path.exists():
+                return path
+        return None
+
+    def put(self, data: bytes) -> tuple[str, int]:
+        """
+        Store a chunk unless it already exists.
+
+        Returns:
+            (sha256 hex digest, compressed bytes written; 0 if deduplicated)
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        if self.find(digest):
+            return digest, 0
+        packed = self._compressor.compress(data) if self._compressor else gzip.compress(data, compresslevel=6)
+        path = self._path(digest, self.ext)
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_suffix(".part")
+        tmp.write_bytes(packed)
+        os.replace(tmp, path)
+        return digest, len(packed)
+
+    def get(self, digest: str) -> bytes:
+        """Read a chunk and check its hash."""
+        path = self.find(digest)
+        if path is None:
+            raise FileNotFoundError(f"Missing chunk {digest}")
+        packed = path.read_bytes()
+        if path.suffix == ".zst":
+            if zstandard is None:
+                raise RuntimeError("Chunk is zstd-compressed. Run: pip install zstandard")
+            data = zstandard.ZstdDecompressor().decompress(packed)
+        else:
+            data = gzip.decompress(packed)
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Chunk {digest} is corrupt")
+        return data
+
+    def manifest_names(self) -> list[str]:
+        return sorted(p.stem for p in self.manifests.glob("*.json"))
+
+    def load_manifest(self, name: str) -> dict:
+        if name == "latest":
+            names = self.manifest_names()
+            if not names:
+                raise FileNotFoundError("No backups yet")
+            name = names[-1]
+        return json.loads((self.manifests / f"{name}.json").read_text())
+
+    def save_manifest(self, manifest: dict):
+        path = self.manifests / f"{manifest['name']}.json"
+        tmp = path.with_suffix(".part")
+        tmp.write_text(json.dumps(manifest, indent=2))
+        os.replace(tmp, path)
+
+    def collect_garbage(self) -> tuple[int, int]:
+        """Delete chunks no manifest references. Returns (files, bytes) removed."""
+        referenced = set()
+        for name in self.manifest_names():
+            manifest = self.load_manifest(name)
+            referenced.update(digest for digest, _ in manifest["database"]["chunks"])
+            referenced.update(entry["chunk"] for entry in manifest["files"].values())
+        files = size = 0
+        for path in self.chunks.glob("*/*"):
+            if path.name.split(".")[0] not in referenced:
+                size += path.stat().st_size
+                path.unlink()
+                files += 1
+        return files, size
+
+
+# =============================================================================
+# DATABASE
+# =============================================================================
+
+def dump_command(args) -> list[str]:
+    """pg_dump in custom format, uncompressed (compression happens per chunk)."""
+    if args.no_docker:
+        return ["pg_dump", "-h", args.pg_host, "-p", str(args.pg_port), "-U", args.pg_user, "-Fc", "-Z0", args.pg_db]
+    return ["docker", "exec", args.container, "pg_dump", "-U", args.pg_user, "-Fc", "-Z0", args.pg_db]
+
+
+def psql_command(args, tool: str, *extra: str, interactive: bool = False) -> list[str]:
+    if args.no_docker:
+        return [tool, "-h", args.pg_host, "-p", str(args.pg_port), "-U", args.pg_user, *extra]
+    return ["docker", "exec", *(["-i"] if interactive else []), args.container, tool, "-U", args.pg_user, *extra]
+
+
+def backup(args) -> dict:
+    """Stream a dump into the chunk store and write the run manifest."""
+    store = ChunkStore(args.store)
+    name = f"listmonk-{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}"
+    start = time.perf_counter()
+
+    if args.dump_file:
+        source = f"file:{args.dump_file}"
+        stream = open(args.dump_file, "rb")
+        process = None
+    else:
+        command = dump_command(args)
+        source = " ".join(command)
+        # stderr goes to a file: a pipe nobody reads while stdout streams could fill and block pg_dump
+        errors = tempfile.TemporaryFile()
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=errors)
+        stream = process.stdout
+
+    whole = hashlib.sha256()
+    chunks = []
+    raw_size = new_bytes = new_chunks = 0
+    code = 0
+    try:
+        with stream:
+            for data in iter_chunks(stream):
+                whole.update(data)
+                digest, written = store.put(data)
+                chunks.append([digest, len(data)])
+                raw_size += len(data)
+                if written:
+                    new_chunks += 1
+                    new_bytes += written
+    except BaseException:
+        if process is not None:
+            # A failed chunk write must not leave pg_dump behind
+            process.kill()
+        raise
+    finally:
+        if process is not None:
+            with errors:
+                code = process.wait()
+                errors.seek(0)
+                stderr = errors.read().decode("utf-8", "replace")
+    if process is not None:
+        if code != 0:
+            raise RuntimeError(f"pg_dump failed: {stderr.strip() or code}")
+    if raw_size == 0:
+        raise RuntimeError("Dump was empty")
+
+    files = {}
+    for filename in CONFIG_FILES:
+        path = Path(filename)
+        if path.exists():
+            digest, written = store.put(path.read_bytes())
+            files[filename] = {"chunk": digest, "size": path.stat().st_size}
+            new_bytes += written
+    if not args.no_docker and shutil.which("docker"):
+        for container in CONTAINERS:
+            result = subprocess.run(["docker", "inspect", container], capture_output=True)
+            if result.returncode == 0:
+                digest, written = store.put(result.stdout)
+                files[f"{container}-info.json"] = {"chunk": digest, "size": len(result.stdout)}
+                new_bytes += written
+
+    manifest = {
+        "name": name,
+        "created": datetime.now().isoformat(),
+        "doe_version": DOE_VERSION,
+        "source": source,
+        "format": "pg_dump custom (-Fc -Z0)",
+        "database": {"size": raw_size, "sha256": whole.hexdigest(), "chunks": chunks},
+        "files": files,
+        "stats": {
+            "chunks": len(chunks),
+            "new_chunks": new_chunks,
+            "new_bytes": new_bytes,
+            "elapsed_sec": round(time.perf_counter() - start, 2),
+        },
+    }
+    store.save_manifest(manifest)
+    return manifest
+
+
+def iter_database(store: ChunkStore, manifest: dict):
+    """Yield the dump's bytes chunk by chunk, checking every chunk and the whole stream."""
+    whole = hashlib.sha256()
+    for digest, size in manifest["database"]["chunks"]:
+        data = store.get(digest)
+        if len(data) != size:
+            raise ValueError(f"Chunk {digest} has wrong size")
+        whole.update(data)
+        yield data
+    if whole.hexdigest() != manifest["database"]["sha256"]:
+        raise ValueError("Reassembled dump does not match the manifest checksum")
+
+
+def verify(store: ChunkStore, manifest: dict, args) -> list[str]:
+    """
+    Reassemble a backup and check every hash. When pg_restore is reachable,
+    also have it read the archive's table of contents.
+
+    Returns:
+        Problems found (empty = verified)
+    """
+    problems = []
+    restore = None
+    if args.pg_check:
+        # Output goes to files, so pg_restore can never block on a full pipe while we feed it
+        toc_file, err_file = tempfile.TemporaryFile(), tempfile.TemporaryFile()
+        restore = subprocess.Popen(psql_command(args, "pg_restore", "--list", interactive=True),
+                                   stdin=subprocess.PIPE, stdout=toc_file, stderr=err_file)
+    feeding = restore is not None
+    try:
+        for data in iter_database(store, manifest):
+            if feeding:
+                try:
+                    restore.stdin.write(data)
+                except BrokenPipeError:
+                    # pg_restore gave up early; its exit code says why, but keep checking hashes
+                    feeding = False
+    except (ValueError, FileNotFoundError, RuntimeError) as e:
+        problems.append(str(e))
+    except BaseException:
+        if restore:
+            restore.kill()
+            restore.wait()
+        raise
+
+    if restore:
+        try:
+            restore.stdin.close()
+        except BrokenPipeError:
+            pass
+        code = restore.wait()
+        with toc_file, err_file:
+            toc_file.seek(0)
+            err_file.seek(0)
+            toc = toc_file.read().decode("utf-8", "replace")
+            err = err_file.read().decode("utf-8", "replace")
+        if code != 0:
+            problems.append(f"pg_restore --list failed: {err.strip()}")
+        elif " TABLE DATA public subscribers " not in toc:
+            problems.append("Archive has no subscribers table data")
+
+    for filename, entry in manifest["files"].items():
+        try:
+            store.get(entry["chunk"])
+        except (ValueError, FileNotFoundError, RuntimeError) as e:
+            problems.append(f"{filename}: {e}")
+    return problems
+
+
+def restore(store: ChunkStore, manifest: dict, args):
+    """Write the verified dump to a file, or pg_restore it into a database."""
+    if args.output:
+        tmp = Path(args.output + ".part")
+        with open(tmp, "wb") as f:
+            for data in iter_database(store, manifest):
+                f.write(data)
+        # Only a fully verified stream gets the real name
+        os.replace(tmp, args.output)
+        for filename, entry in manifest["files"].items():
+            if args.config_dir:
+                Path(args.config_dir).mkdir(parents=True, exist_ok=True)
+                (Path(args.config_dir) / filename).write_bytes(store.get(entry["chunk"]))
+        return
+
+    subprocess.run(psql_command(args, "createdb", args.database), check=False, capture_output=True)
+    with tempfile.TemporaryFile() as errors:
+        process = subprocess.Popen(
+            psql_command(args, "pg_restore", "--no-owner", "--clean", "--if-exists", "-d", args.database,
+                         interactive=True),
+            stdin=subprocess.PIPE, stderr=errors)
+        try:
+            for data in iter_database(store, manifest):
+                process.stdin.write(data)
+        except Exception:
+            process.kill()
+            raise
+        process.stdin.close()
+        code = process.wait()
+        errors.seek(0)
+        err = errors.read().decode("utf-8", "replace")
+    if code != 0:
+        raise RuntimeError(f"pg_restore failed: {err.strip()}")
+
+
+# =============================================================================
+# RETENTION
+# =============================================================================
+
+def select_kept(names: list[str], last: int, daily: int, weekly: int, monthly: int,
+                now: datetime | None = None) -> set[str]:
+    """
+    Grandfather-father-son retention: the `last` most recent backups, plus
+    the newest backup of each of the last `daily` days, `weekly` ISO weeks
+    and `monthly` months.
+    """
+    now = now or datetime.now()
+    dated = []
+    for name in names:
+        try:
+            dated.append((datetime.strptime(name, "listmonk-%Y-%m-%d_%H-%M-%S"), name))
+        except ValueError:
+            continue
+    dated.sort(reverse=True)
+
+    kept = {name for _, name in dated[:last]}
+    for count, key, span in (
+        (daily, lambda d: d.date(), timedelta(days=daily)),
+        (weekly, lambda d: d.isocalendar()[:2], timedelta(weeks=weekly)),
+        (monthly, lambda d: (d.year, d.month), timedelta(days=31 * monthly)),
+    ):
+        seen = set()
+        for when, name in dated:
+            if now - when > span or key(when) in seen or len(seen) >= count:
+                continue
+            seen.add(key(when))
+            kept.add(name)
+    if dated:
+        kept.add(dated[0][1])  # never delete the newest backup
+    return kept
+
+
+def prune(store: ChunkStore, retention: dict, dry_run: bool) -> dict:
+    names = store.manifest_names()
+    kept = select_kept(names, **retention)
+    removed = [n for n in names if n not in kept]
+    if dry_run:
+        return {"kept": sorted(kept), "removed": removed, "chunk_files": 0, "bytes": 0}
+    for name in removed:
+        (store.manifests / f"{name}.json").unlink()
+    files, size = store.collect_garbage()
+    return {"kept": sorted(kept), "removed": removed, "chunk_files": files, "bytes": size}
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def retention(args) -> dict:
+    return {name: getattr(args, f"keep_{name}") for name in DEFAULT_RETENTION}
+
+
+def _mb(n: int) -> str:
+    return f"{n / 1024 / 1024:,.1f} MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Streaming, deduplicated Listmonk database backups.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--store", default=STORE_DIR, help=f"Chunk store (default: {STORE_DIR})")
+    parser.add_argument("--container", default=DB_CONTAINER, help=f"Postgres container (default: {DB_CONTAINER})")
+    parser.add_argument("--no-docker", action="store_true", help="Run pg_dump/pg_restore locally instead of in the container")
+    parser.add_argument("--pg-host", default=os.getenv("PGHOST", "localhost"), help="Postgres host with --no-docker")
+    parser.add_argument("--pg-port", type=int, default=int(os.getenv("PGPORT", "5432")), help="Postgres port with --no-docker")
+    parser.add_argument("--pg-user", default=os.getenv("PGUSER", DB_USER), help=f"Postgres user (default: {DB_USER})")
+    parser.add_argument("--pg-db", default=os.getenv("PGDATABASE", DB_NAME), help=f"Database (default: {DB_NAME})")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    backup_parser = subparsers.add_parser("backup", help="Take a backup")
+    backup_parser.add_argument("--dump-file", help="Chunk an existing pg_dump -Fc file instead of running pg_dump")
+    backup_parser.add_argument("--no-verify", action="store_true", help="Skip re-reading the backup afterwards")
+    backup_parser.add_argument("--no-prune", action="store_true", help="Skip retention after the backup")
+    for name, default in DEFAULT_RETENTION.items():
+        backup_parser.add_argument(f"--keep-{name}", type=int, default=default, help=f"{name.title()} backups to keep (default: {default})")
+
+    subparsers.add_parser("list", help="List backups")
+
+    verify_parser = subparsers.add_parser("verify", help="Re-hash a backup and check it with pg_restore --list")
+    verify_parser.add_argument("name", nargs="?", default="latest", help="Manifest name (default: latest)")
+    verify_parser.add_argument("--all", action="store_true", help="Verify every backup")
+    verify_parser.add_argument("--no-pg-check", dest="pg_check", action="store_false", help="Skip pg_restore --list")
+
+    restore_parser = subparsers.add_parser("restore", help="Restore a backup")
+    restore_parser.add_argument("name", help="Manifest name, or 'latest'")
+    target = restore_parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--output", help="Write the pg_dump archive to this file")
+    target.add_argument("--database", help="pg_restore into this database (created if missing)")
+    restore_parser.add_argument("--config-dir", help="With --output, also write the saved config files here")
+
+    prune_parser = subparsers.add_parser("prune", help="Apply time-based retention and delete unreferenced chunks")
+    for name, default in DEFAULT_RETENTION.items():
+        prune_parser.add_argument(f"--keep-{name}", type=int, default=default, help=f"{name.title()} backups to keep (default: {default})")
+    prune_parser.add_argument("--dry-run", action="store_true", help="Show what would be removed")
+
+    args = parser.parse_args()
+    if not args.command:
+        parser.print_help()
+        return 0
+
+    print(f"[listmonk_backup] v{DOE_VERSION}")
+    print()
+
+    try:
+        store = ChunkStore(args.store)
+
+        if args.command == "backup":
+            print(f"📦 Streaming {'dump file' if args.dump_file else 'pg_dump'} into {args.store}...")
+            manifest = backup(args)
+            stats = manifest["stats"]
+            db = manifest["database"]
+            print(f"✅ {manifest['name']}: {_mb(db['size'])} dump, {stats['chunks']} chunks "
+                  f"({stats['new_chunks']} new), {_mb(stats['new_bytes'])} written in {stats['elapsed_sec']}s")
+            if not args.no_verify:
+                args.pg_check = bool(shutil.which("pg_restore") if args.no_docker else shutil.which("docker"))
+                if not args.pg_check:
+                    print("⚠️ pg_restore not reachable - checking hashes only")
+                problems = verify(store, manifest, args)
+                if problems:
+                    for p in problems:
+                        print(f"  ❌ {p}")
+                    return 1
+                print("✅ Verified: every chunk and the full-stream checksum match"
+                      + (", and pg_restore read the archive" if args.pg_check else ""))
+            if not args.no_prune:
+                result = prune(store, retention(args), False)
+                if result["removed"]:
+                    print(f"🧹 Retention removed {len(result['removed'])} backups, {_mb(result['bytes'])} of chunks")
+            return 0
+
+        if args.command == "list":
+            names = store.manifest_names()
+            if not names:
+                print("No backups yet")
+                return 0
+            print(f"{'Backup':<32} {'Dump':>10} {'Chunks':>7} {'New data':>10}")
+            print("-" * 62)
+            for name in names:
+                m = store.load_manifest(name)
+                print(f"{name:<32} {_mb(m['database']['size']):>10} {m['stats']['chunks']:>7} {_mb(m['stats']['new_bytes']):>10}")
+            total = sum(p.stat().st_size for p in store.chunks.glob("*/*"))
+            print()
+            print(f"Store size: {_mb(total)}")
+            return 0
+
+        if args.command == "verify":
+            names = store.manifest_names() if args.all else [store.load_manifest(args.name)["name"]]
+            if args.pg_check and not (shutil.which("pg_restore") if args.no_docker else shutil.which("docker")):
+                print("⚠️ pg_restore not reachable - checking hashes only")
+                args.pg_check = False
+            failed = 0
+            for name in names:
+                problems = verify(store, store.load_manifest(name), args)
+                if problems:
+                    failed += 1
+                    print(f"  ❌ {name}")
+                    for p in problems:
+                        print(f"     {p}")
+                else:
+                    print(f"  ✅ {name}")
+            return 1 if failed else 0
+
+        if args.command == "restore":
+            manifest = store.load_manifest(args.name)
+            target = args.output or f"database {args.database}"
+            print(f"📥 Restoring {manifest['name']} to {target}...")
+            restore(store, manifest, args)
+            print("✅ Restore complete (all checksums verified)")
+            return 0
+
+        if args.command == "prune":
+            result = prune(store, retention(args), args.dry_run)
+            verb = "Would remove" if args.dry_run else "Removed"
+            for name in result["removed"]:
+                print(f"  🗑️  {name}")
+            print(f"✅ Kept {len(result['kept'])}, {verb.lower()} {len(result['removed'])} backups"
+                  + ("" if args.dry_run else f" and {result['chunk_files']} chunks ({_mb(result['bytes'])})"))
+            return 0
+
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted")
+        return 130
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
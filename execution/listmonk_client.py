@@ -0,0 +1,524 @@
+#!/usr/bin/env python3
+"""
+Script: listmonk_client.py
+Directive: directives/listmonk_client.md
+DOE Framework: v2.0.0
+
+Purpose:
+    One Listmonk API client for every script, instead of ad-hoc requests
+    calls. A single authenticated session (basic auth from .env) keeps
+    connections open between calls.
+
+    Paginated endpoints (subscribers, lists, campaigns) are generators:
+    records are yielded page by page while the next pages are already
+    being fetched on a small thread pool. At most `max_in_flight` pages
+    are requested or held at once, so exporting or scanning a 20k dormant
+    list uses the same memory as a 500-row one, unlike a single
+    per_page=all response.
+
+Cost:
+    Free (self-hosted Listmonk)
+
+Usage:
+    # In a script
+    from listmonk_client import ListmonkClient
+
+    client = ListmonkClient.from_env()
+    for subscriber in client.subscribers(list_id=3, query="subscribers.status = 'enabled'"):
+        ...
+
+    # Stream a list to CSV (email,name,attributes), ready for warmup_scheduler enqueue
+    python execution/listmonk_client.py export --list 3 --out .tmp/dormant.csv
+
+    # Count subscribers / show lists
+    python execution/listmonk_client.py count --list 3
+    python execution/listmonk_client.py lists
+
+    # Compare per_page=all, page-by-page and prefetching against a local mock API
+    python execution/listmonk_client.py benchmark --subscribers 20000
+"""
+
+import os
+import re
+import sys
+import csv
+import json
+import time
+import random
+import argparse
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+from listmonk_watchdog import LISTMONK_LOCAL_URL
+
+load_dotenv()
+
+# =============================================================================
+# VERSION - Must match directive version
+# =============================================================================
+DOE_VERSION = "2026.10.19"
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+LISTMONK_URL = os.getenv("LISTMONK_URL") or LISTMONK_LOCAL_URL
+LISTMONK_ADMIN_USER = os.getenv("LISTMONK_ADMIN_USER")
+LISTMONK_ADMIN_PASSWORD = os.getenv("LISTMONK_ADMIN_PASSWORD")
+
+PER_PAGE = 500
+MAX_IN_FLIGHT = 4
+TIMEOUT = 30
+
+MOCK_PORT = 9011
+
+
+# =============================================================================
+# CLIENT
+# =============================================================================
+
+class ListmonkError(RuntimeError):
+    """Listmonk answered with an error status."""
+
+
+class ListmonkClient:
+    """Authenticated Listmonk API session with streaming pagination."""
+
+    def __init__(self, url: str, user: str | None, password: str | None,
+                 per_page: int = PER_PAGE, max_in_flight: int = MAX_IN_FLIGHT, timeout: float = TIMEOUT):
+        self.url = url.rstrip("/")
+        self.per_page = per_page
+        self.max_in_flight = max(1, max_in_flight)
+        self.timeout = timeout
+        self.session = requests.Session()
+        if user:
+            self.session.auth = (user, password or "")
+        # One pooled connection per page that can be in flight
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_in_flight + 1)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @classmethod
+    def from_env(cls, url: str | None = None, **kwargs) -> "ListmonkClient":
+        return cls(url or LISTMONK_URL, LISTMONK_ADMIN_USER, LISTMONK_ADMIN_PASSWORD, **kwargs)
+
+    def call(self, method: str, path: str, **kwargs):
+        """Call an endpoint and return its `data` field."""
+        response = self.session.request(method, f"{self.url}{path}", timeout=self.timeout, **kwargs)
+        if response.status_code >= 400:
+            raise ListmonkError(f"{method} {path} failed: {response.status_code} {response.text[:200]}")
+        return response.json().get("data") if response.content else None
+
+    def healthy(self) -> bool:
+        try:
+            return self.session.get(f"{self.url}/api/health", timeout=5).status_code == 200
+        except requests.RequestException:
+            return False
+
+    def wait_healthy(self, timeout: float = 60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.healthy():
+                return
+            time.sleep(1)
+        raise ListmonkError(f"Listmonk not healthy after {timeout:g}s")
+
+    # -------------------------------------------------------------------------
+    # Pagination
+    # -------------------------------------------------------------------------
+
+    def pages(self, path: str, params: dict | None = None):
+        """
+        Yield each page's `results` list, in order.
+
+        The first page gives the total; the rest are requested up to
+        `max_in_flight` at a time while earlier pages are being consumed.
+        Stopping early (break, exception) cancels pages not yet started.
+        """
+        params = dict(params or {})
+        per_page = self.per_page
+
+        def fetch(page: int) -> list:
+            return self.call("GET", path, params={**params, "page": page, "per_page": per_page}).get("results") or []
+
+        first = self.call("GET", path, params={**params, "page": 1, "per_page": per_page})
+        results = first.get("results") or []
+        total = first.get("total") or 0
+        last_page = -(-total // per_page)
+        yield results
+        if last_page <= 1 or not results:
+            return
+
+        if self.max_in_flight == 1:
+            for page in range(2, last_page + 1):
+                results = fetch(page)
+                if not results:
+                    return
+                yield results
+            return
+
+        pool = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="listmonk-page")
+        in_flight = deque()
+        next_page = 2
+        try:
+            while next_page <= last_page and len(in_flight) < self.max_in_flight:
+                in_flight.append(pool.submit(fetch, next_page))
+                next_page += 1
+            while in_flight:
+                results = in_flight.popleft().result()
+                if not results:
+                    # Rows were deleted since the total was read
+                    return
+                if next_page <= last_page:
+                    in_flight.append(pool.submit(fetch, next_page))
+                    next_page += 1
+                yield results
+        finally:
+            for future in in_flight:
+                future.cancel()
+            pool.shutdown(wait=True)
+
+    def paginate(self, path: str, params: dict | None = None):
+        """Yield records one at a time from a paginated endpoint."""
+        for results in self.pages(path, params):
+            yield from results
+
+    def subscribers(self, list_id: int | None = None, query: str | None = None, status: str | None = None):
+        """
+        Subscribers, ordered by id.
+
+        Args:
+            list_id: Only this list
+            query: Listmonk SQL expression, e.g. "subscribers.attribs->>'city' = 'Berlin'"
+            status: Subscription status on the list (confirmed, unconfirmed, unsubscribed)
+        """
+        params = {"order_by": "id", "order": "asc"}
+        if list_id is not None:
+            params["list_id"] = list_id
+        if query:
+            params["query"] = query
+        if status:
+            params["subscription_status"] = status
+        return self.paginate("/api/subscribers", params)
+
+    def lists(self):
+        return self.paginate("/api/lists", {"order_by": "id", "order": "asc"})
+
+    def campaigns(self, status: str | None = None):
+        params = {"order_by": "created_at", "order": "desc"}
+        if status:
+            params["status"] = status
+        return self.paginate("/api/campaigns", params)
+
+    def bounces(self):
+        """Bounces, newest first."""
+        return self.paginate("/api/bounces", {"order_by": "created_at", "order": "desc"})
+
+    def count_subscribers(self, list_id: int | None = None, query: str | None = None) -> int:
+        params = {"page": 1, "per_page": 1}
+        if list_id is not None:
+            params["list_id"] = list_id
+        if query:
+            params["query"] = query
+        return self.call("GET", "/api/subscribers", params=params).get("total") or 0
+
+
+def export_subscribers(client: ListmonkClient, out_path: str, list_id: int | None = None,
+                       query: str | None = None, status: str | None = None) -> int:
+    """Write subscribers as a Listmonk import CSV, one row at a time. Returns rows written."""
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with open(out_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["email", "name", "attributes"])
+        for subscriber in client.subscribers(list_id, query, status):
+            writer.writerow([subscriber["email"], subscriber.get("name", ""),
+                             json.dumps(subscriber.get("attribs") or {})])
+            count += 1
+    return count
+
+
+# =============================================================================
+# MOCK API (benchmarks and offline testing)
+# =============================================================================
+
+MOCK_EPOCH = datetime(2025, 6, 1, tzinfo=timezone.utc)
+MOCK_LISTS = [{"id": 1, "name": "Warm", "type": "private", "optin": "single", "tags": ["warm"]},
+              {"id": 2, "name": "Dormant", "type": "private", "optin": "single", "tags": ["dormant"]}]
+
+
+def mock_timestamp(i: int) -> str:
+    return (MOCK_EPOCH + timedelta(minutes=i)).isoformat().replace("+00:00", "Z")
+
+
+def mock_subscriber(i: int) -> dict:
+    """
+    Synthetic subscriber i, generated on demand so the mock holds nothing in
+    memory. Subscriber i was last updated i minutes after MOCK_EPOCH.
+    """
+    rng = random.Random(i)
+    list_id = 1 if i % 5 == 0 else 2
+    status = "unsubscribed" if i % 97 == 0 else "confirmed"
+    return {
+        "id": i, "uuid": f"00000000-0000-4000-8000-{i:012d}", "email": f"user{i}@example.com",
+        "name": f"User {i}", "status": "blocklisted" if i % 211 == 0 else "enabled",
+        "lists": [{"id": list_id, "name": MOCK_LISTS[list_id - 1]["name"], "subscription_status": status}],
+        "attribs": {"city": rng.choice(["Berlin", "Lisbon", "Austin"]), "score": rng.randint(0, 100)},
+        "created_at": mock_timestamp(0), "updated_at": mock_timestamp(i),
+    }
+
+
+def mock_matches(query: str, subscribers: int) -> range:
+    """
+    Subscriber ids matching the few query shapes the mock understands:
+    an updated_at lower bound, opens (every 3rd) and clicks (every 10th).
+    Anything else matches everyone.
+    """
+    if "campaign_views" in query:
+        return range(3, subscribers + 1, 3)
+    if "link_clicks" in query:
+        return range(10, subscribers + 1, 10)
+    match = re.search(r"updated_at\s*>=?\s*'([^']+)'", query)
+    if match:
+        since = datetime.fromisoformat(match.group(1).replace("Z", "+00:00"))
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        first = max(1, -(-int((since - MOCK_EPOCH).total_seconds()) // 60))
+        return range(first, subscribers + 1)
+    return range(1, subscribers + 1)
+
+
+def run_mock(port: int, subscribers: int, latency: float) -> int:
+    """
+    Serve the read endpoints (subscribers, lists, campaigns, bounces) with
+    synthetic data. List creation and membership changes are accepted and
+    discarded.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    def page_of(items, params: dict) -> dict:
+        if params.get("per_page") == "all":
+            selected = items
+        else:
+            per_page = int(params.get("per_page", 20))
+            start = (int(params.get("page", 1)) - 1) * per_page
+            selected = items[start:start + per_page]
+        return {"total": len(items), "page": int(params.get("page", 1)), "per_page": params.get("per_page", 20),
+                "selected": selected}
+
+    campaigns = [{"id": 1, "name": "Dormant re-engagement", "subject": "Still interested?", "status": "finished",
+                  "lists": [{"id": 2, "name": "Dormant"}], "to_send": subscribers, "sent": subscribers,
+                  "views": subscribers // 3, "clicks": subscribers // 10, "bounces": subscribers // 50,
+                  "started_at": mock_timestamp(0), "created_at": mock_timestamp(0),
+                  "updated_at": mock_timestamp(subscribers)}]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            if url.path == "/api/health":
+                return self._send({"data": True})
+            if url.path == "/api/lists":
+                counts = {1: subscribers // 5, 2: subscribers - subscribers // 5}
+                lists = [{**lst, "subscriber_count": counts[lst["id"]], "updated_at": mock_timestamp(0)}
+                         for lst in MOCK_LISTS]
+                page = page_of(lists, params)
+                return self._send({"data": {**page, "results": page.pop("selected")}})
+            if url.path == "/api/campaigns":
+                page = page_of(campaigns, params)
+                return self._send({"data": {**page, "results": page.pop("selected")}})
+
+            # Simulated server and network time per request
+            time.sleep(latency)
+            if url.path == "/api/bounces":
+                # Every 50th subscriber bounced once, newest first
+                ids = range(subscribers - subscribers % 50, 0, -50)
+                page = page_of(ids, params)
+                results = [{"id": i // 50, "type": "hard", "source": "api", "email": f"user{i}@example.com",
+                            "subscriber_id": i, "campaign": {"id": 1, "name": campaigns[0]["name"]},
+                            "created_at": mock_timestamp(i)} for i in page.pop("selected")]
+                return self._send({"data": {**page, "results": results}})
+            if url.path != "/api/subscribers":
+                return self._send({"message": "not found"}, 404)
+
+            page = page_of(mock_matches(params.get("query", ""), subscribers), params)
+            results = [mock_subscriber(i) for i in page.pop("selected")]
+            self._send({"data": {**page, "results": results}})
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if urlparse(self.path).path == "/api/lists":
+                return self._send({"data": {"id": len(MOCK_LISTS) + 1, "name": body.get("name")}})
+            self._send({"message": "not found"}, 404)
+
+        def do_PUT(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if urlparse(self.path).path == "/api/subscribers/lists":
+                # Accepted but not stored: the mock's data is generated, not kept
+                return self._send({"data": len(body.get("ids") or []) > 0})
+            self._send({"message": "not found"}, 404)
+
+        def _send(self, payload: dict, status: int = 200):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    print(f"🧪 Mock Listmonk API on http://127.0.0.1:{port} ({subscribers:,} subscribers, "
+          f"{latency * 1000:.0f} ms per request; Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+def run_benchmark(subscribers: int, latency: float, per_page: int, max_in_flight: int) -> list[dict]:
+    """Time and trace peak memory of three ways to read every subscriber from the mock."""
+    import tracemalloc
+
+    port = MOCK_PORT
+    mock = subprocess.Popen(
+        [sys.executable, __file__, "mock", "--port", str(port), "--subscribers", str(subscribers),
+         "--latency", str(latency)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    results = []
+    try:
+        ListmonkClient(url, None, None).wait_healthy(timeout=10)
+
+        def read_all(client: ListmonkClient) -> int:
+            data = client.call("GET", "/api/subscribers", params={"page": 1, "per_page": "all"})
+            return sum(1 for _ in data["results"])
+
+        def stream(client: ListmonkClient) -> int:
+            return sum(1 for _ in client.subscribers())
+
+        modes = [
+            ("per_page=all", read_all, 1),
+            (f"pages of {per_page}, one at a time", stream, 1),
+            (f"pages of {per_page}, {max_in_flight} in flight", stream, max_in_flight),
+        ]
+        for label, read, in_flight in modes:
+            client = ListmonkClient(url, None, None, per_page=per_page, max_in_flight=in_flight)
+            client.wait_healthy(timeout=10)
+            tracemalloc.start()
+            start = time.perf_counter()
+            count = read(client)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            client.session.close()
+            results.append({"mode": label, "count": count, "seconds": elapsed, "peak_mb": peak / 1e6})
+    finally:
+        mock.terminate()
+        mock.wait()
+    return results
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming Listmonk API client")
+    parser.add_argument("--url", default=LISTMONK_URL, help=f"Listmonk URL (default: LISTMONK_URL or {LISTMONK_LOCAL_URL})")
+    parser.add_argument("--per-page", type=int, default=PER_PAGE, help=f"Records per request (default: {PER_PAGE})")
+    parser.add_argument("--max-in-flight", type=int, default=MAX_IN_FLIGHT,
+                        help=f"Pages requested or held at once (default: {MAX_IN_FLIGHT})")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    export_parser = subparsers.add_parser("export", help="Stream subscribers to a CSV")
+    export_parser.add_argument("--list", type=int, help="List ID (default: all subscribers)")
+    export_parser.add_argument("--query", help="Listmonk SQL expression to filter subscribers")
+    export_parser.add_argument("--status", choices=["confirmed", "unconfirmed", "unsubscribed"],
+                               help="Subscription status on the list")
+    export_parser.add_argument("--out", required=True, help="Output CSV (email,name,attributes)")
+
+    count_parser = subparsers.add_parser("count", help="Count subscribers")
+    count_parser.add_argument("--list", type=int, help="List ID (default: all subscribers)")
+    count_parser.add_argument("--query", help="Listmonk SQL expression to filter subscribers")
+
+    subparsers.add_parser("lists", help="Show lists and subscriber counts")
+
+    mock_parser = subparsers.add_parser("mock", help="Serve a synthetic Listmonk API locally")
+    mock_parser.add_argument("--port", type=int, default=MOCK_PORT, help=f"Port (default: {MOCK_PORT})")
+    mock_parser.add_argument("--subscribers", type=int, default=20_000, help="Synthetic subscribers (default: 20000)")
+    mock_parser.add_argument("--latency", type=float, default=0.05, help="Seconds per request (default: 0.05)")
+
+    bench_parser = subparsers.add_parser("benchmark", help="Compare read strategies against the mock API")
+    bench_parser.add_argument("--subscribers", type=int, default=20_000, help="Synthetic subscribers (default: 20000)")
+    bench_parser.add_argument("--latency", type=float, default=0.05, help="Mock seconds per request (default: 0.05)")
+
+    args = parser.parse_args()
+
+    if args.command == "mock":
+        return run_mock(args.port, args.subscribers, args.latency)
+
+    if not args.command:
+        parser.print_help()
+        return 0
+
+    print(f"[listmonk_client] v{DOE_VERSION}")
+    print()
+
+    try:
+        if args.command == "benchmark":
+            print(f"⏱️  Reading {args.subscribers:,} subscribers from the mock API "
+                  f"({args.latency * 1000:.0f} ms per request)...")
+            for r in run_benchmark(args.subscribers, args.latency, args.per_page, args.max_in_flight):
+                print(f"  {r['mode']:<32} {r['seconds']:6.2f}s  peak {r['peak_mb']:6.1f} MB  ({r['count']:,} rows)")
+            return 0
+
+        if not LISTMONK_ADMIN_USER or not LISTMONK_ADMIN_PASSWORD:
+            print("ERROR: LISTMONK_ADMIN_USER / LISTMONK_ADMIN_PASSWORD not set in .env")
+            return 1
+        client = ListmonkClient.from_env(args.url, per_page=args.per_page, max_in_flight=args.max_in_flight)
+
+        if args.command == "export":
+            start = time.perf_counter()
+            count = export_subscribers(client, args.out, args.list, args.query, args.status)
+            print(f"✅ Exported {count:,} subscribers to {args.out} in {time.perf_counter() - start:.1f}s")
+
+        elif args.command == "count":
+            print(f"{client.count_subscribers(args.list, args.query):,} subscribers")
+
+        elif args.command == "lists":
+            for lst in client.lists():
+                print(f"  {lst['id']:>4}  {lst['name']}  ({lst.get('subscriber_count', 0):,} subscribers)")
+        return 0
+
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted")
+        return 130
+
+    except (ListmonkError, requests.RequestException) as e:
+        print(f"❌ Listmonk error: {e}")
+        return 1
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,587 @@
+#!/usr/bin/env python3
+"""
+Script: listmonk_mirror.py
+Directive: directives/listmonk_mirror.md
+DOE Framework: v2.0.0
+
+Purpose:
+    Keep a local SQLite copy of Listmonk's subscribers, list memberships,
+    engagement, bounces, lists and campaign stats, so reports and
+    segmentation run against the mirror instead of the live instance
+    behind the tunnel (and its 25-connection database pool).
+
+    After the first full copy, each sync fetches only subscribers whose
+    row or list memberships changed since the last `updated_at`
+    watermark, subscribers who opened or clicked since the last sync, and
+    bounces newer than the last one seen. Lists and campaigns are small
+    and are refreshed every time.
+
+    With --events, individual opens and clicks (with timestamps) are also
+    copied, straight from Listmonk's Postgres because the API does not
+    expose them: only rows with an id above the last one copied.
+
+Cost:
+    Free (self-hosted Listmonk)
+
+Usage:
+    # First run copies everything, later runs only what changed
+    python execution/listmonk_mirror.py sync
+
+    # Full copy, also removes subscribers deleted in Listmonk
+    python execution/listmonk_mirror.py sync --full
+
+    # Also copy open/click events (for engagement_score.py)
+    python execution/listmonk_mirror.py sync --events
+
+    # Rows, watermark, last sync
+    python execution/listmonk_mirror.py status
+
+    # Ad-hoc report against the mirror (read-only)
+    python execution/listmonk_mirror.py sql "SELECT status, COUNT(*) FROM subscribers GROUP BY status"
+"""
+
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import requests
+
+from listmonk_backup import DB_CONTAINER, DB_NAME, DB_USER, psql_command
+from listmonk_client import ListmonkClient, ListmonkError, LISTMONK_URL, LISTMONK_ADMIN_USER, LISTMONK_ADMIN_PASSWORD
+
+# =============================================================================
+# VERSION - Must match directive version
+# =============================================================================
+DOE_VERSION = "2026.10.19"
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+MIRROR_DB = ".tmp/listmonk_mirror.db"
+
+# Bigger pages, fewer in flight: each page is one query on Listmonk's pool
+PER_PAGE = 1000
+MAX_IN_FLIGHT = 2
+
+# Re-read rows updated this long before the watermark, in case a slow
+# transaction in Listmonk committed after the last sync read past it
+OVERLAP = timedelta(minutes=5)
+
+# The first sync asks which subscribers opened/clicked within each window
+# (largest first); later syncs only ask about the time since the last one
+ACTIVITY_WINDOWS_DAYS = (365, 90, 30, 7, 1)
+
+ACTIVITY_TABLES = {"last_open": "campaign_views", "last_click": "link_clicks"}
+
+# Event kinds in the events table, and the Listmonk tables they come from
+OPEN, CLICK = 1, 2
+EVENT_TABLES = {OPEN: "campaign_views", CLICK: "link_clicks"}
+
+# Events older than this are not copied (and are dropped on --full)
+EVENT_RETENTION_DAYS = 400
+EVENT_BATCH = 50_000
+
+
+# =============================================================================
+# STORE
+# =============================================================================
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS subscribers (
+    id INTEGER PRIMARY KEY,
+    uuid TEXT,
+    email TEXT NOT NULL,
+    name TEXT,
+    status TEXT,
+    attribs TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    sync_run INTEGER
+);
+CREATE INDEX IF NOT EXISTS subscribers_email ON subscribers (email);
+
+CREATE TABLE IF NOT EXISTS subscriber_lists (
+    subscriber_id INTEGER NOT NULL,
+    list_id INTEGER NOT NULL,
+    status TEXT,
+    PRIMARY KEY (subscriber_id, list_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS subscriber_lists_list ON subscriber_lists (list_id, status);
+
+CREATE TABLE IF NOT EXISTS subscriber_activity (
+    subscriber_id INTEGER PRIMARY KEY,
+    last_open TEXT,
+    last_click TEXT
+);
+
+CREATE TABLE IF NOT EXISTS bounces (
+    id INTEGER PRIMARY KEY,
+    subscriber_id INTEGER,
+    email TEXT,
+    type TEXT,
+    source TEXT,
+    campaign_id INTEGER,
+    created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS bounces_subscriber ON bounces (subscriber_id);
+
+CREATE TABLE IF NOT EXISTS lists (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    type TEXT,
+    optin TEXT,
+    tags TEXT,
+    subscriber_count INTEGER,
+    updated_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS campaigns (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    subject TEXT,
+    status TEXT,
+    lists TEXT,
+    to_send INTEGER,
+    sent INTEGER,
+    views INTEGER,
+    clicks INTEGER,
+    bounces INTEGER,
+    started_at TEXT,
+    updated_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS events (
+    kind INTEGER NOT NULL,
+    source_id INTEGER NOT NULL,
+    subscriber_id INTEGER NOT NULL,
+    campaign_id INTEGER,
+    ts INTEGER NOT NULL,
+    PRIMARY KEY (kind, source_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def utc(timestamp: str | None) -> str | None:
+    """Listmonk timestamp (any offset) as a fixed-width UTC string that sorts correctly."""
+    if not timestamp:
+        return None
+    parsed = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def connect(path: str = MIRROR_DB, readonly: bool = True) -> sqlite3.Connection:
+    """Open the mirror for queries."""
+    if readonly:
+        if not Path(path).exists():
+            raise FileNotFoundError(f"{path} not found (run listmonk_mirror.py sync first)")
+        return sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class Mirror:
+    """Writes to the mirror. Each page is applied in one transaction."""
+
+    def __init__(self, path: str = MIRROR_DB):
+        self.conn = connect(path, readonly=False)
+
+    def get(self, key: str, default: str | None = None) -> str | None:
+        row = self.conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set(self, **values):
+        self.conn.executemany(
+            "INSERT INTO sync_state (key, value) VALUES (?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            [(k, str(v)) for k, v in values.items()],
+        )
+
+    def upsert_subscribers(self, page: list[dict], sync_run: int) -> str | None:
+        """Store a page of subscribers and their memberships. Returns the page's newest updated_at."""
+        rows = [(s["id"], s.get("uuid"), s["email"], s.get("name"), s.get("status"),
+                 json.dumps(s.get("attribs") or {}), utc(s.get("created_at")), utc(s.get("updated_at")), sync_run)
+                for s in page]
+        memberships = [(s["id"], lst["id"], lst.get("subscription_status"))
+                       for s in page for lst in s.get("lists") or []]
+        self.conn.execute("BEGIN")
+        self.conn.executemany(
+            "INSERT INTO subscribers (id, uuid, email, name, status, attribs, created_at, updated_at, sync_run) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (id) DO UPDATE SET "
+            "uuid = excluded.uuid, email = excluded.email, name = excluded.name, status = excluded.status, "
+            "attribs = excluded.attribs, created_at = excluded.created_at, updated_at = excluded.updated_at, "
+            "sync_run = excluded.sync_run",
+            rows,
+        )
+        # Memberships are replaced wholesale, so removals are picked up too
+        self.conn.executemany("DELETE FROM subscriber_lists WHERE subscriber_id = ?", [(r[0],) for r in rows])
+        self.conn.executemany(
+            "INSERT INTO subscriber_lists (subscriber_id, list_id, status) VALUES (?, ?, ?)", memberships)
+        self.conn.execute("COMMIT")
+        return max((r[7] for r in rows if r[7]), default=None)
+
+    def mark_activity(self, seen: list[tuple[int, str]], column: str):
+        """Record (subscriber_id, time) pairs: opened/clicked at or after that time."""
+        self.conn.execute("BEGIN")
+        self.conn.executemany(
+            f"INSERT INTO subscriber_activity (subscriber_id, {column}) VALUES (?, ?) "
+            f"ON CONFLICT (subscriber_id) DO UPDATE SET {column} = MAX(COALESCE({column}, ''), excluded.{column})",
+            seen,
+        )
+        self.conn.execute("COMMIT")
+
+    def insert_events(self, kind: int, rows: list[tuple]):
+        """Store (source_id, subscriber_id, campaign_id, ts) events; they also give exact last opens/clicks."""
+        self.conn.execute("BEGIN")
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO events (kind, source_id, subscriber_id, campaign_id, ts) VALUES (?, ?, ?, ?, ?)",
+            [(kind, *row) for row in rows],
+        )
+        self.conn.execute("COMMIT")
+        latest = {}
+        for _, subscriber_id, _, ts in rows:
+            if ts > latest.get(subscriber_id, 0):
+                latest[subscriber_id] = ts
+        column = "last_open" if kind == OPEN else "last_click"
+        self.mark_activity([(i, utc(datetime.fromtimestamp(ts, timezone.utc).isoformat()))
+                            for i, ts in latest.items()], column)
+
+    def insert_bounces(self, page: list[dict]):
+        self.conn.execute("BEGIN")
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO bounces (id, subscriber_id, email, type, source, campaign_id, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(b["id"], b.get("subscriber_id"), b.get("email"), b.get("type"), b.get("source"),
+              (b.get("campaign") or {}).get("id"), utc(b.get("created_at"))) for b in page],
+        )
+        self.conn.execute("COMMIT")
+
+    def replace_lists(self, lists: list[dict]):
+        self.conn.execute("BEGIN")
+        self.conn.execute("DELETE FROM lists")
+        self.conn.executemany(
+            "INSERT INTO lists (id, name, type, optin, tags, subscriber_count, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(lst["id"], lst.get("name"), lst.get("type"), lst.get("optin"), json.dumps(lst.get("tags") or []),
+              lst.get("subscriber_count"), utc(lst.get("updated_at"))) for lst in lists],
+        )
+        self.conn.execute("COMMIT")
+
+    def replace_campaigns(self, campaigns: list[dict]):
+        self.conn.execute("BEGIN")
+        self.conn.execute("DELETE FROM campaigns")
+        self.conn.executemany(
+            "INSERT INTO campaigns (id, name, subject, status, lists, to_send, sent, views, clicks, bounces, "
+            "started_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(c["id"], c.get("name"), c.get("subject"), c.get("status"),
+              json.dumps([lst.get("id") for lst in c.get("lists") or []]), c.get("to_send"), c.get("sent"),
+              c.get("views"), c.get("clicks"), c.get("bounces"), utc(c.get("started_at")),
+              utc(c.get("updated_at"))) for c in campaigns],
+        )
+        self.conn.execute("COMMIT")
+
+    def prune(self, sync_run: int) -> int:
+        """After a full sync: drop subscribers Listmonk no longer has."""
+        self.conn.execute("BEGIN")
+        deleted = self.conn.execute("DELETE FROM subscribers WHERE sync_run != ?", (sync_run,)).rowcount
+        if deleted:
+            self.conn.execute(
+                "DELETE FROM subscriber_lists WHERE subscriber_id NOT IN (SELECT id FROM subscribers)")
+            self.conn.execute(
+                "DELETE FROM subscriber_activity WHERE subscriber_id NOT IN (SELECT id FROM subscribers)")
+        self.conn.execute("COMMIT")
+        return deleted
+
+    def prune_events(self, before_ts: int) -> int:
+        self.conn.execute("BEGIN")
+        deleted = self.conn.execute("DELETE FROM events WHERE ts < ?", (before_ts,)).rowcount
+        self.conn.execute("COMMIT")
+        return deleted
+
+    def counts(self) -> dict:
+        return {table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("subscribers", "subscriber_lists", "subscriber_activity", "bounces", "lists",
+                              "campaigns", "events")}
+
+    def close(self):
+        self.conn.close()
+
+
+# =============================================================================
+# SYNC
+# =============================================================================
+
+def pg_timestamp(value: str) -> str:
+    """Mirror timestamp as a literal Listmonk's Postgres compares correctly."""
+    return value.replace("Z", "+00:00")
+
+
+def sync_subscribers(client: ListmonkClient, mirror: Mirror, sync_run: int, full: bool) -> tuple[int, bool]:
+    """
+    Upsert subscribers changed since the watermark (all of them if `full`).
+
+    Pages are fetched by offset, so a subscriber deleted mid-sync shifts
+    later rows to earlier pages and some are never fetched. The match count
+    is read before and after; if it changed, or fewer rows came back than
+    it said, the pass is reported as inconsistent and the watermark is left
+    where it was, so the next sync reads those rows again.
+
+    Returns:
+        Tuple of (subscribers fetched, whether the pass saw every row)
+    """
+    watermark = None if full else mirror.get("subscribers_watermark")
+    query = None
+    if watermark:
+        since = pg_timestamp(utc((datetime.fromisoformat(watermark.replace("Z", "+00:00")) - OVERLAP).isoformat()))
+        # Membership changes (unsubscribes, list moves) only touch subscriber_lists.updated_at
+        query = (f"subscribers.updated_at >= '{since}' OR subscribers.id IN "
+                 f"(SELECT subscriber_id FROM subscriber_lists WHERE updated_at >= '{since}')")
+
+    count = 0
+    newest = watermark
+    params = {"order_by": "id", "order": "asc"}
+    if query:
+        params["query"] = query
+    total_before = client.count_subscribers(query=query)
+    for page in client.pages("/api/subscribers", params):
+        page_newest = mirror.upsert_subscribers(page, sync_run)
+        if page_newest and (newest is None or page_newest > newest):
+            newest = page_newest
+        count += len(page)
+    consistent = count >= total_before and client.count_subscribers(query=query) == total_before
+    if newest and consistent:
+        mirror.set(subscribers_watermark=newest)
+    return count, consistent
+
+
+def sync_activity(client: ListmonkClient, mirror: Mirror, started: datetime) -> int:
+    """
+    Opens and clicks per subscriber. The API has no per-subscriber view log,
+    so ask which subscribers have views/clicks since a point in time and
+    store that point as a lower bound for their last open/click.
+    """
+    last = mirror.get("activity_synced_at")
+    if last:
+        windows = [datetime.fromisoformat(last.replace("Z", "+00:00")) - OVERLAP]
+    else:
+        windows = [started - timedelta(days=d) for d in ACTIVITY_WINDOWS_DAYS]
+
+    marked = 0
+    for column, table in ACTIVITY_TABLES.items():
+        for since in windows:
+            at = utc(since.isoformat())
+            query = f"subscribers.id IN (SELECT subscriber_id FROM {table} WHERE created_at >= '{pg_timestamp(at)}')"
+            for page in client.pages("/api/subscribers", {"query": query, "order_by": "id", "order": "asc"}):
+                mirror.mark_activity([(s["id"], at) for s in page], column)
+                marked += len(page)
+    mirror.set(activity_synced_at=utc(started.isoformat()))
+    return marked
+
+
+def sync_bounces(client: ListmonkClient, mirror: Mirror) -> int:
+    """Bounces newer than the newest one mirrored (the API lists them newest first)."""
+    last_id = int(mirror.get("last_bounce_id", "0"))
+    newest_id = last_id
+    count = 0
+    for page in client.pages("/api/bounces", {"order_by": "created_at", "order": "desc"}):
+        new = [b for b in page if b["id"] > last_id]
+        if new:
+            mirror.insert_bounces(new)
+            newest_id = max(newest_id, max(b["id"] for b in new))
+            count += len(new)
+        if len(new) < len(page):
+            break
+    mirror.set(last_bounce_id=newest_id)
+    return count
+
+
+def sync_events(mirror: Mirror, pg_args, full: bool = False) -> int:
+    """
+    Copy opens and clicks with an id above the last one copied, streamed
+    from psql in batches so memory stays flat for millions of rows.
+    """
+    copied = 0
+    if full:
+        mirror.prune_events(int(time.time()) - EVENT_RETENTION_DAYS * 86400)
+    for kind, table in EVENT_TABLES.items():
+        last_id = int(mirror.get(f"last_{table}_id", "0"))
+        sql = (f"SELECT id, subscriber_id, campaign_id, extract(epoch FROM created_at)::bigint FROM {table} "
+               f"WHERE id > {last_id} AND subscriber_id IS NOT NULL "
+               f"AND created_at >= now() - interval '{EVENT_RETENTION_DAYS} days' ORDER BY id")
+        # stderr goes to a file: a pipe nobody reads during the stream could fill and block psql
+        with tempfile.TemporaryFile("w+") as errors:
+            process = subprocess.Popen(
+                psql_command(pg_args, "psql", "-X", "-q", "-A", "-t", "-F", ",", "-d", pg_args.pg_db, "-c", sql),
+                stdout=subprocess.PIPE, stderr=errors, text=True,
+            )
+            batch = []
+            for line in process.stdout:
+                source_id, subscriber_id, campaign_id, ts = line.rstrip("\n").split(",")
+                batch.append((int(source_id), int(subscriber_id), int(campaign_id) if campaign_id else None, int(ts)))
+                if len(batch) >= EVENT_BATCH:
+                    mirror.insert_events(kind, batch)
+                    mirror.set(**{f"last_{table}_id": batch[-1][0]})
+                    copied += len(batch)
+                    batch = []
+            if process.wait() != 0:
+                errors.seek(0)
+                raise ListmonkError(f"psql failed reading {table}: {errors.read().strip()[:300]}")
+        if batch:
+            mirror.insert_events(kind, batch)
+            mirror.set(**{f"last_{table}_id": batch[-1][0]})
+            copied += len(batch)
+    return copied
+
+
+def sync(client: ListmonkClient, mirror: Mirror, full: bool = False, pg_args=None) -> dict:
+    """Bring the mirror up to date (events too if `pg_args` is given). Returns rows fetched per kind."""
+    started = utc_now()
+    start = time.perf_counter()
+    sync_run = int(mirror.get("sync_run", "0")) + 1
+    mirror.set(sync_run=sync_run)
+    full = full or mirror.get("last_full_sync") is None
+
+    stats = {"full": full}
+    mirror.replace_lists(list(client.lists()))
+    mirror.replace_campaigns(list(client.campaigns()))
+    stats["subscribers"], consistent = sync_subscribers(client, mirror, sync_run, full)
+    # A pass that may have missed rows must not delete them; None = pruning skipped
+    stats["pruned"] = (mirror.prune(sync_run) if consistent else None) if full else 0
+    stats["activity"] = sync_activity(client, mirror, started)
+    stats["bounces"] = sync_bounces(client, mirror)
+    stats["events"] = sync_events(mirror, pg_args, full) if pg_args is not None else None
+
+    stats["seconds"] = round(time.perf_counter() - start, 2)
+    stamp = utc(started.isoformat())
+    mirror.set(last_sync=stamp, last_sync_seconds=stats["seconds"])
+    if full:
+        mirror.set(last_full_sync=stamp)
+    return stats
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental local mirror of Listmonk")
+    parser.add_argument("--db", default=MIRROR_DB, help=f"Mirror database (default: {MIRROR_DB})")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    sync_parser = subparsers.add_parser("sync", help="Fetch what changed since the last sync")
+    sync_parser.add_argument("--url", default=LISTMONK_URL, help="Listmonk URL (default: LISTMONK_URL)")
+    sync_parser.add_argument("--full", action="store_true", help="Copy everything and remove deleted subscribers")
+    sync_parser.add_argument("--per-page", type=int, default=PER_PAGE, help=f"Records per request (default: {PER_PAGE})")
+    sync_parser.add_argument("--max-in-flight", type=int, default=MAX_IN_FLIGHT,
+                             help=f"Requests at once (default: {MAX_IN_FLIGHT})")
+    sync_parser.add_argument("--events", action="store_true", help="Also copy opens/clicks from Listmonk's Postgres")
+    sync_parser.add_argument("--container", default=DB_CONTAINER, help=f"With --events: Postgres container (default: {DB_CONTAINER})")
+    sync_parser.add_argument("--no-docker", action="store_true", help="With --events: use local psql instead of the container")
+    sync_parser.add_argument("--pg-host", default="localhost", help="Postgres host with --no-docker")
+    sync_parser.add_argument("--pg-port", type=int, default=5432, help="Postgres port with --no-docker")
+    sync_parser.add_argument("--pg-user", default=DB_USER, help=f"Postgres user (default: {DB_USER})")
+    sync_parser.add_argument("--pg-db", default=DB_NAME, help=f"Database (default: {DB_NAME})")
+
+    subparsers.add_parser("status", help="Row counts, watermark and last sync")
+
+    sql_parser = subparsers.add_parser("sql", help="Run a read-only query against the mirror")
+    sql_parser.add_argument("query", help="SQL query")
+
+    args = parser.parse_args()
+
+    if not args.command:
+        parser.print_help()
+        return 0
+
+    print(f"[listmonk_mirror] v{DOE_VERSION}")
+    print()
+
+    try:
+        if args.command == "sync":
+            if not LISTMONK_ADMIN_USER or not LISTMONK_ADMIN_PASSWORD:
+                print("ERROR: LISTMONK_ADMIN_USER / LISTMONK_ADMIN_PASSWORD not set in .env")
+                return 1
+            client = ListmonkClient.from_env(args.url, per_page=args.per_page, max_in_flight=args.max_in_flight)
+            mirror = Mirror(args.db)
+            print(f"🔄 Syncing {args.url} → {args.db}...")
+            stats = sync(client, mirror, args.full, args if args.events else None)
+            counts = mirror.counts()
+            mirror.close()
+
+            print(f"  {'Full' if stats['full'] else 'Incremental'} sync in {stats['seconds']}s")
+            print(f"  Subscribers fetched: {stats['subscribers']:,}" +
+                  (f" ({stats['pruned']:,} deleted in Listmonk removed)" if stats["pruned"] else ""))
+            if stats["full"] and stats["pruned"] is None:
+                print("  ⚠️  Subscribers changed during the sync; deleted ones were not removed (run sync --full again)")
+            print(f"  Engagement rows: {stats['activity']:,}  New bounces: {stats['bounces']:,}")
+            if stats["events"] is not None:
+                print(f"  New open/click events: {stats['events']:,}")
+            print()
+            print(f"✅ Mirror has {counts['subscribers']:,} subscribers, {counts['lists']} lists, "
+                  f"{counts['campaigns']} campaigns")
+
+        elif args.command == "status":
+            if not Path(args.db).exists():
+                print(f"No mirror yet ({args.db}). Run: python execution/listmonk_mirror.py sync")
+                return 1
+            mirror = Mirror(args.db)
+            for table, count in mirror.counts().items():
+                print(f"  {table}: {count:,}")
+            print()
+            print(f"  Watermark (subscribers.updated_at): {mirror.get('subscribers_watermark', '—')}")
+            print(f"  Last sync: {mirror.get('last_sync', '—')} ({mirror.get('last_sync_seconds', '?')}s)")
+            print(f"  Last full sync: {mirror.get('last_full_sync', '—')}")
+            mirror.close()
+
+        elif args.command == "sql":
+            conn = connect(args.db)
+            start = time.perf_counter()
+            cursor = conn.execute(args.query)
+            columns = [d[0] for d in cursor.description or []]
+            rows = cursor.fetchall()
+            elapsed = (time.perf_counter() - start) * 1000
+            conn.close()
+            if columns:
+                print("\t".join(columns))
+            for row in rows:
+                print("\t".join("" if v is None else str(v) for v in row))
+            print()
+            print(f"({len(rows):,} rows, {elapsed:.1f} ms)")
+
+        return 0
+
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted (the next sync resumes from the last watermark)")
+        return 130
+
+    except (ListmonkError, requests.RequestException) as e:
+        print(f"❌ Listmonk error: {e}")
+        return 1
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,531 @@
+#!/usr/bin/env python3
+"""
+Script: listmonk_watchdog.py
+Directive: directives/listmonk_watchdog.md
+DOE Framework: v2.0.0
+
+Purpose:
+    Cross-platform health watchdog for the Listmonk stack (replaces the
+    sequential checks in watchdog-listmonk.ps1). Each round probes Listmonk
+    /api/health, Postgres readiness and the public tunnel URL concurrently
+    with asyncio. Latency and availability are written to a daily JSONL
+    time series and served as Prometheus metrics.
+
+    When a component fails several rounds in a row, only that container is
+    restarted. A component whose dependency is also down is left alone, so
+    a Postgres outage does not also restart Listmonk and the tunnel.
+
+Cost:
+    Free
+
+Usage:
+    # Watch every 30s with metrics on http://127.0.0.1:9811/metrics
+    python execution/listmonk_watchdog.py run
+
+    # One round, print results (exit 1 if anything is down)
+    python execution/listmonk_watchdog.py once
+
+    # Latency histogram and availability from the time series
+    python execution/listmonk_watchdog.py report --hours 24
+"""
+
+import os
+import re
+import ssl
+import sys
+import json
+import time
+import struct
+import asyncio
+import argparse
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# =============================================================================
+# VERSION - Must match directive version
+# =============================================================================
+DOE_VERSION = "2026.10.19"
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+LISTMONK_LOCAL_URL = "http://localhost:9010"
+TUNNEL_URL = os.getenv("LISTMONK_URL")
+TUNNEL_CONFIG = "tunnel-config.yml"
+
+DB_CONTAINER = "listmonk-db"
+APP_CONTAINER = "listmonk-app"
+TUNNEL_CONTAINER = "cloudflared-tunnel"
+DB_USER = "listmonk"
+DB_NAME = "listmonk"
+
+SERIES_DIR = ".tmp/watchdog"
+METRICS_PORT = 9811
+
+DEFAULT_INTERVAL = 30
+DEFAULT_TIMEOUT = 5
+FAILURES_BEFORE_RESTART = 3
+RESTART_COOLDOWN = 300
+
+# Histogram bucket upper bounds in seconds (Prometheus `le` labels)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PG_PROTOCOL_V3 = 196608
+PG_CANNOT_CONNECT_NOW = "57P03"
+
+
+# =============================================================================
+# PROBES
+# =============================================================================
+
+class ProbeError(Exception):
+    """A probe reached its target but the answer was unhealthy."""
+
+
+async def http_probe(url: str):
+    """GET `url` over a fresh connection; any non-2xx status is a failure."""
+    parts = urlsplit(url)
+    secure = parts.scheme == "https"
+    port = parts.port or (443 if secure else 80)
+    context = ssl.create_default_context() if secure else None
+    reader, writer = await asyncio.open_connection(parts.hostname, port, ssl=context)
+    try:
+        path = parts.path or "/"
+        if parts.query:
+            path += f"?{parts.query}"
+        writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+            f"User-Agent: listmonk-watchdog/{DOE_VERSION}\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+        status_line = await reader.readline()
+        fields = status_line.decode("latin-1").split(" ", 2)
+        if len(fields) < 2 or not fields[1].isdigit():
+            raise ProbeError(f"Bad HTTP response: {status_line[:80]!r}")
+        status = int(fields[1])
+        if not 200 <= status < 300:
+            raise ProbeError(f"HTTP {status}")
+    finally:
+        writer.close()
+
+
+async def postgres_tcp_probe(host: str, port: int, user: str = DB_USER, database: str = DB_NAME):
+    """
+    Readiness check like pg_isready, without a driver.
+
+    Sends a StartupMessage and reads the first reply. An authentication
+    request, or any error other than "starting up / shutting down", means
+    the server is accepting connections.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        params = f"user\0{user}\0database\0{database}\0\0".encode()
+        writer.write(struct.pack("!ii", 8 + len(params), PG_PROTOCOL_V3) + params)
+        await writer.drain()
+        kind = await reader.readexactly(1)
+        if kind == b"R":
+            return
+        if kind != b"E":
+            raise ProbeError(f"Unexpected reply {kind!r}")
+        (length,) = struct.unpack("!i", await reader.readexactly(4))
+        body = await reader.readexactly(length - 4)
+        fields = {f[:1]: f[1:].decode("utf-8", "replace") for f in body.split(b"\0") if f}
+        if fields.get(b"C") == PG_CANNOT_CONNECT_NOW:
+            raise ProbeError(fields.get(b"M", "Database not ready"))
+    finally:
+        writer.close()
+
+
+async def run_command(*command: str, timeout: float = DEFAULT_TIMEOUT) -> tuple[int, str]:
+    """Run a command without blocking the event loop; returns (exit code, output)."""
+    process = await asyncio.create_subprocess_exec(
+        *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
+    try:
+        output, _ = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise
+    return process.returncode, output.decode("utf-8", "replace").strip()
+
+
+async def postgres_docker_probe(container: str, user: str = DB_USER):
+    """pg_isready inside the database container (its port is not published)."""
+    code, output = await run_command("docker", "exec", container, "pg_isready", "-U", user)
+    if code != 0:
+        raise ProbeError(output or f"pg_isready exited {code}")
+
+
+def tunnel_url_from_config(path: str = TUNNEL_CONFIG) -> str | None:
+    """First ingress hostname in tunnel-config.yml, unless it is still a placeholder."""
+    try:
+        text = Path(path).read_text(encoding="utf-8")
+    except OSError:
+        return None
+    match = re.search(r"^\s*-\s*hostname:\s*(\S+)", text, re.M)
+    if not match or "REPLACE_WITH" in match.group(1):
+        return None
+    return f"https://{match.group(1)}"
+
+
+@dataclass
+class Component:
+    """One monitored service: how to probe it and which container to restart."""
+    name: str
+    container: str | None
+    probe: object
+    depends_on: str | None = None
+
+
+def build_components(args) -> list[Component]:
+    listmonk_url = args.listmonk_url.rstrip("/")
+    components = []
+    if args.no_docker:
+        components.append(Component("postgres", None, lambda: postgres_tcp_probe(args.pg_host, args.pg_port)))
+    else:
+        components.append(Component("postgres", DB_CONTAINER, lambda: postgres_docker_probe(DB_CONTAINER)))
+    components.append(Component("listmonk", None if args.no_docker else APP_CONTAINER,
+                                lambda: http_probe(f"{listmonk_url}/api/health"), depends_on="postgres"))
+    tunnel_url = args.tunnel_url or TUNNEL_URL or tunnel_url_from_config()
+    if tunnel_url:
+        tunnel_url = tunnel_url.rstrip("/")
+        components.append(Component("tunnel", None if args.no_docker else TUNNEL_CONTAINER,
+                                    lambda: http_probe(f"{tunnel_url}/api/health"), depends_on="listmonk"))
+    return components
+
+
+# =============================================================================
+# METRICS
+# =============================================================================
+
+@dataclass
+class ComponentStats:
+    """Cumulative counters for one component, in Prometheus histogram form."""
+    buckets: list[int] = field(default_factory=lambda: [0] * len(LATENCY_BUCKETS))
+    latency_sum: float = 0.0
+    probes: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    restarts: int = 0
+    up: int = 0
+    last_latency: float = 0.0
+    last_error: str | None = None
+    last_restart: float = 0.0
+
+    def observe(self, ok: bool, latency: float, error: str | None):
+        self.probes += 1
+        self.latency_sum += latency
+        self.last_latency = latency
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if latency <= bound:
+                self.buckets[i] += 1
+        self.up = int(ok)
+        self.last_error = error
+        if ok:
+            self.consecutive_failures = 0
+        else:
+            self.failures += 1
+            self.consecutive_failures += 1
+
+
+def prometheus_text(stats: dict[str, ComponentStats]) -> str:
+    """Render the counters in the Prometheus text exposition format."""
+    lines = [
+        "# HELP listmonk_up Whether the last probe of the component succeeded.",
+        "# TYPE listmonk_up gauge",
+    ]
+    lines += [f'listmonk_up{{component="{n}"}} {s.up}' for n, s in stats.items()]
+    lines += [
+        "# HELP listmonk_availability_ratio Share of successful probes since the watchdog started.",
+        "# TYPE listmonk_availability_ratio gauge",
+    ]
+    lines += [f'listmonk_availability_ratio{{component="{n}"}} {(s.probes - s.failures) / s.probes if s.probes else 0:.6f}'
+              for n, s in stats.items()]
+    lines += [
+        "# HELP listmonk_probe_duration_seconds Probe latency.",
+        "# TYPE listmonk_probe_duration_seconds histogram",
+    ]
+    for n, s in stats.items():
+        for bound, count in zip(LATENCY_BUCKETS, s.buckets):
+            lines.append(f'listmonk_probe_duration_seconds_bucket{{component="{n}",le="{bound}"}} {count}')
+        lines.append(f'listmonk_probe_duration_seconds_bucket{{component="{n}",le="+Inf"}} {s.probes}')
+        lines.append(f'listmonk_probe_duration_seconds_sum{{component="{n}"}} {s.latency_sum:.6f}')
+        lines.append(f'listmonk_probe_duration_seconds_count{{component="{n}"}} {s.probes}')
+    lines += [
+        "# HELP listmonk_probe_failures_total Failed probes.",
+        "# TYPE listmonk_probe_failures_total counter",
+    ]
+    lines += [f'listmonk_probe_failures_total{{component="{n}"}} {s.failures}' for n, s in stats.items()]
+    lines += [
+        "# HELP listmonk_restarts_total Container restarts issued by the watchdog.",
+        "# TYPE listmonk_restarts_total counter",
+    ]
+    lines += [f'listmonk_restarts_total{{component="{n}"}} {s.restarts}' for n, s in stats.items()]
+    return "\n".join(lines) + "\n"
+
+
+async def serve_metrics(stats: dict[str, ComponentStats], host: str, port: int) -> asyncio.AbstractServer:
+    """Minimal HTTP server for GET /metrics on the watchdog's own event loop."""
+
+    async def handle(reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 5)
+            path = request.split(b" ", 2)[1] if request.count(b" ") >= 2 else b"/"
+            if path.split(b"?")[0] == b"/metrics":
+                body, status = prometheus_text(stats).encode(), "200 OK"
+            else:
+                body, status = b"Not found\n", "404 Not Found"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+            await writer.drain()
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+def series_path(directory: str, day: datetime) -> Path:
+    return Path(directory) / f"series-{day.strftime('%Y-%m-%d')}.jsonl"
+
+
+# =============================================================================
+# WATCHDOG
+# =============================================================================
+
+class Watchdog:
+    """Runs probe rounds, keeps stats, and restarts failing containers."""
+
+    def __init__(self, components: list[Component], timeout: float = DEFAULT_TIMEOUT,
+                 failures_before_restart: int = FAILURES_BEFORE_RESTART,
+                 cooldown: float = RESTART_COOLDOWN, restart: bool = True,
+                 series_dir: str = SERIES_DIR):
+        self.components = components
+        self.timeout = timeout
+        self.failures_before_restart = failures_before_restart
+        self.cooldown = cooldown
+        self.restart = restart
+        self.series_dir = series_dir
+        self.stats = {c.name: ComponentStats() for c in components}
+
+    async def _probe(self, component: Component) -> dict:
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(component.probe(), self.timeout)
+            ok, error = True, None
+        except asyncio.TimeoutError:
+            ok, error = False, f"Timed out after {self.timeout:g}s"
+        except (OSError, ProbeError, asyncio.IncompleteReadError) as e:
+            ok, error = False, str(e) or type(e).__name__
+        latency = time.perf_counter() - start
+        self.stats[component.name].observe(ok, latency, error)
+        return {"component": component.name, "ok": ok, "latency_ms": round(latency * 1000, 2), "error": error}
+
+    async def _restart(self, component: Component) -> dict:
+        stats = self.stats[component.name]
+        stats.last_restart = time.monotonic()
+        stats.restarts += 1
+        try:
+            code, output = await run_command("docker", "restart", component.container, timeout=60)
+        except (OSError, asyncio.TimeoutError) as e:
+            code, output = -1, str(e) or type(e).__name__
+        return {"component": component.name, "container": component.container,
+                "ok": code == 0, "output": output if code else None}
+
+    def _needs_restart(self, component: Component) -> bool:
+        stats = self.stats[component.name]
+        if not self.restart or component.container is None:
+            return False
+        if stats.consecutive_failures < self.failures_before_restart:
+            return False
+        if stats.restarts and time.monotonic() - stats.last_restart < self.cooldown:
+            return False
+        # A failing dependency explains this failure; fix that one instead
+        if component.depends_on and not self.stats[component.depends_on].up:
+            return False
+        return True
+
+    async def round(self) -> dict:
+        """Probe every component concurrently, restart what needs it, record the round."""
+        results = await asyncio.gather(*(self._probe(c) for c in self.components))
+        restarts = await asyncio.gather(*(self._restart(c) for c in self.components if self._needs_restart(c)))
+        record = {"ts": datetime.now().isoformat(timespec="seconds"), "probes": results}
+        if restarts:
+            record["restarts"] = restarts
+
+        path = series_path(self.series_dir, datetime.now())
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        return record
+
+    async def run(self, interval: float, metrics_host: str, metrics_port: int, verbose: bool = True):
+        server = await serve_metrics(self.stats, metrics_host, metrics_port) if metrics_port else None
+        try:
+            while True:
+                started = time.monotonic()
+                record = await self.round()
+                if verbose:
+                    print_round(record)
+                await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+        finally:
+            if server:
+                server.close()
+                await server.wait_closed()
+
+
+def print_round(record: dict):
+    parts = []
+    for p in record["probes"]:
+        mark = "✅" if p["ok"] else "❌"
+        parts.append(f"{mark} {p['component']} {p['latency_ms']:.0f}ms")
+    print(f"[{record['ts']}] " + "  ".join(parts))
+    for p in record["probes"]:
+        if not p["ok"]:
+            print(f"     {p['component']}: {p['error']}")
+    for r in record.get("restarts", []):
+        status = "restarted" if r["ok"] else f"restart failed: {r['output']}"
+        print(f"     🔄 {r['container']} {status}")
+
+
+# =============================================================================
+# REPORT
+# =============================================================================
+
+def report(directory: str, hours: float) -> dict:
+    """Availability, percentiles and histogram per component from the time series."""
+    since = datetime.now() - timedelta(hours=hours)
+    latencies: dict[str, list[float]] = {}
+    failures: dict[str, int] = {}
+    restarts: dict[str, int] = {}
+    day = since.replace(hour=0, minute=0, second=0, microsecond=0)
+    while day <= datetime.now():
+        path = series_path(directory, day)
+        day += timedelta(days=1)
+        if not path.exists():
+            continue
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if datetime.fromisoformat(record["ts"]) < since:
+                    continue
+                for p in record["probes"]:
+                    latencies.setdefault(p["component"], []).append(p["latency_ms"] / 1000)
+                    failures[p["component"]] = failures.get(p["component"], 0) + (not p["ok"])
+                for r in record.get("restarts", []):
+                    restarts[r["component"]] = restarts.get(r["component"], 0) + 1
+
+    summary = {}
+    for name, values in latencies.items():
+        values.sort()
+        counts = [sum(1 for v in values if v <= bound) for bound in LATENCY_BUCKETS]
+        summary[name] = {
+            "probes": len(values),
+            "availability": (len(values) - failures[name]) / len(values),
+            "p50_ms": round(values[len(values) // 2] * 1000, 1),
+            "p99_ms": round(values[min(len(values) - 1, int(len(values) * 0.99))] * 1000, 1),
+            "buckets": dict(zip(LATENCY_BUCKETS, counts)),
+            "restarts": restarts.get(name, 0),
+        }
+    return summary
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Probe the Listmonk stack concurrently, record latency, restart failing containers.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--listmonk-url", default=LISTMONK_LOCAL_URL, help=f"Local Listmonk URL (default: {LISTMONK_LOCAL_URL})")
+    parser.add_argument("--tunnel-url", help="Public URL through the tunnel (default: LISTMONK_URL or tunnel-config.yml)")
+    parser.add_argument("--no-docker", action="store_true", help="Probe Postgres over TCP and never restart containers")
+    parser.add_argument("--pg-host", default="localhost", help="Postgres host with --no-docker")
+    parser.add_argument("--pg-port", type=int, default=5432, help="Postgres port with --no-docker")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help=f"Per-probe timeout in seconds (default: {DEFAULT_TIMEOUT})")
+    parser.add_argument("--dir", default=SERIES_DIR, help=f"Time-series directory (default: {SERIES_DIR})")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    run_parser = subparsers.add_parser("run", help="Probe on a schedule")
+    run_parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help=f"Seconds between rounds (default: {DEFAULT_INTERVAL})")
+    run_parser.add_argument("--failures", type=int, default=FAILURES_BEFORE_RESTART,
+                            help=f"Consecutive failures before a restart (default: {FAILURES_BEFORE_RESTART})")
+    run_parser.add_argument("--cooldown", type=float, default=RESTART_COOLDOWN,
+                            help=f"Seconds between restarts of one container (default: {RESTART_COOLDOWN})")
+    run_parser.add_argument("--no-restart", action="store_true", help="Only observe")
+    run_parser.add_argument("--metrics-host", default="127.0.0.1", help="Metrics bind host (default: 127.0.0.1)")
+    run_parser.add_argument("--metrics-port", type=int, default=METRICS_PORT, help=f"Metrics port, 0 to disable (default: {METRICS_PORT})")
+    run_parser.add_argument("--quiet", action="store_true", help="Do not print each round")
+
+    subparsers.add_parser("once", help="Run one round and exit")
+
+    report_parser = subparsers.add_parser("report", help="Summarise the time series")
+    report_parser.add_argument("--hours", type=float, default=24, help="Window in hours (default: 24)")
+
+    args = parser.parse_args()
+
+    print(f"[listmonk_watchdog] v{DOE_VERSION}")
+    print()
+
+    try:
+        if args.command == "run":
+            watchdog = Watchdog(build_components(args), args.timeout, args.failures, args.cooldown,
+                                restart=not (args.no_restart or args.no_docker), series_dir=args.dir)
+            names = ", ".join(c.name for c in watchdog.components)
+            print(f"👀 Probing {names} every {args.interval:g}s")
+            if args.metrics_port:
+                print(f"📈 Metrics: http://{args.metrics_host}:{args.metrics_port}/metrics")
+            asyncio.run(watchdog.run(args.interval, args.metrics_host, args.metrics_port, verbose=not args.quiet))
+
+        elif args.command == "once":
+            watchdog = Watchdog(build_components(args), args.timeout, restart=False, series_dir=args.dir)
+            record = asyncio.run(watchdog.round())
+            print_round(record)
+            return 0 if all(p["ok"] for p in record["probes"]) else 1
+
+        elif args.command == "report":
+            summary = report(args.dir, args.hours)
+            if not summary:
+                print(f"No samples in the last {args.hours:g}h")
+                return 1
+            for name, s in summary.items():
+                print(f"{name}: {s['availability']:.2%} up over {s['probes']:,} probes, "
+                      f"p50 {s['p50_ms']}ms, p99 {s['p99_ms']}ms, {s['restarts']} restarts")
+                previous = 0
+                for bound, count in s["buckets"].items():
+                    in_bucket = count - previous
+                    previous = count
+                    if in_bucket:
+                        bar = "█" * round(40 * in_bucket / s["probes"])
+                        print(f"  ≤{bound * 1000:>6g}ms {in_bucket:>6,} {bar}")
+                if s["probes"] > previous:
+                    print(f"  >{LATENCY_BUCKETS[-1] * 1000:>6g}ms {s['probes'] - previous:>6,}")
+
+        else:
+            parser.print_help()
+        return 0
+
+    except KeyboardInterrupt:
+        print("\n⚠️ Stopped")
+        return 130
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
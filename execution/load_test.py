@@ -0,0 +1,516 @@
+#!/usr/bin/env python3
+"""
+Script: load_test.py
+Directive: directives/load_test.md
+DOE Framework: v2.0.0
+
+Purpose:
+    Load-test the Listmonk sending path (listmonk-app + listmonk-db) with
+    no real email leaving the machine. For each size (default 1k, 20k and
+    200k subscribers), it:
+
+    1. Seeds a throwaway list with synthetic subscribers using Listmonk's
+       bulk importer
+    2. Points Listmonk's SMTP settings at a local aiosmtpd sink standing
+       in for Resend
+    3. Starts a campaign through the API and times every delivery
+    4. Samples Postgres/app CPU (docker stats) and Postgres connections
+       while it sends
+
+    The report covers end-to-end throughput, queue lag (how long each
+    message waited after the campaign started) and database load. Runs are
+    saved as JSON and compared with a saved baseline. The original SMTP
+    settings are restored afterwards, also after Ctrl+C or an error.
+
+Cost:
+    Free (nothing is sent to Resend)
+
+Usage:
+    # Full run: 1k, 20k, 200k subscribers
+    python execution/load_test.py run
+
+    # Quick run, saved as the new baseline
+    python execution/load_test.py run --sizes 1000 --save-baseline
+
+    # Restore SMTP settings if a run was killed hard
+    python execution/load_test.py restore-settings
+"""
+
+import os
+import csv
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+from dotenv import load_dotenv
+
+from listmonk_backup import DB_CONTAINER, DB_NAME, DB_USER
+from listmonk_client import ListmonkClient
+from listmonk_watchdog import APP_CONTAINER, LISTMONK_LOCAL_URL
+from pg_profiler import PsqlError, PsqlSession
+
+load_dotenv()
+
+# =============================================================================
+# VERSION - Must match directive version
+# =============================================================================
+DOE_VERSION = "2026.10.19"
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+# Hosts --url may name without --allow-public (LISTMONK_URL is the public tunnel)
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+LISTMONK_ADMIN_USER = os.getenv("LISTMONK_ADMIN_USER")
+LISTMONK_ADMIN_PASSWORD = os.getenv("LISTMONK_ADMIN_PASSWORD")
+
+OUTPUT_DIR = ".tmp/load_test"
+SETTINGS_BACKUP = f"{OUTPUT_DIR}/settings-backup.json"
+BASELINE_FILE = f"{OUTPUT_DIR}/baseline.json"
+
+DEFAULT_SIZES = (1_000, 20_000, 200_000)
+SINK_PORT = 2525
+# How the listmonk-app container reaches the sink on this machine
+SINK_ADDRESS_FROM_CONTAINER = "host.docker.internal"
+EMAIL_DOMAIN = "loadtest.example.com"
+FROM_EMAIL = f"Load Test <sender@{EMAIL_DOMAIN}>"
+
+POLL_INTERVAL = 1.0
+IMPORT_TIMEOUT = 1800
+SEND_TIMEOUT = 3600
+
+
+# =============================================================================
+# LISTMONK API
+# =============================================================================
+
+class ListmonkAPI(ListmonkClient):
+    """The endpoints the harness needs, on the shared client session."""
+
+    def get_settings(self) -> dict:
+        return self.call("GET", "/api/settings")
+
+    def put_settings(self, settings: dict):
+        # Listmonk reloads itself after a settings change
+        self.call("PUT", "/api/settings", json=settings)
+        time.sleep(2)
+        self.wait_healthy()
+
+    def create_list(self, name: str) -> int:
+        return self.call("POST", "/api/lists", json={"name": name, "type": "private", "optin": "single",
+                                                     "tags": ["load-test"]})["id"]
+
+    def import_subscribers(self, csv_path: str, list_id: int):
+        params = {"mode": "subscribe", "subscription_status": "confirmed", "delim": ",",
+                  "lists": [list_id], "overwrite": True}
+        with open(csv_path, "rb") as f:
+            self.call("POST", "/api/import/subscribers",
+                      files={"file": ("subscribers.csv", f, "text/csv")}, data={"params": json.dumps(params)})
+
+    def import_status(self) -> dict:
+        return self.call("GET", "/api/import/subscribers")
+
+    def create_campaign(self, name: str, list_id: int) -> dict:
+        return self.call("POST", "/api/campaigns", json={
+            "name": name, "subject": f"{name} {{{{ .Subscriber.FirstName }}}}", "lists": [list_id],
+            "from_email": FROM_EMAIL, "type": "regular", "messenger": "email", "content_type": "plain",
+            "body": "Hello {{ .Subscriber.Name }},\n\nThis is a load test.\n\n{{ UnsubscribeURL }}\n",
+        })
+
+    def start_campaign(self, campaign_id: int):
+        self.call("PUT", f"/api/campaigns/{campaign_id}/status", json={"status": "running"})
+
+    def campaign(self, campaign_id: int) -> dict:
+        return self.call("GET", f"/api/campaigns/{campaign_id}")
+
+    def cleanup(self, campaign_id: int | None, list_id: int | None):
+        if campaign_id:
+            self.call("DELETE", f"/api/campaigns/{campaign_id}")
+        if list_id:
+            self.call("POST", "/api/subscribers/query/delete", json={"query": "", "list_ids": [list_id]})
+            self.call("DELETE", f"/api/lists/{list_id}")
+
+
+def sink_settings(settings: dict, address: str, port: int) -> dict:
+    """Copy of the settings with every SMTP server disabled and the sink added."""
+    patched = json.loads(json.dumps(settings))
+    for server in patched.get("smtp", []):
+        server["enabled"] = False
+    patched.setdefault("smtp", []).append({
+        "enabled": True, "host": address, "port": port, "name": "load-test-sink",
+        "auth_protocol": "none", "username": "", "password": "", "tls_type": "none", "tls_skip_verify": True,
+        "max_conns": 10, "idle_timeout": "15s", "wait_timeout": "5s", "max_msg_retries": 0,
+        "email_headers": [], "hello_hostname": "",
+    })
+    return patched
+
+
+def restore_settings(api: ListmonkAPI, path: str = SETTINGS_BACKUP) -> bool:
+    """Put back the settings saved before the sink was installed."""
+    backup = Path(path)
+    if not backup.exists():
+        return False
+    # SMTP passwords come back blank from the API; Listmonk keeps the stored
+    # password for any server whose uuid matches
+    api.put_settings(json.loads(backup.read_text()))
+    backup.unlink()
+    return True
+
+
+# =============================================================================
+# SMTP SINK
+# =============================================================================
+
+class TimingSink:
+    """aiosmtpd handler that records the arrival time of every message."""
+
+    def __init__(self):
+        self.arrivals: list[float] = []
+        self.lock = threading.Lock()
+
+    async def handle_DATA(self, server, session, envelope):
+        now = time.monotonic()
+        with self.lock:
+            self.arrivals.append(now)
+        return "250 OK"
+
+    def reset(self):
+        with self.lock:
+            self.arrivals = []
+
+    def count(self) -> int:
+        return len(self.arrivals)
+
+
+def start_sink(host: str, port: int):
+    from aiosmtpd.controller import Controller
+
+    handler = TimingSink()
+    controller = Controller(handler, hostname=host, port=port, data_size_limit=0)
+    controller.start()
+    return controller, handler
+
+
+# =============================================================================
+# RESOURCE SAMPLING
+# =============================================================================
+
+class ResourceSampler(threading.Thread):
+    """Background sampler for container CPU and Postgres connections."""
+
+    def __init__(self, args):
+        super().__init__(daemon=True)
+        self.args = args
+        self.stop = threading.Event()
+        self.samples: list[dict] = []
+
+    def _docker_cpu(self) -> dict:
+        result = subprocess.run(
+            ["docker", "stats", "--no-stream", "--format", "{{.Name}} {{.CPUPerc}}", DB_CONTAINER, APP_CONTAINER],
+            capture_output=True, text=True, timeout=15)
+        cpu = {}
+        for line in result.stdout.splitlines():
+            name, _, percent = line.partition(" ")
+            try:
+                cpu[name] = float(percent.strip().rstrip("%"))
+            except ValueError:
+                pass
+        return cpu
+
+    def run(self):
+        session = None
+        try:
+            session = PsqlSession(self.args)
+        except OSError:
+            pass
+        while not self.stop.is_set():
+            sample = {"t": time.monotonic()}
+            try:
+                sample["cpu"] = self._docker_cpu()
+            except (OSError, subprocess.TimeoutExpired):
+                sample["cpu"] = {}
+            if session:
+                try:
+                    line = session.query(
+                        "SELECT count(*), count(*) FILTER (WHERE state = 'active') FROM pg_stat_activity "
+                        f"WHERE datname = '{self.args.pg_db}' AND backend_type = 'client backend'")[0]
+                    sample["connections"], sample["active"] = (int(v) for v in line.split("|"))
+                except (IndexError, ValueError):
+                    pass
+                except PsqlError as e:
+                    print(f"\n  ⚠️ Postgres sampling stopped: {e}")
+                    session = None
+            self.samples.append(sample)
+            self.stop.wait(self.args.sample_interval)
+        if session:
+            session.close()
+
+    def summary(self) -> dict:
+        db_cpu = [s["cpu"][DB_CONTAINER] for s in self.samples if DB_CONTAINER in s.get("cpu", {})]
+        app_cpu = [s["cpu"][APP_CONTAINER] for s in self.samples if APP_CONTAINER in s.get("cpu", {})]
+        connections = [s["connections"] for s in self.samples if "connections" in s]
+        active = [s["active"] for s in self.samples if "active" in s]
+
+        def stats(values):
+            return {"avg": round(sum(values) / len(values), 1), "peak": max(values)} if values else None
+
+        return {"db_cpu_pct": stats(db_cpu), "app_cpu_pct": stats(app_cpu),
+                "db_connections": stats(connections), "db_active_connections": stats(active)}
+
+
+# =============================================================================
+# RUN
+# =============================================================================
+
+def write_csv(path: str, size: int, tag: str):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["email", "name", "attributes"])
+        for i in range(size):
+            writer.writerow([f"lt-{tag}-{i}@{EMAIL_DOMAIN}", f"Load Test {i}",
+                             json.dumps({"load_test": True, "n": i})])
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def run_size(api: ListmonkAPI, sink: TimingSink, size: int, args) -> dict:
+    """Seed, send and measure one subscriber count."""
+    tag = datetime.now().strftime("%Y%m%d%H%M%S")
+    name = f"load-test-{size}-{tag}"
+    list_id = campaign_id = None
+    result = {"size": size}
+    try:
+        # Seed
+        list_id = api.create_list(name)
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "subscribers.csv")
+            write_csv(csv_path, size, tag)
+            start = time.monotonic()
+            api.import_subscribers(csv_path, list_id)
+            deadline = start + IMPORT_TIMEOUT
+            while True:
+                status = api.import_status()
+                if status.get("status") == "finished":
+                    break
+                if status.get("status") == "failed" or time.monotonic() > deadline:
+                    raise RuntimeError(f"Import {status.get('status')}: {status}")
+                time.sleep(POLL_INTERVAL)
+        seed_seconds = time.monotonic() - start
+        result["seed"] = {"seconds": round(seed_seconds, 1), "imported": status.get("imported"),
+                          "per_sec": round(size / seed_seconds) if seed_seconds else None}
+        print(f"  👥 Seeded {size:,} subscribers in {seed_seconds:.1f}s")
+
+        # Send
+        campaign_id = api.create_campaign(name, list_id)["id"]
+        sink.reset()
+        sampler = ResourceSampler(args)
+        sampler.start()
+        started = time.monotonic()
+        api.start_campaign(campaign_id)
+        deadline = started + SEND_TIMEOUT
+        finished_at = None
+        try:
+            while time.monotonic() < deadline:
+                campaign = api.campaign(campaign_id)
+                received = sink.count()
+                if campaign["status"] in ("finished", "cancelled") and finished_at is None:
+                    finished_at = time.monotonic()
+                if finished_at and (received >= size or time.monotonic() - finished_at > 10):
+                    break
+                print(f"\r  📤 {received:,}/{size:,} delivered, listmonk: {campaign['status']} "
+                      f"{campaign.get('sent', 0):,} sent", end="", flush=True)
+                time.sleep(POLL_INTERVAL)
+        finally:
+            sampler.stop.set()
+            sampler.join(timeout=30)
+        print()
+
+        arrivals = sorted(a - started for a in sink.arrivals)
+        received = len(arrivals)
+        first, last = (arrivals[0], arrivals[-1]) if arrivals else (0.0, 0.0)
+        span = last - first
+        result["send"] = {
+            "listmonk_status": campaign["status"],
+            "listmonk_sent": campaign.get("sent"),
+            "received": received,
+            "complete": received >= size,
+            "time_to_first_s": round(first, 2),
+            "duration_s": round(last, 2),
+            "throughput_per_min": round(received / last * 60) if last else None,
+            "steady_per_min": round((received - 1) / span * 60) if span else None,
+            "queue_lag_p50_s": round(percentile(arrivals, 0.5), 2),
+            "queue_lag_p99_s": round(percentile(arrivals, 0.99), 2),
+            "finish_lag_s": round(finished_at - started - last, 2) if finished_at and arrivals else None,
+        }
+        result["resources"] = sampler.summary()
+    finally:
+        if not args.keep_data:
+            try:
+                api.cleanup(campaign_id, list_id)
+            except (RuntimeError, requests.RequestException) as e:
+                print(f"  ⚠️ Cleanup failed for {name}: {e}")
+    return result
+
+
+def compare(run: dict, baseline: dict) -> list[str]:
+    """Throughput and lag changes per size vs the baseline."""
+    lines = []
+    base = {r["size"]: r for r in baseline.get("results", []) if "send" in r}
+    for r in run["results"]:
+        b = base.get(r["size"])
+        if not b or "send" not in r:
+            continue
+        for key, label in (("throughput_per_min", "throughput"), ("queue_lag_p99_s", "p99 queue lag")):
+            new, old = r["send"].get(key), b["send"].get(key)
+            if new is None or not old:
+                continue
+            change = (new - old) / old * 100
+            lines.append(f"{r['size']:>9,}  {label}: {old:,} → {new:,} ({change:+.1f}%)")
+    return lines
+
+
+def print_result(r: dict):
+    s = r.get("send", {})
+    res = r.get("resources", {})
+    print(f"  ✅ {s.get('received', 0):,}/{r['size']:,} delivered in {s.get('duration_s')}s "
+          f"→ {s.get('throughput_per_min') or 0:,}/min (steady {s.get('steady_per_min') or 0:,}/min)")
+    print(f"     Queue lag p50 {s.get('queue_lag_p50_s')}s, p99 {s.get('queue_lag_p99_s')}s, "
+          f"first message after {s.get('time_to_first_s')}s")
+    for key, label in (("db_cpu_pct", "DB CPU %"), ("app_cpu_pct", "App CPU %"),
+                       ("db_connections", "DB connections"), ("db_active_connections", "DB active")):
+        if res.get(key):
+            print(f"     {label}: avg {res[key]['avg']}, peak {res[key]['peak']}")
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load-test Listmonk's sending path against a local SMTP sink.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--url", default=LISTMONK_LOCAL_URL, help=f"Listmonk URL (default: {LISTMONK_LOCAL_URL})")
+    parser.add_argument("--allow-public", action="store_true",
+                        help="Allow a --url that is not on this machine (e.g. the public tunnel)")
+    parser.add_argument("--container", default=DB_CONTAINER, help=argparse.SUPPRESS)
+    parser.add_argument("--no-docker", action="store_true", help="Sample Postgres with local psql")
+    parser.add_argument("--pg-host", default="localhost", help="Postgres host with --no-docker")
+    parser.add_argument("--pg-port", type=int, default=5432, help="Postgres port with --no-docker")
+    parser.add_argument("--pg-user", default=DB_USER, help=argparse.SUPPRESS)
+    parser.add_argument("--pg-db", default=DB_NAME, help=argparse.SUPPRESS)
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    run_parser = subparsers.add_parser("run", help="Run the load test")
+    run_parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                            help="Comma-separated subscriber counts (default: 1000,20000,200000)")
+    run_parser.add_argument("--sink-host", default="0.0.0.0", help="Sink bind host (default: 0.0.0.0)")
+    run_parser.add_argument("--sink-port", type=int, default=SINK_PORT, help=f"Sink port (default: {SINK_PORT})")
+    run_parser.add_argument("--sink-address", default=SINK_ADDRESS_FROM_CONTAINER,
+                            help=f"Sink address as seen from listmonk-app (default: {SINK_ADDRESS_FROM_CONTAINER})")
+    run_parser.add_argument("--sample-interval", type=float, default=2.0, help="Resource sampling period (default: 2s)")
+    run_parser.add_argument("--keep-data", action="store_true", help="Keep the seeded lists and campaigns")
+    run_parser.add_argument("--save-baseline", action="store_true", help="Save this run as the baseline")
+
+    subparsers.add_parser("restore-settings", help="Restore SMTP settings saved by an interrupted run")
+
+    args = parser.parse_args()
+
+    print(f"[load_test] v{DOE_VERSION}")
+    print()
+
+    if args.command not in ("run", "restore-settings"):
+        parser.print_help()
+        return 0
+    if not LISTMONK_ADMIN_USER or not LISTMONK_ADMIN_PASSWORD:
+        print("ERROR: LISTMONK_ADMIN_USER / LISTMONK_ADMIN_PASSWORD not set in .env")
+        return 1
+    if urlparse(args.url).hostname not in LOCAL_HOSTS and not args.allow_public:
+        print(f"ERROR: {args.url} is not local. A load test sends thousands of requests; "
+              f"pass --allow-public to run it through that endpoint anyway")
+        return 1
+
+    api = ListmonkAPI(args.url, LISTMONK_ADMIN_USER, LISTMONK_ADMIN_PASSWORD)
+    controller = None
+    try:
+        if args.command == "restore-settings":
+            print("✅ Settings restored" if restore_settings(api) else f"Nothing to restore ({SETTINGS_BACKUP} not found)")
+            return 0
+
+        sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+        api.wait_healthy(10)
+        if Path(SETTINGS_BACKUP).exists():
+            print(f"⚠️ {SETTINGS_BACKUP} exists from an interrupted run; restoring it first")
+            restore_settings(api)
+
+        controller, sink = start_sink(args.sink_host, args.sink_port)
+        settings = api.get_settings()
+        Path(OUTPUT_DIR).mkdir(parents=True, exist_ok=True)
+        Path(SETTINGS_BACKUP).write_text(json.dumps(settings, indent=2))
+        print(f"🔀 Pointing Listmonk SMTP at {args.sink_address}:{args.sink_port} (original saved to {SETTINGS_BACKUP})")
+        api.put_settings(sink_settings(settings, args.sink_address, args.sink_port))
+
+        run = {
+            "run_at": datetime.now().isoformat(timespec="seconds"),
+            "listmonk": {k: settings.get(k) for k in ("app.concurrency", "app.message_rate", "app.batch_size")},
+            "results": [],
+        }
+        try:
+            for size in sizes:
+                print()
+                print(f"▶️  {size:,} subscribers")
+                r = run_size(api, sink, size, args)
+                run["results"].append(r)
+                print_result(r)
+        finally:
+            print()
+            print("🔀 Restoring SMTP settings...")
+            restore_settings(api)
+
+        out = Path(OUTPUT_DIR) / f"run-{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json"
+        out.write_text(json.dumps(run, indent=2))
+        print(f"Results: {out}")
+
+        if Path(BASELINE_FILE).exists() and not args.save_baseline:
+            changes = compare(run, json.loads(Path(BASELINE_FILE).read_text()))
+            if changes:
+                print()
+                print("VS BASELINE")
+                print("-" * 60)
+                for line in changes:
+                    print(f"  {line}")
+        if args.save_baseline:
+            Path(BASELINE_FILE).write_text(json.dumps(run, indent=2))
+            print(f"📌 Saved as baseline: {BASELINE_FILE}")
+
+        return 0 if all(r.get("send", {}).get("complete") for r in run["results"]) else 1
+
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted")
+        return 130
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+    finally:
+        if controller:
+            controller.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,828 @@
+#!/usr/bin/env python3
+"""
+Script: log_analyzer.py
+Directive: directives/log_analyzer.md
+DOE Framework: v2.0.0
+
+Purpose:
+    Analyse Listmonk (`docker logs listmonk-app`) and watchdog logs without
+    grepping by hand. Counts SMTP errors, rate-limit hits, restarts and
+    other errors per minute over a rolling window, and raises an alert
+    when a count crosses its threshold.
+
+    Logs are read in large chunks, not line by line. A prefilter of a few
+    literal needles, compiled once, finds the handful of lines that can
+    matter with fast substring searches over the whole chunk. Only those
+    lines are split out and parsed with regexes, so ordinary traffic lines
+    are never touched by Python code. Historical files are split into
+    byte ranges and scanned by a process pool.
+
+    Follow mode tails files (surviving rotation) and `docker logs -f`,
+    keeping only a fixed ring of per-minute counters, so memory stays
+    constant however long it runs.
+
+Cost:
+    Free
+
+Usage:
+    # Scan history: watchdog-listmonk.log and docker logs listmonk-app
+    python execution/log_analyzer.py scan
+
+    # Scan specific files, last day of container logs
+    python execution/log_analyzer.py scan old-listmonk.log --docker listmonk-app --since 24h
+
+    # Follow live and alert
+    python execution/log_analyzer.py follow
+
+    # Throughput vs line-by-line regexes on a synthetic multi-hundred-MB log
+    python execution/log_analyzer.py benchmark --mb 512
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import calendar
+import threading
+import subprocess
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+# =============================================================================
+# VERSION - Must match directive version
+# =============================================================================
+DOE_VERSION = "2026.10.19"
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+WATCHDOG_LOG = "watchdog-listmonk.log"
+APP_CONTAINER = "listmonk-app"
+
+OUTPUT_DIR = ".tmp/logs"
+ALERTS_LOG = ".tmp/logs/alerts.jsonl"
+
+CHUNK_SIZE = 8 * 1024 * 1024
+MAX_LINE = 64 * 1024          # Longer lines are cut; keeps follow-mode buffers bounded
+POLL_INTERVAL = 0.25          # Seconds between checks of an idle followed file
+
+# Files smaller than this are scanned in-process; a pool costs more than it saves
+PARALLEL_THRESHOLD = 64 * 1024 * 1024
+
+CATEGORIES = ("smtp_error", "rate_limit", "restart", "error")
+SMTP_ERROR, RATE_LIMIT, RESTART, ERROR = range(len(CATEGORIES))
+
+# Alert when a category reaches this many events within the window
+DEFAULT_WINDOW = 5
+DEFAULT_THRESHOLDS = {"smtp_error": 20, "rate_limit": 10, "restart": 2, "error": 50}
+
+# Prefilter: every line classify() can count contains one of these, so lines
+# without any of them are skipped unread. The first letter is left off where
+# case varies (Error/error, Restarting/started).
+NEEDLES = (b"rror", b"RROR", b"WARN", b"tart", b"limit", b"anic")
+
+# Anchors; each contains a needle
+ERROR_RE = re.compile(rb"\b(?:[Ee]rror|ERROR|WARN|panic)")
+RESTART_RE = re.compile(rb"[Rr]estart(?:ing|ed)\b|\bstarted\s*$|started via docker-compose|http server started")
+
+# Refine error lines (and "limit" lines for rate limits)
+RATE_LIMIT_RE = re.compile(
+    rb"rate.?limit|too many (?:requests|messages|connections)|\b429\b|sliding.?window", re.I)
+SMTP_ERROR_RE = re.compile(
+    rb"smtp|error sending|\b[45]\d\d[ -][245]\.\d{1,3}\.\d{1,3}|\b(?:421|45[0124]|5[35][0-4])\b"
+    rb"|dial tcp|i/o timeout|connection (?:reset|refused)|broken pipe|\bEOF\b|\btls\b", re.I)
+
+# First timestamp in a line: docker --timestamps, Go log (2026/10/19 13:37:28), PowerShell log
+TIMESTAMP_RE = re.compile(rb"(\d{4})[-/](\d\d)[-/](\d\d)[T ](\d\d):(\d\d)")
+
+
+# =============================================================================
+# PREFILTER AND RULES
+# =============================================================================
+
+def candidate_lines(block: bytes, needles: tuple[bytes, ...] = NEEDLES) -> list[bytes]:
+    """
+    Lines of `block` containing any needle, in order. One substring search
+    per needle over the whole block; a needle that matches resumes after
+    the end of that line.
+    """
+    starts = set()
+    for needle in needles:
+        i = block.find(needle)
+        while i >= 0:
+            starts.add(block.rfind(b"\n", 0, i) + 1)
+            end = block.find(b"\n", i)
+            if end < 0:
+                break
+            i = block.find(needle, end)
+
+    lines = []
+    for start in sorted(starts):
+        end = block.find(b"\n", start)
+        lines.append(block[start:end if end >= 0 else len(block)].rstrip(b"\r"))
+    return lines
+
+
+def classify(line: bytes) -> int | None:
+    """
+    Category index of a line, or None if it is not an event. Only lines
+    with an error/warning or restart anchor (or "limit") are counted, which
+    is what makes the NEEDLES prefilter exact.
+    """
+    is_error = ERROR_RE.search(line) is not None
+    if (is_error or b"limit" in line) and RATE_LIMIT_RE.search(line):
+        return RATE_LIMIT
+    if is_error and SMTP_ERROR_RE.search(line):
+        return SMTP_ERROR
+    if RESTART_RE.search(line):
+        return RESTART
+    if is_error:
+        return ERROR
+    return None
+
+
+_minute_cache: dict[bytes, int] = {}
+
+
+def line_minute(line: bytes) -> int | None:
+    """Minutes since the epoch from the first timestamp in the line (as written, no zone)."""
+    match = TIMESTAMP_RE.search(line, 0, 64)
+    if not match:
+        return None
+    key = match.group(0)
+    minute = _minute_cache.get(key)
+    if minute is None:
+        y, mo, d, h, mi = map(int, match.groups())
+        try:
+            minute = calendar.timegm((y, mo, d, h, mi, 0)) // 60
+        except (ValueError, OverflowError):
+            return None
+        if len(_minute_cache) > 4096:
+            _minute_cache.clear()
+        _minute_cache[key] = minute
+    return minute
+
+
+def format_minute(minute: int) -> str:
+    return datetime.fromtimestamp(minute * 60, timezone.utc).strftime("%Y-%m-%d %H:%M")
+
+
+class LineSplitter:
+    """Cuts a stream of chunks into blocks of whole lines, carrying the partial last line."""
+
+    def __init__(self):
+        self.carry = b""
+
+    def feed(self, chunk: bytes) -> bytes:
+        data = self.carry + chunk if self.carry else chunk
+        cut = data.rfind(b"\n") + 1
+        self.carry = data[cut:]
+        if len(self.carry) > MAX_LINE:
+            self.carry = self.carry[:MAX_LINE]
+        return data[:cut]
+
+    def flush(self) -> bytes:
+        data, self.carry = self.carry, b""
+        return data
+
+
+# =============================================================================
+# SCAN (HISTORY)
+# =============================================================================
+
+class ScanResult:
+    """Totals and per-minute counts for one source."""
+
+    def __init__(self):
+        self.bytes = 0
+        self.candidates = 0
+        self.totals = [0] * len(CATEGORIES)
+        self.undated = 0
+        self.minutes: dict[int, list[int]] = {}
+        self.samples: dict[str, str] = {}
+
+    def add_block(self, block: bytes):
+        self.bytes += len(block)
+        for line in candidate_lines(block):
+            self.candidates += 1
+            category = classify(line)
+            if category is None:
+                continue
+            self.totals[category] += 1
+            name = CATEGORIES[category]
+            if name not in self.samples:
+                self.samples[name] = line[:300].decode("utf-8", "replace")
+            minute = line_minute(line)
+            if minute is None:
+                self.undated += 1
+                continue
+            counts = self.minutes.get(minute)
+            if counts is None:
+                counts = self.minutes[minute] = [0] * len(CATEGORIES)
+            counts[category] += 1
+
+    def merge(self, other: "ScanResult"):
+        self.bytes += other.bytes
+        self.candidates += other.candidates
+        self.undated += other.undated
+        self.totals = [a + b for a, b in zip(self.totals, other.totals)]
+        for minute, counts in other.minutes.items():
+            mine = self.minutes.setdefault(minute, [0] * len(CATEGORIES))
+            for i, count in enumerate(counts):
+                mine[i] += count
+        for name, sample in other.samples.items():
+            self.samples.setdefault(name, sample)
+
+
+def scan_range(path: str, start: int, end: int) -> ScanResult:
+    """Scan bytes [start, end) of a file; both ends are on line boundaries."""
+    result = ScanResult()
+    splitter = LineSplitter()
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            result.add_block(splitter.feed(chunk))
+    result.add_block(splitter.flush())
+    return result
+
+
+def split_ranges(path: str, parts: int) -> list[tuple[int, int]]:
+    """Byte ranges of about equal size, each starting at the beginning of a line."""
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, "rb") as f:
+        for i in range(1, parts):
+            f.seek(size * i // parts)
+            f.readline()
+            position = f.tell()
+            if bounds[-1] < position < size:
+                bounds.append(position)
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def scan_file(path: str, workers: int | None = None) -> ScanResult:
+    """Scan a file, in parallel byte ranges if it is large."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or os.path.getsize(path) < PARALLEL_THRESHOLD:
+        return scan_range(path, 0, os.path.getsize(path))
+
+    ranges = split_ranges(path, workers * 4)
+    result = ScanResult()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(scan_range, [path] * len(ranges), *zip(*ranges)):
+            result.merge(part)
+    return result
+
+
+def scan_stream(chunks) -> ScanResult:
+    """Scan any iterable of byte chunks (a docker logs pipe)."""
+    result = ScanResult()
+    splitter = LineSplitter()
+    for chunk in chunks:
+        result.add_block(splitter.feed(chunk))
+    result.add_block(splitter.flush())
+    return result
+
+
+def find_alerts(minutes: dict[int, list[int]], window: int, thresholds: dict[str, int]) -> list[dict]:
+    """
+    Threshold crossings of each category's rolling `window`-minute count.
+    An alert fires when the count reaches the threshold and re-arms once it
+    has fallen below again.
+    """
+    alerts = []
+    ordered = sorted(minutes)
+    for index, name in enumerate(CATEGORIES):
+        limit = thresholds.get(name)
+        if not limit:
+            continue
+        recent = deque()
+        total, active = 0, False
+        for minute in ordered:
+            count = minutes[minute][index]
+            if not count:
+                continue
+            while recent and recent[0][0] <= minute - window:
+                total -= recent.popleft()[1]
+            if total < limit:
+                active = False
+            recent.append((minute, count))
+            total += count
+            if total >= limit and not active:
+                active = True
+                alerts.append({"minute": format_minute(minute), "category": name, "count": total,
+                               "window_min": window, "threshold": limit})
+    alerts.sort(key=lambda a: a["minute"])
+    return alerts
+
+
+# =============================================================================
+# SOURCES
+# =============================================================================
+
+def docker_available() -> bool:
+    return shutil.which("docker") is not None
+
+
+def docker_chunks(container: str, follow: bool = False, since: str | None = None):
+    """Yield chunks of `docker logs --timestamps` (stdout and stderr together)."""
+    check = subprocess.run(["docker", "inspect", "-f", "{{.Id}}", container], capture_output=True, text=True)
+    if check.returncode != 0:
+        raise RuntimeError(f"Container {container} not found: {check.stderr.strip() or check.stdout.strip()}")
+
+    command = ["docker", "logs", "--timestamps"]
+    if follow:
+        command += ["--follow", "--tail", "0"]
+    if since:
+        command += ["--since", since]
+    process = subprocess.Popen([*command, container], stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    try:
+        while True:
+            chunk = process.stdout.read1(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+
+
+def follow_file(path: str, stop: threading.Event, from_start: bool = False):
+    """
+    Yield chunks appended to a file, like `tail -F`. A replaced (rotated)
+    or truncated file is reopened and read from the start. Yields b"" when
+    idle so the caller can check `stop`.
+    """
+    f, inode = None, None
+    while not stop.is_set():
+        if f is None:
+            try:
+                f = open(path, "rb")
+            except FileNotFoundError:
+                stop.wait(POLL_INTERVAL)
+                continue
+            inode = os.fstat(f.fileno()).st_ino
+            if not from_start:
+                f.seek(0, os.SEEK_END)
+            from_start = True
+
+        chunk = f.read(CHUNK_SIZE)
+        if chunk:
+            yield chunk
+            continue
+
+        try:
+            current = os.stat(path)
+        except FileNotFoundError:
+            current = None
+        if current is None or current.st_ino != inode or current.st_size < f.tell():
+            f.close()
+            f = None
+            continue
+        yield b""
+        stop.wait(POLL_INTERVAL)
+    if f:
+        f.close()
+
+
+# =============================================================================
+# FOLLOW (LIVE)
+# =============================================================================
+
+class RollingCounter:
+    """Per-minute counts for the last `window` minutes, in a fixed ring of slots."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.slot_minute = [-1] * window
+        self.counts = [[0] * len(CATEGORIES) for _ in range(window)]
+
+    def add(self, minute: int, category: int):
+        slot = minute % self.window
+        if self.slot_minute[slot] != minute:
+            self.slot_minute[slot] = minute
+            self.counts[slot] = [0] * len(CATEGORIES)
+        self.counts[slot][category] += 1
+
+    def minute(self, minute: int) -> list[int]:
+        slot = minute % self.window
+        return self.counts[slot] if self.slot_minute[slot] == minute else [0] * len(CATEGORIES)
+
+    def total(self, minute: int, category: int) -> int:
+        return sum(counts[category] for m, counts in zip(self.slot_minute, self.counts)
+                   if minute - self.window < m <= minute)
+
+
+class Monitor:
+    """
+    Live counters across all followed sources. Events are counted in the
+    minute they arrive (wall clock), so sources in different time zones
+    line up.
+    """
+
+    def __init__(self, window: int, thresholds: dict[str, int], alerts_log: str | None = ALERTS_LOG,
+                 quiet: bool = False):
+        self.counter = RollingCounter(window)
+        self.thresholds = thresholds
+        self.alerts_log = alerts_log
+        self.quiet = quiet
+        self.active = [False] * len(CATEGORIES)
+        self.lock = threading.Lock()
+        self.lines = 0
+        self.bytes = 0
+        self.alerts = 0
+
+    def feed(self, source: str, block: bytes):
+        lines = candidate_lines(block)
+        with self.lock:
+            self.bytes += len(block)
+            minute = int(time.time() // 60)
+            for line in lines:
+                category = classify(line)
+                if category is None:
+                    continue
+                self.lines += 1
+                self.counter.add(minute, category)
+                self._check(minute, category, source, line)
+
+    def _check(self, minute: int, category: int, source: str, line: bytes):
+        name = CATEGORIES[category]
+        limit = self.thresholds.get(name)
+        if not limit:
+            return
+        total = self.counter.total(minute, category)
+        if total < limit or self.active[category]:
+            return
+        self.active[category] = True
+        self.alerts += 1
+        alert = {"ts": datetime.now().isoformat(timespec="seconds"), "category": name, "count": total,
+                 "window_min": self.counter.window, "threshold": limit, "source": source,
+                 "line": line[:300].decode("utf-8", "replace")}
+        if not self.quiet:
+            print(f"🚨 {alert['ts']}  {name}: {total} in the last {self.counter.window} min "
+                  f"(threshold {limit})  [{source}]")
+            print(f"     {alert['line'][:160]}")
+        if self.alerts_log:
+            path = Path(self.alerts_log)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(alert) + "\n")
+
+    def tick(self, minute: int) -> list[int]:
+        """Close `minute`: re-arm alerts that fell below threshold, return its counts."""
+        with self.lock:
+            for category, name in enumerate(CATEGORIES):
+                limit = self.thresholds.get(name)
+                if self.active[category] and (not limit or self.counter.total(minute, category) < limit):
+                    self.active[category] = False
+            return list(self.counter.minute(minute))
+
+
+def pump(monitor: Monitor, source: str, chunks, errors: list):
+    """Feed one source's chunks into the monitor (runs in its own thread)."""
+    splitter = LineSplitter()
+    try:
+        for chunk in chunks:
+            if chunk:
+                block = splitter.feed(chunk)
+                if block:
+                    monitor.feed(source, block)
+        tail = splitter.flush()
+        if tail:
+            monitor.feed(source, tail)
+    except Exception as e:
+        errors.append(f"{source}: {e}")
+
+
+def format_counts(counts: list[int]) -> str:
+    return "  ".join(f"{name} {count}" for name, count in zip(CATEGORIES, counts))
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+def synthetic_log(path: Path, megabytes: int, seed: int = 11) -> int:
+    """
+    Write a Listmonk-style container log of about `megabytes` MB: send
+    progress lines, with a thin stream of SMTP errors and bursts of rate
+    limiting and restarts. Returns the number of lines.
+    """
+    rng = random.Random(seed)
+    start = calendar.timegm((2026, 1, 5, 0, 0, 0))
+    target = megabytes * 1024 * 1024
+    written = lines = 0
+    second = 0
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        while written < target:
+            ts = start + second
+            second += 1
+            stamp = datetime.fromtimestamp(ts, timezone.utc)
+            prefix = f"{stamp:%Y-%m-%dT%H:%M:%S}.{rng.randrange(10**9):09d}Z {stamp:%Y/%m/%d %H:%M:%S}"
+            burst = (ts // 60) % 240 == 17
+            block = []
+            for n in range(20):
+                r = rng.random()
+                # Restarts first: their range lies inside the SMTP error one
+                if r < 0.0001:
+                    block.append(f"{prefix} ⇨ http server started on [::]:9000")
+                elif r < 0.002 or (burst and r < 0.05):
+                    block.append(f"{prefix} manager.go:532: error sending message in campaign (dormant-jan): "
+                                 f"subscriber user{rng.randrange(20000)}@company{rng.randrange(4000)}.example: "
+                                 f"550 5.1.1 mailbox unavailable")
+                elif burst and r < 0.08:
+                    block.append(f"{prefix} manager.go:532: error sending message in campaign (dormant-jan): "
+                                 f"421 4.7.0 Too many requests, rate limit exceeded")
+                else:
+                    block.append(f"{prefix} manager.go:401: campaign (dormant-jan) sent {rng.randrange(20000)} "
+                                 f"of 20000 to subscriber {rng.randrange(10**6)}, batch {n} ok")
+            text = "\n".join(block) + "\n"
+            f.write(text)
+            written += len(text.encode("utf-8"))
+            lines += len(block)
+    return lines
+
+
+def naive_scan(path: str, limit_bytes: int) -> tuple[ScanResult, int]:
+    """Reference: every line through the rules, no prefilter. Returns (result, bytes read)."""
+    result = ScanResult()
+    read = 0
+    with open(path, "rb") as f:
+        for line in f:
+            read += len(line)
+            result.bytes += len(line)
+            category = classify(line.rstrip(b"\r\n"))
+            if category is not None:
+                result.totals[category] += 1
+            if read >= limit_bytes:
+                break
+    return result, read
+
+
+def peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_benchmark(megabytes: int, workers: int, naive_mb: int) -> dict:
+    out = Path(OUTPUT_DIR) / "benchmark"
+    out.mkdir(parents=True, exist_ok=True)
+    path = out / "listmonk.log"
+    lines = synthetic_log(path, megabytes)
+    size = os.path.getsize(path)
+
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        while f.read(CHUNK_SIZE):
+            pass
+    read_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single = scan_range(str(path), 0, size)
+    single_s = time.perf_counter() - start
+    missing = [c for c, n in zip(CATEGORIES, single.totals) if n == 0 and c != "error"]
+    if missing:
+        raise RuntimeError(f"Synthetic log has no {', '.join(missing)} lines")
+
+    parallel_s = None
+    if workers > 1:
+        start = time.perf_counter()
+        parallel = scan_file(str(path), workers)
+        parallel_s = time.perf_counter() - start
+        if parallel.totals != single.totals:
+            raise RuntimeError(f"Parallel scan differs: {parallel.totals} vs {single.totals}")
+
+    # Same rules on every line of a prefix of the file
+    start = time.perf_counter()
+    reference, naive_bytes = naive_scan(str(path), naive_mb * 1024 * 1024)
+    naive_s = time.perf_counter() - start
+    prefix = scan_range(str(path), 0, naive_bytes)
+    mismatch = prefix.totals != reference.totals
+
+    # Follow mode over the whole file: memory must not grow with it
+    rss_before = peak_rss_mb()
+    monitor = Monitor(DEFAULT_WINDOW, DEFAULT_THRESHOLDS, alerts_log=None, quiet=True)
+    stop = threading.Event()
+    errors = []
+
+    def until_idle():
+        for chunk in follow_file(str(path), stop, from_start=True):
+            if not chunk:
+                stop.set()
+            yield chunk
+
+    start = time.perf_counter()
+    pump(monitor, "benchmark", until_idle(), errors)
+    follow_s = time.perf_counter() - start
+    rss_after = peak_rss_mb()
+
+    return {
+        "size_mb": size / 1e6, "lines": lines, "read_s": read_s, "single_s": single_s,
+        "parallel_s": parallel_s, "workers": workers, "naive_mb": naive_bytes / 1e6, "naive_s": naive_s,
+        "mismatch": mismatch, "totals": dict(zip(CATEGORIES, single.totals)),
+        "candidates": single.candidates, "alerts": len(find_alerts(single.minutes, DEFAULT_WINDOW, DEFAULT_THRESHOLDS)),
+        "follow_s": follow_s, "follow_events": monitor.lines,
+        "rss_before": rss_before, "rss_after": rss_after, "path": str(path),
+    }
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def resolve_sources(args) -> tuple[list[str], list[str]]:
+    """Files and containers to read; defaults to the watchdog log and listmonk-app."""
+    files, containers = list(args.files), list(args.docker or [])
+    if not files and not containers:
+        if Path(WATCHDOG_LOG).exists():
+            files.append(WATCHDOG_LOG)
+        if docker_available():
+            containers.append(APP_CONTAINER)
+    return files, containers
+
+
+def thresholds_from(args) -> dict[str, int]:
+    return {"smtp_error": args.smtp_errors, "rate_limit": args.rate_limits,
+            "restart": args.restarts, "error": args.errors}
+
+
+def print_scan(name: str, result: ScanResult, seconds: float, alerts: list[dict]):
+    rate = result.bytes / seconds / 1e6 if seconds else 0
+    print(f"📂 {name}: {result.bytes / 1e6:,.1f} MB in {seconds:.2f}s ({rate:,.0f} MB/s), "
+          f"{result.candidates:,} lines past the prefilter")
+    print(f"     {format_counts(result.totals)}")
+    for index, category in enumerate(CATEGORIES):
+        if result.totals[index] and result.minutes:
+            minute, counts = max(result.minutes.items(), key=lambda kv: kv[1][index])
+            if counts[index]:
+                print(f"     peak {category}: {counts[index]}/min at {format_minute(minute)}")
+    for alert in alerts[:20]:
+        print(f"     🚨 {alert['minute']}  {alert['category']}: {alert['count']} in {alert['window_min']} min "
+              f"(threshold {alert['threshold']})")
+    if len(alerts) > 20:
+        print(f"     ... {len(alerts) - 20:,} more alerts")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count SMTP errors, rate limits and restarts in Listmonk/watchdog logs")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW,
+                        help=f"Rolling window in minutes (default: {DEFAULT_WINDOW})")
+    parser.add_argument("--smtp-errors", type=int, default=DEFAULT_THRESHOLDS["smtp_error"],
+                        help="SMTP errors per window before an alert (default: %(default)s)")
+    parser.add_argument("--rate-limits", type=int, default=DEFAULT_THRESHOLDS["rate_limit"],
+                        help="Rate-limit hits per window before an alert (default: %(default)s)")
+    parser.add_argument("--restarts", type=int, default=DEFAULT_THRESHOLDS["restart"],
+                        help="Restarts per window before an alert (default: %(default)s)")
+    parser.add_argument("--errors", type=int, default=DEFAULT_THRESHOLDS["error"],
+                        help="Other errors and warnings per window before an alert (default: %(default)s)")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    scan_parser = subparsers.add_parser("scan", help="Analyse existing logs")
+    scan_parser.add_argument("files", nargs="*", help=f"Log files (default: {WATCHDOG_LOG} and docker {APP_CONTAINER})")
+    scan_parser.add_argument("--docker", action="append", metavar="CONTAINER", help="Container logs to read (repeatable)")
+    scan_parser.add_argument("--since", help="With --docker: only logs since (e.g. 24h, 2026-10-19)")
+    scan_parser.add_argument("--workers", type=int, default=None, help="Processes for large files (default: CPU count)")
+    scan_parser.add_argument("--out", default=OUTPUT_DIR, help=f"Report directory (default: {OUTPUT_DIR})")
+
+    follow_parser = subparsers.add_parser("follow", help="Tail logs live and alert")
+    follow_parser.add_argument("files", nargs="*", help=f"Log files (default: {WATCHDOG_LOG} and docker {APP_CONTAINER})")
+    follow_parser.add_argument("--docker", action="append", metavar="CONTAINER", help="Container logs to follow (repeatable)")
+    follow_parser.add_argument("--alerts", default=ALERTS_LOG, help=f"Alert log (default: {ALERTS_LOG})")
+
+    bench_parser = subparsers.add_parser("benchmark", help="Prefiltered scan vs line-by-line rules on a synthetic log")
+    bench_parser.add_argument("--mb", type=int, default=512, help="Synthetic log size in MB (default: 512)")
+    bench_parser.add_argument("--naive-mb", type=int, default=64, help="MB to run line by line (default: 64)")
+    bench_parser.add_argument("--workers", type=int, default=None, help="Processes (default: CPU count)")
+
+    args = parser.parse_args()
+
+    if not args.command:
+        parser.print_help()
+        return 0
+
+    print(f"[log_analyzer] v{DOE_VERSION}")
+    print()
+
+    try:
+        if args.command == "scan":
+            files, containers = resolve_sources(args)
+            if not files and not containers:
+                print(f"❌ No sources: {WATCHDOG_LOG} not found and docker not available")
+                return 1
+            thresholds = thresholds_from(args)
+            report = {"timestamp": datetime.now().isoformat(), "window_min": args.window,
+                      "thresholds": thresholds, "sources": {}}
+            for name in files + containers:
+                start = time.perf_counter()
+                if name in files:
+                    result = scan_file(name, args.workers)
+                else:
+                    result = scan_stream(docker_chunks(name, since=args.since))
+                seconds = time.perf_counter() - start
+                alerts = find_alerts(result.minutes, args.window, thresholds)
+                print_scan(name, result, seconds, alerts)
+                print()
+                busiest = sorted(result.minutes.items(), key=lambda kv: -sum(kv[1]))[:20]
+                report["sources"][name] = {
+                    "bytes": result.bytes,
+                    "seconds": round(seconds, 3),
+                    "totals": dict(zip(CATEGORIES, result.totals)),
+                    "undated": result.undated,
+                    "busiest_minutes": {format_minute(m): dict(zip(CATEGORIES, c)) for m, c in busiest},
+                    "alerts": alerts,
+                    "samples": result.samples,
+                }
+            path = Path(args.out) / "scan.json"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(report, indent=2))
+            print(f"  Report: {path}")
+            alerted = any(s["alerts"] for s in report["sources"].values())
+            print("⚠️  Thresholds crossed" if alerted else "✅ No thresholds crossed")
+            return 0
+
+        if args.command == "follow":
+            files, containers = resolve_sources(args)
+            if not files and not containers:
+                print(f"❌ No sources: {WATCHDOG_LOG} not found and docker not available")
+                return 1
+            monitor = Monitor(args.window, thresholds_from(args), args.alerts)
+            stop = threading.Event()
+            errors = []
+            threads = [threading.Thread(target=pump, args=(monitor, Path(f).name, follow_file(f, stop), errors),
+                                        daemon=True) for f in files]
+            threads += [threading.Thread(target=pump, args=(monitor, c, docker_chunks(c, follow=True), errors),
+                                         daemon=True) for c in containers]
+            for thread in threads:
+                thread.start()
+            print(f"👀 Following {', '.join([Path(f).name for f in files] + containers)} "
+                  f"(window {args.window} min; Ctrl+C to stop)")
+
+            minute = int(time.time() // 60)
+            try:
+                while any(t.is_alive() for t in threads):
+                    time.sleep(1)
+                    now = int(time.time() // 60)
+                    if now != minute:
+                        counts = monitor.tick(minute)
+                        if any(counts):
+                            print(f"[{datetime.fromtimestamp(minute * 60):%H:%M}] {format_counts(counts)}")
+                        minute = now
+                    while errors:
+                        print(f"⚠️  {errors.pop(0)}")
+            finally:
+                stop.set()
+            print(f"  All sources ended ({monitor.alerts} alerts)")
+            return 0
+
+        if args.command == "benchmark":
+            workers = args.workers or os.cpu_count() or 1
+            print(f"⏱️  Writing a {args.mb:,} MB synthetic Listmonk log...")
+            r = run_benchmark(args.mb, workers, args.naive_mb)
+            mb = r["size_mb"]
+            naive_rate = r["naive_mb"] / r["naive_s"]
+            single_rate = mb / r["single_s"]
+            print(f"  Log: {mb:,.0f} MB, {r['lines']:,} lines ({r['path']})")
+            print(f"  Plain read:            {mb / r['read_s']:8,.0f} MB/s")
+            print(f"  Prefilter, 1 process:  {single_rate:8,.0f} MB/s  ({r['candidates']:,} lines past the prefilter)")
+            if r["parallel_s"]:
+                print(f"  Prefilter, {r['workers']} processes: {mb / r['parallel_s']:8,.0f} MB/s")
+            print(f"  Line by line:          {naive_rate:8,.0f} MB/s  (first {r['naive_mb']:,.0f} MB)")
+            print(f"  Speedup:               {single_rate / naive_rate:8.1f}x")
+            print(f"  Follow mode:           {mb / r['follow_s']:8,.0f} MB/s, {r['follow_events']:,} events")
+            if r["rss_after"] is not None:
+                print(f"  Peak memory:           {r['rss_before']:8,.0f} MB before follow, {r['rss_after']:,.0f} MB after")
+            print(f"  Events: {', '.join(f'{k} {v:,}' for k, v in r['totals'].items())}; {r['alerts']} alerts")
+            print()
+            if r["mismatch"]:
+                print("❌ Prefiltered and line-by-line counts differ")
+                return 1
+            print("✅ Prefiltered counts match line-by-line counts")
+            return 0
+
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted")
+        return 130
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,741 @@
+#!/usr/bin/env python3
+"""
+Script: pg_profiler.py
+Directive: directives/pg_profiler.md
+DOE Framework: v2.0.0
+
+Purpose:
+    Profile the Listmonk Postgres database during a campaign send and
+    size Listmonk's connection pool from what was observed instead of
+    guessing.
+
+    pg_stat_activity is sampled on an interval to measure connection
+    saturation (the pool sitting at max_open is what stalls a send).
+    pg_stat_statements is snapshotted before and after to find the slowest
+    subscriber/campaign queries. Table and index statistics drive index
+    recommendations for subscribers/subscriber_lists. The result is a
+    report with recommended [db] settings for config.toml.
+
+    All queries go through one long-lived psql session (docker exec or
+    local), so sampling every second costs one round trip, not one
+    process start.
+
+Cost:
+    Free
+
+Usage:
+    # Sample while a campaign is sending (Ctrl+C to stop early)
+    python execution/pg_profiler.py sample --duration 300
+
+    # Local Postgres: load the latest backup, add synthetic subscribers,
+    # then profile a simulated send
+    python execution/pg_profiler.py --no-docker --pg-db listmonk_profile load --subscribers 200000
+    python execution/pg_profiler.py --no-docker --pg-db listmonk_profile sample --simulate-send 1 --duration 60
+"""
+
+import re
+import sys
+import json
+import math
+import time
+import tomllib
+import argparse
+import threading
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+from backup_verify import find_backups, load_dump
+from listmonk_backup import DB_CONTAINER, DB_NAME, DB_USER, psql_command
+
+# =============================================================================
+# VERSION - Must match directive version
+# =============================================================================
+DOE_VERSION = "2026.10.19"
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+CONFIG_FILE = "config.toml"
+REPORT_DIR = ".tmp/pg_profile"
+
+DEFAULT_INTERVAL = 1.0
+DEFAULT_DURATION = 120
+SENTINEL = "__DOE_PSQL_DONE__"
+
+# Listmonk's defaults when the settings table holds 0
+LISTMONK_DEFAULT_CONCURRENCY = 10
+LISTMONK_DEFAULT_BATCH_SIZE = 1000
+
+# Pool headroom on top of send concurrency, for the API, importer and dashboard
+POOL_HEADROOM = 5
+SEND_TABLES = ("subscribers", "subscriber_lists", "campaigns", "campaign_lists")
+SEND_QUERY_RE = re.compile(r"\b(subscribers|subscriber_lists|campaigns|campaign_lists)\b", re.I)
+LARGE_TABLE_ROWS = 10_000
+
+# Index candidates for Listmonk's schema. Recommended only when the columns
+# are not already a leading prefix of an index AND the profile shows a need.
+CANDIDATE_INDEXES = [
+    {
+        "table": "subscriber_lists",
+        "columns": ["list_id", "subscriber_id"],
+        "ddl": "CREATE INDEX CONCURRENTLY idx_sub_lists_list_sub ON subscriber_lists "
+               "(list_id, subscriber_id) WHERE status <> 'unsubscribed';",
+        "pattern": re.compile(r"list_id\s*=\s*ANY", re.I),
+        "reason": "Campaign batches fetch list members in subscriber-id order; "
+                  "(list_id) alone forces a sort or a scan of every member per batch",
+        "send_path": True,
+    },
+    {
+        "table": "subscribers",
+        "columns": ["attribs"],
+        "ddl": "CREATE INDEX CONCURRENTLY idx_subs_attribs ON subscribers USING gin (attribs jsonb_path_ops);",
+        "pattern": re.compile(r"attribs\s*(@>|->>?|\?)", re.I),
+        "reason": "Segment queries filter on subscriber attributes",
+    },
+    {
+        "table": "subscriber_lists",
+        "columns": ["list_id", "status"],
+        "ddl": "CREATE INDEX CONCURRENTLY idx_sub_lists_list_status ON subscriber_lists (list_id, status);",
+        "pattern": re.compile(r"subscriber_lists.*GROUP BY.*list_id.*status", re.I | re.S),
+        "reason": "List subscriber counts group by list and status",
+    },
+]
+
+# Listmonk's next-batch query (queries.sql: next-campaign-subscribers), simplified
+SIMULATED_BATCH_QUERY = """
+SELECT coalesce(max(id), -1), count(*) FROM (
+    SELECT s.id FROM subscribers s
+    JOIN subscriber_lists sl ON sl.subscriber_id = s.id
+    WHERE sl.list_id = ANY('{{{lists}}}'::INT[]) AND sl.status <> 'unsubscribed'
+      AND s.id > {last_id} AND s.status <> 'blocklisted'
+    ORDER BY s.id LIMIT {batch}
+) b"""
+
+
+# =============================================================================
+# PSQL SESSION
+# =============================================================================
+
+class PsqlError(Exception):
+    """psql reported an error for a query."""
+
+
+class PsqlSession:
+    """
+    One persistent psql process. Each query is followed by an \\echo of a
+    sentinel, so its output can be read back without reconnecting.
+    """
+
+    def __init__(self, args, database: str | None = None):
+        command = psql_command(args, "psql", "-X", "-q", "-A", "-t", "-v", "ON_ERROR_STOP=0",
+                               "-d", database or args.pg_db, interactive=True)
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.STDOUT, text=True, bufsize=1)
+        self.lock = threading.Lock()
+
+    def query(self, sql: str) -> list[str]:
+        """Run one statement; returns its output lines."""
+        with self.lock:
+            try:
+                self.process.stdin.write(sql.strip().rstrip(";") + ";\n\\echo " + SENTINEL + "\n")
+                self.process.stdin.flush()
+            except BrokenPipeError:
+                raise PsqlError("psql exited: " + self.process.stdout.read().strip()) from None
+            lines = []
+            while True:
+                line = self.process.stdout.readline()
+                if not line:
+                    raise PsqlError("psql exited: " + " ".join(lines).strip())
+                line = line.rstrip("\n")
+                if line == SENTINEL:
+                    break
+                lines.append(line)
+        errors = [l for l in lines if l.startswith(("ERROR:", "FATAL:", "psql:"))]
+        if errors:
+            raise PsqlError(" ".join(errors))
+        return lines
+
+    def json(self, sql: str):
+        """Run a query that returns a single JSON value."""
+        # json_agg puts a newline between elements
+        text = "\n".join(self.query(sql)).strip()
+        return json.loads(text) if text else None
+
+    def close(self):
+        try:
+            self.process.stdin.write("\\q\n")
+            self.process.stdin.close()
+        except (BrokenPipeError, ValueError):
+            pass
+        self.process.wait(timeout=10)
+
+
+# =============================================================================
+# QUERIES
+# =============================================================================
+
+ACTIVITY_SQL = """
+SELECT coalesce(json_agg(a), '[]') FROM (
+    SELECT pid, datname, usename, state, wait_event_type, wait_event,
+           extract(epoch FROM backend_start) AS backend_start,
+           extract(epoch FROM now() - query_start) AS query_seconds,
+           extract(epoch FROM now() - xact_start) AS xact_seconds,
+           left(query, 300) AS query
+    FROM pg_stat_activity
+    WHERE backend_type = 'client backend' AND pid <> pg_backend_pid()
+) a"""
+
+SERVER_SQL = """
+SELECT json_build_object(
+    'version', current_setting('server_version_num')::int,
+    'max_connections', current_setting('max_connections')::int,
+    'reserved_connections', current_setting('superuser_reserved_connections')::int,
+    'shared_preload_libraries', current_setting('shared_preload_libraries'),
+    'pg_stat_statements', EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'))"""
+
+LISTMONK_SETTINGS_SQL = """
+SELECT coalesce(json_object_agg(key, value), '{}') FROM settings
+WHERE key IN ('app.concurrency', 'app.batch_size', 'app.message_rate')"""
+
+STATEMENTS_SQL = """
+SELECT coalesce(json_agg(s), '[]') FROM (
+    SELECT queryid::text AS id, calls, total_exec_time, rows,
+           shared_blks_hit, shared_blks_read, left(query, 600) AS query
+    FROM pg_stat_statements
+    WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+) s"""
+
+TABLES_SQL = """
+SELECT coalesce(json_agg(t), '[]') FROM (
+    SELECT relname AS table, n_live_tup AS live_rows, seq_scan, seq_tup_read,
+           coalesce(idx_scan, 0) AS idx_scan, n_dead_tup AS dead_rows
+    FROM pg_stat_user_tables WHERE relname IN ({tables})
+) t"""
+
+INDEXES_SQL = """
+SELECT coalesce(json_agg(i), '[]') FROM (
+    SELECT c.relname AS table, ic.relname AS index, pg_get_indexdef(x.indexrelid) AS definition,
+           x.indisunique AS unique, x.indpred IS NOT NULL AS partial,
+           x.indexprs IS NOT NULL AS expression,
+           (SELECT array_agg(a.attname ORDER BY k.n)
+              FROM unnest(x.indkey::int2[]) WITH ORDINALITY k(attnum, n)
+              JOIN pg_attribute a ON a.attrelid = x.indrelid AND a.attnum = k.attnum) AS columns,
+           s.idx_scan, pg_relation_size(x.indexrelid) AS bytes
+    FROM pg_index x
+    JOIN pg_class c ON c.oid = x.indrelid
+    JOIN pg_class ic ON ic.oid = x.indexrelid
+    JOIN pg_stat_user_indexes s ON s.indexrelid = x.indexrelid
+    WHERE c.relname IN ({tables})
+) i"""
+
+
+def table_list() -> str:
+    return ", ".join(f"'{t}'" for t in SEND_TABLES)
+
+
+def enable_statements(session: PsqlSession, server: dict) -> str | None:
+    """Create pg_stat_statements if the library is preloaded; returns a note if it can't be used."""
+    if server["pg_stat_statements"]:
+        return None
+    if "pg_stat_statements" not in server["shared_preload_libraries"]:
+        return ("pg_stat_statements is not preloaded; slow queries come from activity sampling only. "
+                "Add `command: postgres -c shared_preload_libraries=pg_stat_statements` to the db service.")
+    try:
+        session.query("CREATE EXTENSION IF NOT EXISTS pg_stat_statements")
+        server["pg_stat_statements"] = True
+        return None
+    except PsqlError as e:
+        return f"Could not create pg_stat_statements: {e}"
+
+
+# =============================================================================
+# SAMPLING
+# =============================================================================
+
+def summarise_activity(rows: list[dict], database: str, user: str) -> dict:
+    """Connection counts for one pg_stat_activity sample."""
+    ours = [r for r in rows if r["datname"] == database and r["usename"] == user]
+    active = [r for r in ours if r["state"] == "active"]
+    return {
+        "ts": time.time(),
+        "total": len(ours),
+        "active": len(active),
+        "idle": sum(1 for r in ours if r["state"] == "idle"),
+        "idle_in_transaction": sum(1 for r in ours if (r["state"] or "").startswith("idle in transaction")),
+        "lock_waits": sum(1 for r in active if r["wait_event_type"] == "Lock"),
+        "others": len(rows) - len(ours),
+        "longest_query_s": max((r["query_seconds"] or 0 for r in active), default=0),
+        "pids": {r["pid"]: r["backend_start"] for r in ours},
+        "active_queries": [r["query"] for r in active],
+    }
+
+
+class SendSimulator:
+    """Walk lists in batches the way Listmonk's campaign manager does, on N sessions."""
+
+    def __init__(self, args, lists: str, workers: int, batch: int):
+        self.args = args
+        self.lists = lists
+        self.workers = workers
+        self.batch = batch
+        self.stop = threading.Event()
+        self.batches = 0
+        self.rows = 0
+        self.lock = threading.Lock()
+        self.threads = [threading.Thread(target=self._walk, daemon=True) for _ in range(workers)]
+
+    def _walk(self):
+        session = PsqlSession(self.args)
+        try:
+            while not self.stop.is_set():
+                last_id = 0
+                while not self.stop.is_set():
+                    line = session.query(SIMULATED_BATCH_QUERY.format(
+                        lists=self.lists, last_id=last_id, batch=self.batch))[0]
+                    last_id, count = (int(v) for v in line.split("|"))
+                    with self.lock:
+                        self.batches += 1
+                        self.rows += count
+                    if count < self.batch:
+                        break
+        finally:
+            session.close()
+
+    def start(self):
+        for t in self.threads:
+            t.start()
+
+    def finish(self):
+        self.stop.set()
+        for t in self.threads:
+            t.join(timeout=30)
+
+
+def sample(args) -> dict:
+    """Sample activity for the requested duration; snapshot statistics around it."""
+    session = PsqlSession(args)
+    try:
+        server = session.json(SERVER_SQL)
+        try:
+            listmonk = session.json(LISTMONK_SETTINGS_SQL)
+        except PsqlError:
+            listmonk = {}
+        notes = []
+        note = enable_statements(session, server)
+        if note:
+            notes.append(note)
+
+        tables_before = session.json(TABLES_SQL.format(tables=table_list()))
+        statements_before = session.json(STATEMENTS_SQL) if server["pg_stat_statements"] else []
+
+        simulator = None
+        if args.simulate_send:
+            workers = args.simulate_workers or 1
+            batch = int(listmonk.get("app.batch_size") or 0) or LISTMONK_DEFAULT_BATCH_SIZE
+            simulator = SendSimulator(args, args.simulate_send, workers, batch)
+            simulator.start()
+            print(f"🚚 Simulating send to list(s) {args.simulate_send}: {workers} worker(s), batch {batch}")
+
+        samples = []
+        print(f"📊 Sampling every {args.interval:g}s for {args.duration:g}s (Ctrl+C to stop early)...")
+        deadline = time.monotonic() + args.duration
+        try:
+            while time.monotonic() < deadline:
+                started = time.monotonic()
+                samples.append(summarise_activity(session.json(ACTIVITY_SQL), args.pg_db, args.pg_user))
+                time.sleep(max(0.0, args.interval - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            print("\n⚠️ Sampling stopped early")
+        finally:
+            if simulator:
+                simulator.finish()
+
+        tables_after = session.json(TABLES_SQL.format(tables=table_list()))
+        statements_after = session.json(STATEMENTS_SQL) if server["pg_stat_statements"] else []
+        indexes = session.json(INDEXES_SQL.format(tables=table_list()))
+    finally:
+        session.close()
+
+    result = {
+        "server": server,
+        "listmonk_settings": listmonk,
+        "samples": samples,
+        "tables": diff_tables(tables_before, tables_after),
+        "statements": diff_statements(statements_before, statements_after),
+        "indexes": indexes,
+        "notes": notes,
+    }
+    if simulator:
+        result["simulation"] = {"workers": simulator.workers, "batches": simulator.batches, "rows": simulator.rows}
+    return result
+
+
+def diff_tables(before: list[dict], after: list[dict]) -> dict:
+    start = {t["table"]: t for t in before}
+    diffed = {}
+    for t in after:
+        b = start.get(t["table"], {})
+        diffed[t["table"]] = {
+            "live_rows": t["live_rows"],
+            "dead_rows": t["dead_rows"],
+            "seq_scan": t["seq_scan"] - b.get("seq_scan", 0),
+            "seq_tup_read": t["seq_tup_read"] - b.get("seq_tup_read", 0),
+            "idx_scan": t["idx_scan"] - b.get("idx_scan", 0),
+        }
+    return diffed
+
+
+def diff_statements(before: list[dict], after: list[dict]) -> list[dict]:
+    """Per-statement work done during the sampling window, slowest first."""
+    start = {s["id"]: s for s in before}
+    diffed = []
+    for s in after:
+        b = start.get(s["id"], {})
+        calls = s["calls"] - b.get("calls", 0)
+        if calls <= 0:
+            continue
+        total = s["total_exec_time"] - b.get("total_exec_time", 0)
+        reads = s["shared_blks_read"] - b.get("shared_blks_read", 0)
+        hits = s["shared_blks_hit"] - b.get("shared_blks_hit", 0)
+        diffed.append({
+            "query": " ".join(s["query"].split()),
+            "calls": calls,
+            "total_ms": round(total, 2),
+            "mean_ms": round(total / calls, 3),
+            "rows": s["rows"] - b.get("rows", 0),
+            "cache_hit": round(hits / (hits + reads), 4) if hits + reads else None,
+        })
+    diffed.sort(key=lambda s: s["total_ms"], reverse=True)
+    return diffed
+
+
+# =============================================================================
+# ANALYSIS
+# =============================================================================
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def current_pool(path: str = CONFIG_FILE) -> dict:
+    """The [db] pool settings from config.toml."""
+    try:
+        with open(path, "rb") as f:
+            db = tomllib.load(f).get("db", {})
+    except (OSError, tomllib.TOMLDecodeError):
+        db = {}
+    return {"max_open": db.get("max_open"), "max_idle": db.get("max_idle"), "max_lifetime": db.get("max_lifetime")}
+
+
+def slow_send_queries(profile: dict, limit: int) -> list[dict]:
+    """Slowest statements on send tables; falls back to activity samples without pg_stat_statements."""
+    statements = [s for s in profile["statements"] if SEND_QUERY_RE.search(s["query"])]
+    if statements or profile["server"]["pg_stat_statements"]:
+        return statements[:limit]
+    seen: dict[str, int] = {}
+    for s in profile["samples"]:
+        for q in s["active_queries"]:
+            if SEND_QUERY_RE.search(q or ""):
+                key = " ".join(q.split())
+                seen[key] = seen.get(key, 0) + 1
+    ranked = sorted(seen.items(), key=lambda kv: kv[1], reverse=True)[:limit]
+    return [{"query": q, "samples_active": n} for q, n in ranked]
+
+
+def recommend_pool(profile: dict, pool: dict) -> dict:
+    """Pool settings sized from observed concurrency and server capacity."""
+    samples = profile["samples"]
+    server = profile["server"]
+    settings = profile["listmonk_settings"]
+    concurrency = int(settings.get("app.concurrency") or 0) or LISTMONK_DEFAULT_CONCURRENCY
+
+    totals = [s["total"] for s in samples]
+    in_use = [s["active"] + s["idle_in_transaction"] for s in samples]
+    others = max((s["others"] for s in samples), default=0)
+    max_open = pool.get("max_open") or 0
+    saturated = sum(1 for t in totals if max_open and t >= max_open)
+
+    # New backends seen after the first sample = connections opened mid-send
+    seen = dict(samples[0]["pids"]) if samples else {}
+    opened = 0
+    for s in samples[1:]:
+        for pid, started in s["pids"].items():
+            if seen.get(pid) != started:
+                opened += 1
+                seen[pid] = started
+    minutes = (samples[-1]["ts"] - samples[0]["ts"]) / 60 if len(samples) > 1 else 0
+    churn = opened / minutes if minutes else 0
+
+    capacity = server["max_connections"] - server["reserved_connections"] - others - POOL_HEADROOM
+    peak_in_use = max(in_use, default=0)
+    want_open = max(concurrency + POOL_HEADROOM, math.ceil(peak_in_use * 1.5))
+    rec_open = max(2, min(want_open, capacity))
+    rec_idle = max(2, min(rec_open, math.ceil(percentile(in_use, 0.95)) + 2))
+    rec_lifetime = "1800s" if churn > 2 else (pool.get("max_lifetime") or "300s")
+
+    reasons = [
+        f"Send concurrency {concurrency} + {POOL_HEADROOM} for API/import traffic; peak in-use {peak_in_use}",
+        f"Server capacity for Listmonk: {capacity} "
+        f"(max_connections {server['max_connections']} - reserved {server['reserved_connections']} - other clients {others} - {POOL_HEADROOM})",
+        f"max_idle covers p95 in-use ({percentile(in_use, 0.95)}) so steady sends don't reconnect; idle backends above that only hold memory",
+    ]
+    if churn > 2:
+        reasons.append(f"{churn:.1f} new connections/min during the send; a longer max_lifetime avoids reconnect stalls")
+    if want_open > capacity:
+        reasons.append("⚠️ Wanted pool exceeds server capacity: raise max_connections or lower app.concurrency")
+
+    return {
+        "current": pool,
+        "recommended": {"max_open": rec_open, "max_idle": rec_idle, "max_lifetime": rec_lifetime},
+        "observed": {
+            "samples": len(samples),
+            "peak_connections": max(totals, default=0),
+            "peak_in_use": peak_in_use,
+            "p95_in_use": percentile(in_use, 0.95),
+            "saturated_pct": round(100 * saturated / len(samples), 1) if samples else 0,
+            "idle_in_transaction_peak": max((s["idle_in_transaction"] for s in samples), default=0),
+            "lock_wait_peak": max((s["lock_waits"] for s in samples), default=0),
+            "longest_query_s": round(max((s["longest_query_s"] for s in samples), default=0), 2),
+            "connections_opened_per_min": round(churn, 2),
+        },
+        "reasons": reasons,
+    }
+
+
+def recommend_indexes(profile: dict) -> list[dict]:
+    """Candidate indexes backed by evidence, plus redundant existing ones."""
+    indexes = profile["indexes"]
+    tables = profile["tables"]
+    statements = slow_send_queries(profile, 50)
+    recommendations = []
+
+    for candidate in CANDIDATE_INDEXES:
+        width = len(candidate["columns"])
+        covered = any(i["table"] == candidate["table"] and not i["partial"]
+                      and (i["columns"] or [])[:width] == candidate["columns"] for i in indexes)
+        if covered:
+            continue
+        evidence = []
+        for s in statements:
+            if candidate["pattern"].search(s["query"]):
+                detail = f"{s['mean_ms']} ms mean over {s['calls']} calls" if "mean_ms" in s else \
+                         f"active in {s['samples_active']} samples"
+                evidence.append(f"{detail}: {s['query'][:120]}")
+        t = tables.get(candidate["table"], {})
+        # Sequential scans alone only implicate the send path's index
+        if (evidence or candidate.get("send_path")) and t.get("live_rows", 0) >= LARGE_TABLE_ROWS \
+                and t.get("seq_scan", 0) > t.get("idx_scan", 0):
+            evidence.append(f"{t['seq_scan']} sequential vs {t['idx_scan']} index scans on "
+                            f"{t['live_rows']:,} rows during sampling")
+        if evidence:
+            recommendations.append({"action": "create", "ddl": candidate["ddl"],
+                                    "reason": candidate["reason"], "evidence": evidence[:3]})
+
+    # A plain index whose columns lead another index only adds write cost
+    for i in indexes:
+        if i["unique"] or i["partial"] or i["expression"] or not i["columns"]:
+            continue
+        for other in indexes:
+            if other is i or other["table"] != i["table"] or other["partial"] or other["expression"]:
+                continue
+            cols = other["columns"] or []
+            if len(cols) > len(i["columns"]) and cols[:len(i["columns"])] == i["columns"]:
+                recommendations.append({
+                    "action": "drop", "ddl": f"DROP INDEX CONCURRENTLY {i['index']};",
+                    "reason": f"Columns {', '.join(i['columns'])} lead {other['index']}; "
+                              f"it only slows imports ({i['bytes'] / 1024 / 1024:.1f} MB, {i['idx_scan']} scans)",
+                    "evidence": [other["definition"]],
+                })
+                break
+    return recommendations
+
+
+# =============================================================================
+# LOAD
+# =============================================================================
+
+SYNTHETIC_SQL = """
+WITH new_subs AS (
+    INSERT INTO subscribers (uuid, email, name, attribs, status)
+    SELECT gen_random_uuid(), 'profile-' || g || '@example.com', 'Profile ' || g,
+           json_build_object('city', (ARRAY['Austin','Denver','Boston','Miami'])[1 + g % 4], 'score', g % 100)::jsonb,
+           CASE WHEN g % 50 = 0 THEN 'blocklisted' ELSE 'enabled' END::subscriber_status
+    FROM generate_series(1, {count}) g
+    ON CONFLICT DO NOTHING
+    RETURNING id
+)
+INSERT INTO subscriber_lists (subscriber_id, list_id, status)
+SELECT id, {list_id}, CASE WHEN id % 20 = 0 THEN 'unsubscribed' ELSE 'confirmed' END::subscription_status
+FROM new_subs"""
+
+
+def first_list_id(session: PsqlSession) -> int:
+    """Lowest list id; a backup without lists gets one to hold the synthetic subscribers."""
+    lines = session.query("SELECT min(id) FROM lists")
+    if lines and lines[0].strip():
+        return int(lines[0])
+    print("  No lists in the backup; creating 'Profiler synthetic'")
+    return int(session.query(
+        "INSERT INTO lists (uuid, name, type, optin) "
+        "VALUES (gen_random_uuid(), 'Profiler synthetic', 'private', 'single') RETURNING id")[0])
+
+
+def load(args) -> dict:
+    """Restore a backup into args.pg_db and optionally add synthetic subscribers."""
+    backups = find_backups([args.backup] if args.backup else [])
+    if not backups:
+        raise FileNotFoundError("No backup found in backups/")
+    backup = backups[0]
+    print(f"📥 Loading {backup.path} into {args.pg_db}...")
+    start = time.perf_counter()
+    load_dump(backup, args.pg_db, args)
+    result = {"backup": str(backup.path), "database": args.pg_db}
+
+    if args.subscribers:
+        session = PsqlSession(args)
+        try:
+            list_id = args.list_id or first_list_id(session)
+            print(f"👥 Adding {args.subscribers:,} synthetic subscribers to list {list_id}...")
+            session.query(SYNTHETIC_SQL.format(count=args.subscribers, list_id=list_id))
+            session.query("ANALYZE subscribers")
+            session.query("ANALYZE subscriber_lists")
+        finally:
+            session.close()
+        result.update({"synthetic_subscribers": args.subscribers, "list_id": list_id})
+    result["seconds"] = round(time.perf_counter() - start, 1)
+    return result
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def print_report(profile: dict, pool: dict, indexes: list[dict], slow: list[dict]):
+    o = pool["observed"]
+    print()
+    print("CONNECTIONS")
+    print("-" * 60)
+    print(f"  Samples: {o['samples']}  peak: {o['peak_connections']}  peak in use: {o['peak_in_use']}  p95 in use: {o['p95_in_use']}")
+    print(f"  At max_open ({pool['current']['max_open']}): {o['saturated_pct']}% of samples")
+    print(f"  Idle in transaction (peak): {o['idle_in_transaction_peak']}  lock waits (peak): {o['lock_wait_peak']}")
+    print(f"  Longest running query: {o['longest_query_s']}s  new connections/min: {o['connections_opened_per_min']}")
+    if "simulation" in profile:
+        s = profile["simulation"]
+        print(f"  Simulated send: {s['batches']:,} batches, {s['rows']:,} rows, {s['workers']} worker(s)")
+
+    print()
+    print("SLOWEST SEND QUERIES")
+    print("-" * 60)
+    for s in slow:
+        if "mean_ms" in s:
+            print(f"  {s['total_ms']:>10,.1f} ms total  {s['mean_ms']:>9,.3f} ms mean  {s['calls']:>7,} calls")
+        else:
+            print(f"  active in {s['samples_active']} samples")
+        print(f"      {s['query'][:140]}")
+    if not slow:
+        print("  (none captured)")
+
+    print()
+    print("RECOMMENDED config.toml [db]")
+    print("-" * 60)
+    for key, value in pool["recommended"].items():
+        current = pool["current"].get(key)
+        value_text = f'"{value}"' if isinstance(value, str) else value
+        change = "" if current == value else f"   # was {current!r}"
+        print(f"  {key} = {value_text}{change}")
+    for reason in pool["reasons"]:
+        print(f"  - {reason}")
+
+    print()
+    print("INDEXES")
+    print("-" * 60)
+    for r in indexes:
+        print(f"  {r['ddl']}")
+        print(f"      {r['reason']}")
+        for e in r["evidence"]:
+            print(f"      · {e}")
+    if not indexes:
+        print("  No changes suggested")
+    for note in profile["notes"]:
+        print()
+        print(f"ℹ️  {note}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Profile Listmonk's Postgres usage during a send and recommend pool/index settings.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--container", default=DB_CONTAINER, help=f"Postgres container (default: {DB_CONTAINER})")
+    parser.add_argument("--no-docker", action="store_true", help="Use local psql instead of the container")
+    parser.add_argument("--pg-host", default="localhost", help="Postgres host with --no-docker")
+    parser.add_argument("--pg-port", type=int, default=5432, help="Postgres port with --no-docker")
+    parser.add_argument("--pg-user", default=DB_USER, help=f"Postgres user (default: {DB_USER})")
+    parser.add_argument("--pg-db", default=DB_NAME, help=f"Database (default: {DB_NAME})")
+    parser.add_argument("--config", default=CONFIG_FILE, help=f"Listmonk config with the current pool (default: {CONFIG_FILE})")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    sample_parser = subparsers.add_parser("sample", help="Sample during a send and report")
+    sample_parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help=f"Seconds to sample (default: {DEFAULT_DURATION})")
+    sample_parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help=f"Seconds between samples (default: {DEFAULT_INTERVAL})")
+    sample_parser.add_argument("--simulate-send", metavar="LIST_IDS", help="Walk these lists like a campaign send (comma-separated ids)")
+    sample_parser.add_argument("--simulate-workers", type=int, help="Concurrent simulated sends (default: 1)")
+    sample_parser.add_argument("--top", type=int, default=10, help="Slow queries to show (default: 10)")
+
+    load_parser = subparsers.add_parser("load", help="Restore a backup into --pg-db for local profiling")
+    load_parser.add_argument("backup", nargs="?", help="Zip or folder (default: newest in backups/)")
+    load_parser.add_argument("--subscribers", type=int, default=0, help="Synthetic subscribers to add")
+    load_parser.add_argument("--list-id", type=int, help="List for synthetic subscribers (default: lowest id)")
+
+    args = parser.parse_args()
+
+    print(f"[pg_profiler] v{DOE_VERSION}")
+    print()
+
+    try:
+        if args.command == "sample":
+            profile = sample(args)
+            if not profile["samples"]:
+                print("❌ No samples taken")
+                return 1
+            pool = recommend_pool(profile, current_pool(args.config))
+            indexes = recommend_indexes(profile)
+            slow = slow_send_queries(profile, args.top)
+            print_report(profile, pool, indexes, slow)
+
+            for s in profile["samples"]:
+                s.pop("pids")
+                s.pop("active_queries")
+            Path(REPORT_DIR).mkdir(parents=True, exist_ok=True)
+            report_path = Path(REPORT_DIR) / f"profile-{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json"
+            report_path.write_text(json.dumps({**profile, "pool": pool, "index_recommendations": indexes}, indent=2))
+            print()
+            print(f"Report: {report_path}")
+
+        elif args.command == "load":
+            if args.pg_db == DB_NAME:
+                print(f"ERROR: Refusing to overwrite the live '{DB_NAME}' database; pass --pg-db listmonk_profile")
+                return 1
+            result = load(args)
+            print(f"✅ Loaded into {result['database']} in {result['seconds']}s")
+
+        else:
+            parser.print_help()
+        return 0
+
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted")
+        return 130
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
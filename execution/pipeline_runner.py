@@ -0,0 +1,608 @@
+#!/usr/bin/env python3
+"""
+Script: pipeline_runner.py
+Directive: directives/pipeline_runner.md
+DOE Framework: v2.0.0
+
+Purpose:
+    Run a multi-step workflow from pipelines/PIPELINES.md from a JSON spec
+    instead of by hand. Stages are execution/ scripts. A stage runs as soon
+    as the stages it depends on have finished, so independent stages run
+    concurrently in a process pool.
+
+    Each stage gets a key: a hash of its script, resolved arguments, input
+    files and the outputs of the stages it depends on. If the key matches
+    the last successful run and the outputs are unchanged, the stage is
+    skipped. If the outputs were changed or deleted but this key was seen
+    before, they are restored from the output cache. So after a small
+    change only the affected stages run again. A stage that re-runs but
+    produces identical output does not re-run the stages after it.
+
+    Every stage's status, duration and declared cost go to log_cost().
+
+Cost:
+    Free (stages log their own API costs)
+
+Usage:
+    # Show the stages and what would run
+    python execution/pipeline_runner.py run dormant_campaign --plan
+
+    # Run it, overriding spec params
+    python execution/pipeline_runner.py run dormant_campaign --set list=data/dormant.csv
+
+    # Re-run one stage even if nothing changed
+    python execution/pipeline_runner.py run dormant_campaign --force hygiene
+
+    # Available pipelines
+    python execution/pipeline_runner.py list
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import subprocess
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+from doe_utils import log_cost
+
+# =============================================================================
+# VERSION - Must match directive version
+# =============================================================================
+DOE_VERSION = "2026.10.19"
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+PIPELINES_DIR = "pipelines"
+EXECUTION_DIR = "execution"
+STATE_DIR = ".tmp/pipelines"
+
+DEFAULT_WORKERS = 4
+LOG_TAIL_LINES = 20
+
+# {params.list}, {hygiene.clean}
+REFERENCE_RE = re.compile(r"\{(\w+)\.(\w+)\}")
+
+
+# =============================================================================
+# SPEC
+# =============================================================================
+
+class SpecError(Exception):
+    """The pipeline spec is invalid."""
+
+
+def find_spec(name_or_path: str) -> Path:
+    """Accept a spec path or a name from pipelines/."""
+    path = Path(name_or_path)
+    if path.is_file():
+        return path
+    path = Path(PIPELINES_DIR) / f"{name_or_path}.json"
+    if path.is_file():
+        return path
+    raise SpecError(f"No pipeline spec '{name_or_path}' (looked in {PIPELINES_DIR}/)")
+
+
+def load_spec(path: Path, overrides: dict | None = None) -> dict:
+    """
+    Load a spec and resolve {params.*} and {stage.output} references.
+
+    Returns:
+        Spec with each stage's `args`, `inputs` and `outputs` resolved and
+        its dependencies in `depends_on` (from references plus `after`)
+    """
+    spec = json.loads(path.read_text())
+    spec.setdefault("name", path.stem)
+    params = {**spec.get("params", {}), **(overrides or {})}
+    stages = spec.get("stages")
+    if not stages:
+        raise SpecError(f"{path}: no stages")
+
+    def resolve(value: str, stage_id: str, deps: set) -> str:
+        def replace(match):
+            scope, key = match.groups()
+            if scope == "params":
+                if key not in params:
+                    raise SpecError(f"{stage_id}: unknown param '{key}'")
+                return str(params[key])
+            upstream = stages.get(scope)
+            if upstream is None:
+                raise SpecError(f"{stage_id}: unknown stage '{scope}'")
+            if key not in upstream.get("outputs", {}):
+                raise SpecError(f"{stage_id}: stage '{scope}' has no output '{key}'")
+            deps.add(scope)
+            return resolve(upstream["outputs"][key], scope, set())
+        return REFERENCE_RE.sub(replace, value)
+
+    for stage_id, stage in stages.items():
+        if "script" not in stage:
+            raise SpecError(f"{stage_id}: missing 'script'")
+        script = Path(EXECUTION_DIR) / stage["script"]
+        if not script.is_file():
+            raise SpecError(f"{stage_id}: {script} not found")
+        deps = set(stage.get("after", []))
+        stage["script_path"] = str(script)
+        stage["args"] = [resolve(str(a), stage_id, deps) for a in stage.get("args", [])]
+        stage["inputs"] = [resolve(i, stage_id, deps) for i in stage.get("inputs", [])]
+        stage["outputs"] = {k: resolve(v, stage_id, deps) for k, v in stage.get("outputs", {}).items()}
+        stage["env"] = {k: resolve(str(v), stage_id, deps) for k, v in stage.get("env", {}).items()}
+        stage["cost"] = stage.get("cost", {})
+        stage["depends_on"] = sorted(deps)
+        for dep in deps:
+            if dep not in stages:
+                raise SpecError(f"{stage_id}: unknown stage '{dep}' in 'after'")
+
+    spec["order"] = topological_order(stages)
+    spec["params"] = params
+    return spec
+
+
+def topological_order(stages: dict) -> list[str]:
+    """Stage ids with dependencies first, in spec order where there is a choice."""
+    order, done, visiting = [], set(), set()
+
+    def visit(stage_id: str, path: list[str]):
+        if stage_id in done:
+            return
+        if stage_id in visiting:
+            raise SpecError(f"Cycle: {' -> '.join(path + [stage_id])}")
+        visiting.add(stage_id)
+        for dep in stages[stage_id]["depends_on"]:
+            visit(dep, path + [stage_id])
+        visiting.discard(stage_id)
+        done.add(stage_id)
+        order.append(stage_id)
+
+    for stage_id in stages:
+        visit(stage_id, [])
+    return order
+
+
+# =============================================================================
+# HASHING
+# =============================================================================
+
+class FileHasher:
+    """sha256 of files, reusing earlier results while size and mtime are unchanged."""
+
+    def __init__(self, known: dict):
+        self.known = known
+
+    def file(self, path: Path) -> str:
+        st = path.stat()
+        key = str(path.resolve())
+        cached = self.known.get(key)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(1024 * 1024):
+                digest.update(chunk)
+        self.known[key] = [st.st_mtime_ns, st.st_size, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def tree(self, pattern: str) -> dict[str, str]:
+        """{file: sha256} for a file, a directory (recursively) or a glob."""
+        path = Path(pattern)
+        if any(c in pattern for c in "*?["):
+            paths = sorted(Path().glob(pattern))
+        elif path.is_dir():
+            paths = sorted(p for p in path.rglob("*") if p.is_file())
+        elif path.is_file():
+            paths = [path]
+        else:
+            return {}
+        return {str(p): self.file(p) for p in paths if p.is_file()}
+
+
+def digest(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode()).hexdigest()
+
+
+# =============================================================================
+# STAGE EXECUTION (runs in the process pool)
+# =============================================================================
+
+def execute_stage(command: list[str], env: dict, log_path: str) -> dict:
+    """Run one stage's script with its output in log_path. Returns exit code and duration."""
+    started = time.perf_counter()
+    with open(log_path, "w") as log:
+        try:
+            code = subprocess.run(command, env={**os.environ, **env}, stdin=subprocess.DEVNULL,
+                                  stdout=log, stderr=subprocess.STDOUT).returncode
+        except OSError as e:
+            log.write(f"{e}\n")
+            code = 127
+    return {"returncode": code, "duration_s": time.perf_counter() - started}
+
+
+# =============================================================================
+# RUNNER
+# =============================================================================
+
+class PipelineRunner:
+    """Schedules a pipeline's stages and keeps its state and output cache."""
+
+    def __init__(self, spec: dict, workers: int = DEFAULT_WORKERS, force: set | None = None):
+        self.spec = spec
+        self.name = spec["name"]
+        self.stages = spec["stages"]
+        self.workers = workers
+        self.force = force or set()
+        self.run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+
+        self.dir = Path(STATE_DIR) / self.name
+        self.objects = self.dir / "cache" / "objects"
+        self.manifests = self.dir / "cache" / "keys"
+        self.logs = self.dir / "logs"
+        self.state_path = self.dir / "state.json"
+        for directory in (self.objects, self.manifests, self.logs):
+            directory.mkdir(parents=True, exist_ok=True)
+
+        self.state = json.loads(self.state_path.read_text()) if self.state_path.exists() else {}
+        self.state.setdefault("stages", {})
+        self.hasher = FileHasher(self.state.setdefault("file_hashes", {}))
+        self.results: dict[str, dict] = {}
+
+    # -------------------------------------------------------------------------
+    # Keys and cache
+    # -------------------------------------------------------------------------
+
+    def stage_key(self, stage_id: str) -> str:
+        """Hash of everything that determines what this stage produces."""
+        stage = self.stages[stage_id]
+        inputs = {}
+        for pattern in stage["inputs"]:
+            inputs.update(self.hasher.tree(pattern))
+        upstream = {}
+        for dep in stage["depends_on"]:
+            result = self.results[dep]
+            # Stages without outputs pass their key, so a re-run still propagates
+            upstream[dep] = result["outputs"] or result["key"]
+        return digest({
+            "script": self.hasher.file(Path(stage["script_path"])),
+            "args": stage["args"],
+            "env": stage["env"],
+            "inputs": inputs,
+            "upstream": upstream,
+        })
+
+    def current_outputs(self, stage_id: str) -> dict[str, str] | None:
+        """{file: sha256} of a stage's outputs, or None if one is missing."""
+        outputs = {}
+        for path in self.stages[stage_id]["outputs"].values():
+            files = self.hasher.tree(path)
+            if not files:
+                return None
+            outputs.update(files)
+        return outputs
+
+    def store_outputs(self, key: str, outputs: dict[str, str]):
+        """Copy outputs into the content-addressed cache and record them under `key`."""
+        for path, sha in outputs.items():
+            target = self.objects / sha
+            if not target.exists():
+                shutil.copyfile(path, target)
+        (self.manifests / f"{key}.json").write_text(json.dumps(outputs))
+
+    def restore_outputs(self, key: str) -> dict[str, str] | None:
+        """Put back the outputs recorded for `key`. None if they are not cached."""
+        manifest = self.manifests / f"{key}.json"
+        if not manifest.exists():
+            return None
+        outputs = json.loads(manifest.read_text())
+        if not all((self.objects / sha).exists() for sha in outputs.values()):
+            return None
+        for path, sha in outputs.items():
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(self.objects / sha, path)
+        return outputs
+
+    def check_cache(self, stage_id: str, key: str, restore: bool = True) -> tuple[str, dict] | None:
+        """("cached", outputs) or ("restored", outputs) if the stage can be skipped."""
+        stage = self.stages[stage_id]
+        if stage_id in self.force or "all" in self.force or stage.get("always"):
+            return None
+        previous = self.state["stages"].get(stage_id, {})
+        if previous.get("key") == key:
+            outputs = self.current_outputs(stage_id)
+            if outputs is not None and outputs == previous.get("outputs"):
+                return "cached", outputs
+        if stage.get("cache_outputs", True) and stage["outputs"]:
+            if restore:
+                outputs = self.restore_outputs(key)
+            else:
+                manifest = self.manifests / f"{key}.json"
+                outputs = json.loads(manifest.read_text()) if manifest.exists() else None
+            if outputs is not None:
+                return "restored", outputs
+        return None
+
+    def save_state(self):
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.state, indent=2))
+        tmp.replace(self.state_path)
+
+    # -------------------------------------------------------------------------
+    # Scheduling
+    # -------------------------------------------------------------------------
+
+    def command(self, stage_id: str) -> list[str]:
+        stage = self.stages[stage_id]
+        return [sys.executable, stage["script_path"], *stage["args"]]
+
+    def record(self, stage_id: str, status: str, key: str | None, outputs: dict,
+               duration_s: float = 0.0, returncode: int | None = None):
+        stage = self.stages[stage_id]
+        ran = status == "ran"
+        result = {"status": status, "key": key, "outputs": outputs,
+                  "duration_s": duration_s, "returncode": returncode}
+        self.results[stage_id] = result
+
+        if status in ("ran", "cached", "restored"):
+            previous = self.state["stages"].get(stage_id, {})
+            self.state["stages"][stage_id] = {
+                "key": key,
+                "outputs": outputs,
+                # Keep the last real run time, so skipped stages can show what they saved
+                "duration_s": duration_s if ran else previous.get("duration_s", 0.0),
+                "finished": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            self.save_state()
+
+        if status != "blocked":
+            log_cost(self.name, stage["cost"] if ran else {}, extra={
+                "pipeline": self.name,
+                "stage": stage_id,
+                "status": status,
+                "duration_s": round(duration_s, 3),
+                "run_id": self.run_id,
+            })
+
+    def finish_stage(self, stage_id: str, key: str, execution: dict):
+        stage = self.stages[stage_id]
+        if execution["returncode"] != 0:
+            self.record(stage_id, "failed", key, {}, execution["duration_s"], execution["returncode"])
+            return
+        outputs = self.current_outputs(stage_id)
+        if outputs is None:
+            missing = [p for p in stage["outputs"].values() if not self.hasher.tree(p)]
+            with open(self.logs / f"{stage_id}.log", "a") as log:
+                log.write(f"\nDeclared outputs missing: {', '.join(missing)}\n")
+            self.record(stage_id, "failed", key, {}, execution["duration_s"], execution["returncode"])
+            return
+        if stage.get("cache_outputs", True) and outputs:
+            self.store_outputs(key, outputs)
+        self.record(stage_id, "ran", key, outputs, execution["duration_s"], 0)
+
+    def run(self, on_event=None) -> dict[str, dict]:
+        """Run the pipeline. Returns {stage_id: result} in completion order."""
+        on_event = on_event or (lambda *a: None)
+        pending = list(self.spec["order"])
+        running = {}
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            while pending or running:
+                progressed = True
+                while progressed:
+                    progressed = False
+                    for stage_id in list(pending):
+                        deps = self.stages[stage_id]["depends_on"]
+                        if any(d not in self.results for d in deps):
+                            continue
+                        pending.remove(stage_id)
+                        progressed = True
+
+                        if any(self.results[d]["status"] in ("failed", "blocked") for d in deps):
+                            self.record(stage_id, "blocked", None, {})
+                            on_event(stage_id, self.results[stage_id])
+                            continue
+
+                        key = self.stage_key(stage_id)
+                        hit = self.check_cache(stage_id, key)
+                        if hit:
+                            status, outputs = hit
+                            self.record(stage_id, status, key, outputs)
+                            on_event(stage_id, self.results[stage_id])
+                            continue
+
+                        on_event(stage_id, {"status": "started"})
+                        # Lets a script's own Trace/log_cost entry name the stage it ran for
+                        env = {**self.stages[stage_id]["env"], "DOE_PIPELINE_STAGE": f"{self.name}:{stage_id}"}
+                        future = pool.submit(execute_stage, self.command(stage_id), env,
+                                             str(self.logs / f"{stage_id}.log"))
+                        running[future] = (stage_id, key)
+
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage_id, key = running.pop(future)
+                    self.finish_stage(stage_id, key, future.result())
+                    on_event(stage_id, self.results[stage_id])
+
+        return self.results
+
+    def plan(self) -> list[tuple[str, str]]:
+        """(stage_id, what would happen) without running or restoring anything."""
+        plan = []
+        will_run = set()
+        for stage_id in self.spec["order"]:
+            stage = self.stages[stage_id]
+            upstream = [d for d in stage["depends_on"] if d in will_run]
+            if upstream:
+                # The key depends on what those stages produce
+                plan.append((stage_id, f"run if the output of {', '.join(upstream)} changes"))
+                will_run.add(stage_id)
+                continue
+
+            key = self.stage_key(stage_id)
+            hit = self.check_cache(stage_id, key, restore=False)
+            if hit:
+                status, outputs = hit
+                self.results[stage_id] = {"status": status, "key": key, "outputs": outputs}
+                plan.append((stage_id, "skip (unchanged)" if status == "cached" else "restore from cache"))
+                continue
+
+            if stage_id in self.force or "all" in self.force:
+                reason = "forced"
+            elif stage.get("always"):
+                reason = "always"
+            elif stage_id not in self.state["stages"]:
+                reason = "first run"
+            else:
+                reason = "inputs changed"
+            plan.append((stage_id, f"run ({reason})"))
+            will_run.add(stage_id)
+        return plan
+
+
+def list_specs() -> list[dict]:
+    specs = []
+    for path in sorted(Path(PIPELINES_DIR).glob("*.json")):
+        try:
+            spec = load_spec(path)
+            specs.append({"name": spec["name"], "description": spec.get("description", ""),
+                          "stages": {s: spec["stages"][s]["depends_on"] for s in spec["order"]}})
+        except (SpecError, ValueError) as e:
+            specs.append({"name": path.stem, "error": str(e)})
+    return specs
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+STATUS_ICONS = {"ran": "✅", "cached": "⏭️ ", "restored": "♻️ ", "failed": "❌", "blocked": "⛔"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a pipeline of execution scripts with cached, parallel stages")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    run_parser = subparsers.add_parser("run", help="Run a pipeline")
+    run_parser.add_argument("pipeline", help=f"Spec name in {PIPELINES_DIR}/ or path to a .json spec")
+    run_parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE", help="Override a spec param")
+    run_parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                            help=f"Stages run at once (default: {DEFAULT_WORKERS})")
+    run_parser.add_argument("--force", action="append", default=[], metavar="STAGE",
+                            help="Run this stage even if cached ('all' for every stage)")
+    run_parser.add_argument("--plan", action="store_true", help="Show what would run, run nothing")
+
+    subparsers.add_parser("list", help="List pipeline specs")
+
+    clean_parser = subparsers.add_parser("clean", help="Delete a pipeline's state and output cache")
+    clean_parser.add_argument("pipeline", help="Spec name")
+
+    args = parser.parse_args()
+
+    print(f"[pipeline_runner] v{DOE_VERSION}")
+    print()
+
+    try:
+        if args.command == "list":
+            specs = list_specs()
+            if not specs:
+                print(f"No pipeline specs in {PIPELINES_DIR}/")
+            for spec in specs:
+                print(f"🔗 {spec['name']}")
+                if "error" in spec:
+                    print(f"   ❌ {spec['error']}")
+                    continue
+                if spec["description"]:
+                    print(f"   {spec['description']}")
+                for stage_id, deps in spec["stages"].items():
+                    print(f"   - {stage_id}" + (f" (after {', '.join(deps)})" if deps else ""))
+                print()
+
+        elif args.command == "clean":
+            target = Path(STATE_DIR) / args.pipeline
+            if target.exists():
+                shutil.rmtree(target)
+                print(f"🗑️ Removed {target}")
+            else:
+                print(f"Nothing cached for {args.pipeline}")
+
+        elif args.command == "run":
+            overrides = {}
+            for item in args.set:
+                key, sep, value = item.partition("=")
+                if not sep:
+                    parser.error(f"--set expects KEY=VALUE, got '{item}'")
+                overrides[key] = value
+
+            spec = load_spec(find_spec(args.pipeline), overrides)
+            for stage_id in args.force:
+                if stage_id != "all" and stage_id not in spec["stages"]:
+                    raise SpecError(f"--force: unknown stage '{stage_id}'")
+            runner = PipelineRunner(spec, args.workers, set(args.force))
+
+            if args.plan:
+                print(f"🔗 {spec['name']}: {len(spec['order'])} stages")
+                for stage_id, action in runner.plan():
+                    print(f"   {stage_id:<24} {action}")
+                return 0
+
+            print(f"🔗 {spec['name']}: {len(spec['order'])} stages, up to {args.workers} at once")
+            started = time.perf_counter()
+
+            def on_event(stage_id: str, result: dict):
+                if result["status"] == "started":
+                    print(f"   ▶️  {stage_id}", flush=True)
+                    return
+                icon = STATUS_ICONS[result["status"]]
+                timing = f" {result['duration_s']:.1f}s" if result["status"] in ("ran", "failed") else ""
+                print(f"   {icon} {stage_id}: {result['status']}{timing}", flush=True)
+
+            results = runner.run(on_event)
+            wall = time.perf_counter() - started
+
+            print()
+            print(f"   {'Stage':<24} {'Status':<9} {'Time':>8} {'Saved':>8}")
+            saved_total = 0.0
+            for stage_id in spec["order"]:
+                result = results[stage_id]
+                saved = 0.0
+                if result["status"] in ("cached", "restored"):
+                    saved = runner.state["stages"].get(stage_id, {}).get("duration_s", 0.0)
+                saved_total += saved
+                print(f"   {stage_id:<24} {result['status']:<9} {result['duration_s']:>7.1f}s "
+                      f"{saved:>7.1f}s")
+            busy = sum(r["duration_s"] for r in results.values())
+            print()
+            print(f"   Wall time {wall:.1f}s, stage time {busy:.1f}s, ~{saved_total:.1f}s skipped via cache")
+
+            failed = [s for s, r in results.items() if r["status"] == "failed"]
+            for stage_id in failed:
+                log_path = runner.logs / f"{stage_id}.log"
+                lines = log_path.read_text(errors="replace").splitlines()[-LOG_TAIL_LINES:]
+                print()
+                print(f"❌ {stage_id} (exit {results[stage_id]['returncode']}), last lines of {log_path}:")
+                for line in lines:
+                    print(f"   {line}")
+            if failed:
+                return 1
+            print(f"\n✅ Pipeline complete. Logs: {runner.logs}")
+
+        else:
+            parser.print_help()
+        return 0
+
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted")
+        return 130
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,597 @@
+#!/usr/bin/env python3
+"""
+Script: resend_batch.py
+Directive: directives/resend_batch.md
+DOE Framework: v2.0.0
+
+Purpose:
+    Send bursts of transactional emails (notifications, setup tests) through
+    Resend's HTTP batch endpoint instead of one SMTP transaction or API call
+    per message. Messages are grouped into batches of up to 100, several
+    batches are in flight at once on a pooled session, and requests are
+    paced to the account's rate limit.
+
+    Failures are handled per batch and per message: 429 pauses every worker
+    for Retry-After, network errors and 5xx retry the same batch under the
+    same Idempotency-Key (no duplicates), rejected messages in a batch go
+    back into the queue on their own, and a batch rejected as a whole is
+    split in half until the bad message is isolated.
+
+Cost:
+    Resend per-email pricing (plan dependent). Mock and benchmark are free.
+
+Usage:
+    # Send a test email
+    python execution/resend_batch.py send --to you@example.com --from hello@mail.callvaultai.com
+
+    # Notify everyone in a CSV (email column)
+    python execution/resend_batch.py send --csv .tmp/notify.csv --from hello@mail.callvaultai.com \\
+        --subject "Maintenance tonight" --html-file notice.html
+
+    # Single sends vs batches against the local mock Resend API
+    python execution/resend_batch.py benchmark --messages 2000
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import uuid
+import random
+import argparse
+import threading
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# =============================================================================
+# VERSION - Must match directive version
+# =============================================================================
+DOE_VERSION = "2026.10.19"
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+RESEND_API_URL = os.getenv("RESEND_API_URL", "https://api.resend.com")
+RESEND_API_KEY = os.getenv("RESEND_API_KEY")
+
+# Resend's maximum emails per batch call
+BATCH_SIZE = 100
+MAX_IN_FLIGHT = 2
+
+# Requests per second (Resend's default team limit is 2); 0 = no pacing
+RATE_LIMIT = float(os.getenv("RESEND_RATE_LIMIT", "2"))
+
+RETRIES = 3
+TIMEOUT = 30
+MAX_RETRY_AFTER = 60
+# A batch that gets this many 429s fails instead of waiting forever
+MAX_RATE_LIMITED = 20
+
+METRICS_LOG = ".tmp/resend_metrics.jsonl"
+MOCK_PORT = 9012
+
+
+# =============================================================================
+# SENDER
+# =============================================================================
+
+class ResendError(RuntimeError):
+    """Resend refused the request for every message (bad key, unverified domain)."""
+
+
+@dataclass
+class SendResult:
+    to: str
+    success: bool
+    attempts: int
+    id: str | None = None
+    error: str | None = None
+
+
+def email(sender: str, to: str | list[str], subject: str, text: str | None = None, html: str | None = None,
+          **fields) -> dict:
+    """One message in Resend's send format. Extra fields (reply_to, headers, tags) pass through."""
+    message = {"from": sender, "to": [to] if isinstance(to, str) else to, "subject": subject, **fields}
+    if text is not None:
+        message["text"] = text
+    if html is not None:
+        message["html"] = html
+    return message
+
+
+def retry_after(response: requests.Response, default: float = 1.0) -> float:
+    """Seconds to wait from Retry-After (seconds or HTTP date) or ratelimit-reset."""
+    value = response.headers.get("Retry-After") or response.headers.get("ratelimit-reset")
+    if not value:
+        return default
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return default
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+class ResendBatchSender:
+    """
+    Batches messages onto POST /emails/batch with up to `max_in_flight`
+    requests at once. One lock-protected clock paces requests to `rate`
+    per second and carries Retry-After pauses across all workers.
+    """
+
+    def __init__(self, api_key: str | None = RESEND_API_KEY, url: str = RESEND_API_URL,
+                 batch_size: int = BATCH_SIZE, max_in_flight: int = MAX_IN_FLIGHT, rate: float = RATE_LIMIT,
+                 retries: int = RETRIES, timeout: float = TIMEOUT):
+        self.url = url.rstrip("/")
+        self.batch_size = max(1, min(batch_size, BATCH_SIZE))
+        self.max_in_flight = max(1, max_in_flight)
+        self.rate = rate
+        self.retries = retries
+        self.timeout = timeout
+        self.session = requests.Session()
+        if api_key:
+            self.session.headers["Authorization"] = f"Bearer {api_key}"
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_in_flight)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self.stats = Counter()
+
+    def _wait_turn(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + (1 / self.rate if self.rate > 0 else 0)
+            self.stats["requests"] += 1
+        if slot > now:
+            time.sleep(slot - now)
+
+    def _pause(self, seconds: float):
+        """Hold every worker's next request for `seconds`."""
+        with self._lock:
+            self._next_slot = max(self._next_slot, time.monotonic() + seconds)
+
+    def _post(self, path: str, payload, headers: dict | None = None) -> requests.Response:
+        self._wait_turn()
+        return self.session.post(f"{self.url}{path}", json=payload, headers=headers, timeout=self.timeout)
+
+    def send(self, messages: list[dict]) -> list[SendResult]:
+        """Send every message; results are in input order."""
+        results: list[SendResult | None] = [None] * len(messages)
+        attempts = [0] * len(messages)
+        rate_limited = [0] * len(messages)
+        queue = deque(range(len(messages)))
+        # Whole batches to resend as they were (same Idempotency-Key), ahead of new ones
+        resend: deque[tuple[list[int], str]] = deque()
+        in_flight = {}
+        fatal = None
+
+        def recipient(i: int) -> str:
+            return ", ".join(messages[i]["to"]) if isinstance(messages[i]["to"], list) else messages[i]["to"]
+
+        def finish(i: int, error: str | None = None, message_id: str | None = None):
+            results[i] = SendResult(recipient(i), error is None, attempts[i], message_id, error)
+            self.stats["sent" if error is None else "failed"] += 1
+
+        def retry_or_fail(indices: list[int], error: str, key: str | None = None):
+            """Requeue what has attempts left: as the same batch with `key`, otherwise one by one."""
+            alive = [i for i in indices if attempts[i] <= self.retries]
+            for i in indices:
+                if attempts[i] > self.retries:
+                    finish(i, error)
+            if alive:
+                self.stats["retried"] += len(alive)
+                if key and len(alive) == len(indices):
+                    resend.append((alive, key))
+                else:
+                    queue.extendleft(reversed(alive))
+
+        with ThreadPoolExecutor(self.max_in_flight) as pool:
+            while queue or resend or in_flight:
+                while not fatal and len(in_flight) < self.max_in_flight and (queue or resend):
+                    if resend:
+                        indices, key = resend.popleft()
+                    else:
+                        indices = [queue.popleft() for _ in range(min(self.batch_size, len(queue)))]
+                        key = uuid.uuid4().hex
+                    for i in indices:
+                        attempts[i] += 1
+                    headers = {"Idempotency-Key": key, "x-batch-validation": "permissive"}
+                    future = pool.submit(self._post, "/emails/batch", [messages[i] for i in indices], headers)
+                    in_flight[future] = (indices, key)
+                if fatal:
+                    for i in list(queue) + [i for indices, _ in resend for i in indices]:
+                        finish(i, fatal)
+                    queue.clear()
+                    resend.clear()
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    indices, key = in_flight.pop(future)
+                    try:
+                        response = future.result()
+                    except requests.RequestException as e:
+                        # The batch may or may not have gone through: the same key makes the retry safe
+                        retry_or_fail(indices, f"network: {e}", key)
+                        continue
+
+                    status = response.status_code
+                    if status == 429:
+                        self.stats["rate_limited"] += 1
+                        self._pause(retry_after(response))
+                        for i in indices:
+                            attempts[i] -= 1
+                            rate_limited[i] += 1
+                        if max(rate_limited[i] for i in indices) >= MAX_RATE_LIMITED:
+                            for i in indices:
+                                finish(i, f"429 rate limited {MAX_RATE_LIMITED} times: {response.text[:200]}")
+                        else:
+                            resend.appendleft((indices, key))
+                    elif status >= 500:
+                        self._pause(min(2 ** (max(attempts[i] for i in indices) - 1), 10))
+                        retry_or_fail(indices, f"{status} {response.text[:200]}", key)
+                    elif status in (401, 403):
+                        fatal = f"{status} {response.text[:200]}"
+                        for i in indices:
+                            finish(i, fatal)
+                    elif status in (400, 422) and len(indices) > 1:
+                        # Rejected as a whole: halve until the offending message is on its own
+                        self.stats["split"] += 1
+                        for i in indices:
+                            attempts[i] -= 1
+                        middle = len(indices) // 2
+                        resend.appendleft((indices[middle:], uuid.uuid4().hex))
+                        resend.appendleft((indices[:middle], uuid.uuid4().hex))
+                    elif status >= 400:
+                        for i in indices:
+                            finish(i, f"{status} {response.text[:200]}")
+                    else:
+                        self._settle(response.json(), indices, finish)
+
+        if fatal and all(r is not None and not r.success for r in results):
+            raise ResendError(fatal)
+        return results
+
+    @staticmethod
+    def _settle(body: dict, indices: list[int], finish):
+        """
+        Permissive response: `data` holds ids of accepted messages in order,
+        `errors` the rejected positions. Rejections are validation errors
+        (bad address, missing field), so they fail without a retry.
+        """
+        errors = {e["index"]: e.get("message", "rejected") for e in body.get("errors") or []}
+        ids = iter(body.get("data") or [])
+        for position, i in enumerate(indices):
+            if position in errors:
+                finish(i, errors[position])
+            else:
+                finish(i, message_id=(next(ids, None) or {}).get("id"))
+
+    def send_single(self, messages: list[dict]) -> list[SendResult]:
+        """One POST /emails per message (for comparison; no batching or retries)."""
+        def one(message: dict) -> SendResult:
+            to = ", ".join(message["to"])
+            try:
+                response = self._post("/emails", message)
+            except requests.RequestException as e:
+                return SendResult(to, False, 1, error=str(e))
+            if response.status_code >= 400:
+                return SendResult(to, False, 1, error=f"{response.status_code} {response.text[:200]}")
+            return SendResult(to, True, 1, response.json().get("id"))
+
+        with ThreadPoolExecutor(self.max_in_flight) as pool:
+            return list(pool.map(one, messages))
+
+    def close(self):
+        self.session.close()
+
+
+# =============================================================================
+# MOCK RESEND API
+# =============================================================================
+
+class MockResend:
+    """
+    Local stand-in for POST /emails and /emails/batch. Validates like Resend
+    (from, to, subject, html or text; at most 100 per batch), honours
+    Idempotency-Key and x-batch-validation, and can rate-limit, add latency
+    and fail a share of requests with 500.
+    """
+
+    def __init__(self, port: int = MOCK_PORT, latency: float = 0.05, rate_limit: float = 0,
+                 error_rate: float = 0.0, seed: int = 3):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        self.delivered = Counter()
+        self.requests = Counter()
+        self.idempotent = {}
+        self.lock = threading.Lock()
+        self.recent = deque()
+        random_ = random.Random(seed)
+        mock = self
+
+        def invalid(message: dict) -> str | None:
+            to = message.get("to")
+            to = [to] if isinstance(to, str) else to or []
+            if not message.get("from"):
+                return "The `from` field is required."
+            if not to or any("@" not in t or t.endswith(".invalid") for t in to):
+                return f"Invalid `to` field: {to}"
+            if not message.get("subject"):
+                return "The `subject` field is required."
+            if not (message.get("html") or message.get("text")):
+                return "Either `html` or `text` is required."
+            return None
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"null")
+                path = self.path.split("?")[0]
+                with mock.lock:
+                    mock.requests[path] += 1
+                    now = time.monotonic()
+                    while mock.recent and mock.recent[0] <= now - 1:
+                        mock.recent.popleft()
+                    limited = rate_limit and len(mock.recent) >= rate_limit
+                    if not limited:
+                        mock.recent.append(now)
+                    failed = random_.random() < error_rate
+                    key = self.headers.get("Idempotency-Key")
+                    replay = mock.idempotent.get((path, key)) if key else None
+                if limited:
+                    mock.requests["429"] += 1
+                    return self._send({"name": "rate_limit_exceeded", "message": "Too many requests"}, 429,
+                                      {"Retry-After": "1"})
+                time.sleep(latency)
+                if replay:
+                    return self._send(*replay)
+                if failed:
+                    return self._send({"name": "internal_server_error", "message": "Unexpected error"}, 500)
+
+                if path == "/emails":
+                    error = invalid(body or {})
+                    reply = ({"name": "validation_error", "message": error}, 422) if error else \
+                        ({"id": mock.deliver(body)}, 200)
+                elif path == "/emails/batch":
+                    reply = mock.batch(body, self.headers.get("x-batch-validation", "strict"), invalid)
+                else:
+                    reply = ({"name": "not_found", "message": "Not found"}, 404)
+                if key:
+                    with mock.lock:
+                        mock.idempotent[(path, key)] = reply
+                self._send(*reply)
+
+            def _send(self, payload: dict, status: int = 200, headers: dict | None = None):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.url = f"http://127.0.0.1:{port}"
+        self.thread = None
+
+    def deliver(self, message: dict) -> str:
+        with self.lock:
+            for to in ([message["to"]] if isinstance(message["to"], str) else message["to"]):
+                self.delivered[to] += 1
+        return str(uuid.uuid4())
+
+    def batch(self, messages, mode: str, invalid) -> tuple[dict, int]:
+        if not isinstance(messages, list) or not 1 <= len(messages) <= BATCH_SIZE:
+            return {"name": "validation_error", "message": f"Batch must hold 1-{BATCH_SIZE} emails"}, 422
+        errors = [{"index": i, "message": e} for i, e in enumerate(invalid(m) for m in messages) if e]
+        if errors and mode != "permissive":
+            return {"name": "validation_error", "message": errors[0]["message"]}, 422
+        failed = {e["index"] for e in errors}
+        data = [{"id": self.deliver(m)} for i, m in enumerate(messages) if i not in failed]
+        return ({"data": data, "errors": errors} if mode == "permissive" else {"data": data}), 200
+
+    def start(self) -> "MockResend":
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+def synthetic_messages(count: int, invalid_every: int = 0) -> list[dict]:
+    return [email("notify@mail.example.com",
+                  f"user{i}@example.invalid" if invalid_every and i % invalid_every == invalid_every - 1
+                  else f"user{i}@example.com",
+                  f"Notification {i}", text=f"Hello user {i},\nYour report is ready.\n")
+            for i in range(count)]
+
+
+def run_benchmark(count: int, latency: float, max_in_flight: int) -> list[dict]:
+    """
+    Single sends vs batches on an unthrottled mock, then batches against a
+    mock with Resend's 2 req/s limit, 2% server errors and 1% invalid
+    addresses, checking every valid message arrives exactly once.
+    """
+    rows = []
+    for label, mode, mock_kwargs, invalid_every in (
+        ("POST /emails, one per message", "single", {}, 0),
+        (f"POST /emails/batch, {BATCH_SIZE} per call", "batch", {}, 0),
+        ("batch, 2 req/s limit, 2% 500s, 1% invalid", "batch", {"rate_limit": 2, "error_rate": 0.02}, 100),
+    ):
+        messages = synthetic_messages(count, invalid_every)
+        mock = MockResend(latency=latency, **mock_kwargs).start()
+        sender = ResendBatchSender("re_mock", url=mock.url, max_in_flight=max_in_flight, rate=0)
+        start = time.perf_counter()
+        results = sender.send_single(messages) if mode == "single" else sender.send(messages)
+        elapsed = time.perf_counter() - start
+        sender.close()
+        mock.stop()
+
+        expected = {m["to"][0] for m in messages if not m["to"][0].endswith(".invalid")}
+        duplicates = sum(n - 1 for n in mock.delivered.values() if n > 1)
+        rows.append({
+            "mode": label, "seconds": elapsed, "requests": sender.stats["requests"],
+            "sent": sum(r.success for r in results), "failed": sum(not r.success for r in results),
+            "rate_limited": mock.requests["429"], "duplicates": duplicates,
+            "correct": set(mock.delivered) == expected and duplicates == 0,
+        })
+    return rows
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def load_recipients(path: str) -> list[str]:
+    with open(path, newline="", encoding="utf-8") as f:
+        return [row["email"].strip() for row in csv.DictReader(f) if row.get("email", "").strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch sender for the Resend HTTP API")
+    parser.add_argument("--url", default=RESEND_API_URL, help=f"API base URL (default: {RESEND_API_URL})")
+    parser.add_argument("--max-in-flight", type=int, default=MAX_IN_FLIGHT,
+                        help=f"Batch requests at once (default: {MAX_IN_FLIGHT})")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    send_parser = subparsers.add_parser("send", help="Send one message per recipient")
+    send_parser.add_argument("--to", action="append", default=[], help="Recipient (repeatable)")
+    send_parser.add_argument("--csv", help="CSV with an email column")
+    send_parser.add_argument("--from", dest="sender", required=True, help="From address (verified domain)")
+    send_parser.add_argument("--subject", default="Test email from DOE setup", help="Subject line")
+    send_parser.add_argument("--text", default="This is a test email sent through the Resend API.",
+                             help="Plain-text body")
+    send_parser.add_argument("--html-file", help="HTML body file (sent alongside --text)")
+    send_parser.add_argument("--rate", type=float, default=RATE_LIMIT,
+                             help=f"Requests per second (default: {RATE_LIMIT:g}, RESEND_RATE_LIMIT)")
+    send_parser.add_argument("--retries", type=int, default=RETRIES, help=f"Retries per message (default: {RETRIES})")
+
+    mock_parser = subparsers.add_parser("mock", help="Serve a local mock Resend API")
+    mock_parser.add_argument("--port", type=int, default=MOCK_PORT, help=f"Port (default: {MOCK_PORT})")
+    mock_parser.add_argument("--latency", type=float, default=0.05, help="Seconds per request (default: 0.05)")
+    mock_parser.add_argument("--rate-limit", type=float, default=2, help="Requests per second before 429 (default: 2)")
+    mock_parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered 500")
+
+    bench_parser = subparsers.add_parser("benchmark", help="Single sends vs batches against the mock")
+    bench_parser.add_argument("--messages", type=int, default=2000, help="Messages per run (default: 2000)")
+    bench_parser.add_argument("--latency", type=float, default=0.05, help="Mock seconds per request (default: 0.05)")
+
+    args = parser.parse_args()
+
+    if not args.command:
+        parser.print_help()
+        return 0
+
+    print(f"[resend_batch] v{DOE_VERSION}")
+    print()
+
+    try:
+        if args.command == "mock":
+            mock = MockResend(args.port, args.latency, args.rate_limit, args.error_rate)
+            print(f"🧪 Mock Resend API on {mock.url} ({args.latency * 1000:.0f} ms per request, "
+                  f"{args.rate_limit:g} req/s; Ctrl+C to stop)")
+            try:
+                mock.server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                mock.server.server_close()
+                print(f"\n  Requests: {dict(mock.requests)}  Delivered: {sum(mock.delivered.values()):,}")
+            return 0
+
+        if args.command == "benchmark":
+            print(f"⏱️  {args.messages:,} messages, {args.latency * 1000:.0f} ms per request, "
+                  f"{args.max_in_flight} in flight...")
+            rows = run_benchmark(args.messages, args.latency, args.max_in_flight)
+            for r in rows:
+                print(f"  {r['mode']:<44} {r['seconds']:6.2f}s  {r['requests']:>5,} requests  "
+                      f"sent {r['sent']:,}  failed {r['failed']:,}  429s {r['rate_limited']}  "
+                      f"{'✅' if r['correct'] else '❌ delivered set differs'}")
+            print()
+            print(f"  Requests per message: {rows[0]['requests'] / args.messages:.2f} single, "
+                  f"{rows[1]['requests'] / args.messages:.2f} batched "
+                  f"({rows[0]['seconds'] / rows[1]['seconds']:.0f}x faster)")
+            return 0 if all(r["correct"] for r in rows) else 1
+
+        recipients = args.to + (load_recipients(args.csv) if args.csv else [])
+        if not recipients:
+            parser.error("send needs --to or --csv")
+        if not RESEND_API_KEY and args.url == RESEND_API_URL:
+            print("ERROR: RESEND_API_KEY not set in .env")
+            return 1
+
+        html = Path(args.html_file).read_text(encoding="utf-8") if args.html_file else None
+        messages = [email(args.sender, to, args.subject, text=args.text, html=html) for to in recipients]
+        sender = ResendBatchSender(RESEND_API_KEY, args.url, max_in_flight=args.max_in_flight, rate=args.rate,
+                                   retries=args.retries)
+        print(f"📤 Sending {len(messages):,} messages in batches of {sender.batch_size}...")
+        start = time.perf_counter()
+        results = sender.send(messages)
+        elapsed = time.perf_counter() - start
+        sender.close()
+
+        failed = [r for r in results if not r.success]
+        if len(results) <= 20:
+            for r in results:
+                print(f"  ✅ {r.to} ({r.id})" if r.success else f"  ❌ {r.to}: {r.error}")
+        else:
+            for r in failed[:20]:
+                print(f"  ❌ {r.to}: {r.error}")
+
+        summary = {"sent": len(results) - len(failed), "failed": len(failed), "requests": sender.stats["requests"],
+                   "rate_limited": sender.stats["rate_limited"], "retried": sender.stats["retried"],
+                   "elapsed_sec": round(elapsed, 3)}
+        Path(METRICS_LOG).parent.mkdir(parents=True, exist_ok=True)
+        with open(METRICS_LOG, "a") as f:
+            f.write(json.dumps({"timestamp": datetime.now().isoformat(), **summary}) + "\n")
+
+        print()
+        print(f"  {summary['sent']:,} sent in {elapsed:.1f}s with {summary['requests']:,} requests "
+              f"({summary['rate_limited']} rate-limited, {summary['retried']} retried)")
+        print("✅ Done!" if not failed else f"⚠️ {len(failed)} message(s) failed")
+        return 0 if not failed else 1
+
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted")
+        return 130
+
+    except (ResendError, requests.RequestException) as e:
+        print(f"❌ Resend error: {e}")
+        return 1
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,594 @@
+#!/usr/bin/env python3
+"""
+Script: segment_engine.py
+Directive: directives/segment_engine.md
+DOE Framework: v2.0.0
+
+Purpose:
+    Build segments like "dormant AND opened:90d AND NOT bounced" from the
+    local Listmonk mirror in milliseconds, and push them into a Listmonk
+    list.
+
+    Every list, subscriber status, bounce type, engagement bucket and
+    attribute value gets a bitmap with one bit per subscriber id (Listmonk
+    ids are a dense serial, so bit position = id). Bitmaps are packed NumPy
+    uint8 arrays: 125 KB per key for 1M subscribers, stored compressed in
+    .tmp/segments/. A segment expression is a few whole-array AND/OR/NOT
+    operations over the bitmaps it names; only those are decompressed.
+
+Cost:
+    Free (local); exporting to a list is a few Listmonk API calls
+
+Usage:
+    # Build the index from the mirror (also done automatically when stale)
+    python execution/segment_engine.py build
+
+    # Size of a segment
+    python execution/segment_engine.py count "dormant AND opened:90d AND NOT bounced"
+
+    # The "All Contacts" segment from SPEC.md, into a Listmonk list
+    python execution/segment_engine.py export "warm OR dormant" --to-list "All Contacts"
+
+    # What can be used in expressions
+    python execution/segment_engine.py keys
+
+    # Bitmaps vs SQL on a synthetic 1M-subscriber mirror
+    python execution/segment_engine.py benchmark --subscribers 1000000
+"""
+
+import re
+import sys
+import csv
+import json
+import time
+import argparse
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+from listmonk_mirror import MIRROR_DB, connect
+
+# =============================================================================
+# VERSION - Must match directive version
+# =============================================================================
+DOE_VERSION = "2026.10.19"
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+INDEX_DIR = ".tmp/segments"
+
+# Engagement buckets: opened:<n>d / clicked:<n>d
+ENGAGEMENT_DAYS = (1, 7, 30, 90, 365)
+
+# Buckets are relative to build time, so rebuild an index older than this
+MAX_INDEX_AGE = timedelta(hours=6)
+
+# Attributes with more distinct values than this (ids, free text, scores)
+# are not indexed; filter them in the mirror with SQL instead
+MAX_ATTRIBUTE_VALUES = 100
+
+# Subscribers added to a Listmonk list per API call
+EXPORT_CHUNK = 5000
+
+OPERATORS = {"AND", "OR", "NOT"}
+
+
+# =============================================================================
+# BITMAPS
+# =============================================================================
+
+class SegmentError(ValueError):
+    """Bad segment expression or unknown key."""
+
+
+def to_bitmap(ids, size: int) -> np.ndarray:
+    """Packed bitmap with the bits for `ids` set."""
+    bits = np.zeros(size, dtype=bool)
+    bits[np.asarray(ids, dtype=np.int64)] = True
+    return np.packbits(bits)
+
+
+# Set bits per byte value, for numpy < 2.0 (no np.bitwise_count)
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+
+def count(bitmap: np.ndarray) -> int:
+    if hasattr(np, "bitwise_count"):
+        return int(np.bitwise_count(bitmap).sum())
+    return int(_POPCOUNT[bitmap].sum(dtype=np.int64))
+
+
+def bitmap_ids(bitmap: np.ndarray) -> np.ndarray:
+    return np.flatnonzero(np.unpackbits(bitmap))
+
+
+def normalise_key(key: str) -> str:
+    return key.strip().lower()
+
+
+def fetch_ids(conn, sql: str, params=()) -> np.ndarray:
+    return np.fromiter((r[0] for r in conn.execute(sql, params)), dtype=np.int64)
+
+
+# =============================================================================
+# INDEX
+# =============================================================================
+
+class SegmentIndex:
+    """Named bitmaps over subscriber ids, loaded lazily from an .npz file."""
+
+    def __init__(self, bitmaps, meta: dict):
+        self.bitmaps = bitmaps
+        self.meta = meta
+
+    @classmethod
+    def build(cls, conn, now: datetime | None = None) -> "SegmentIndex":
+        now = now or datetime.now(timezone.utc)
+        max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM subscribers").fetchone()[0]
+        size = max_id + 1
+        bitmaps = {"all": to_bitmap(fetch_ids(conn, "SELECT id FROM subscribers"), size)}
+        aliases = {}
+
+        # Lists: members (not unsubscribed), by id and by name
+        for list_id, name in conn.execute("SELECT id, name FROM lists"):
+            members = fetch_ids(conn, "SELECT subscriber_id FROM subscriber_lists "
+                                      "WHERE list_id = ? AND status != 'unsubscribed'", (list_id,))
+            unsubscribed = fetch_ids(conn, "SELECT subscriber_id FROM subscriber_lists "
+                                           "WHERE list_id = ? AND status = 'unsubscribed'", (list_id,))
+            bitmaps[f"list:{list_id}"] = to_bitmap(members, size)
+            bitmaps[f"unsubscribed:{list_id}"] = to_bitmap(unsubscribed, size)
+            if name:
+                aliases[normalise_key(name)] = f"list:{list_id}"
+                aliases[f"list:{normalise_key(name)}"] = f"list:{list_id}"
+                aliases[f"unsubscribed:{normalise_key(name)}"] = f"unsubscribed:{list_id}"
+
+        for (status,) in conn.execute("SELECT DISTINCT status FROM subscribers WHERE status IS NOT NULL"):
+            bitmaps[f"status:{normalise_key(status)}"] = to_bitmap(
+                fetch_ids(conn, "SELECT id FROM subscribers WHERE status = ?", (status,)), size)
+
+        bitmaps["bounced"] = to_bitmap(fetch_ids(
+            conn, "SELECT DISTINCT subscriber_id FROM bounces WHERE subscriber_id <= ?", (max_id,)), size)
+        for (kind,) in conn.execute("SELECT DISTINCT type FROM bounces WHERE type IS NOT NULL"):
+            bitmaps[f"bounced:{normalise_key(kind)}"] = to_bitmap(fetch_ids(
+                conn, "SELECT DISTINCT subscriber_id FROM bounces WHERE type = ? AND subscriber_id <= ?",
+                (kind, max_id)), size)
+
+        # last_open/last_click are lower bounds (see listmonk_mirror.md)
+        for key, column in (("opened", "last_open"), ("clicked", "last_click")):
+            for days in ENGAGEMENT_DAYS:
+                since = (now - timedelta(days=days)).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+                bitmaps[f"{key}:{days}d"] = to_bitmap(fetch_ids(
+                    conn, f"SELECT subscriber_id FROM subscriber_activity WHERE {column} >= ? "
+                          f"AND subscriber_id <= ?", (since, max_id)), size)
+
+        # Scalar attributes with few distinct values: attr:<name>=<value>
+        values = {}
+        rows = conn.execute(
+            "SELECT j.key, CASE j.type WHEN 'true' THEN 'true' WHEN 'false' THEN 'false' ELSE j.value END, s.id "
+            "FROM subscribers s, json_each(s.attribs) j "
+            "WHERE j.type IN ('text', 'integer', 'true', 'false')")
+        for name, value, subscriber_id in rows:
+            per_value = values.setdefault(name, {})
+            if per_value is None:
+                continue
+            per_value.setdefault(normalise_key(str(value)), []).append(subscriber_id)
+            if len(per_value) > MAX_ATTRIBUTE_VALUES:
+                values[name] = None
+        for name, per_value in values.items():
+            for value, ids in (per_value or {}).items():
+                bitmaps[f"attr:{normalise_key(name)}={value}"] = to_bitmap(ids, size)
+
+        meta = {"built_at": now.isoformat(), "size": size, "subscribers": count(bitmaps["all"]),
+                "aliases": aliases, "skipped_attributes": sorted(n for n, v in values.items() if v is None)}
+        return cls(bitmaps, meta)
+
+    def save(self, directory: str = INDEX_DIR, source: str | None = None):
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        # Keys become archive member names; keep them in the metadata instead
+        keys = sorted(self.bitmaps)
+        np.savez_compressed(path / "bitmaps.npz", **{f"b{i}": self.bitmaps[k] for i, k in enumerate(keys)})
+        (path / "index.json").write_text(json.dumps({**self.meta, "keys": keys, "source": source}, indent=2))
+
+    @classmethod
+    def load(cls, directory: str = INDEX_DIR) -> "SegmentIndex":
+        path = Path(directory)
+        meta = json.loads((path / "index.json").read_text())
+        archive = np.load(path / "bitmaps.npz")
+        return cls(_LazyBitmaps(archive, meta["keys"]), meta)
+
+    def keys(self) -> list[str]:
+        return sorted(self.bitmaps)
+
+    def bitmap(self, key: str) -> np.ndarray:
+        key = normalise_key(key)
+        if key not in self.bitmaps:
+            key = self.meta["aliases"].get(key, key)
+        if key not in self.bitmaps:
+            close = [k for k in self.keys() if key.split(":")[0] in k][:5]
+            hint = f" (did you mean: {', '.join(close)})" if close else " (see: segment_engine.py keys)"
+            raise SegmentError(f"unknown key '{key}'{hint}")
+        return self.bitmaps[key]
+
+    def evaluate(self, expression: str) -> np.ndarray:
+        return _Parser(expression, self).parse()
+
+
+class _LazyBitmaps:
+    """Key → bitmap, decompressing each member of the archive on first use."""
+
+    def __init__(self, archive, keys: list[str]):
+        self.archive = archive
+        self.members = {k: f"b{i}" for i, k in enumerate(keys)}
+        self.cache = {}
+
+    def __contains__(self, key):
+        return key in self.members
+
+    def __iter__(self):
+        return iter(self.members)
+
+    def __getitem__(self, key):
+        if key not in self.cache:
+            self.cache[key] = self.archive[self.members[key]]
+        return self.cache[key]
+
+
+# =============================================================================
+# EXPRESSIONS
+# =============================================================================
+
+_TOKEN_RE = re.compile(r'\s*(?:(\()|(\))|"([^"]*)"|([^\s()"]+))')
+
+
+class _Parser:
+    """
+    Recursive descent over:  expr := term (OR term)* ; term := factor (AND factor)* ;
+    factor := NOT factor | ( expr ) | key.  Keys may be quoted ("list:All Contacts").
+    """
+
+    def __init__(self, expression: str, index: SegmentIndex):
+        self.index = index
+        self.tokens = []
+        pos = 0
+        expression = expression.strip()
+        while pos < len(expression):
+            match = _TOKEN_RE.match(expression, pos)
+            if not match:
+                raise SegmentError(f"cannot parse near: {expression[pos:pos + 20]!r}")
+            lparen, rparen, quoted, word = match.groups()
+            if lparen or rparen:
+                self.tokens.append(("op", lparen or rparen))
+            elif quoted is not None:
+                self.tokens.append(("key", quoted))
+            elif word.upper() in OPERATORS:
+                self.tokens.append(("op", word.upper()))
+            else:
+                self.tokens.append(("key", word))
+            pos = match.end()
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, value=None):
+        token = self.peek()
+        if token[0] is None or (value is not None and token != ("op", value)):
+            raise SegmentError(f"expected {value or 'a key'}, got {token[1] or 'end of expression'}")
+        self.pos += 1
+        return token
+
+    def parse(self) -> np.ndarray:
+        if not self.tokens:
+            raise SegmentError("empty expression")
+        result = self.expr()
+        if self.pos != len(self.tokens):
+            raise SegmentError(f"unexpected '{self.peek()[1]}'")
+        return result & self.index.bitmap("all")
+
+    def expr(self) -> np.ndarray:
+        result = self.term()
+        while self.peek() == ("op", "OR"):
+            self.take("OR")
+            result = result | self.term()
+        return result
+
+    def term(self) -> np.ndarray:
+        result = self.factor()
+        while self.peek() == ("op", "AND"):
+            self.take("AND")
+            result = result & self.factor()
+        return result
+
+    def factor(self) -> np.ndarray:
+        if self.peek() == ("op", "NOT"):
+            self.take("NOT")
+            return ~self.factor()
+        if self.peek() == ("op", "("):
+            self.take("(")
+            result = self.expr()
+            self.take(")")
+            return result
+        kind, value = self.take()
+        if kind != "key":
+            raise SegmentError(f"unexpected '{value}'")
+        return self.index.bitmap(value)
+
+
+# =============================================================================
+# INDEX LIFECYCLE
+# =============================================================================
+
+def mirror_stamp(mirror_path: str) -> str | None:
+    conn = connect(mirror_path)
+    row = conn.execute("SELECT value FROM sync_state WHERE key = 'last_sync'").fetchone()
+    conn.close()
+    return row[0] if row else None
+
+
+def build_index(mirror_path: str = MIRROR_DB, index_dir: str = INDEX_DIR) -> SegmentIndex:
+    conn = connect(mirror_path)
+    index = SegmentIndex.build(conn)
+    conn.close()
+    index.save(index_dir, source=mirror_stamp(mirror_path))
+    return index
+
+
+def open_index(mirror_path: str = MIRROR_DB, index_dir: str = INDEX_DIR) -> SegmentIndex:
+    """The saved index, rebuilt first if the mirror has synced since or it is too old."""
+    meta_path = Path(index_dir) / "index.json"
+    if meta_path.exists():
+        meta = json.loads(meta_path.read_text())
+        age = datetime.now(timezone.utc) - datetime.fromisoformat(meta["built_at"])
+        if meta.get("source") == mirror_stamp(mirror_path) and age < MAX_INDEX_AGE:
+            return SegmentIndex.load(index_dir)
+    build_index(mirror_path, index_dir)
+    return SegmentIndex.load(index_dir)
+
+
+# =============================================================================
+# EXPORT
+# =============================================================================
+
+def export_csv(bitmap: np.ndarray, out_path: str, mirror_path: str = MIRROR_DB) -> int:
+    """Write the segment as a Listmonk import CSV (email,name,attributes)."""
+    bits = np.unpackbits(bitmap)
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = connect(mirror_path)
+    written = 0
+    with open(out_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["email", "name", "attributes"])
+        for subscriber_id, email, name, attribs in conn.execute(
+                "SELECT id, email, name, attribs FROM subscribers ORDER BY id"):
+            if subscriber_id < len(bits) and bits[subscriber_id]:
+                writer.writerow([email, name or "", attribs or "{}"])
+                written += 1
+    conn.close()
+    return written
+
+
+def export_to_list(bitmap: np.ndarray, index: SegmentIndex, list_name: str, replace: bool = False) -> dict:
+    """
+    Add the segment's subscribers to a Listmonk list (created if missing).
+    Subscribers who unsubscribed from that list or are blocklisted are never
+    added: the add is sent as `confirmed` and would re-subscribe them. With
+    `replace`, members the mirror knows of that are not in the segment are
+    removed. Returns counts.
+    """
+    from listmonk_client import ListmonkClient
+
+    client = ListmonkClient.from_env()
+    existing = next((lst for lst in client.lists() if lst["name"] == list_name), None)
+    if existing:
+        list_id = existing["id"]
+    else:
+        list_id = client.call("POST", "/api/lists", json={
+            "name": list_name, "type": "private", "optin": "single", "tags": ["segment"]})["id"]
+
+    current = index.bitmaps[f"list:{list_id}"] if f"list:{list_id}" in index.bitmaps else np.zeros_like(bitmap)
+    eligible = bitmap & ~current
+    opted_out = np.zeros_like(bitmap)
+    for key in (f"unsubscribed:{list_id}", "status:blocklisted"):
+        if key in index.bitmaps:
+            opted_out |= bitmap & index.bitmaps[key]
+    to_add = bitmap_ids(eligible & ~opted_out)
+    to_remove = bitmap_ids(current & ~bitmap) if replace else np.array([], dtype=np.int64)
+
+    for action, ids in (("add", to_add), ("remove", to_remove)):
+        for start in range(0, len(ids), EXPORT_CHUNK):
+            payload = {"ids": ids[start:start + EXPORT_CHUNK].tolist(), "action": action,
+                       "target_list_ids": [list_id]}
+            if action == "add":
+                payload["status"] = "confirmed"
+            client.call("PUT", "/api/subscribers/lists", json=payload)
+    return {"list_id": list_id, "created": existing is None, "added": len(to_add), "removed": len(to_remove),
+            "skipped": count(opted_out & ~current)}
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+BENCHMARK_EXPRESSION = "dormant AND opened:90d AND NOT bounced AND NOT status:blocklisted"
+BENCHMARK_SQL = """
+SELECT COUNT(*) FROM subscribers s
+JOIN subscriber_lists sl ON sl.subscriber_id = s.id AND sl.list_id = 2 AND sl.status != 'unsubscribed'
+JOIN subscriber_activity a ON a.subscriber_id = s.id AND a.last_open >= ?
+WHERE s.status != 'blocklisted'
+AND NOT EXISTS (SELECT 1 FROM bounces b WHERE b.subscriber_id = s.id)
+"""
+
+
+def synthetic_mirror(path: str, subscribers: int, seed: int = 7):
+    """A mirror database with random subscribers, memberships, opens and bounces."""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, subscribers + 1)
+    now = datetime.now(timezone.utc)
+    conn = connect(path, readonly=False)
+    conn.execute("BEGIN")
+    conn.executemany("INSERT INTO lists (id, name) VALUES (?, ?)", [(1, "Warm"), (2, "Dormant")])
+    status = np.where(rng.random(subscribers) < 0.01, "blocklisted", "enabled")
+    city = rng.choice(["berlin", "lisbon", "austin", "leeds"], subscribers)
+    conn.executemany(
+        "INSERT INTO subscribers (id, email, name, status, attribs) VALUES (?, ?, ?, ?, ?)",
+        ((int(i), f"user{i}@example.com", f"User {i}", str(s), f'{{"city": "{c}"}}')
+         for i, s, c in zip(ids, status, city)))
+    list_ids = np.where(rng.random(subscribers) < 0.2, 1, 2)
+    list_status = np.where(rng.random(subscribers) < 0.03, "unsubscribed", "confirmed")
+    conn.executemany("INSERT INTO subscriber_lists VALUES (?, ?, ?)",
+                     ((int(i), int(l), str(s)) for i, l, s in zip(ids, list_ids, list_status)))
+    opened = ids[rng.random(subscribers) < 0.35]
+    ages = rng.integers(0, 400, len(opened))
+    conn.executemany("INSERT INTO subscriber_activity (subscriber_id, last_open) VALUES (?, ?)",
+                     ((int(i), (now - timedelta(days=int(a))).strftime("%Y-%m-%dT%H:%M:%S.%fZ"))
+                      for i, a in zip(opened, ages)))
+    bounced = ids[rng.random(subscribers) < 0.02]
+    conn.executemany("INSERT INTO bounces (id, subscriber_id, type) VALUES (?, ?, ?)",
+                     ((n, int(i), "hard") for n, i in enumerate(bounced, 1)))
+    conn.execute("COMMIT")
+    conn.close()
+
+
+def run_benchmark(subscribers: int, runs: int = 20) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        mirror_path = str(Path(tmp) / "mirror.db")
+        start = time.perf_counter()
+        synthetic_mirror(mirror_path, subscribers)
+        generate = time.perf_counter() - start
+
+        start = time.perf_counter()
+        build_index(mirror_path, tmp)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = SegmentIndex.load(tmp)
+        result = index.evaluate(BENCHMARK_EXPRESSION)
+        first = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(runs):
+            result = index.evaluate(BENCHMARK_EXPRESSION)
+            bitmap_count = count(result)
+        evaluate = (time.perf_counter() - start) / runs
+
+        since = (datetime.now(timezone.utc) - timedelta(days=90)).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+        conn = connect(mirror_path)
+        start = time.perf_counter()
+        sql_count = conn.execute(BENCHMARK_SQL, (since,)).fetchone()[0]
+        sql = time.perf_counter() - start
+        conn.close()
+        index_bytes = (Path(tmp) / "bitmaps.npz").stat().st_size
+    return {"generate_s": generate, "build_s": build, "first_ms": first * 1000, "evaluate_ms": evaluate * 1000,
+            "sql_ms": sql * 1000, "count": bitmap_count, "sql_count": sql_count, "index_mb": index_bytes / 1e6}
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Bitmap segmentation over the Listmonk mirror")
+    parser.add_argument("--mirror", default=MIRROR_DB, help=f"Mirror database (default: {MIRROR_DB})")
+    parser.add_argument("--index-dir", default=INDEX_DIR, help=f"Index directory (default: {INDEX_DIR})")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    subparsers.add_parser("build", help="Rebuild the bitmap index from the mirror")
+    subparsers.add_parser("keys", help="Keys usable in expressions, with counts")
+
+    count_parser = subparsers.add_parser("count", help="Number of subscribers in a segment")
+    count_parser.add_argument("expression", help='e.g. "dormant AND opened:90d AND NOT bounced"')
+
+    export_parser = subparsers.add_parser("export", help="Export a segment to a Listmonk list or a CSV")
+    export_parser.add_argument("expression", help="Segment expression")
+    target = export_parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--to-list", help="Listmonk list name (created if missing)")
+    target.add_argument("--csv", help="Output CSV (email,name,attributes)")
+    export_parser.add_argument("--replace", action="store_true",
+                               help="With --to-list: also remove list members not in the segment")
+
+    bench_parser = subparsers.add_parser("benchmark", help="Bitmaps vs SQL on a synthetic mirror")
+    bench_parser.add_argument("--subscribers", type=int, default=1_000_000, help="Synthetic subscribers (default: 1000000)")
+
+    args = parser.parse_args()
+
+    if not args.command:
+        parser.print_help()
+        return 0
+
+    print(f"[segment_engine] v{DOE_VERSION}")
+    print()
+
+    try:
+        if args.command == "benchmark":
+            print(f"⏱️  Synthetic mirror with {args.subscribers:,} subscribers...")
+            r = run_benchmark(args.subscribers)
+            print(f"  Generated in {r['generate_s']:.1f}s, index built in {r['build_s']:.1f}s ({r['index_mb']:.1f} MB)")
+            print(f"  \"{BENCHMARK_EXPRESSION}\"")
+            print(f"  Bitmaps: {r['evaluate_ms']:.2f} ms ({r['first_ms']:.1f} ms incl. loading)  → {r['count']:,}")
+            print(f"  SQL on the mirror: {r['sql_ms']:.0f} ms  → {r['sql_count']:,}")
+            return 0
+
+        if args.command == "build":
+            start = time.perf_counter()
+            index = build_index(args.mirror, args.index_dir)
+            print(f"✅ Indexed {index.meta['subscribers']:,} subscribers, {len(index.keys())} keys "
+                  f"in {time.perf_counter() - start:.1f}s")
+            if index.meta["skipped_attributes"]:
+                print(f"   Not indexed (over {MAX_ATTRIBUTE_VALUES} values): {', '.join(index.meta['skipped_attributes'])}")
+            return 0
+
+        index = open_index(args.mirror, args.index_dir)
+
+        if args.command == "keys":
+            names = {v: k for k, v in index.meta["aliases"].items() if ":" not in k}
+            for key in index.keys():
+                alias = f"  ({names[key]})" if key in names else ""
+                print(f"  {key}{alias}: {count(index.bitmaps[key]):,}")
+            print()
+            print(f"Built {index.meta['built_at']}; list names work as keys (e.g. dormant)")
+
+        elif args.command == "count":
+            start = time.perf_counter()
+            segment = index.evaluate(args.expression)
+            size = count(segment)
+            print(f"{size:,} subscribers ({(time.perf_counter() - start) * 1000:.2f} ms)")
+
+        elif args.command == "export":
+            segment = index.evaluate(args.expression)
+            if args.csv:
+                written = export_csv(segment, args.csv, args.mirror)
+                print(f"✅ Wrote {written:,} subscribers to {args.csv}")
+            else:
+                result = export_to_list(segment, index, args.to_list, args.replace)
+                action = "Created" if result["created"] else "Updated"
+                print(f"✅ {action} list '{args.to_list}' (id {result['list_id']}): "
+                      f"+{result['added']:,}" + (f" / -{result['removed']:,}" if args.replace else ""))
+                if result["skipped"]:
+                    print(f"   Skipped {result['skipped']:,} unsubscribed from the list or blocklisted")
+                print("   Run listmonk_mirror.py sync to see the change in the mirror")
+        return 0
+
+    except SegmentError as e:
+        print(f"❌ Segment error: {e}")
+        return 1
+
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return 1
+
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted")
+        return 130
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
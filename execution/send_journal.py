@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Script: send_journal.py
+Directive: directives/send_journal.md
+DOE Framework: v2.0.0
+
+Purpose:
+    Crash-safe record of who was mailed in each campaign, so a send job
+    that dies halfway never mails anyone twice or skips them on restart.
+
+    The journal is an append-only log of (campaign, email) records: A
+    before a message is handed to the SMTP server, S once it is accepted,
+    R if the attempt is abandoned. Writers block until their record is on
+    disk, but fsyncs are batched: one background thread fsyncs everything
+    written so far, so any number of concurrent writers share each fsync.
+    On start the log is replayed into an in-memory dict per campaign, so
+    "already sent?" is one dict lookup. When most records are superseded
+    (every send leaves an A and an S), the log is rewritten with only the
+    current state and swapped in atomically.
+
+    An A without S or R means the process died mid-send: the message may
+    or may not have gone out. Callers decide what to do with those.
+
+Cost:
+    Free (local file)
+
+Usage:
+    # Journal size and per-campaign counts
+    python execution/send_journal.py status
+
+    # Was this address mailed in this campaign?
+    python execution/send_journal.py check dormant-jan someone@example.com
+
+    # Rewrite the journal with current state only
+    python execution/send_journal.py compact
+
+    # Write throughput and 1M-entry recovery time
+    python execution/send_journal.py benchmark --entries 1000000
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# =============================================================================
+# VERSION - Must match directive version
+# =============================================================================
+DOE_VERSION = "2026.10.19"
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+JOURNAL_PATH = ".tmp/send_journal.log"
+
+# Compact when the log holds this many records and over a third of them are superseded
+COMPACT_MIN_RECORDS = 50_000
+# While running, the flusher re-checks that after this many new records
+COMPACT_CHECK_EVERY = 10_000
+
+ATTEMPT, SENT, RELEASE = "A", "S", "R"
+
+
+# =============================================================================
+# JOURNAL
+# =============================================================================
+
+class JournalError(OSError):
+    """An fsync failed; records can no longer be made durable."""
+
+
+class InvalidRecord(ValueError):
+    """A campaign or email the tab-separated log cannot hold."""
+
+
+class SendJournal:
+    """
+    Append-only (campaign, email) journal with group-committed fsyncs and
+    an in-memory index. Safe to share across threads.
+    """
+
+    def __init__(self, path: str = JOURNAL_PATH, fsync: bool = True):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fsync = fsync
+        # campaign -> {email: ATTEMPT | SENT}
+        self.index: dict[str, dict[str, str]] = {}
+        self.records = 0
+        self.fsyncs = 0
+        self.recovery_seconds = self._replay()
+
+        self.lock = threading.Lock()
+        self.durable_changed = threading.Condition(self.lock)
+        # Held for each fsync, so compaction never swaps the file underneath one
+        self.sync_lock = threading.Lock()
+        self.written = 0
+        self.durable = 0
+        self.closed = False
+        # First fsync/compaction error; once set, every write raises it
+        self.error = None
+        self.compact_checked = self.records
+        self.file = open(self.path, "ab")
+        if self._worth_compacting():
+            self.compact()
+        self.flusher = threading.Thread(target=self._flush_loop, name="send-journal-fsync", daemon=True)
+        self.flusher.start()
+
+    # -------------------------------------------------------------------------
+    # Recovery
+    # -------------------------------------------------------------------------
+
+    def _replay(self) -> float:
+        """Rebuild the index from the log. A torn last record (crash mid-write) is cut off."""
+        start = time.perf_counter()
+        if not self.path.exists():
+            return 0.0
+        data = self.path.read_bytes()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            with open(self.path, "r+b") as f:
+                f.truncate(end)
+
+        index = self.index
+        campaign_name, entries = None, None
+        for line in data[:end].decode("utf-8", "replace").split("\n")[:-1]:
+            try:
+                op, campaign, email = line.split("\t")
+            except ValueError:
+                continue
+            if campaign != campaign_name:
+                campaign_name, entries = campaign, index.setdefault(campaign, {})
+            if op == RELEASE:
+                entries.pop(email, None)
+            elif op == SENT or (op == ATTEMPT and entries.get(email) != SENT):
+                entries[email] = op
+            elif op != ATTEMPT:
+                continue
+            self.records += 1
+        return time.perf_counter() - start
+
+    # -------------------------------------------------------------------------
+    # Lookups (O(1), no I/O)
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _key(email: str) -> str:
+        return email.strip().lower()
+
+    def state(self, campaign: str, email: str) -> str | None:
+        """SENT, ATTEMPT (in doubt) or None (never attempted, or released)."""
+        return self.index.get(campaign, {}).get(self._key(email))
+
+    def is_sent(self, campaign: str, email: str) -> bool:
+        return self.state(campaign, email) == SENT
+
+    def in_doubt(self, campaign: str) -> list[str]:
+        return [email for email, op in self.index.get(campaign, {}).items() if op == ATTEMPT]
+
+    def counts(self) -> dict[str, dict[str, int]]:
+        result = {}
+        for campaign, entries in self.index.items():
+            sent = sum(1 for op in entries.values() if op == SENT)
+            result[campaign] = {"sent": sent, "in_doubt": len(entries) - sent}
+        return result
+
+    @property
+    def live(self) -> int:
+        return sum(len(entries) for entries in self.index.values())
+
+    # -------------------------------------------------------------------------
+    # Writes
+    # -------------------------------------------------------------------------
+
+    def attempt(self, campaign: str, email: str):
+        """Record that `email` is about to be sent. Returns once the record is on disk."""
+        self._write(ATTEMPT, campaign, email)
+
+    def sent(self, campaign: str, email: str):
+        """Record that the server accepted the message. Returns once the record is on disk."""
+        self._write(SENT, campaign, email)
+
+    def release(self, campaign: str, email: str):
+        """Record that the attempt was abandoned without sending (safe to retry)."""
+        self._write(RELEASE, campaign, email)
+
+    def _write(self, op: str, campaign: str, email: str):
+        if "\t" in campaign or "\n" in campaign:
+            raise InvalidRecord(f"Campaign name cannot contain tabs or newlines: {campaign!r}")
+        key = self._key(email)
+        if "\t" in key or "\n" in key or "\r" in key:
+            raise InvalidRecord(f"Email cannot contain tabs or newlines: {email!r}")
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("Journal is closed")
+            if self.error is not None:
+                raise JournalError(f"Journal is not durable: {self.error}") from self.error
+            self.file.write(f"{op}\t{campaign}\t{key}\n".encode())
+            entries = self.index.setdefault(campaign, {})
+            # Same rules as _replay: SENT is terminal for ATTEMPT
+            if op == RELEASE:
+                entries.pop(key, None)
+            elif op == SENT or entries.get(key) != SENT:
+                entries[key] = op
+            self.records += 1
+            self.written += 1
+            sequence = self.written
+            self.durable_changed.notify_all()
+            while self.durable < sequence and not self.closed and self.error is None:
+                self.durable_changed.wait()
+            if self.durable < sequence and self.error is not None:
+                raise JournalError(f"Journal is not durable: {self.error}") from self.error
+
+    def _flush_loop(self):
+        """Group commit: each round makes every record written so far durable with one fsync."""
+        while True:
+            with self.lock:
+                while self.written == self.durable and not self.closed:
+                    self.durable_changed.wait()
+                if self.closed:
+                    return
+            try:
+                self._sync()
+                if self.records - self.compact_checked >= COMPACT_CHECK_EVERY:
+                    self.compact_checked = self.records
+                    if self._worth_compacting():
+                        self.compact()
+            except OSError as e:
+                # A failed fsync may have lost pages; never report those records durable.
+                # Writers waiting on them get the error instead of blocking forever.
+                with self.lock:
+                    self.error = e
+                    self.durable_changed.notify_all()
+                return
+
+    def _sync(self):
+        with self.sync_lock:
+            with self.lock:
+                self.file.flush()
+                target = self.written
+                fd = self.file.fileno()
+            if self.fsync:
+                os.fsync(fd)
+                self.fsyncs += 1
+            with self.lock:
+                self.durable = max(self.durable, target)
+                self.durable_changed.notify_all()
+
+    # -------------------------------------------------------------------------
+    # Compaction
+    # -------------------------------------------------------------------------
+
+    def _worth_compacting(self) -> bool:
+        return self.records >= COMPACT_MIN_RECORDS and self.live * 3 < self.records * 2
+
+    def compact(self) -> tuple[int, int]:
+        """Rewrite the log with one record per live entry. Returns (records before, after)."""
+        with self.sync_lock, self.lock:
+            before = self.records
+            self.file.flush()
+            temp = self.path.with_name(self.path.name + ".compact")
+            with open(temp, "wb") as f:
+                for campaign, entries in self.index.items():
+                    f.write("".join(f"{op}\t{campaign}\t{email}\n" for email, op in entries.items()).encode())
+                f.flush()
+                os.fsync(f.fileno())
+            self.file.close()
+            os.replace(temp, self.path)
+            _fsync_directory(self.path.parent)
+            self.file = open(self.path, "ab")
+            self.records = self.compact_checked = self.live
+            self.durable = self.written
+            self.durable_changed.notify_all()
+            return before, self.records
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self.error is None:
+                self._sync()
+                if self._worth_compacting():
+                    self.compact()
+        finally:
+            with self.lock:
+                self.closed = True
+                self.durable_changed.notify_all()
+            self.flusher.join(timeout=5)
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def _fsync_directory(path: Path):
+    """Make a rename durable (POSIX only; Windows has no directory handles)."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+def run_benchmark(entries: int, writes: int, threads: int) -> dict:
+    """Concurrent durable writes, then recovery and lookups on an `entries`-sized journal."""
+    # Next to the real journal, so fsync hits the same disk (not a RAM-backed /tmp)
+    Path(JOURNAL_PATH).parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=Path(JOURNAL_PATH).parent) as tmp:
+        path = Path(tmp) / "journal.log"
+
+        journal = SendJournal(str(path))
+        per_thread = writes // threads
+
+        def worker(t: int):
+            for i in range(per_thread // 2):
+                email = f"w{t}-{i}@example.com"
+                journal.attempt("bench-writes", email)
+                journal.sent("bench-writes", email)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(threads) as pool:
+            list(pool.map(worker, range(threads)))
+        write_seconds = time.perf_counter() - start
+        written, fsyncs = journal.written, journal.fsyncs
+        journal.close()
+        path.unlink()
+
+        # A journal as a campaign leaves it: an A and an S per address, a few still in doubt
+        with open(path, "w", encoding="utf-8") as f:
+            for i in range(entries):
+                f.write(f"A\tbench\tuser{i}@example.com\n")
+                if i % 1000:
+                    f.write(f"S\tbench\tuser{i}@example.com\n")
+        size_mb = path.stat().st_size / 1e6
+
+        start = time.perf_counter()
+        journal = SendJournal(str(path))
+        open_seconds = time.perf_counter() - start
+        recovery = journal.recovery_seconds
+
+        start = time.perf_counter()
+        hits = sum(journal.is_sent("bench", f"user{i}@example.com") for i in range(0, entries, 7))
+        lookups = len(range(0, entries, 7))
+        lookup_us = (time.perf_counter() - start) / lookups * 1e6
+        in_doubt = len(journal.in_doubt("bench"))
+        records_after = journal.records
+        journal.close()
+
+    return {"writes": written, "write_seconds": write_seconds, "fsyncs": fsyncs, "threads": threads,
+            "entries": entries, "size_mb": size_mb, "recovery_s": recovery, "open_s": open_seconds,
+            "records_after": records_after, "lookup_us": lookup_us, "hits": hits, "in_doubt": in_doubt}
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Crash-safe per-campaign send journal")
+    parser.add_argument("--journal", default=JOURNAL_PATH, help=f"Journal file (default: {JOURNAL_PATH})")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    subparsers.add_parser("status", help="Records, live entries and per-campaign counts")
+
+    check_parser = subparsers.add_parser("check", help="Journal state of one address in a campaign")
+    check_parser.add_argument("campaign", help="Campaign name")
+    check_parser.add_argument("email", help="Email address")
+
+    doubt_parser = subparsers.add_parser("in-doubt", help="Addresses whose send may or may not have gone out")
+    doubt_parser.add_argument("campaign", help="Campaign name")
+
+    subparsers.add_parser("compact", help="Rewrite the journal with current state only")
+
+    bench_parser = subparsers.add_parser("benchmark", help="Durable write throughput and recovery time")
+    bench_parser.add_argument("--entries", type=int, default=1_000_000, help="Journal size to recover (default: 1000000)")
+    bench_parser.add_argument("--writes", type=int, default=20_000, help="Durable writes to time (default: 20000)")
+    bench_parser.add_argument("--threads", type=int, default=16, help="Concurrent writers (default: 16)")
+
+    args = parser.parse_args()
+
+    if not args.command:
+        parser.print_help()
+        return 0
+
+    print(f"[send_journal] v{DOE_VERSION}")
+    print()
+
+    try:
+        if args.command == "benchmark":
+            print(f"⏱️  {args.writes:,} durable writes from {args.threads} threads, "
+                  f"then recovering {args.entries:,} entries...")
+            r = run_benchmark(args.entries, args.writes, args.threads)
+            print(f"  Writes: {r['writes'] / r['write_seconds']:,.0f}/s "
+                  f"({r['writes'] / max(r['fsyncs'], 1):.1f} records per fsync)")
+            print(f"  Recovery: {r['recovery_s']:.2f}s for {r['entries']:,} entries ({r['size_mb']:.0f} MB), "
+                  f"{r['open_s']:.2f}s including compaction to {r['records_after']:,} records")
+            print(f"  Lookup: {r['lookup_us']:.2f} µs  ({r['in_doubt']:,} in doubt)")
+            return 0
+
+        if not Path(args.journal).exists() and args.command != "compact":
+            print(f"No journal at {args.journal}")
+            return 0
+
+        with SendJournal(args.journal) as journal:
+            if args.command == "status":
+                print(f"📒 {args.journal}: {journal.records:,} records, {journal.live:,} current "
+                      f"(replayed in {journal.recovery_seconds:.2f}s)")
+                for campaign, c in sorted(journal.counts().items()):
+                    print(f"  {campaign:<30} {c['sent']:>9,} sent  {c['in_doubt']:>6,} in doubt")
+
+            elif args.command == "check":
+                state = journal.state(args.campaign, args.email)
+                print({SENT: "✅ Sent", ATTEMPT: "⚠️ In doubt (process stopped mid-send)",
+                       None: "Not sent"}[state])
+
+            elif args.command == "in-doubt":
+                for email in journal.in_doubt(args.campaign):
+                    print(email)
+
+            elif args.command == "compact":
+                before, after = journal.compact()
+                print(f"✅ Compacted {before:,} records to {after:,}")
+        return 0
+
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted")
+        return 130
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
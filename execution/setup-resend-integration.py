@@ -16,14 +16,18 @@ Usage:
 
 import os
 import sys
-import json
-import requests
-from dotenv import load_dotenv
+import argparse
 from pathlib import Path
 
+from doe_bootstrap import lazy_import, load_env, profile_startup
+from doe_trace import Trace, add_trace_arguments
+
+# requests is imported on first use, so --help stays fast
+requests = lazy_import("requests")
+
 # Load environment variables
 env_path = Path(__file__).parent.parent / '.env'
-load_dotenv(env_path)
+load_env(env_path)
 
 # Configuration
 RESEND_API_KEY = os.getenv('RESEND_API_KEY')
@@ -236,27 +240,44 @@ def display_next_steps():
     print("\n" + "="*70)
 
 def main():
+    profile_startup()
+
+    parser = argparse.ArgumentParser(
+        description="Set up the sending domain in Resend, add its DNS records to Cloudflare, "
+                    "and check the Listmonk connection."
+    )
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+
     print("🚀 Starting Resend Integration Setup")
     print("="*70)
 
-    # Step 1: Check environment
-    check_env_vars()
+    # Each step is timed into .tmp/traces/setup-resend-integration.jsonl
+    with Trace.from_args("setup-resend-integration", args) as trace:
+        # Step 1: Check environment
+        with trace.span("check_env_vars"):
+            check_env_vars()
 
-    # Step 2: Add domain to Resend
-    domain_info = add_domain_to_resend()
-    domain_id = domain_info.get('id')
+        # Step 2: Add domain to Resend
+        with trace.span("add_domain_to_resend", domain=SENDING_DOMAIN):
+            domain_info = add_domain_to_resend()
+            domain_id = domain_info.get('id')
 
-    # Step 3: Get DNS records
-    dns_records = get_dns_records_from_resend(domain_id)
+        # Step 3: Get DNS records
+        with trace.span("get_dns_records_from_resend") as span:
+            dns_records = get_dns_records_from_resend(domain_id)
+            span.set(records=len(dns_records))
 
-    # Step 4: Add DNS records to Cloudflare
-    add_dns_records_to_cloudflare(dns_records)
+        # Step 4: Add DNS records to Cloudflare
+        with trace.span("add_dns_records_to_cloudflare"):
+            add_dns_records_to_cloudflare(dns_records)
 
-    # Step 5: Check Listmonk connection
-    check_listmonk_connection()
+        # Step 5: Check Listmonk connection
+        with trace.span("check_listmonk_connection"):
+            check_listmonk_connection()
 
-    # Step 6: Display next steps
-    display_next_steps()
+        # Step 6: Display next steps
+        display_next_steps()
 
     print("\n✅ Setup script complete!")
 
@@ -0,0 +1,506 @@
+#!/usr/bin/env python3
+"""
+Script: shard_send.py
+Directive: directives/shard_send.md
+DOE Framework: v2.0.0
+
+Purpose:
+    Split one campaign's recipients across several sending nodes (machines,
+    or processes on one machine) so a large dormant-list send is not limited
+    to one sender's rate.
+
+    Recipients are assigned by consistent hashing on the lowercased email
+    (a ring with virtual nodes per shard), so adding or removing a node only
+    moves about 1/N of the recipients. Each shard is an ordinary
+    warmup_scheduler queue with its own send journal: its own progress
+    checkpoint, its own --rate budget (one Resend key per node), and its
+    share of the sending domain's daily ramp-up cap. The coordinator starts
+    the shards in parallel and merges their stats into one campaign report.
+
+Cost:
+    Resend per-email pricing (plan dependent), the same as one scheduler.
+    The benchmark uses a local SMTP sink and is free.
+
+Usage:
+    # Split a cleaned list across 4 shards
+    python execution/shard_send.py split .tmp/hygiene/clean.csv --campaign dormant-jan --shards 4
+
+    # Send every shard in parallel (arguments after -- go to warmup_scheduler.py run)
+    python execution/shard_send.py run --campaign dormant-jan --rate 2 -- \\
+        --from "Andre <hello@mail.callvaultai.com>" --subject "Still there?" --body body.html
+
+    # Merged progress and throughput
+    python execution/shard_send.py report --campaign dormant-jan
+
+    # Throughput scaling with 1, 2 and 4 shards against a local sink
+    python execution/shard_send.py benchmark
+"""
+
+import re
+import sys
+import json
+import math
+import time
+import bisect
+import asyncio
+import hashlib
+import argparse
+import tempfile
+import subprocess
+from collections import Counter
+from datetime import datetime
+from email.utils import parseaddr
+from pathlib import Path
+
+from send_journal import SendJournal
+from warmup_scheduler import DEFAULT_RAMP, DEFAULT_RATE, SendQueue, daily_cap, read_recipients
+
+# =============================================================================
+# VERSION - Must match directive version
+# =============================================================================
+DOE_VERSION = "2026.10.19"
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+SHARD_ROOT = ".tmp/shards"
+
+# Points per shard on the hash ring; more points = more even shares
+VNODES = 128
+
+SCHEDULER = str(Path(__file__).with_name("warmup_scheduler.py"))
+
+# Shards get this as their own ramp; the coordinator enforces the campaign-wide one through --limit
+UNCAPPED_RAMP = "1000000000"
+
+SHARD_NAME = re.compile(r"[A-Za-z0-9_.-]+")
+
+
+# =============================================================================
+# PARTITIONING
+# =============================================================================
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hash ring: each shard owns the arcs ending at its `vnodes` points."""
+
+    def __init__(self, shards: list[str], vnodes: int = VNODES):
+        points = sorted((_hash(f"{shard}#{i}"), shard) for shard in shards for i in range(vnodes))
+        self.hashes = [h for h, _ in points]
+        self.owners = [shard for _, shard in points]
+
+    def shard(self, email: str) -> str:
+        i = bisect.bisect(self.hashes, _hash(email.strip().lower()))
+        return self.owners[i % len(self.owners)]
+
+
+class ShardedCampaign:
+    """On-disk layout: <root>/<campaign>/manifest.json and one directory per shard."""
+
+    def __init__(self, campaign: str, root: str = SHARD_ROOT):
+        self.campaign = campaign
+        self.dir = Path(root) / campaign
+        self.manifest_path = self.dir / "manifest.json"
+        self.manifest = json.loads(self.manifest_path.read_text()) if self.manifest_path.exists() else None
+
+    def paths(self, shard: str) -> dict[str, str]:
+        base = self.dir / shard
+        return {"db": str(base / "send_queue.db"), "journal": str(base / "send_journal.log"),
+                "metrics": str(base / "metrics.jsonl"), "log": str(base / "run.log")}
+
+    def all_shards(self) -> list[str]:
+        return self.manifest["shards"] + self.manifest.get("retired", []) if self.manifest else []
+
+    def require_manifest(self):
+        if not self.manifest:
+            raise FileNotFoundError(f"No shards for '{self.campaign}' in {self.dir} (run split first)")
+
+    def _handled(self) -> dict[str, str]:
+        """Recipients an existing shard has sent, attempted or is holding: email -> shard."""
+        handled = {}
+        for shard in self.all_shards():
+            paths = self.paths(shard)
+            if not Path(paths["db"]).exists():
+                continue
+            queue = SendQueue(paths["db"])
+            for (email,) in queue.conn.execute(
+                    "SELECT email FROM jobs WHERE campaign = ? AND status != 'pending'", (self.campaign,)):
+                handled[email.strip().lower()] = shard
+            queue.conn.close()
+            if Path(paths["journal"]).exists():
+                with SendJournal(paths["journal"]) as journal:
+                    for email in journal.index.get(self.campaign, {}):
+                        handled.setdefault(email, shard)
+        return handled
+
+    def split(self, rows: list[dict], shards: list[str], vnodes: int = VNODES) -> dict:
+        """
+        Assign recipients to shards and queue them. Re-splitting (e.g. with
+        another node) keeps every recipient a shard already handled where it
+        is and only moves pending ones.
+        """
+        for shard in shards:
+            if not SHARD_NAME.fullmatch(shard):
+                raise ValueError(f"Shard names may only use letters, digits, '.', '_' and '-': {shard!r}")
+        ring = HashRing(shards, vnodes)
+        previous = HashRing(self.manifest["shards"], self.manifest["vnodes"]) if self.manifest else None
+        handled = self._handled()
+
+        assigned = {shard: [] for shard in shards}
+        moved = 0
+        for row in rows:
+            email = row["email"].strip().lower()
+            if email in handled:
+                continue
+            shard = ring.shard(email)
+            assigned[shard].append(row)
+            moved += previous is not None and previous.shard(email) != shard
+
+        stats = {"recipients": len(rows), "kept": sum(1 for r in rows if r["email"].strip().lower() in handled),
+                 "moved": moved, "queued": {}, "dropped": 0}
+        retired = sorted(set(self.all_shards()) - set(shards))
+        for shard in shards + retired:
+            paths = self.paths(shard)
+            Path(paths["db"]).parent.mkdir(parents=True, exist_ok=True)
+            queue = SendQueue(paths["db"])
+            # Pending jobs that now belong to another shard (or to none) leave this one
+            pending = queue.conn.execute(
+                "SELECT id, email FROM jobs WHERE campaign = ? AND status = 'pending'", (self.campaign,)).fetchall()
+            stale = [(job_id,) for job_id, email in pending if shard in retired or ring.shard(email) != shard]
+            with queue.lock:
+                queue.conn.execute("BEGIN")
+                queue.conn.executemany("DELETE FROM jobs WHERE id = ?", stale)
+                queue.conn.execute("COMMIT")
+            stats["dropped"] += len(stale)
+            if shard in assigned:
+                queue.enqueue(self.campaign, assigned[shard])
+            stats["queued"][shard] = sum(queue.counts(self.campaign).values())
+            queue.conn.close()
+
+        total = sum(stats["queued"][s] for s in shards) or 1
+        self.manifest = {
+            "campaign": self.campaign, "shards": shards, "retired": retired, "vnodes": vnodes,
+            # Each shard's share of the day's allowance
+            "shares": {s: stats["queued"][s] / total for s in shards},
+            "updated_at": datetime.now().isoformat(),
+        }
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path.write_text(json.dumps(self.manifest, indent=2))
+        return stats
+
+    # -------------------------------------------------------------------------
+    # Running
+    # -------------------------------------------------------------------------
+
+    def allowance(self, domain: str, ramp: list[int]) -> dict:
+        """
+        Today's campaign-wide allowance for the sending domain: the ramp day
+        of the shard that started first, minus what all shards sent today.
+        """
+        day_index, sent_today = 0, 0
+        for shard in self.all_shards():
+            db = self.paths(shard)["db"]
+            if Path(db).exists():
+                queue = SendQueue(db)
+                shard_day, shard_sent = queue.domain_day(domain)
+                queue.conn.close()
+                day_index = max(day_index, shard_day)
+                sent_today += shard_sent
+        cap = daily_cap(ramp, day_index)
+        return {"day": day_index, "cap": cap, "sent_today": sent_today, "allowance": max(0, cap - sent_today)}
+
+    def limits(self, shards: list[str], allowance: int) -> dict[str, int]:
+        """Split an allowance by shard share (largest remainder, so the parts add up exactly)."""
+        shares = self.manifest["shares"]
+        weight = sum(shares[s] for s in shards) or 1
+        exact = {s: allowance * shares[s] / weight for s in shards}
+        limits = {s: math.floor(v) for s, v in exact.items()}
+        for s in sorted(shards, key=lambda s: limits[s] - exact[s])[:allowance - sum(limits.values())]:
+            limits[s] += 1
+        return limits
+
+    def command(self, shard: str, rate: float, limit: int, scheduler_args: list[str]) -> list[str]:
+        paths = self.paths(shard)
+        # Passed-through arguments come first, so the shard's own settings win over them
+        return [sys.executable, SCHEDULER, "--db", paths["db"], "run", *scheduler_args,
+                "--campaign", self.campaign, "--journal", paths["journal"], "--metrics-log", paths["metrics"],
+                "--rate", str(rate), "--ramp", UNCAPPED_RAMP, "--limit", str(limit)]
+
+    def run(self, shards: list[str], rate: float, limits: dict[str, int], scheduler_args: list[str]) -> dict:
+        """Start one scheduler process per shard, wait for all. Returns exit codes and wall time."""
+        self.require_manifest()
+        unknown = set(shards) - set(self.manifest["shards"])
+        if unknown:
+            raise ValueError(f"Unknown shard(s): {', '.join(sorted(unknown))}")
+        start = time.perf_counter()
+        processes = {}
+        for shard in shards:
+            log = open(self.paths(shard)["log"], "a")
+            processes[shard] = (subprocess.Popen(self.command(shard, rate, limits[shard], scheduler_args),
+                                                 stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL), log)
+        codes = {}
+        for shard, (process, log) in processes.items():
+            codes[shard] = process.wait()
+            log.close()
+        return {"codes": codes, "wall_sec": time.perf_counter() - start}
+
+    # -------------------------------------------------------------------------
+    # Report
+    # -------------------------------------------------------------------------
+
+    def report(self, wall_sec: float | None = None) -> dict:
+        """Merge queue counts and each shard's latest run metrics into one campaign report."""
+        self.require_manifest()
+        shards = []
+        totals = Counter()
+        for shard in self.all_shards():
+            paths = self.paths(shard)
+            counts = {}
+            if Path(paths["db"]).exists():
+                queue = SendQueue(paths["db"])
+                counts = queue.counts(self.campaign)
+                queue.conn.close()
+            last_run = None
+            if Path(paths["metrics"]).exists():
+                lines = Path(paths["metrics"]).read_text().splitlines()
+                last_run = json.loads(lines[-1]) if lines else None
+            totals.update(counts)
+            shards.append({"shard": shard, "retired": shard not in self.manifest["shards"], "counts": counts,
+                           "last_run": last_run})
+
+        runs = [s["last_run"] for s in shards if s["last_run"]]
+        last_sent = sum(r["sent"] for r in runs)
+        report = {
+            "campaign": self.campaign,
+            "generated_at": datetime.now().isoformat(),
+            "shards": shards,
+            "totals": dict(totals),
+            "last_run": {
+                "sent": last_sent,
+                "failed": sum(r["failed"] for r in runs),
+                "suppressed": sum(r["suppressed"] for r in runs),
+                # Shards run side by side, so their rates add up
+                "throughput_per_sec": round(last_sent / wall_sec, 2) if wall_sec
+                else round(sum(r["throughput_per_sec"] for r in runs), 2),
+                "wall_sec": round(wall_sec, 2) if wall_sec else max((r["elapsed_sec"] for r in runs), default=0),
+                "slowest_p99_ms": max((r["latency_ms"]["p99"] for r in runs), default=0),
+                "budget_stops": [s["shard"] for s in shards if s["last_run"] and s["last_run"].get("budget_stop")],
+            },
+        }
+        (self.dir / "report.json").write_text(json.dumps(report, indent=2))
+        return report
+
+
+def print_report(report: dict):
+    print(f"CAMPAIGN: {report['campaign']}")
+    print("-" * 78)
+    print(f"  {'shard':<14} {'pending':>8} {'sent':>8} {'failed':>7} {'suppr.':>7} {'uncert.':>7}   "
+          f"{'last run':>8} {'msg/s':>7}")
+    for s in report["shards"]:
+        c, r = s["counts"], s["last_run"] or {}
+        name = s["shard"] + (" (retired)" if s["retired"] else "")
+        print(f"  {name:<14} {c.get('pending', 0):>8,} {c.get('sent', 0):>8,} {c.get('failed', 0):>7,} "
+              f"{c.get('suppressed', 0):>7,} {c.get('uncertain', 0):>7,}   "
+              f"{r.get('sent', 0):>8,} {r.get('throughput_per_sec', 0):>7}")
+    t, r = report["totals"], report["last_run"]
+    print("-" * 78)
+    print(f"  {'total':<14} {t.get('pending', 0):>8,} {t.get('sent', 0):>8,} {t.get('failed', 0):>7,} "
+          f"{t.get('suppressed', 0):>7,} {t.get('uncertain', 0):>7,}   {r['sent']:>8,} {r['throughput_per_sec']:>7}")
+    if r["budget_stops"]:
+        print(f"  🛑 Budget stopped: {', '.join(r['budget_stops'])}")
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+def start_sink(port: int, latency: float):
+    """aiosmtpd sink that holds each message `latency` seconds (like a remote server) and counts recipients."""
+    from aiosmtpd.controller import Controller
+
+    class LatencyHandler:
+        received = Counter()
+
+        async def handle_DATA(self, server, session, envelope):
+            await asyncio.sleep(latency)
+            for recipient in envelope.rcpt_tos:
+                self.received[recipient.lower()] += 1
+            return "250 OK"
+
+    handler = LatencyHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    return controller, handler
+
+
+def run_benchmark(messages: int, shard_counts: list[int], rate: float, workers: int, latency: float,
+                  port: int) -> list[dict]:
+    """Same campaign with 1..N shards, each limited to `rate` msg/s, against one sink."""
+    controller, handler = start_sink(port, latency)
+    results = []
+    Path(SHARD_ROOT).mkdir(parents=True, exist_ok=True)
+    try:
+        with tempfile.TemporaryDirectory(dir=SHARD_ROOT) as root:
+            body = Path(root) / "body.txt"
+            body.write_text("Hello {{name}},\nStill interested?\n")
+            recipients = [{"email": f"user{i}@example.com", "name": f"User {i}"} for i in range(messages)]
+            for count in shard_counts:
+                campaign = ShardedCampaign(f"bench-{count}", root)
+                campaign.split(recipients, [f"shard-{i}" for i in range(count)])
+                handler.received.clear()
+                shards = campaign.manifest["shards"]
+                run = campaign.run(shards, rate, campaign.limits(shards, messages), [
+                    "--from", "bench@mail.example.com", "--subject", "Benchmark", "--body", str(body),
+                    "--smtp-host", "127.0.0.1", "--smtp-port", str(port), "--no-tls", "--no-auth",
+                    "--workers", str(workers)])
+                report = campaign.report(run["wall_sec"])
+                exact = (len(handler.received) == messages and set(handler.received.values()) == {1})
+                results.append({"shards": count, "wall_sec": run["wall_sec"], "sent": report["last_run"]["sent"],
+                                "throughput": report["last_run"]["throughput_per_sec"],
+                                "exact": exact and all(code == 0 for code in run["codes"].values())})
+    finally:
+        controller.stop()
+    base = results[0]["throughput"] / results[0]["shards"] if results and results[0]["throughput"] else 0
+    for r in results:
+        r["efficiency"] = r["throughput"] / (base * r["shards"]) if base else 0
+    return results
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Consistent-hash sharding of campaign sends across nodes",
+        epilog="Arguments after -- in `run` are passed to warmup_scheduler.py run.",
+    )
+    parser.add_argument("--root", default=SHARD_ROOT, help=f"Shard directory (default: {SHARD_ROOT})")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    split_parser = subparsers.add_parser("split", help="Assign a campaign's recipients to shards")
+    split_parser.add_argument("list", help="CSV (email,name,attributes) or one address per line")
+    split_parser.add_argument("--campaign", required=True, help="Campaign name")
+    group = split_parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--shards", type=int, help="Number of shards (named shard-0, shard-1, ...)")
+    group.add_argument("--nodes", help="Comma-separated shard names, e.g. desktop,laptop,vps")
+    split_parser.add_argument("--vnodes", type=int, default=VNODES, help=f"Ring points per shard (default: {VNODES})")
+
+    run_parser = subparsers.add_parser("run", help="Send shards in parallel, then report")
+    run_parser.add_argument("--campaign", required=True, help="Campaign name")
+    run_parser.add_argument("--shard", action="append", help="Run only this shard (repeatable; default: all)")
+    run_parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                            help=f"Messages/sec per shard (default: {DEFAULT_RATE})")
+    run_parser.add_argument("--ramp", help="Campaign-wide daily caps, split across shards (default: built-in curve)")
+    run_parser.add_argument("--limit", type=int, help="Send at most this many now, across all shards")
+
+    report_parser = subparsers.add_parser("report", help="Merged per-shard progress and last-run stats")
+    report_parser.add_argument("--campaign", required=True, help="Campaign name")
+    report_parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+
+    bench_parser = subparsers.add_parser("benchmark", help="Throughput with 1..N shards against a local sink")
+    bench_parser.add_argument("--messages", type=int, default=1200, help="Recipients (default: 1200)")
+    bench_parser.add_argument("--shards", default="1,2,4", help="Shard counts to compare (default: 1,2,4)")
+    bench_parser.add_argument("--rate", type=float, default=50, help="Messages/sec per shard (default: 50)")
+    bench_parser.add_argument("--workers", type=int, default=4, help="Workers per shard (default: 4)")
+    bench_parser.add_argument("--latency", type=float, default=0.02, help="Sink seconds per message (default: 0.02)")
+    bench_parser.add_argument("--port", type=int, default=8027, help="Sink port (default: 8027)")
+
+    args, scheduler_args = parser.parse_known_args()
+    if scheduler_args[:1] == ["--"]:
+        scheduler_args = scheduler_args[1:]
+    if scheduler_args and args.command != "run":
+        parser.error(f"unrecognized arguments: {' '.join(scheduler_args)}")
+
+    if not args.command:
+        parser.print_help()
+        return 0
+
+    print(f"[shard_send] v{DOE_VERSION}")
+    print()
+
+    try:
+        if args.command == "benchmark":
+            counts = [int(x) for x in args.shards.split(",")]
+            print(f"⏱️  {args.messages:,} messages, {args.rate:g} msg/s per shard, "
+                  f"{args.latency * 1000:.0f} ms per message at the sink...")
+            try:
+                results = run_benchmark(args.messages, counts, args.rate, args.workers, args.latency, args.port)
+            except ImportError:
+                print("❌ aiosmtpd not installed. Run: pip install aiosmtpd")
+                return 1
+            for r in results:
+                print(f"  {r['shards']} shard(s): {r['wall_sec']:6.1f}s  {r['throughput']:7.1f} msg/s  "
+                      f"{r['efficiency']:5.0%} of linear  "
+                      f"{'✅ each recipient once' if r['exact'] else '❌ missing or duplicate recipients'}")
+            return 0 if all(r["exact"] for r in results) else 1
+
+        campaign = ShardedCampaign(args.campaign, args.root)
+
+        if args.command == "split":
+            shards = [f"shard-{i}" for i in range(args.shards)] if args.shards else \
+                [s.strip() for s in args.nodes.split(",") if s.strip()]
+            if not shards:
+                parser.error("at least one shard is needed")
+            rows = [r for r in read_recipients(args.list) if r.get("email")]
+            stats = campaign.split(rows, shards, args.vnodes)
+            print(f"✅ {stats['recipients']:,} recipients across {len(shards)} shards in {campaign.dir}")
+            for shard in shards:
+                print(f"  {shard:<14} {stats['queued'][shard]:>8,} ({campaign.manifest['shares'][shard]:.1%})")
+            if stats["kept"] or stats["moved"] or stats["dropped"]:
+                print(f"  Re-split: {stats['moved']:,} pending moved, {stats['kept']:,} already handled kept in place")
+            return 0
+
+        if args.command == "run":
+            campaign.require_manifest()
+            shards = args.shard or campaign.manifest["shards"]
+            ramp = [int(x) for x in args.ramp.split(",")] if args.ramp else DEFAULT_RAMP
+            sender = argparse.ArgumentParser(add_help=False)
+            sender.add_argument("--from", dest="sender", default="")
+            domain = parseaddr(sender.parse_known_args(scheduler_args)[0].sender)[1].rpartition("@")[2].lower()
+            if not domain:
+                parser.error("pass the scheduler's --from after -- (the sending domain sets the ramp)")
+
+            quota = campaign.allowance(domain, ramp)
+            allowance = quota["allowance"] if args.limit is None else min(quota["allowance"], args.limit)
+            limits = campaign.limits(shards, allowance)
+            print(f"📈 {domain}: ramp day {quota['day']}, cap {quota['cap']}, sent today {quota['sent_today']} "
+                  f"(all shards), allowance {allowance}")
+            print(f"🚀 Running {len(shards)} shard(s) of '{args.campaign}' at {args.rate:g} msg/s each "
+                  f"(logs in {campaign.dir}/<shard>/run.log)...")
+            run = campaign.run(shards, args.rate, limits, scheduler_args)
+            print()
+            print_report(campaign.report(run["wall_sec"] if not args.shard else None))
+            failed = [s for s, code in run["codes"].items() if code != 0]
+            if failed:
+                print(f"\n⚠️ Shard(s) exited with errors: {', '.join(failed)} (see their run.log)")
+                return 1
+            print("\n✅ Done!")
+            return 0
+
+        report = campaign.report()
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print_report(report)
+        return 0
+
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return 1
+
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted (each shard resumes from its own queue and journal)")
+        return 130
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,551 @@
+#!/usr/bin/env python3
+"""
+Script: smtp_engine.py
+Directive: directives/smtp_engine.md
+DOE Framework: v2.0.0
+
+Purpose:
+    Asyncio SMTP sender for scripted sends (setup test emails, small
+    campaigns) through Resend SMTP. Keeps a pool of persistent,
+    authenticated connections, pipelines the envelope (MAIL/RCPT/DATA)
+    when the server advertises PIPELINING, and recycles each connection
+    after a configurable number of messages.
+
+    Failures are classified: 4xx replies and dropped connections are
+    retryable, 5xx replies are permanent.
+
+Cost:
+    Resend per-email pricing (plan dependent). Benchmark mode is free.
+
+Usage:
+    # Send a test email through Resend
+    python execution/smtp_engine.py --to you@example.com --from hello@mail.callvaultai.com
+
+    # Measure throughput against a built-in local aiosmtpd sink
+    python execution/smtp_engine.py --benchmark 2000 --connections 8
+"""
+
+import os
+import ssl
+import sys
+import json
+import time
+import base64
+import asyncio
+import argparse
+from dataclasses import dataclass, field
+from datetime import datetime
+from email.message import EmailMessage
+from email.policy import SMTP as SMTP_POLICY
+from email.utils import make_msgid
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from doe_trace import Trace, add_trace_arguments
+
+load_dotenv()
+
+# =============================================================================
+# VERSION - Must match directive version
+# =============================================================================
+DOE_VERSION = "2026.10.19"
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+SMTP_HOST = os.getenv("RESEND_SMTP_HOST", "smtp.resend.com")
+SMTP_PORT = int(os.getenv("RESEND_SMTP_PORT", "465"))
+SMTP_USER = "resend"
+RESEND_API_KEY = os.getenv("RESEND_API_KEY")
+
+METRICS_LOG = ".tmp/smtp_metrics.jsonl"
+
+DEFAULT_CONNECTIONS = 4
+DEFAULT_MAX_PER_CONNECTION = 100
+DEFAULT_RETRIES = 3
+TIMEOUT = 30
+
+
+# =============================================================================
+# ERRORS
+# =============================================================================
+
+class SMTPReplyError(Exception):
+    """Server replied with a non-success code."""
+
+    def __init__(self, code: int, message: str, stage: str):
+        super().__init__(f"{stage}: {code} {message}")
+        self.code = code
+        self.message = message
+        self.stage = stage
+
+    @property
+    def retryable(self) -> bool:
+        return 400 <= self.code < 500
+
+
+def is_retryable(error: Exception) -> bool:
+    """4xx replies, timeouts and dropped connections are worth retrying; 5xx are not."""
+    if isinstance(error, SMTPReplyError):
+        return error.retryable
+    return isinstance(error, (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError))
+
+
+# =============================================================================
+# CONNECTION
+# =============================================================================
+
+class SMTPConnection:
+    """One SMTP session: connect, EHLO, STARTTLS, AUTH, then any number of messages."""
+
+    def __init__(self, host: str, port: int, username: str | None = None, password: str | None = None,
+                 tls: str = "auto", local_hostname: str = "localhost"):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        # "implicit" (port 465), "starttls", "none", or "auto" (implicit on 465, STARTTLS if offered)
+        self.tls = tls
+        self.local_hostname = local_hostname
+        self.reader: asyncio.StreamReader | None = None
+        self.writer: asyncio.StreamWriter | None = None
+        self.extensions: dict[str, str] = {}
+        self.messages_sent = 0
+
+    async def _read_reply(self, stage: str, expect: tuple[int, ...] = (250,)) -> tuple[int, str]:
+        lines = []
+        while True:
+            line = await asyncio.wait_for(self.reader.readline(), TIMEOUT)
+            if not line:
+                raise ConnectionError(f"{stage}: connection closed by server")
+            text = line.decode("utf-8", "replace").rstrip("\r\n")
+            lines.append(text[4:])
+            if len(text) < 4 or text[3] != "-":
+                break
+        code = int(text[:3])
+        message = "\n".join(lines)
+        if code not in expect:
+            raise SMTPReplyError(code, message, stage)
+        return code, message
+
+    async def _command(self, line: str, stage: str, expect: tuple[int, ...] = (250,)) -> tuple[int, str]:
+        self.writer.write(line.encode() + b"\r\n")
+        await self.writer.drain()
+        return await self._read_reply(stage, expect)
+
+    async def _ehlo(self):
+        _, message = await self._command(f"EHLO {self.local_hostname}", "EHLO")
+        self.extensions = {}
+        for line in message.split("\n")[1:]:
+            name, _, params = line.partition(" ")
+            self.extensions[name.upper()] = params
+
+    async def connect(self):
+        implicit = self.tls == "implicit" or (self.tls == "auto" and self.port == 465)
+        context = ssl.create_default_context() if self.tls != "none" else None
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=context if implicit else None), TIMEOUT)
+        await self._read_reply("greeting", (220,))
+        await self._ehlo()
+
+        wants_starttls = self.tls == "starttls" or (self.tls == "auto" and "STARTTLS" in self.extensions)
+        if not implicit and wants_starttls:
+            await self._command("STARTTLS", "STARTTLS", (220,))
+            await self.writer.start_tls(context, server_hostname=self.host)
+            await self._ehlo()
+
+        if self.username and self.password:
+            await self._auth()
+
+    async def _auth(self):
+        mechanisms = self.extensions.get("AUTH", "").upper().split()
+        if "PLAIN" in mechanisms or "LOGIN" not in mechanisms:
+            token = base64.b64encode(f"\0{self.username}\0{self.password}".encode()).decode()
+            await self._command(f"AUTH PLAIN {token}", "AUTH", (235,))
+        else:
+            await self._command("AUTH LOGIN", "AUTH", (334,))
+            await self._command(base64.b64encode(self.username.encode()).decode(), "AUTH", (334,))
+            await self._command(base64.b64encode(self.password.encode()).decode(), "AUTH", (235,))
+
+    async def send(self, sender: str, recipients: list[str], data: bytes) -> dict[str, str]:
+        """
+        Send one message. With PIPELINING the whole envelope goes out in one
+        write and the replies are read back in order.
+
+        Like smtplib, the message is sent if at least one recipient is
+        accepted; refused recipients are returned as {address: reply}.
+
+        Raises:
+            SMTPReplyError: if the sender, every recipient, or the data is rejected
+        """
+        envelope = [f"MAIL FROM:<{sender}>"] + [f"RCPT TO:<{r}>" for r in recipients] + ["DATA"]
+        pipelined = "PIPELINING" in self.extensions
+        if pipelined:
+            self.writer.write("".join(line + "\r\n" for line in envelope).encode())
+            await self.writer.drain()
+
+        async def step(line: str, stage: str, expect: tuple[int, ...]):
+            if pipelined:
+                return await self._read_reply(stage, expect)
+            return await self._command(line, stage, expect)
+
+        refused = {}
+        error = last_refusal = None
+        try:
+            await step(envelope[0], "MAIL", (250,))
+        except SMTPReplyError as e:
+            error = e
+        for recipient, line in zip(recipients, envelope[1:-1]):
+            if error and not pipelined:
+                break
+            try:
+                await step(line, "RCPT", (250, 251))
+            except SMTPReplyError as e:
+                refused[recipient] = f"{e.code} {e.message}"
+                last_refusal = e
+        if not error and refused and len(refused) == len(recipients):
+            error = last_refusal
+        if error and not pipelined:
+            await self._reset()
+            raise error
+
+        # Pipelined DATA reply must always be consumed to keep the session in sync
+        try:
+            await step(envelope[-1], "DATA", (354,))
+        except SMTPReplyError as e:
+            error = error or e
+        if error:
+            await self._reset()
+            raise error
+
+        self.writer.write(dot_stuff(data) + b".\r\n")
+        await self.writer.drain()
+        await self._read_reply("DATA end")
+        self.messages_sent += 1
+        return refused
+
+    async def _reset(self):
+        try:
+            await self._command("RSET", "RSET")
+        except (SMTPReplyError, OSError, asyncio.TimeoutError):
+            await self.close()
+
+    async def close(self):
+        if self.writer is None:
+            return
+        try:
+            self.writer.write(b"QUIT\r\n")
+            await self.writer.drain()
+            self.writer.close()
+            await asyncio.wait_for(self.writer.wait_closed(), 5)
+        except (OSError, asyncio.TimeoutError, ssl.SSLError):
+            pass
+        self.writer = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.writer is not None and not self.writer.is_closing()
+
+
+def dot_stuff(data: bytes) -> bytes:
+    """Normalise line endings to CRLF and escape leading dots (RFC 5321 4.5.2)."""
+    data = data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    if not data.endswith(b"\n"):
+        data += b"\n"
+    lines = data.split(b"\n")[:-1]
+    return b"".join((b"." + line if line.startswith(b".") else line) + b"\r\n" for line in lines)
+
+
+# =============================================================================
+# POOL AND ENGINE
+# =============================================================================
+
+@dataclass
+class SendResult:
+    recipient: str
+    success: bool
+    attempts: int
+    latency: float = 0.0
+    error: str | None = None
+    retryable: bool = False
+
+
+@dataclass
+class Metrics:
+    latencies: list[float] = field(default_factory=list)
+    sent: int = 0
+    failed: int = 0
+    retries: int = 0
+    connections_opened: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    def summary(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        ordered = sorted(self.latencies)
+
+        def pct(p):
+            if not ordered:
+                return 0.0
+            return round(ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000, 2)
+
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+            "connections_opened": self.connections_opened,
+            "elapsed_sec": round(elapsed, 3),
+            "messages_per_sec": round(self.sent / elapsed, 2) if elapsed else 0,
+            "latency_ms": {"p50": pct(50), "p99": pct(99)},
+        }
+
+
+class SMTPPool:
+    """
+    Up to `size` persistent connections. A connection is closed and replaced
+    after `max_per_connection` messages or after any connection-level error.
+    """
+
+    def __init__(self, size: int, max_per_connection: int, metrics: Metrics, **connection_kwargs):
+        self.size = size
+        self.max_per_connection = max_per_connection
+        self.metrics = metrics
+        self.connection_kwargs = connection_kwargs
+        self.idle: asyncio.Queue = asyncio.Queue()
+        self.slots = asyncio.Semaphore(size)
+
+    async def acquire(self) -> SMTPConnection:
+        await self.slots.acquire()
+        while not self.idle.empty():
+            conn = self.idle.get_nowait()
+            if conn.is_open:
+                return conn
+        conn = SMTPConnection(**self.connection_kwargs)
+        try:
+            await conn.connect()
+        except BaseException:
+            await conn.close()
+            self.slots.release()
+            raise
+        self.metrics.connections_opened += 1
+        return conn
+
+    async def release(self, conn: SMTPConnection, healthy: bool = True):
+        if healthy and conn.is_open and conn.messages_sent < self.max_per_connection:
+            self.idle.put_nowait(conn)
+        else:
+            await conn.close()
+        self.slots.release()
+
+    async def close(self):
+        while not self.idle.empty():
+            await self.idle.get_nowait().close()
+
+
+class SMTPEngine:
+    """Send many messages concurrently over a connection pool with retries."""
+
+    def __init__(self, host: str = SMTP_HOST, port: int = SMTP_PORT, username: str | None = SMTP_USER,
+                 password: str | None = RESEND_API_KEY, tls: str = "auto",
+                 connections: int = DEFAULT_CONNECTIONS, max_per_connection: int = DEFAULT_MAX_PER_CONNECTION,
+                 retries: int = DEFAULT_RETRIES):
+        self.metrics = Metrics()
+        self.retries = retries
+        self.pool = SMTPPool(connections, max_per_connection, self.metrics, host=host, port=port,
+                             username=username, password=password, tls=tls)
+
+    async def send(self, message: EmailMessage) -> SendResult:
+        """Send one message, retrying retryable failures with exponential backoff."""
+        sender = message["Sender"] or message["From"]
+        sender = sender.addresses[0].addr_spec if hasattr(sender, "addresses") else str(sender)
+        recipients = [a.addr_spec for h in ("To", "Cc", "Bcc") if message[h] for a in message[h].addresses]
+        data = message.as_bytes(policy=SMTP_POLICY)
+        label = ", ".join(recipients)
+
+        for attempt in range(1, self.retries + 2):
+            conn = None
+            try:
+                conn = await self.pool.acquire()
+                # Latency covers the SMTP transaction only, not waiting for a free connection
+                start = time.perf_counter()
+                await conn.send(sender, recipients, data)
+            except Exception as e:
+                retryable = is_retryable(e)
+                if conn is not None:
+                    await self.pool.release(conn, healthy=isinstance(e, SMTPReplyError) and conn.is_open)
+                if retryable and attempt <= self.retries:
+                    self.metrics.retries += 1
+                    await asyncio.sleep(min(2 ** (attempt - 1), 10))
+                    continue
+                self.metrics.failed += 1
+                return SendResult(label, False, attempt, error=str(e) or type(e).__name__, retryable=retryable)
+
+            latency = time.perf_counter() - start
+            await self.pool.release(conn)
+            self.metrics.sent += 1
+            self.metrics.latencies.append(latency)
+            return SendResult(label, True, attempt, latency)
+
+    async def send_many(self, messages: list[EmailMessage]) -> list[SendResult]:
+        # The pool's semaphore bounds concurrency to the number of connections
+        return await asyncio.gather(*(self.send(m) for m in messages))
+
+    async def close(self):
+        await self.pool.close()
+
+
+def build_message(sender: str, to: str, subject: str, body: str) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = sender
+    msg["To"] = to
+    msg["Subject"] = subject
+    msg["Message-ID"] = make_msgid(domain=sender.rpartition("@")[2].rstrip(">") or None)
+    msg.set_content(body)
+    return msg
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+def start_sink(port: int):
+    """Start an in-process aiosmtpd sink on a background thread. Returns (controller, handler)."""
+    from aiosmtpd.controller import Controller
+
+    class CountingHandler:
+        count = 0
+
+        async def handle_DATA(self, server, session, envelope):
+            self.count += 1
+            return "250 OK"
+
+    handler = CountingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    return controller, handler
+
+
+async def run_benchmark(count: int, connections: int, max_per_connection: int, host: str, port: int) -> dict:
+    engine = SMTPEngine(host=host, port=port, username=None, password=None, tls="none",
+                        connections=connections, max_per_connection=max_per_connection, retries=0)
+    messages = [build_message("bench@mail.example.com", f"user{i}@example.com", f"Benchmark {i}",
+                              "Hello,\n.leading dot line\nThanks\n") for i in range(count)]
+    engine.metrics.started = time.perf_counter()
+    await engine.send_many(messages)
+    await engine.close()
+    return engine.metrics.summary()
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Asyncio SMTP sender with a pooled, pipelined connection engine.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--to", action="append", help="Recipient (repeatable); sends one message each")
+    parser.add_argument("--from", dest="sender", help="From address")
+    parser.add_argument("--subject", default="Test email from DOE setup", help="Subject line")
+    parser.add_argument("--body", default="This is a test email sent through Resend SMTP.", help="Plain-text body")
+    parser.add_argument("--host", default=SMTP_HOST, help=f"SMTP host (default: {SMTP_HOST})")
+    parser.add_argument("--port", type=int, default=SMTP_PORT, help=f"SMTP port (default: {SMTP_PORT})")
+    parser.add_argument("--tls", choices=["auto", "implicit", "starttls", "none"], default="auto",
+                        help="TLS mode (default: auto = implicit on 465, STARTTLS if offered)")
+    parser.add_argument("--connections", type=int, default=DEFAULT_CONNECTIONS,
+                        help=f"Pooled connections (default: {DEFAULT_CONNECTIONS})")
+    parser.add_argument("--max-per-connection", type=int, default=DEFAULT_MAX_PER_CONNECTION,
+                        help=f"Messages before a connection is recycled (default: {DEFAULT_MAX_PER_CONNECTION})")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES, help=f"Retries for 4xx/network errors (default: {DEFAULT_RETRIES})")
+    parser.add_argument("--benchmark", type=int, metavar="MESSAGES", help="Send N messages to a local sink and report metrics")
+    parser.add_argument("--sink-port", type=int, default=8025, help="Port for the built-in sink (default: 8025)")
+    parser.add_argument("--external-sink", action="store_true", help="Benchmark against an already running sink at --host/--port")
+    add_trace_arguments(parser)
+
+    args = parser.parse_args()
+
+    print(f"[smtp_engine] v{DOE_VERSION}")
+    print()
+
+    try:
+        if args.benchmark:
+            controller = None
+            host, port = args.host, args.port
+            if not args.external_sink:
+                try:
+                    controller, handler = start_sink(args.sink_port)
+                except ImportError:
+                    print("❌ aiosmtpd not installed. Run: pip install aiosmtpd")
+                    return 1
+                host, port = "127.0.0.1", args.sink_port
+
+            print(f"📤 Sending {args.benchmark} messages to {host}:{port} over {args.connections} connections...")
+            try:
+                metrics = asyncio.run(run_benchmark(args.benchmark, args.connections, args.max_per_connection, host, port))
+            finally:
+                if controller:
+                    controller.stop()
+
+            if controller and handler.count != metrics["sent"]:
+                print(f"⚠️ Sink received {handler.count} messages, engine reported {metrics['sent']}")
+
+            print()
+            print("RESULTS")
+            print("-" * 40)
+            print(f"  Sent: {metrics['sent']}  Failed: {metrics['failed']}  Connections: {metrics['connections_opened']}")
+            print(f"  Throughput: {metrics['messages_per_sec']} msg/s")
+            print(f"  Latency p50/p99: {metrics['latency_ms']['p50']} / {metrics['latency_ms']['p99']} ms")
+
+            Path(METRICS_LOG).parent.mkdir(parents=True, exist_ok=True)
+            with open(METRICS_LOG, "a") as f:
+                f.write(json.dumps({"timestamp": datetime.now().isoformat(), "benchmark": True,
+                                    "connections": args.connections, **metrics}) + "\n")
+            return 0 if metrics["failed"] == 0 else 1
+
+        if not args.to or not args.sender:
+            parser.error("--to and --from are required unless --benchmark is given")
+        if not RESEND_API_KEY and args.host == SMTP_HOST:
+            print("ERROR: RESEND_API_KEY not set in .env")
+            return 1
+
+        async def send_all(messages):
+            engine = SMTPEngine(host=args.host, port=args.port, tls=args.tls, connections=args.connections,
+                                max_per_connection=args.max_per_connection, retries=args.retries)
+            results = await engine.send_many(messages)
+            await engine.close()
+            return results, engine.metrics.summary()
+
+        with Trace.from_args("smtp_engine", args) as trace:
+            with trace.span("build_messages", count=len(args.to)):
+                messages = [build_message(args.sender, to, args.subject, args.body) for to in args.to]
+            with trace.span("send", host=args.host, connections=args.connections) as span:
+                results, metrics = asyncio.run(send_all(messages))
+                span.set(sent=metrics["sent"], failed=metrics["failed"])
+        for r in results:
+            if r.success:
+                print(f"  ✅ {r.recipient} ({r.latency * 1000:.0f} ms, attempt {r.attempts})")
+            else:
+                kind = "retryable" if r.retryable else "permanent"
+                print(f"  ❌ {r.recipient}: {r.error} ({kind})")
+
+        Path(METRICS_LOG).parent.mkdir(parents=True, exist_ok=True)
+        with open(METRICS_LOG, "a") as f:
+            f.write(json.dumps({"timestamp": datetime.now().isoformat(), "benchmark": False, **metrics}) + "\n")
+
+        print()
+        print("✅ Done!" if metrics["failed"] == 0 else f"⚠️ {metrics['failed']} message(s) failed")
+        return 0 if metrics["failed"] == 0 else 1
+
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted")
+        return 130
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
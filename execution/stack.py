@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+"""
+Script: stack.py
+Directive: directives/stack.md
+DOE Framework: v2.0.0
+
+Purpose:
+    Bring the Listmonk stack (db, listmonk, cloudflared from
+    docker-compose.yml) up and wait until each service is actually ready,
+    instead of sleeping for fixed times like watchdog-listmonk.ps1.
+
+    The Docker daemon is polled with exponential backoff. The stack's
+    containers are then followed on the `docker events` stream. Each
+    service is started once the service it depends on is ready (db) or
+    started (listmonk), and gated by the watchdog's health probes, retried
+    with backoff from 50 ms. A container event (start, healthy, die) triggers
+    an immediate probe, so readiness is seen as soon as it happens. A
+    container that keeps dying fails the startup at once, with its logs.
+
+    Time to ready is reported per service and appended to a history file.
+
+Cost:
+    Free
+
+Usage:
+    # Start everything and wait until it is ready
+    python execution/stack.py up
+
+    # Only the database and Listmonk
+    python execution/stack.py up db listmonk
+
+    # Container state and one probe per service
+    python execution/stack.py status
+
+    # Past startups
+    python execution/stack.py history
+"""
+
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import subprocess
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+from listmonk_watchdog import (APP_CONTAINER, DB_CONTAINER, DEFAULT_TIMEOUT, LISTMONK_LOCAL_URL,
+                               TUNNEL_CONTAINER, TUNNEL_URL, ProbeError, http_probe,
+                               postgres_docker_probe, run_command, tunnel_url_from_config)
+
+# =============================================================================
+# VERSION - Must match directive version
+# =============================================================================
+DOE_VERSION = "2026.10.19"
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+COMPOSE_FILE = "docker-compose.yml"
+HISTORY_LOG = ".tmp/stack/startups.jsonl"
+
+# Launched on Windows when the Docker daemon is not reachable
+DOCKER_DESKTOP_EXE = r"C:\Program Files\Docker\Docker\Docker Desktop.exe"
+
+DOCKER_TIMEOUT = 180     # Seconds for the daemon to come up
+READY_TIMEOUT = 180      # Seconds for each service to become ready
+MAX_DEATHS = 3           # Container exits while waiting before giving up
+
+# Probe backoff: 50 ms, 100 ms, ... capped at 1 s; reset by container events
+INITIAL_BACKOFF = 0.05
+MAX_BACKOFF = 1.0
+
+# cloudflared logs this once a connection to the Cloudflare edge is up
+TUNNEL_READY_LINE = "Registered tunnel connection"
+
+
+# =============================================================================
+# ERRORS
+# =============================================================================
+
+class StartupError(Exception):
+    """The stack could not be brought up."""
+
+
+# =============================================================================
+# SERVICES
+# =============================================================================
+
+@dataclass
+class Service:
+    """
+    One compose service. It is started once `depends_on` has reached
+    `condition` ("ready" or "started"), like compose's depends_on.
+    """
+    name: str
+    container: str
+    probe: object
+    depends_on: str | None = None
+    condition: str = "ready"
+    started: asyncio.Event = field(default_factory=asyncio.Event)
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+    failed: bool = False
+
+
+async def tunnel_log_probe(container: str = TUNNEL_CONTAINER):
+    """cloudflared has registered an edge connection since the container last started."""
+    code, started_at = await run_command("docker", "inspect", "-f", "{{.State.StartedAt}}", container)
+    if code != 0:
+        raise ProbeError(started_at or f"docker inspect exited {code}")
+    code, output = await run_command("docker", "logs", "--since", started_at, container)
+    if TUNNEL_READY_LINE not in output:
+        raise ProbeError("No tunnel connection registered yet")
+
+
+def build_services(args) -> dict[str, Service]:
+    listmonk_url = args.listmonk_url.rstrip("/")
+    tunnel_url = (args.tunnel_url or TUNNEL_URL or tunnel_url_from_config() or "").rstrip("/")
+    if tunnel_url:
+        tunnel_probe = lambda: http_probe(f"{tunnel_url}/api/health")
+    else:
+        tunnel_probe = tunnel_log_probe
+    return {
+        "db": Service("db", DB_CONTAINER, lambda: postgres_docker_probe(DB_CONTAINER)),
+        "listmonk": Service("listmonk", APP_CONTAINER, lambda: http_probe(f"{listmonk_url}/api/health"),
+                            depends_on="db"),
+        "cloudflared": Service("cloudflared", TUNNEL_CONTAINER, tunnel_probe,
+                               depends_on="listmonk", condition="started"),
+    }
+
+
+def with_dependencies(services: dict[str, Service], names: list[str]) -> list[str]:
+    """Requested services plus everything they depend on, in compose file order."""
+    wanted = set()
+    for name in names:
+        if name not in services:
+            raise StartupError(f"Unknown service '{name}' (choose from {', '.join(services)})")
+        while name:
+            wanted.add(name)
+            name = services[name].depends_on
+    return [name for name in services if name in wanted]
+
+
+# =============================================================================
+# DOCKER
+# =============================================================================
+
+async def docker_ready() -> bool:
+    try:
+        code, _ = await run_command("docker", "version", "--format", "{{.Server.Version}}")
+    except (OSError, asyncio.TimeoutError):
+        return False
+    return code == 0
+
+
+async def wait_for_docker(timeout: float = DOCKER_TIMEOUT) -> tuple[float, int]:
+    """
+    Poll the daemon with backoff until it answers. On Windows, Docker
+    Desktop is launched first if the daemon is not up.
+
+    Returns:
+        Tuple of (seconds waited, polls)
+    """
+    start = time.monotonic()
+    if await docker_ready():
+        return 0.0, 1
+    if shutil.which("docker") is None:
+        raise StartupError("docker is not installed or not on PATH")
+    if sys.platform == "win32" and Path(DOCKER_DESKTOP_EXE).exists():
+        print("🐳 Starting Docker Desktop...")
+        subprocess.Popen([DOCKER_DESKTOP_EXE])
+
+    polls, delay = 1, 0.25
+    while time.monotonic() - start < timeout:
+        await asyncio.sleep(delay)
+        polls += 1
+        if await docker_ready():
+            return time.monotonic() - start, polls
+        delay = min(delay * 2, MAX_BACKOFF)
+    raise StartupError(f"Docker daemon not reachable after {timeout:g}s")
+
+
+async def compose_command(compose_file: str) -> list[str]:
+    """`docker compose` (v2) if available, else `docker-compose`."""
+    code, _ = await run_command("docker", "compose", "version")
+    if code == 0:
+        return ["docker", "compose", "-f", compose_file]
+    if shutil.which("docker-compose"):
+        return ["docker-compose", "-f", compose_file]
+    raise StartupError("Neither `docker compose` nor `docker-compose` is available")
+
+
+async def container_state(container: str) -> str:
+    """running, restarting, exited, created, paused, dead, or missing."""
+    code, output = await run_command("docker", "inspect", "-f", "{{.State.Status}}", container)
+    return output if code == 0 else "missing"
+
+
+class DockerEvents:
+    """
+    `docker events` for the stack's containers, one queue per container.
+    Started with --since, so events from before the stream connected are
+    replayed rather than missed.
+    """
+
+    def __init__(self, containers: list[str]):
+        self.queues = {c: asyncio.Queue() for c in containers}
+        self.process = None
+        self.reader = None
+
+    async def start(self, since: float):
+        filters = ["--filter", "type=container"]
+        for container in self.queues:
+            filters += ["--filter", f"container={container}"]
+        self.process = await asyncio.create_subprocess_exec(
+            "docker", "events", "--since", str(int(since)), "--format", "{{json .}}", *filters,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL)
+        self.reader = asyncio.create_task(self._read(since))
+
+    async def _read(self, since: float):
+        async for line in self.process.stdout:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if event.get("timeNano", 0) < since * 1e9:
+                continue
+            attributes = event.get("Actor", {}).get("Attributes", {})
+            queue = self.queues.get(attributes.get("name"))
+            if queue is not None:
+                queue.put_nowait({
+                    "action": event.get("Action") or event.get("status", ""),
+                    "exit_code": attributes.get("exitCode"),
+                })
+
+    async def close(self):
+        if self.reader:
+            self.reader.cancel()
+        if self.process and self.process.returncode is None:
+            self.process.kill()
+            await self.process.wait()
+
+
+# =============================================================================
+# STARTUP
+# =============================================================================
+
+async def wait_ready(service: Service, events: DockerEvents, timeout: float,
+                     probe_timeout: float, max_deaths: int, expected_deaths: int = 0) -> dict:
+    """
+    Probe until the service is ready. Between probes, wait for the backoff
+    delay or the next container event, whichever comes first. The first
+    `expected_deaths` exits are ones this script caused (`docker restart`)
+    and don't count towards `max_deaths`.
+    """
+    queue = events.queues[service.container]
+    start = time.monotonic()
+    deadline = start + timeout
+    delay, probes, deaths, error = INITIAL_BACKOFF, 0, 0, None
+
+    while True:
+        probes += 1
+        try:
+            await asyncio.wait_for(service.probe(), probe_timeout)
+            return {"probes": probes, "deaths": deaths, "via": "probe"}
+        except asyncio.TimeoutError:
+            error = f"Probe timed out after {probe_timeout:g}s"
+        except (OSError, ProbeError, asyncio.IncompleteReadError) as e:
+            error = str(e) or type(e).__name__
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise StartupError(f"{service.name} not ready after {timeout:g}s: {error}")
+        try:
+            event = await asyncio.wait_for(queue.get(), min(delay, remaining))
+        except asyncio.TimeoutError:
+            delay = min(delay * 2, MAX_BACKOFF)
+            continue
+
+        action = event["action"]
+        if action == "start":
+            service.started.set()
+            delay = INITIAL_BACKOFF
+        elif action == "health_status: healthy":
+            return {"probes": probes, "deaths": deaths, "via": "healthcheck"}
+        elif action == "die":
+            if expected_deaths:
+                expected_deaths -= 1
+                continue
+            deaths += 1
+            print(f"  ⚠️  {service.container} exited (code {event['exit_code']}), {deaths}/{max_deaths}")
+            if deaths >= max_deaths:
+                _, logs = await run_command("docker", "logs", "--tail", "20", service.container)
+                raise StartupError(f"{service.container} exited {deaths} times while starting:\n{logs}")
+
+
+async def bring_up(service: Service, services: dict[str, Service], compose: list[str],
+                   events: DockerEvents, up_start: float, args) -> dict:
+    """Wait for the dependency, start the container if needed, then gate on readiness."""
+    if service.depends_on in services:
+        dependency = services[service.depends_on]
+        await (dependency.ready if service.condition == "ready" else dependency.started).wait()
+        if dependency.failed:
+            service.failed = True
+            service.started.set()
+            service.ready.set()
+            return {"service": service.name, "action": "skipped",
+                    "error": f"{dependency.name} did not start"}
+
+    requested = time.monotonic()
+    state = await container_state(service.container)
+    if state == "running":
+        action = "running"
+    elif state == "restarting":
+        # Docker's restart backoff grows to a minute; restart it now instead
+        action, command = "restarted", ["docker", "restart", service.container]
+    elif state == "paused":
+        action, command = "unpaused", ["docker", "unpause", service.container]
+    else:
+        action, command = "started", [*compose, "up", "-d", "--no-deps", service.name]
+
+    try:
+        if action != "running":
+            code, output = await run_command(*command, timeout=120)
+            if code != 0:
+                raise StartupError(f"{' '.join(command[-2:])} failed: {output}")
+        service.started.set()
+        result = await wait_ready(service, events, args.timeout, args.probe_timeout, args.max_deaths,
+                                  expected_deaths=1 if action == "restarted" else 0)
+    except (StartupError, OSError, asyncio.TimeoutError) as e:
+        service.failed = True
+        service.started.set()
+        service.ready.set()
+        return {"service": service.name, "action": action, "error": str(e) or type(e).__name__}
+
+    service.ready.set()
+    now = time.monotonic()
+    return {"service": service.name, "action": action, "ready_s": round(now - requested, 3),
+            "at_s": round(now - up_start, 3), **result}
+
+
+async def stack_up(names: list[str], args) -> dict:
+    """Bring the requested services (and their dependencies) up, concurrently where possible."""
+    up_start = time.monotonic()
+    since = time.time()
+    docker_s, polls = await wait_for_docker(args.docker_timeout)
+    if docker_s:
+        print(f"🐳 Docker ready after {docker_s:.1f}s ({polls} polls)")
+
+    compose = await compose_command(args.file)
+    all_services = build_services(args)
+    services = {name: all_services[name] for name in with_dependencies(all_services, names)}
+
+    events = DockerEvents([s.container for s in services.values()])
+    await events.start(since)
+    try:
+        results = await asyncio.gather(*(
+            bring_up(s, services, compose, events, up_start, args) for s in services.values()))
+    finally:
+        await events.close()
+
+    record = {
+        "ts": datetime.now().isoformat(timespec="seconds"),
+        "ok": not any(s.failed for s in services.values()),
+        "total_s": round(time.monotonic() - up_start, 3),
+        "docker_s": round(docker_s, 3),
+        "services": results,
+    }
+    path = Path(args.history)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+    return record
+
+
+async def stack_status(args) -> list[dict]:
+    """Container state and one probe per service, concurrently."""
+    async def one(service: Service) -> dict:
+        state = await container_state(service.container)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(service.probe(), args.probe_timeout)
+            error = None
+        except asyncio.TimeoutError:
+            error = f"Timed out after {args.probe_timeout:g}s"
+        except (OSError, ProbeError, asyncio.IncompleteReadError) as e:
+            error = str(e) or type(e).__name__
+        return {"service": service.name, "container": service.container, "state": state,
+                "ready": error is None, "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+                "error": error}
+
+    return await asyncio.gather(*(one(s) for s in build_services(args).values()))
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def print_startup(record: dict):
+    for r in record["services"]:
+        if "error" in r:
+            print(f"  ❌ {r['service']:<12} {r['action']}: {r['error']}")
+        else:
+            extra = f", {r['deaths']} exits" if r["deaths"] else ""
+            print(f"  ✅ {r['service']:<12} {r['action']:<10} ready in {r['ready_s']:6.2f}s "
+                  f"(at {r['at_s']:.2f}s, {r['probes']} probes, via {r['via']}{extra})")
+    print()
+    print(f"  Total: {record['total_s']:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Start the Listmonk stack and wait until each service is ready")
+    parser.add_argument("--file", default=COMPOSE_FILE, help=f"Compose file (default: {COMPOSE_FILE})")
+    parser.add_argument("--listmonk-url", default=LISTMONK_LOCAL_URL,
+                        help=f"Local Listmonk URL (default: {LISTMONK_LOCAL_URL})")
+    parser.add_argument("--tunnel-url", help="Public URL through the tunnel (default: LISTMONK_URL or tunnel-config.yml)")
+    parser.add_argument("--probe-timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help=f"Seconds per probe (default: {DEFAULT_TIMEOUT})")
+    parser.add_argument("--history", default=HISTORY_LOG, help=f"Startup history (default: {HISTORY_LOG})")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    up_parser = subparsers.add_parser("up", help="Start services and wait until they are ready")
+    up_parser.add_argument("services", nargs="*", default=["db", "listmonk", "cloudflared"],
+                           help="Compose services (default: db listmonk cloudflared)")
+    up_parser.add_argument("--timeout", type=float, default=READY_TIMEOUT,
+                           help=f"Seconds for each service to become ready (default: {READY_TIMEOUT})")
+    up_parser.add_argument("--docker-timeout", type=float, default=DOCKER_TIMEOUT,
+                           help=f"Seconds for the Docker daemon (default: {DOCKER_TIMEOUT})")
+    up_parser.add_argument("--max-deaths", type=int, default=MAX_DEATHS,
+                           help=f"Container exits while starting before giving up (default: {MAX_DEATHS})")
+
+    subparsers.add_parser("status", help="Container state and one probe per service")
+
+    history_parser = subparsers.add_parser("history", help="Past startups")
+    history_parser.add_argument("--last", type=int, default=10, help="Startups to show (default: 10)")
+
+    args = parser.parse_args()
+
+    if not args.command:
+        parser.print_help()
+        return 0
+
+    print(f"[stack] v{DOE_VERSION}")
+    print()
+
+    try:
+        if args.command == "up":
+            print(f"🚀 Bringing up {', '.join(args.services)}")
+            record = asyncio.run(stack_up(args.services, args))
+            print_startup(record)
+            print()
+            if not record["ok"]:
+                print("❌ Stack not ready")
+                return 1
+            print("✅ Stack ready")
+            return 0
+
+        if args.command == "status":
+            results = asyncio.run(stack_status(args))
+            for r in results:
+                mark = "✅" if r["ready"] else "❌"
+                print(f"  {mark} {r['service']:<12} {r['container']:<20} {r['state']:<11} {r['latency_ms']:.0f}ms")
+                if r["error"]:
+                    print(f"     {r['error']}")
+            return 0 if all(r["ready"] for r in results) else 1
+
+        if args.command == "history":
+            path = Path(args.history)
+            lines = path.read_text(encoding="utf-8").splitlines() if path.exists() else []
+            if not lines:
+                print("No startups recorded yet")
+                return 1
+            for line in lines[-args.last:]:
+                record = json.loads(line)
+                times = "  ".join(f"{r['service']} {r['ready_s']:.1f}s" if "ready_s" in r
+                                  else f"{r['service']} ❌" for r in record["services"])
+                print(f"  {record['ts']}  total {record['total_s']:6.1f}s  docker {record['docker_s']:5.1f}s  {times}")
+            return 0
+
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted")
+        return 130
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,723 @@
+#!/usr/bin/env python3
+"""
+Script: suppression.py
+Directive: directives/suppression.md
+DOE Framework: v2.0.0
+
+Purpose:
+    Consume Resend bounce and complaint events and keep a persistent
+    suppression index, so hard-bounced and complaining addresses are never
+    imported or mailed again.
+
+    Events arrive through a local webhook receiver (point a Cloudflare
+    tunnel route at it) or are replayed from a file. Accepted events are
+    group-committed to an append-only log (fsync per batch, before the
+    webhook is acknowledged), then applied to an on-disk open-addressing
+    hash set. Lookups are O(1): an optional in-memory Bloom filter, then
+    one probe sequence in the memory-mapped table.
+
+Cost:
+    Free
+
+Usage:
+    # Receive Resend webhooks on port 8787
+    python execution/suppression.py serve --port 8787
+
+    # Replay exported events (JSON array or one JSON event per line)
+    python execution/suppression.py replay events.jsonl
+
+    # Check or add addresses
+    python execution/suppression.py check someone@example.com
+    python execution/suppression.py add someone@example.com --reason manual
+
+    # Ingest and lookup throughput
+    python execution/suppression.py --benchmark 20000
+
+    # From other scripts
+    from suppression import SuppressionIndex
+    index = SuppressionIndex.open_readonly()
+    if index.is_suppressed(email): ...
+"""
+
+import os
+import sys
+import hmac
+import json
+import mmap
+import time
+import queue
+import base64
+import struct
+import hashlib
+import argparse
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# =============================================================================
+# VERSION - Must match directive version
+# =============================================================================
+DOE_VERSION = "2026.10.19"
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+SUPPRESSION_DIR = ".tmp/suppression"
+LOG_FILE = "events.jsonl"
+INDEX_FILE = "index.bin"
+
+# Svix signing secret from the Resend webhook settings (whsec_...). Optional.
+WEBHOOK_SECRET = os.getenv("RESEND_WEBHOOK_SECRET")
+SIGNATURE_TOLERANCE_SEC = 300
+
+# Resend event types that suppress an address
+SUPPRESSING_EVENTS = {"email.bounced", "email.complained"}
+
+# Group commit: most events written per fsync
+BATCH_MAX = 1000
+
+# Table header: magic, entry count, log bytes applied, slot count
+_MAGIC = b"DOESUP01"
+_HEADER = struct.Struct("<8sQQQ")
+_SLOT = struct.Struct("<Q")
+_INITIAL_SLOTS = 1 << 14
+_MAX_LOAD = 0.5
+
+_BLOOM_BITS_PER_SLOT = 8
+_BLOOM_HASHES = 6
+
+
+# =============================================================================
+# KEYS
+# =============================================================================
+
+def normalise_email(email: str) -> str:
+    """Trim and lowercase; IDN domains become punycode (matches list_hygiene output)."""
+    local, _, domain = email.strip().lower().rpartition("@")
+    if not domain.isascii():
+        try:
+            domain = domain.encode("idna").decode("ascii")
+        except UnicodeError:
+            pass
+    return f"{local}@{domain}"
+
+
+def email_digest(email: str) -> tuple[int, int]:
+    """Two independent 64-bit hashes of the normalised address (key, Bloom step)."""
+    digest = hashlib.blake2b(normalise_email(email).encode("utf-8"), digest_size=16).digest()
+    key, step = struct.unpack("<QQ", digest)
+    # 0 marks an empty slot
+    return key or 1, step | 1
+
+
+# =============================================================================
+# INDEX
+# =============================================================================
+
+class BloomFilter:
+    """In-memory Bloom filter using double hashing over the address digest."""
+
+    def __init__(self, bits: int):
+        self.bits = max(64, bits)
+        self.array = bytearray((self.bits + 7) // 8)
+
+    def add(self, key: int, step: int):
+        for i in range(_BLOOM_HASHES):
+            bit = (key + i * step) % self.bits
+            self.array[bit >> 3] |= 1 << (bit & 7)
+
+    def __contains__(self, digest: tuple[int, int]) -> bool:
+        key, step = digest
+        for i in range(_BLOOM_HASHES):
+            bit = (key + i * step) % self.bits
+            if not self.array[bit >> 3] & (1 << (bit & 7)):
+                return False
+        return True
+
+
+class SuppressionIndex:
+    """
+    Persistent set of suppressed addresses.
+
+    events.jsonl is the source of truth; index.bin is a memory-mapped
+    open-addressing table of 64-bit address hashes derived from it. The
+    table header records how much of the log it has applied, so a writer
+    that crashed between the two catches up on the next open.
+    """
+
+    def __init__(self, directory: str = SUPPRESSION_DIR, readonly: bool = False, bloom: bool = False):
+        self.dir = Path(directory)
+        self.log_path = self.dir / LOG_FILE
+        self.index_path = self.dir / INDEX_FILE
+        self.readonly = readonly
+        self.lock = threading.Lock()
+        self.file = None
+        self.map = None
+        self.slots = 0
+        self.count = 0
+        self.applied = 0
+        self.bloom = None
+        # Read-only: keys from log records the table hasn't applied yet
+        self.pending: set[int] = set()
+
+        if not readonly:
+            self.dir.mkdir(parents=True, exist_ok=True)
+            if not self.index_path.exists():
+                self._create(self.index_path, _INITIAL_SLOTS)
+        if self.index_path.exists():
+            self._map()
+            if not readonly:
+                self._catch_up()
+        if readonly:
+            self._read_pending()
+        if bloom:
+            self._build_bloom()
+
+    @classmethod
+    def open_readonly(cls, directory: str = SUPPRESSION_DIR, bloom: bool = True) -> "SuppressionIndex":
+        """Open for lookups only (importers, senders). A missing index is simply empty."""
+        return cls(directory, readonly=True, bloom=bloom)
+
+    # -- file handling --------------------------------------------------------
+
+    @staticmethod
+    def _create(path: Path, slots: int, count: int = 0, applied: int = 0):
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, count, applied, slots))
+            f.truncate(_HEADER.size + slots * _SLOT.size)
+
+    def _map(self):
+        self.file = open(self.index_path, "rb" if self.readonly else "r+b")
+        access = mmap.ACCESS_READ if self.readonly else mmap.ACCESS_WRITE
+        self.map = mmap.mmap(self.file.fileno(), 0, access=access)
+        magic, self.count, self.applied, self.slots = _HEADER.unpack_from(self.map, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{self.index_path} is not a suppression index")
+
+    def close(self):
+        if self.map is not None:
+            if not self.readonly:
+                self.map.flush()
+            self.map.close()
+            self.file.close()
+            self.map = None
+
+    def _write_header(self):
+        _HEADER.pack_into(self.map, 0, _MAGIC, self.count, self.applied, self.slots)
+
+    # -- table ------------------------------------------------------------------
+
+    def _probe(self, key: int) -> tuple[int, bool]:
+        """Return (slot offset, found) for a key using linear probing."""
+        mask = self.slots - 1
+        slot = key & mask
+        while True:
+            offset = _HEADER.size + slot * _SLOT.size
+            value = _SLOT.unpack_from(self.map, offset)[0]
+            if value == key:
+                return offset, True
+            if value == 0:
+                return offset, False
+            slot = (slot + 1) & mask
+
+    def _insert_key(self, key: int) -> bool:
+        offset, found = self._probe(key)
+        if found:
+            return False
+        _SLOT.pack_into(self.map, offset, key)
+        self.count += 1
+        return True
+
+    def _grow(self):
+        """
+        Rehash into a table twice the size. The new table is complete and
+        fsynced before os.replace swaps it in, so a crash leaves either the
+        old table or the new one, never a half-filled one.
+        """
+        slots = self.slots * 2
+        mask = slots - 1
+        table = bytearray(_HEADER.size + slots * _SLOT.size)
+        for i in range(self.slots):
+            key = _SLOT.unpack_from(self.map, _HEADER.size + i * _SLOT.size)[0]
+            if not key:
+                continue
+            slot = key & mask
+            while _SLOT.unpack_from(table, _HEADER.size + slot * _SLOT.size)[0]:
+                slot = (slot + 1) & mask
+            _SLOT.pack_into(table, _HEADER.size + slot * _SLOT.size, key)
+        _HEADER.pack_into(table, 0, _MAGIC, self.count, self.applied, slots)
+
+        tmp = self.index_path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(table)
+            f.flush()
+            os.fsync(f.fileno())
+        self.close()
+        os.replace(tmp, self.index_path)
+        if hasattr(os, "O_DIRECTORY"):
+            fd = os.open(self.dir, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        self._map()
+        if self.bloom is not None:
+            self._build_bloom()
+
+    def _build_bloom(self):
+        self.bloom = BloomFilter(max(self.slots, _INITIAL_SLOTS) * _BLOOM_BITS_PER_SLOT)
+        if not self.log_path.exists():
+            return
+        with open(self.log_path, "rb") as f:
+            for line in f:
+                try:
+                    self.bloom.add(*email_digest(json.loads(line)["email"]))
+                except (ValueError, KeyError):
+                    continue
+
+    def _apply(self, records: list[dict]):
+        for record in records:
+            if (self.count + 1) > self.slots * _MAX_LOAD:
+                self._grow()
+            key, step = email_digest(record["email"])
+            self._insert_key(key)
+            if self.bloom is not None:
+                self.bloom.add(key, step)
+
+    def _unapplied(self) -> tuple[list[dict], bytes, int]:
+        """Log records after the table's applied offset: (records, complete bytes, total bytes read)."""
+        if not self.log_path.exists() or self.applied >= self.log_path.stat().st_size:
+            return [], b"", 0
+        with open(self.log_path, "rb") as f:
+            f.seek(self.applied)
+            data = f.read()
+        complete = data[:data.rfind(b"\n") + 1]
+        records = []
+        for line in complete.splitlines():
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+        return records, complete, len(data)
+
+    def _catch_up(self):
+        """Apply log records written after the table was last updated."""
+        records, complete, read = self._unapplied()
+        if not read:
+            return
+        # Drop a torn final line from a crash mid-write so the next append starts cleanly
+        if len(complete) < read:
+            os.truncate(self.log_path, self.applied + len(complete))
+        self._apply(records)
+        self.applied += len(complete)
+        self._write_header()
+
+    def _read_pending(self):
+        """
+        Read-only counterpart of _catch_up: the table can't be written, so
+        suppressions still only in the log (a writer mid-batch, or one that
+        crashed before updating the table) are kept in memory instead.
+        """
+        records, _, _ = self._unapplied()
+        for record in records:
+            if "email" not in record:
+                continue
+            key = email_digest(record["email"])[0]
+            if key not in self.pending and not (self.map is not None and self._probe(key)[1]):
+                self.pending.add(key)
+                self.count += 1
+
+    # -- public API -------------------------------------------------------------
+
+    def is_suppressed(self, email: str) -> bool:
+        """O(1) membership check."""
+        if self.map is None and not self.pending:
+            return False
+        digest = email_digest(email)
+        if self.bloom is not None and digest not in self.bloom:
+            return False
+        return digest[0] in self.pending or (self.map is not None and self._probe(digest[0])[1])
+
+    def add(self, records: list[dict]) -> int:
+        """
+        Durably record suppressions: append to the log, fsync, then update
+        the table. Records need at least an "email" key.
+
+        Returns:
+            Number of addresses that were not already suppressed
+        """
+        if self.readonly:
+            raise PermissionError("Index opened read-only")
+        if not records:
+            return 0
+        with self.lock:
+            payload = b"".join(json.dumps(r, separators=(",", ":")).encode() + b"\n" for r in records)
+            with open(self.log_path, "ab") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            before = self.count
+            self._apply(records)
+            self.applied += len(payload)
+            self._write_header()
+            return self.count - before
+
+    def details(self, email: str) -> list[dict]:
+        """All log records for an address (linear scan; for humans, not hot paths)."""
+        target = normalise_email(email)
+        if not self.log_path.exists():
+            return []
+        found = []
+        with open(self.log_path, "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if normalise_email(record.get("email", "")) == target:
+                    found.append(record)
+        return found
+
+
+# =============================================================================
+# EVENTS
+# =============================================================================
+
+def suppression_records(event: dict) -> list[dict]:
+    """
+    Turn one Resend webhook event into suppression records.
+
+    Hard bounces and complaints suppress every recipient; transient bounces
+    and all other event types are ignored.
+    """
+    event_type = event.get("type", "")
+    if event_type not in SUPPRESSING_EVENTS:
+        return []
+    data = event.get("data") or {}
+    bounce = data.get("bounce") or {}
+    if event_type == "email.bounced" and str(bounce.get("type", "")).lower() in ("transient", "undetermined"):
+        return []
+
+    recipients = data.get("to") or []
+    if isinstance(recipients, str):
+        recipients = [recipients]
+    reason = "complaint" if event_type == "email.complained" else "hard_bounce"
+    return [{
+        "email": normalise_email(r),
+        "reason": reason,
+        "detail": bounce.get("message") or bounce.get("subType") or "",
+        "email_id": data.get("email_id", ""),
+        "event_at": event.get("created_at", ""),
+        "recorded_at": datetime.now().isoformat(),
+    } for r in recipients if "@" in r]
+
+
+def verify_signature(secret: str, headers, body: bytes, now: float | None = None) -> bool:
+    """Verify a Svix signature (Resend webhooks): HMAC-SHA256 over "id.timestamp.body"."""
+    msg_id = headers.get("svix-id")
+    timestamp = headers.get("svix-timestamp")
+    signatures = headers.get("svix-signature")
+    if not (msg_id and timestamp and signatures):
+        return False
+    try:
+        if abs((now or time.time()) - int(timestamp)) > SIGNATURE_TOLERANCE_SEC:
+            return False
+    except ValueError:
+        return False
+
+    key = base64.b64decode(secret.split("_", 1)[1] if secret.startswith("whsec_") else secret)
+    expected = base64.b64encode(hmac.new(key, f"{msg_id}.{timestamp}.".encode() + body, hashlib.sha256).digest())
+    for candidate in signatures.split():
+        version, _, signature = candidate.partition(",")
+        if version == "v1" and hmac.compare_digest(signature.encode(), expected):
+            return True
+    return False
+
+
+class Ingestor:
+    """
+    Group commit. Callers submit records and wait; a single writer thread
+    takes everything queued, writes it with one fsync, and releases the
+    callers. Under a burst, thousands of events share each fsync.
+    """
+
+    def __init__(self, index: SuppressionIndex):
+        self.index = index
+        self.pending = queue.Queue()
+        self.events = 0
+        self.suppressed = 0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, records: list[dict], timeout: float = 30) -> bool:
+        """Queue records and block until they are durable."""
+        done = threading.Event()
+        result = []
+        self.pending.put((records, done, result))
+        return done.wait(timeout) and result == [True]
+
+    def _run(self):
+        while True:
+            # Whatever queued up while the previous batch was being written goes in this one
+            batch = [self.pending.get()]
+            while len(batch) < BATCH_MAX:
+                try:
+                    batch.append(self.pending.get_nowait())
+                except queue.Empty:
+                    break
+            records = [r for item, _, _ in batch for r in item]
+            try:
+                self.suppressed += self.index.add(records)
+                ok = True
+            except OSError as e:
+                print(f"❌ Could not write suppression log: {e}")
+                ok = False
+            except Exception as e:
+                # Keep the writer alive: without it every later webhook gets a 503
+                print(f"❌ Could not apply suppressions: {e}")
+                ok = False
+            self.events += len(batch)
+            for _, done, result in batch:
+                result.append(ok)
+                done.set()
+
+
+class WebhookServer(ThreadingHTTPServer):
+    # Bursts open many connections at once; the default backlog of 5 resets them
+    request_queue_size = 256
+    daemon_threads = True
+
+
+def make_handler(ingestor: Ingestor, secret: str | None):
+    class WebhookHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are separate writes; avoid Nagle/delayed-ACK stalls on keep-alive
+        disable_nagle_algorithm = True
+
+        def _reply(self, code: int, body: dict):
+            payload = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._reply(200, {"status": "ok", "suppressed": ingestor.index.count, "events": ingestor.events})
+            else:
+                self._reply(404, {"error": "not found"})
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if secret and not verify_signature(secret, self.headers, body):
+                self._reply(401, {"error": "invalid signature"})
+                return
+            try:
+                event = json.loads(body)
+            except ValueError:
+                self._reply(400, {"error": "invalid JSON"})
+                return
+            # Only acknowledge once the event is on disk; Resend retries anything else
+            if not ingestor.submit(suppression_records(event) if isinstance(event, dict) else []):
+                self._reply(503, {"error": "ingest timeout"})
+                return
+            self._reply(200, {"received": True})
+
+        def log_message(self, format, *args):
+            pass
+
+    return WebhookHandler
+
+
+def read_events(path: str):
+    """Yield events from a JSON array file or a JSON-lines file."""
+    with open(path, encoding="utf-8") as f:
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+        f.seek(0)
+        if first == "[":
+            yield from json.load(f)
+            return
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+def run_benchmark(n: int, clients: int) -> dict:
+    """Ingest n bounce events over HTTP with concurrent clients, then time lookups."""
+    import http.client
+    import shutil
+    import tempfile
+
+    directory = tempfile.mkdtemp(prefix="suppression-bench-")
+    try:
+        index = SuppressionIndex(directory, bloom=True)
+        ingestor = Ingestor(index)
+        server = WebhookServer(("127.0.0.1", 0), make_handler(ingestor, None))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_address[1]
+
+        def client(worker: int):
+            conn = http.client.HTTPConnection("127.0.0.1", port)
+            for i in range(worker, n, clients):
+                event = {"type": "email.bounced", "created_at": datetime.now().isoformat(),
+                         "data": {"email_id": str(i), "to": [f"bounce{i}@example.com"],
+                                  "bounce": {"type": "Permanent", "message": "Mailbox does not exist"}}}
+                conn.request("POST", "/", json.dumps(event), {"Content-Type": "application/json"})
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    raise RuntimeError(f"Webhook returned {response.status}")
+            conn.close()
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=client, args=(w,)) for w in range(clients)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        ingest = time.perf_counter() - start
+        server.shutdown()
+
+        index.close()
+        reader = SuppressionIndex.open_readonly(directory)
+        lookups = [f"bounce{i}@example.com" for i in range(n)] + [f"fine{i}@example.com" for i in range(n)]
+        start = time.perf_counter()
+        hits = sum(reader.is_suppressed(e) for e in lookups)
+        lookup = time.perf_counter() - start
+
+        return {
+            "events": n,
+            "stored": reader.count,
+            "lookup_hits": hits,
+            "ingest_per_sec": round(n / ingest),
+            "lookup_us": round(lookup / len(lookups) * 1e6, 2),
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Ingest Resend bounce/complaint events into a persistent suppression index.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--dir", default=SUPPRESSION_DIR, help=f"Index directory (default: {SUPPRESSION_DIR})")
+    parser.add_argument("--benchmark", type=int, metavar="EVENTS", help="Measure webhook ingest and lookup speed")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent webhook clients for --benchmark (default: 8)")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    serve_parser = subparsers.add_parser("serve", help="Run the webhook receiver")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Bind host (default: 127.0.0.1)")
+    serve_parser.add_argument("--port", type=int, default=8787, help="Bind port (default: 8787)")
+
+    replay_parser = subparsers.add_parser("replay", help="Ingest events from a file")
+    replay_parser.add_argument("file", help="JSON array or JSON-lines file of Resend events")
+
+    add_parser = subparsers.add_parser("add", help="Suppress addresses manually")
+    add_parser.add_argument("emails", nargs="+", help="Addresses to suppress")
+    add_parser.add_argument("--reason", default="manual", help="Reason to record (default: manual)")
+
+    check_parser = subparsers.add_parser("check", help="Check whether addresses are suppressed")
+    check_parser.add_argument("emails", nargs="+", help="Addresses to check")
+
+    subparsers.add_parser("stats", help="Show index size")
+
+    args = parser.parse_args()
+
+    print(f"[suppression] v{DOE_VERSION}")
+    print()
+
+    try:
+        if args.benchmark:
+            print(f"⏱️  Posting {args.benchmark:,} events with {args.clients} clients...")
+            r = run_benchmark(args.benchmark, args.clients)
+            print()
+            print("RESULTS")
+            print("-" * 40)
+            print(f"  Stored: {r['stored']:,} / {r['events']:,} events (lookup hits: {r['lookup_hits']:,})")
+            print(f"  Webhook ingest: {r['ingest_per_sec']:,} events/s (durable before ack)")
+            print(f"  Lookup: {r['lookup_us']} µs per address")
+            return 0 if r["stored"] == r["events"] == r["lookup_hits"] else 1
+
+        if args.command == "serve":
+            index = SuppressionIndex(args.dir, bloom=True)
+            ingestor = Ingestor(index)
+            server = WebhookServer((args.host, args.port), make_handler(ingestor, WEBHOOK_SECRET))
+            print(f"📥 Listening on http://{args.host}:{args.port}/ ({index.count:,} addresses suppressed)")
+            if not WEBHOOK_SECRET:
+                print("⚠️ RESEND_WEBHOOK_SECRET not set - signatures are not verified")
+            try:
+                server.serve_forever()
+            finally:
+                server.server_close()
+                index.close()
+
+        elif args.command == "replay":
+            index = SuppressionIndex(args.dir)
+            events = added = 0
+            batch = []
+            for event in read_events(args.file):
+                events += 1
+                batch.extend(suppression_records(event))
+                if len(batch) >= BATCH_MAX:
+                    added += index.add(batch)
+                    batch = []
+            added += index.add(batch)
+            index.close()
+            print(f"✅ Replayed {events:,} events, {added:,} new suppressions")
+
+        elif args.command == "add":
+            index = SuppressionIndex(args.dir)
+            now = datetime.now().isoformat()
+            added = index.add([{"email": normalise_email(e), "reason": args.reason, "recorded_at": now}
+                               for e in args.emails])
+            index.close()
+            print(f"✅ {added} new suppressions")
+
+        elif args.command == "check":
+            index = SuppressionIndex.open_readonly(args.dir, bloom=False)
+            for email in args.emails:
+                if index.is_suppressed(email):
+                    reasons = sorted({d.get("reason", "") for d in index.details(email)})
+                    print(f"  ⛔ {email}: suppressed ({', '.join(reasons)})")
+                else:
+                    print(f"  ✅ {email}: ok")
+
+        elif args.command == "stats":
+            index = SuppressionIndex.open_readonly(args.dir, bloom=False)
+            print(f"  Suppressed addresses: {index.count:,}")
+            print(f"  Table slots: {index.slots:,}")
+            print(f"  Log: {index.log_path} ({index.log_path.stat().st_size if index.log_path.exists() else 0:,} bytes)")
+
+        else:
+            parser.print_help()
+        return 0
+
+    except KeyboardInterrupt:
+        print("\n⚠️ Stopped")
+        return 130
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -32,15 +32,14 @@ Usage:
     python execution/sync_agent_files.py --sync --backup
 """
 
-import os
 import sys
 import argparse
-import difflib
-import shutil
 import re
 from datetime import datetime
 from pathlib import Path
 
+from doe_bootstrap import profile_startup, serve_from_daemon
+
 # =============================================================================
 # VERSION - Must match directive version
 # =============================================================================
@@ -199,6 +198,8 @@ def check_sync() -> dict:
 
 def show_diff(file1: str, file2: str) -> None:
     """Show diff between two files."""
+    import difflib
+
     path1, path2 = Path(file1), Path(file2)
     
     content1 = get_file_content(path1)
@@ -241,6 +242,8 @@ def show_diff(file1: str, file2: str) -> None:
 
 def create_backup(filename: str) -> str | None:
     """Create a timestamped backup of a file."""
+    import shutil
+
     filepath = Path(filename)
     if not filepath.exists():
         return None
@@ -502,11 +505,41 @@ def ensure_all_files_exist() -> dict:
     return result
 
 
+def report_check() -> int:
+    """Print the --check report. Returns 0 if in sync, 1 otherwise."""
+    result = check_sync()
+
+    print("SYNC STATUS")
+    print("-" * 40)
+
+    if result["missing"]:
+        print(f"❌ Missing files: {', '.join(result['missing'])}")
+
+    for filename, info in result["files"].items():
+        if info["exists"]:
+            is_source = " (would be source)" if filename == result["detected_source"] else ""
+            print(f"  {filename}: {info['hash']} [{info['mtime']}]{is_source}")
+        else:
+            print(f"  {filename}: MISSING")
+
+    print()
+    if result["in_sync"]:
+        print("✅ All files are in sync")
+    else:
+        print(f"⚠️  Files are NOT in sync.")
+        print(f"   Detected source: {result['detected_source']} ({result['source_reason']})")
+        print(f"   Run --sync to propagate from {result['detected_source']} to others.")
+
+    return 0 if result["in_sync"] else 1
+
+
 # =============================================================================
 # MAIN
 # =============================================================================
 
 def main():
+    profile_startup()
+
     parser = argparse.ArgumentParser(
         description="Sync and maintain agent instruction files. Auto-detects which file was most recently modified and syncs from that source.",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -595,30 +628,9 @@ Default fallback source: {DEFAULT_SOURCE}
         return 0
     
     if args.check:
-        result = check_sync()
-
-        print("SYNC STATUS")
-        print("-" * 40)
-
-        if result["missing"]:
-            print(f"❌ Missing files: {', '.join(result['missing'])}")
-
-        for filename, info in result["files"].items():
-            if info["exists"]:
-                is_source = " (would be source)" if filename == result["detected_source"] else ""
-                print(f"  {filename}: {info['hash']} [{info['mtime']}]{is_source}")
-            else:
-                print(f"  {filename}: MISSING")
-
-        print()
-        if result["in_sync"]:
-            print("✅ All files are in sync")
-        else:
-            print(f"⚠️  Files are NOT in sync.")
-            print(f"   Detected source: {result['detected_source']} ({result['source_reason']})")
-            print(f"   Run --sync to propagate from {result['detected_source']} to others.")
-
-        return 0 if result["in_sync"] else 1
+        # Answered by the DOE command server when it is running, in-process otherwise
+        exit_code = serve_from_daemon({"command": "check"})
+        return report_check() if exit_code is None else exit_code
 
     if args.diff:
         # Show diffs between all pairs
@@ -0,0 +1,515 @@
+#!/usr/bin/env python3
+"""
+Script: template_render.py
+Directive: directives/template_render.md
+DOE Framework: v2.0.0
+
+Purpose:
+    Render personalised campaign emails without re-processing the whole
+    template per subscriber. Each template (Listmonk-style tags such as
+    {{ .Subscriber.FirstName }}) is compiled once into a format program of
+    static fragments and slots; MIME headers and part boundaries are built
+    once per campaign. Per subscriber only the slot values are filled in
+    and the body parts encoded. Large batches are split across a process
+    pool.
+
+Cost:
+    Free (local CPU only)
+
+Usage:
+    # Preview the first rendered message for a list
+    python execution/template_render.py --from "Andre <hello@mail.callvaultai.com>" \\
+        --subject "Hi {{ .Subscriber.FirstName }}" --html body.html --list .tmp/hygiene/clean.csv --preview 1
+
+    # Renders/sec for the warm (1k) and dormant (20k) list sizes
+    python execution/template_render.py --benchmark
+"""
+
+import os
+import re
+import sys
+import csv
+import html
+import json
+import time
+import random
+import argparse
+import binascii
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from email import message_from_bytes, policy
+from email.header import Header
+from email.message import EmailMessage
+from email.utils import formataddr, formatdate, parseaddr
+from functools import lru_cache
+from pathlib import Path
+
+# =============================================================================
+# VERSION - Must match directive version
+# =============================================================================
+DOE_VERSION = "2026.10.19"
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+# Below this many messages a process pool costs more than it saves
+PARALLEL_THRESHOLD = 5000
+CHUNK_SIZE = 2000
+
+# List sizes from SPEC.md (warm ~1k, dormant ~20k)
+BENCHMARK_SIZES = [1000, 20000]
+
+TAG_RE = re.compile(r"\{\{\s*(.*?)\s*\}\}")
+
+# Never allowed in a header value (header injection from imported names/attributes)
+CONTROL_RE = re.compile(r"[\x00-\x08\x0a-\x1f\x7f]")
+
+# Tags resolved per subscriber
+SUBSCRIBER_FIELDS = {
+    ".Subscriber.Email": lambda s: s["email"],
+    ".Subscriber.Name": lambda s: s["name"],
+    ".Subscriber.FirstName": lambda s: s["name"].split(" ", 1)[0],
+    ".Subscriber.LastName": lambda s: s["name"].rpartition(" ")[2] if " " in s["name"] else "",
+    ".Subscriber.UUID": lambda s: s["uuid"],
+    # Shorthand used by warmup_scheduler bodies
+    "name": lambda s: s["name"].split(" ", 1)[0] or "there",
+}
+
+# Tags that are the same for every subscriber in a campaign
+CAMPAIGN_FIELDS = {
+    ".Campaign.Name": "name",
+    ".Campaign.Subject": "subject",
+    ".Campaign.FromEmail": "from_email",
+}
+
+
+class TemplateError(ValueError):
+    """Template contains a tag this renderer does not understand."""
+
+
+# =============================================================================
+# COMPILATION
+# =============================================================================
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """A template reduced to a str.format program: static text plus numbered slots."""
+    program: str
+    slots: tuple[str, ...]
+    escape: bool
+
+    def render(self, values: dict[str, str]) -> str:
+        if not self.slots:
+            return self.program
+        if self.escape:
+            return self.program.format(*[html.escape(values[s]) for s in self.slots])
+        return self.program.format(*[values[s] for s in self.slots])
+
+
+@lru_cache(maxsize=64)
+def compile_template(source: str, campaign: tuple = (), escape: bool = False) -> CompiledTemplate:
+    """
+    Compile a template once. Campaign-level tags are folded into the static
+    text; subscriber tags become slots.
+
+    Args:
+        source: Template text
+        campaign: Campaign fields as a tuple of (key, value) pairs (hashable for the cache)
+        escape: HTML-escape slot values (for HTML bodies)
+
+    Raises:
+        TemplateError: on an unknown tag
+    """
+    campaign = dict(campaign)
+    program = []
+    slots = []
+    last = 0
+    for match in TAG_RE.finditer(source):
+        program.append(source[last:match.start()].replace("{", "{{").replace("}", "}}"))
+        tag = match.group(1)
+        last = match.end()
+
+        if tag in CAMPAIGN_FIELDS:
+            value = str(campaign.get(CAMPAIGN_FIELDS[tag], ""))
+            value = html.escape(value) if escape else value
+            program.append(value.replace("{", "{{").replace("}", "}}"))
+            continue
+        if not (tag in SUBSCRIBER_FIELDS or tag == "UnsubscribeURL" or tag.startswith(".Subscriber.Attribs.")):
+            raise TemplateError(f"Unsupported template tag: {{{{ {tag} }}}}")
+        if tag not in slots:
+            slots.append(tag)
+        program.append("{" + str(slots.index(tag)) + "}")
+    program.append(source[last:].replace("{", "{{").replace("}", "}}"))
+    return CompiledTemplate("".join(program), tuple(slots), escape)
+
+
+def slot_values(subscriber: dict, slots: set[str], unsubscribe_base: str) -> dict[str, str]:
+    """Resolve every slot used by a campaign for one subscriber."""
+    values = {}
+    for tag in slots:
+        if tag in SUBSCRIBER_FIELDS:
+            values[tag] = SUBSCRIBER_FIELDS[tag](subscriber)
+        elif tag == "UnsubscribeURL":
+            values[tag] = f"{unsubscribe_base}/{subscriber['uuid']}"
+        else:
+            values[tag] = str(subscriber["attribs"].get(tag[len(".Subscriber.Attribs."):], ""))
+    return values
+
+
+def normalise_subscriber(row: dict) -> dict:
+    """Accept Listmonk API subscribers ({attribs: {...}}) or CSV rows ({attributes: "json"})."""
+    attribs = row.get("attribs")
+    if attribs is None:
+        raw = row.get("attributes") or "{}"
+        try:
+            attribs = json.loads(raw) if isinstance(raw, str) else raw
+        except json.JSONDecodeError:
+            attribs = {}
+    return {
+        "email": row["email"],
+        "name": row.get("name") or "",
+        "uuid": row.get("uuid") or "",
+        "attribs": attribs if isinstance(attribs, dict) else {},
+    }
+
+
+# =============================================================================
+# MIME ASSEMBLY
+# =============================================================================
+
+@dataclass(frozen=True)
+class CampaignTemplate:
+    """Everything needed to render one campaign. Picklable, so it can be sent to pool workers."""
+    sender: str
+    subject: str
+    html: str | None = None
+    text: str | None = None
+    campaign: dict = field(default_factory=dict)
+    unsubscribe_base: str = ""
+
+
+def _qp(text: str) -> bytes:
+    """Quoted-printable body with CRLF line endings."""
+    return binascii.b2a_qp(text.encode("utf-8")).replace(b"\r\n", b"\n").replace(b"\n", b"\r\n")
+
+
+def _clean(value: str) -> str:
+    """Replace CR, LF and other control characters, so subscriber data can't add header lines."""
+    return CONTROL_RE.sub(" ", value)
+
+
+def _header(name: str, value: str) -> bytes:
+    value = _clean(value)
+    if value.isascii():
+        return f"{name}: {value}\r\n".encode()
+    return f"{name}: {Header(value, 'utf-8').encode()}\r\n".encode()
+
+
+class MessageRenderer:
+    """
+    Render complete RFC 5322 messages for one campaign.
+
+    Everything that does not depend on the subscriber (From, MIME-Version,
+    multipart boundary, part headers, the subject when it has no slots) is
+    encoded to bytes once in __init__.
+    """
+
+    def __init__(self, template: CampaignTemplate):
+        if not template.html and not template.text:
+            raise TemplateError("Template needs an HTML or a text body")
+        campaign = tuple(sorted(template.campaign.items()))
+        self.template = template
+        self.subject = compile_template(template.subject, campaign)
+        self.html = compile_template(template.html, campaign, escape=True) if template.html else None
+        self.text = compile_template(template.text, campaign) if template.text else None
+        self.slots = set(self.subject.slots)
+        for part in (self.html, self.text):
+            if part:
+                self.slots.update(part.slots)
+        self.unsubscribe_base = template.unsubscribe_base.rstrip("/")
+
+        name, addr = parseaddr(template.sender)
+        self.domain = addr.rpartition("@")[2] or "localhost"
+        self.msgid_prefix = f"{random.getrandbits(48):012x}.{os.getpid()}"
+        self.counter = itertools.count()
+        self.date_second = None
+        self.date_header = b""
+
+        self.static_subject = _header("Subject", self.subject.program.format()) if not self.subject.slots else None
+        boundary = f"=_doe_{random.getrandbits(64):016x}"
+        part_header = (b"Content-Transfer-Encoding: quoted-printable\r\n"
+                       b"Content-Type: text/%s; charset=\"utf-8\"\r\n\r\n")
+        self.head = (_header("From", formataddr((name, addr), charset="utf-8")) + b"MIME-Version: 1.0\r\n")
+        if self.html and self.text:
+            self.head += f'Content-Type: multipart/alternative; boundary="{boundary}"\r\n\r\n'.encode()
+            self.text_open = f"--{boundary}\r\n".encode() + part_header % b"plain"
+            self.html_open = f"\r\n--{boundary}\r\n".encode() + part_header % b"html"
+            self.close = f"\r\n--{boundary}--\r\n".encode()
+        else:
+            kind = b"html" if self.html else b"plain"
+            self.head += part_header % kind
+            self.text_open = self.html_open = b""
+            self.close = b""
+
+    def _date(self) -> bytes:
+        now = int(time.time())
+        if now != self.date_second:
+            self.date_second = now
+            self.date_header = f"Date: {formatdate(now, localtime=True)}\r\n".encode()
+        return self.date_header
+
+    def render(self, row: dict) -> bytes:
+        """Render one subscriber's message as SMTP-ready bytes."""
+        subscriber = normalise_subscriber(row)
+        values = slot_values(subscriber, self.slots, self.unsubscribe_base)
+
+        to = formataddr((_clean(subscriber["name"]), _clean(subscriber["email"])), charset="utf-8")
+        parts = [
+            _header("To", to),
+            self.static_subject or _header("Subject", self.subject.render(values)),
+            self._date(),
+            f"Message-ID: <{self.msgid_prefix}.{next(self.counter)}@{self.domain}>\r\n".encode(),
+            self.head,
+        ]
+        if self.html and self.text:
+            parts += [self.text_open, _qp(self.text.render(values)),
+                      self.html_open, _qp(self.html.render(values)), self.close]
+        else:
+            parts.append(_qp((self.html or self.text).render(values)))
+        return b"".join(parts)
+
+
+# =============================================================================
+# BATCH RENDERING
+# =============================================================================
+
+_worker_renderer: MessageRenderer | None = None
+
+
+def _init_worker(template: CampaignTemplate):
+    global _worker_renderer
+    _worker_renderer = MessageRenderer(template)
+
+
+def _render_chunk(rows: list[dict]) -> list[bytes]:
+    return [_worker_renderer.render(r) for r in rows]
+
+
+def render_many(template: CampaignTemplate, rows: list[dict], workers: int | None = None) -> list[bytes]:
+    """
+    Render a whole list. Batches of PARALLEL_THRESHOLD or more are split into
+    chunks across a process pool (each worker compiles the template once);
+    smaller batches render in-process.
+
+    Args:
+        template: Campaign template
+        rows: Subscribers (Listmonk API objects or CSV rows)
+        workers: Pool size (default: CPU count; 1 forces in-process rendering)
+
+    Returns:
+        Rendered messages, in input order
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(rows) < PARALLEL_THRESHOLD:
+        renderer = MessageRenderer(template)
+        return [renderer.render(r) for r in rows]
+
+    chunks = [rows[i:i + CHUNK_SIZE] for i in range(0, len(rows), CHUNK_SIZE)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(template,)) as pool:
+        return [message for chunk in pool.map(_render_chunk, chunks) for message in chunk]
+
+
+def render_naive(template: CampaignTemplate, row: dict) -> bytes:
+    """Reference renderer: substitute tags in the full template and build a fresh EmailMessage."""
+    subscriber = normalise_subscriber(row)
+    unsubscribe_base = template.unsubscribe_base.rstrip("/")
+
+    def substitute(source: str, escape: bool) -> str:
+        def replace(match):
+            tag = match.group(1)
+            if tag in CAMPAIGN_FIELDS:
+                value = str(template.campaign.get(CAMPAIGN_FIELDS[tag], ""))
+            else:
+                value = slot_values(subscriber, {tag}, unsubscribe_base)[tag]
+            return html.escape(value) if escape else value
+        return TAG_RE.sub(replace, source)
+
+    msg = EmailMessage()
+    msg["To"] = formataddr((subscriber["name"], subscriber["email"]))
+    msg["Subject"] = substitute(template.subject, False)
+    msg["From"] = template.sender
+    if template.text:
+        msg.set_content(substitute(template.text, False))
+        if template.html:
+            msg.add_alternative(substitute(template.html, True), subtype="html")
+    else:
+        msg.set_content(substitute(template.html, True), subtype="html")
+    return msg.as_bytes(policy=policy.SMTP)
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+SAMPLE_HTML = """<!doctype html>
+<html><body style="font-family: Arial, sans-serif; margin: 0 auto; max-width: 600px">
+<p>Hi {{ .Subscriber.FirstName }},</p>
+<p>It has been a while since we last spoke. {{ .Campaign.Name }} is back with a few updates
+that we think are relevant to your work in {{ .Subscriber.Attribs.city }}.</p>
+""" + "<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt ut labore et dolore magna aliqua.</p>\n" * 30 + """
+<p>If you would rather not hear from us, <a href="{{ UnsubscribeURL }}">unsubscribe here</a>.</p>
+<p style="color: #888">Sent to {{ .Subscriber.Email }}</p>
+</body></html>
+"""
+
+SAMPLE_TEXT = re.sub(r"<[^>]+>", "", SAMPLE_HTML)
+
+
+def synthetic_subscribers(n: int, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    first = ["Ana", "Ben", "Chloé", "Dev", "Eli", "Fatima", "Greg", "Hana", "Ivan", "José"]
+    cities = ["Lisbon", "Austin", "Zürich", "Leeds", "Pune"]
+    return [{
+        "email": f"user{i}@example.com",
+        "name": f"{rng.choice(first)} Tester{i}",
+        "uuid": f"{rng.getrandbits(128):032x}",
+        "attribs": {"city": rng.choice(cities)},
+    } for i in range(n)]
+
+
+def _decoded(message: bytes) -> tuple:
+    msg = message_from_bytes(message, policy=policy.default)
+    bodies = tuple(part.get_content() for part in msg.walk() if not part.is_multipart())
+    return str(msg["To"]), str(msg["Subject"]), bodies
+
+
+def run_benchmark(sizes: list[int], workers: int | None) -> dict:
+    template = CampaignTemplate(
+        sender="Andre <hello@mail.example.com>",
+        subject="{{ .Subscriber.FirstName }}, still interested?",
+        html=SAMPLE_HTML, text=SAMPLE_TEXT,
+        campaign={"name": "Spring update"},
+        unsubscribe_base="https://listmonk.example.com/subscription/campaign-uuid",
+    )
+
+    # Both renderers must produce the same decoded content
+    sample = synthetic_subscribers(50)
+    renderer = MessageRenderer(template)
+    for row in sample:
+        if _decoded(renderer.render(row)) != _decoded(render_naive(template, row)):
+            raise RuntimeError(f"Compiled and reference output differ for {row['email']}")
+
+    # Subscriber data must not be able to add headers
+    hostile = {"email": "eve@example.com", "name": "Eve\r\nBcc: victim@example.com",
+               "uuid": "0", "attribs": {"city": "Leeds\nBcc: victim@example.com"}}
+    injected = MessageRenderer(replace(template, subject="Hi {{ .Subscriber.Name }} {{ .Subscriber.Attribs.city }}"))
+    headers = message_from_bytes(injected.render(hostile), policy=policy.default)
+    if headers["Bcc"] is not None or headers.get_all("Subject") != [
+            "Hi Eve  Bcc: victim@example.com Leeds Bcc: victim@example.com"]:
+        raise RuntimeError("Subscriber data injected a header")
+
+    results = {}
+    for n in sizes:
+        rows = synthetic_subscribers(n)
+        start = time.perf_counter()
+        for row in rows:
+            render_naive(template, row)
+        naive = time.perf_counter() - start
+
+        start = time.perf_counter()
+        render_many(template, rows, workers=1)
+        compiled = time.perf_counter() - start
+
+        start = time.perf_counter()
+        render_many(template, rows, workers=workers)
+        pooled = time.perf_counter() - start
+
+        results[n] = {
+            "naive_per_sec": round(n / naive),
+            "compiled_per_sec": round(n / compiled),
+            "render_many_per_sec": round(n / pooled),
+            "speedup": round(naive / min(compiled, pooled), 1),
+        }
+    return results
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compile campaign templates once and render personalised messages fast.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--from", dest="sender", help='From header, e.g. "Name <hello@mail.example.com>"')
+    parser.add_argument("--subject", help="Subject template")
+    parser.add_argument("--html", help="HTML body template file")
+    parser.add_argument("--text", help="Plain-text body template file")
+    parser.add_argument("--campaign-name", default="", help="Value for {{ .Campaign.Name }}")
+    parser.add_argument("--unsubscribe-base", default="", help="URL prefix for {{ UnsubscribeURL }} (subscriber UUID is appended)")
+    parser.add_argument("--list", help="Subscribers CSV (email,name,attributes)")
+    parser.add_argument("--preview", type=int, default=1, help="Print the first N rendered messages (default: 1)")
+    parser.add_argument("--workers", type=int, help="Process pool size (default: CPU count)")
+    parser.add_argument("--benchmark", action="store_true", help="Report renders/sec for 1k and 20k synthetic subscribers")
+
+    args = parser.parse_args()
+
+    print(f"[template_render] v{DOE_VERSION}")
+    print()
+
+    try:
+        if args.benchmark:
+            print(f"⏱️  Rendering {', '.join(str(n) for n in BENCHMARK_SIZES)} messages "
+                  f"(workers: {args.workers or os.cpu_count()})...")
+            results = run_benchmark(BENCHMARK_SIZES, args.workers)
+            print()
+            print(f"{'Messages':>10} {'Naive/s':>10} {'Compiled/s':>12} {'render_many/s':>14} {'Speedup':>8}")
+            print("-" * 58)
+            for n, r in results.items():
+                print(f"{n:>10,} {r['naive_per_sec']:>10,} {r['compiled_per_sec']:>12,} "
+                      f"{r['render_many_per_sec']:>14,} {r['speedup']:>7}x")
+            return 0
+
+        if not (args.sender and args.subject and (args.html or args.text) and args.list):
+            parser.error("--from, --subject, --list and --html or --text are required (or use --benchmark)")
+
+        template = CampaignTemplate(
+            sender=args.sender,
+            subject=args.subject,
+            html=Path(args.html).read_text(encoding="utf-8") if args.html else None,
+            text=Path(args.text).read_text(encoding="utf-8") if args.text else None,
+            campaign={"name": args.campaign_name, "subject": args.subject},
+            unsubscribe_base=args.unsubscribe_base,
+        )
+        with open(args.list, newline="", encoding="utf-8-sig") as f:
+            rows = [r for r in csv.DictReader(f) if r.get("email")]
+
+        start = time.perf_counter()
+        messages = render_many(template, rows, workers=args.workers)
+        elapsed = time.perf_counter() - start
+
+        for message in messages[:args.preview]:
+            print(message.decode("utf-8", "replace"))
+            print("=" * 60)
+        print(f"✅ Rendered {len(messages)} messages in {elapsed:.2f}s "
+              f"({len(messages) / elapsed if elapsed else 0:,.0f}/s)")
+        return 0
+
+    except TemplateError as e:
+        print(f"❌ Template error: {e}")
+        return 1
+
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted")
+        return 130
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,725 @@
+#!/usr/bin/env python3
+"""
+Script: warmup_scheduler.py
+Directive: directives/warmup_scheduler.md
+DOE Framework: v2.0.0
+
+Purpose:
+    Pace warm and dormant campaign sends so a 10-20k list never goes out
+    in one blast. Recipients are queued locally (SQLite), released in
+    batches under a per-sending-domain ramp-up curve, and dispatched by a
+    worker pool that shares a token bucket per Resend key.
+
+    The queue survives crashes: re-running `run` picks up where it stopped.
+    Every send is also recorded in the send journal (send_journal.py)
+    before and after the SMTP transaction, so a restart never mails anyone
+    the crashed run already reached. Sends cut off mid-transaction are
+    held as "uncertain" instead of being repeated.
+
+Cost:
+    Resend per-email pricing (plan dependent). No other API costs.
+
+Usage:
+    # Queue a cleaned list for a campaign
+    python execution/warmup_scheduler.py enqueue .tmp/hygiene/clean.csv --campaign dormant-jan
+
+    # Send today's allowance (ramp-up curve decides how many)
+    python execution/warmup_scheduler.py run --campaign dormant-jan \\
+        --from "Andre <hello@mail.callvaultai.com>" --subject "Still there?" --body body.html
+
+    # Check progress and today's quota
+    python execution/warmup_scheduler.py status --campaign dormant-jan
+
+    # Measure throughput against a local SMTP sink (no real email sent)
+    python execution/warmup_scheduler.py sink --port 8025
+    python execution/warmup_scheduler.py run --campaign test --smtp-host localhost --smtp-port 8025 --no-tls ...
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import sqlite3
+import smtplib
+import argparse
+import threading
+from datetime import datetime, date
+from email.utils import parseaddr
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from cost_meter import CostMeter, BudgetExceeded
+from send_journal import ATTEMPT, JOURNAL_PATH, SENT, InvalidRecord, JournalError, SendJournal
+from suppression import SuppressionIndex
+from template_render import CampaignTemplate, MessageRenderer, TemplateError
+
+load_dotenv()
+
+# =============================================================================
+# VERSION - Must match directive version
+# =============================================================================
+DOE_VERSION = "2026.10.19"
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+QUEUE_DB = ".tmp/send_queue.db"
+METRICS_LOG = ".tmp/send_metrics.jsonl"
+
+# Resend SMTP (see SPEC.md decision 2)
+SMTP_HOST = os.getenv("RESEND_SMTP_HOST", "smtp.resend.com")
+SMTP_PORT = int(os.getenv("RESEND_SMTP_PORT", "465"))
+SMTP_USER = "resend"
+
+# One key is enough; several keys (comma-separated) get one bucket each
+RESEND_API_KEYS = [k.strip() for k in os.getenv("RESEND_API_KEYS", os.getenv("RESEND_API_KEY", "")).split(",") if k.strip()]
+
+# Daily cap per sending domain, indexed by days since that domain's first send.
+# After the last step the final value applies.
+DEFAULT_RAMP = [50, 100, 200, 400, 750, 1500, 3000, 5000, 8000, 12000, 20000]
+
+# Messages per second per Resend key
+DEFAULT_RATE = 2.0
+
+# Metered per sent message, so cost_budgets.json can cap a run (plan dependent)
+RESEND_COST_PER_EMAIL = float(os.getenv("RESEND_COST_PER_EMAIL", "0"))
+
+HTML_FALLBACK_TEXT = "This message requires an HTML-capable email client."
+
+
+# =============================================================================
+# QUEUE
+# =============================================================================
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    campaign TEXT NOT NULL,
+    email TEXT NOT NULL,
+    name TEXT,
+    attributes TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    sent_at TEXT,
+    UNIQUE (campaign, email)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_pending ON jobs (campaign, status, id);
+
+CREATE TABLE IF NOT EXISTS domain_usage (
+    domain TEXT NOT NULL,
+    day TEXT NOT NULL,
+    sent INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (domain, day)
+);
+"""
+
+
+class SendQueue:
+    """SQLite-backed queue. One connection, shared across worker threads under a lock."""
+
+    def __init__(self, path: str = QUEUE_DB):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+
+    def enqueue(self, campaign: str, rows: list[dict]) -> int:
+        """Add recipients; addresses already queued for the campaign are skipped."""
+        with self.lock:
+            before = self.conn.total_changes
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO jobs (campaign, email, name, attributes) VALUES (?, ?, ?, ?)",
+                [(campaign, r["email"], r.get("name", ""), r.get("attributes", "")) for r in rows],
+            )
+            self.conn.execute("COMMIT")
+            return self.conn.total_changes - before
+
+    def requeue_uncertain(self, campaign: str) -> int:
+        """Return jobs held as 'uncertain' to the pending queue (they will be sent again)."""
+        with self.lock:
+            cur = self.conn.execute(
+                "UPDATE jobs SET status = 'pending' WHERE campaign = ? AND status = 'uncertain'", (campaign,))
+            return cur.rowcount
+
+    def requeue_deferred(self, campaign: str) -> int:
+        """Return jobs a previous run deferred (temporary failures) to the pending queue."""
+        with self.lock:
+            cur = self.conn.execute(
+                "UPDATE jobs SET status = 'pending' WHERE campaign = ? AND status = 'deferred'", (campaign,))
+            return cur.rowcount
+
+    def recover(self, campaign: str) -> int:
+        """Return jobs left 'sending' by a crashed run to the pending queue."""
+        with self.lock:
+            cur = self.conn.execute(
+                "UPDATE jobs SET status = 'pending' WHERE campaign = ? AND status = 'sending'", (campaign,))
+            return cur.rowcount
+
+    def claim_batch(self, campaign: str, limit: int) -> list[tuple]:
+        """Mark up to `limit` pending jobs as 'sending' and return them."""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            rows = self.conn.execute(
+                "SELECT id, email, name, attributes FROM jobs "
+                "WHERE campaign = ? AND status = 'pending' ORDER BY id LIMIT ?",
+                (campaign, limit),
+            ).fetchall()
+            self.conn.executemany(
+                "UPDATE jobs SET status = 'sending', attempts = attempts + 1 WHERE id = ?",
+                [(r[0],) for r in rows],
+            )
+            self.conn.execute("COMMIT")
+            return rows
+
+    def mark(self, job_id: int, status: str, domain: str, error: str | None = None, count_quota: bool = True):
+        """
+        Record the outcome of one send. A "sent" counts against today's domain
+        quota unless count_quota is False (a send recovered from an earlier run).
+        """
+        now = datetime.now()
+        with self.lock:
+            self.conn.execute("BEGIN")
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, sent_at = ? WHERE id = ?",
+                (status, error, now.isoformat() if status == "sent" else None, job_id),
+            )
+            if status == "sent" and count_quota:
+                self.conn.execute(
+                    "INSERT INTO domain_usage (domain, day, sent) VALUES (?, ?, 1) "
+                    "ON CONFLICT (domain, day) DO UPDATE SET sent = sent + 1",
+                    (domain, now.date().isoformat()),
+                )
+            self.conn.execute("COMMIT")
+
+    def counts(self, campaign: str) -> dict:
+        rows = self.conn.execute(
+            "SELECT status, COUNT(*) FROM jobs WHERE campaign = ? GROUP BY status", (campaign,)).fetchall()
+        return dict(rows)
+
+    def domain_day(self, domain: str) -> tuple[int, int]:
+        """
+        Return (ramp day index, messages already sent today) for a sending domain.
+
+        Day 0 is the first day this domain sent anything through the scheduler.
+        """
+        first = self.conn.execute(
+            "SELECT MIN(day) FROM domain_usage WHERE domain = ? AND sent > 0", (domain,)).fetchone()[0]
+        today = date.today()
+        day_index = (today - date.fromisoformat(first)).days if first else 0
+        sent_today = self.conn.execute(
+            "SELECT sent FROM domain_usage WHERE domain = ? AND day = ?", (domain, today.isoformat())).fetchone()
+        return day_index, sent_today[0] if sent_today else 0
+
+
+def daily_cap(ramp: list[int], day_index: int) -> int:
+    """Cap for a given ramp day; the last step holds once the curve is exhausted."""
+    return ramp[min(day_index, len(ramp) - 1)]
+
+
+# =============================================================================
+# RATE CONTROL
+# =============================================================================
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens/sec, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until one token is available."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# =============================================================================
+# DISPATCH
+# =============================================================================
+
+class Dispatcher:
+    """
+    Worker pool. Each worker thread keeps one authenticated SMTP connection
+    open and reuses it; each Resend key has its own token bucket.
+    """
+
+    def __init__(self, queue: SendQueue, args, keys: list[str], meter: CostMeter, journal: SendJournal):
+        self.queue = queue
+        self.args = args
+        self.meter = meter
+        self.journal = journal
+        # Set by the first send a budget refuses; later jobs go back to pending
+        self.budget_stop = None
+        self.keys = keys or [""]
+        self.buckets = [TokenBucket(args.rate) for _ in self.keys]
+        self.local = threading.local()
+        self.worker_ids = {}
+        self.worker_lock = threading.Lock()
+        self.latencies = []
+        self.sent = 0
+        self.failed = 0
+        self.suppressed = 0
+        self.already_sent = 0
+        self.uncertain = 0
+        # Temporary failures, left 'deferred' so this run doesn't retry them straight away
+        self.deferred = 0
+        self.stats_lock = threading.Lock()
+        # Bounced/complained addresses are skipped at send time, even if queued earlier
+        self.suppression = SuppressionIndex.open_readonly()
+        # Compiled once per run; workers only fill in subscriber slots
+        self.sender_address = parseaddr(args.sender)[1]
+        self.renderer = MessageRenderer(CampaignTemplate(
+            sender=args.sender,
+            subject=args.subject,
+            html=args.body_text if args.html else None,
+            text=HTML_FALLBACK_TEXT if args.html else args.body_text,
+            campaign={"name": args.campaign, "subject": args.subject},
+        ))
+
+    def _worker_index(self) -> int:
+        ident = threading.get_ident()
+        with self.worker_lock:
+            return self.worker_ids.setdefault(ident, len(self.worker_ids))
+
+    def _connection(self, key_index: int) -> smtplib.SMTP:
+        conn = getattr(self.local, "conn", None)
+        if conn is not None:
+            return conn
+
+        args = self.args
+        if args.no_tls:
+            conn = smtplib.SMTP(args.smtp_host, args.smtp_port, timeout=30)
+        elif args.smtp_port == 465:
+            conn = smtplib.SMTP_SSL(args.smtp_host, args.smtp_port, timeout=30)
+        else:
+            conn = smtplib.SMTP(args.smtp_host, args.smtp_port, timeout=30)
+            conn.starttls()
+        if self.keys[key_index]:
+            conn.login(SMTP_USER, self.keys[key_index])
+        self.local.conn = conn
+        return conn
+
+    def _drop_connection(self):
+        conn = getattr(self.local, "conn", None)
+        self.local.conn = None
+        if conn is not None:
+            try:
+                conn.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+
+    def _reset_connection(self):
+        """RSET after a refused message so the connection can be reused."""
+        conn = getattr(self.local, "conn", None)
+        if conn is not None:
+            try:
+                conn.rset()
+            except (smtplib.SMTPException, OSError):
+                self._drop_connection()
+
+    def send(self, job: tuple):
+        job_id, email, name, attributes = job
+        state = self.journal.state(self.args.campaign, email)
+        if state == SENT:
+            # Sent by a run that stopped before the queue recorded it; that day's quota already counted it
+            self.queue.mark(job_id, "sent", self.args.domain, count_quota=False)
+            with self.stats_lock:
+                self.already_sent += 1
+            return
+        if state == ATTEMPT and not self.args.resend_uncertain:
+            # A run stopped mid-send: it may have gone out, so don't repeat it unasked
+            self.queue.mark(job_id, "uncertain", self.args.domain)
+            with self.stats_lock:
+                self.uncertain += 1
+            return
+
+        if self.suppression.is_suppressed(email):
+            self.queue.mark(job_id, "suppressed", self.args.domain)
+            with self.stats_lock:
+                self.suppressed += 1
+            return
+
+        if self.budget_stop is None:
+            try:
+                self.meter.guard("resend", RESEND_COST_PER_EMAIL)
+            except BudgetExceeded as e:
+                self.budget_stop = e
+        if self.budget_stop is not None:
+            self.queue.mark(job_id, "pending", self.args.domain)
+            return
+
+        key_index = self._worker_index() % len(self.keys)
+        self.buckets[key_index].acquire()
+
+        start = time.perf_counter()
+        data_started = False
+        try:
+            conn = self._connection(key_index)
+            message = self.renderer.render({"email": email, "name": name, "attributes": attributes})
+            self.journal.attempt(self.args.campaign, email)
+            # sendmail() split up, to know whether a failure came before or after DATA began
+            conn.ehlo_or_helo_if_needed()
+            code, reply = conn.mail(self.sender_address)
+            if code != 250:
+                raise smtplib.SMTPSenderRefused(code, reply, self.sender_address)
+            code, reply = conn.rcpt(email)
+            if code not in (250, 251):
+                raise smtplib.SMTPRecipientsRefused({email: (code, reply)})
+            data_started = True
+            code, reply = conn.data(message)
+            if code != 250:
+                raise smtplib.SMTPDataError(code, reply)
+        except JournalError:
+            # Sends can no longer be recorded: stop the run rather than send unrecorded
+            raise
+        except InvalidRecord as e:
+            # Address the journal can't record (tab or newline in it); never sent
+            self.meter.release("resend")
+            self.queue.mark(job_id, "failed", self.args.domain, str(e)[:500])
+            with self.stats_lock:
+                self.failed += 1
+            return
+        except UnicodeEncodeError as e:
+            # Non-ASCII address: the renderer or smtplib refuses it before sending, maybe after MAIL
+            self._reset_connection()
+            if self.journal.state(self.args.campaign, email) == ATTEMPT:
+                self.journal.release(self.args.campaign, email)
+            self.meter.release("resend")
+            self.queue.mark(job_id, "failed", self.args.domain, f"Address is not ASCII: {e}"[:500])
+            with self.stats_lock:
+                self.failed += 1
+            return
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+            # The server answered with a refusal, so nothing was accepted
+            self._reset_connection()
+            self.journal.release(self.args.campaign, email)
+            self.meter.release("resend")
+            code = list(e.recipients.values())[0][0] if isinstance(e, smtplib.SMTPRecipientsRefused) else e.smtp_code
+            # 5xx is permanent; 4xx is retried on the next run
+            if code >= 500:
+                self.queue.mark(job_id, "failed", self.args.domain, str(e)[:500])
+                with self.stats_lock:
+                    self.failed += 1
+            else:
+                self.queue.mark(job_id, "deferred", self.args.domain, str(e)[:500])
+                with self.stats_lock:
+                    self.deferred += 1
+            return
+        except (smtplib.SMTPException, OSError) as e:
+            # Connection-level problem: reconnect next time
+            self._drop_connection()
+            self.meter.release("resend")
+            if data_started:
+                # Cut off during DATA: the server may have accepted it, so keep the ATTEMPT
+                # record and hold the job like one a crashed run left mid-send
+                self.queue.mark(job_id, "uncertain", self.args.domain, str(e)[:500])
+                with self.stats_lock:
+                    self.uncertain += 1
+                return
+            if self.journal.state(self.args.campaign, email) == ATTEMPT:
+                self.journal.release(self.args.campaign, email)
+            self.queue.mark(job_id, "deferred", self.args.domain, str(e)[:500])
+            with self.stats_lock:
+                self.deferred += 1
+            return
+
+        latency = time.perf_counter() - start
+        self.journal.sent(self.args.campaign, email)
+        self.queue.mark(job_id, "sent", self.args.domain)
+        self.meter.charge("resend", RESEND_COST_PER_EMAIL)
+        with self.stats_lock:
+            self.sent += 1
+            self.latencies.append(latency)
+
+    def close(self, pool: ThreadPoolExecutor):
+        # Each worker closes its own connection
+        list(pool.map(lambda _: self._drop_connection(), range(self.args.workers)))
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_campaign(args) -> dict:
+    """Send today's allowance for a campaign in batches. Returns run metrics."""
+    queue = SendQueue(args.db)
+    recovered = queue.recover(args.campaign)
+    if recovered:
+        print(f"♻️  Recovered {recovered} in-flight jobs from a previous run")
+    deferred = queue.requeue_deferred(args.campaign)
+    if deferred:
+        print(f"🔁 Retrying {deferred} jobs a previous run deferred")
+    if args.resend_uncertain:
+        requeued = queue.requeue_uncertain(args.campaign)
+        print(f"♻️  Sending {requeued} uncertain jobs again")
+
+    ramp = [int(x) for x in args.ramp.split(",")] if args.ramp else DEFAULT_RAMP
+    day_index, sent_today = queue.domain_day(args.domain)
+    allowance = max(0, daily_cap(ramp, day_index) - sent_today)
+    if args.limit is not None:
+        allowance = min(allowance, args.limit)
+
+    print(f"📈 {args.domain}: ramp day {day_index}, cap {daily_cap(ramp, day_index)}, "
+          f"sent today {sent_today}, allowance {allowance}")
+
+    meter = CostMeter("warmup_scheduler")
+    if not RESEND_COST_PER_EMAIL and any(b.limit_usd is not None and b.applies_to("warmup_scheduler", "resend")
+                                         for b in meter.budgets):
+        print("⚠️  RESEND_COST_PER_EMAIL is 0, so USD budgets do not count these sends "
+              "(set it, or cap with limit_requests)")
+    journal = SendJournal(args.journal)
+    dispatcher = Dispatcher(queue, args, RESEND_API_KEYS if not args.no_auth else [], meter, journal)
+    start = time.perf_counter()
+    batches = 0
+
+    with meter, journal, ThreadPoolExecutor(max_workers=args.workers) as pool:
+        while allowance > 0:
+            batch = queue.claim_batch(args.campaign, min(args.batch_size, allowance))
+            if not batch:
+                break
+            batches += 1
+            skipped_before = (dispatcher.suppressed + dispatcher.uncertain + dispatcher.already_sent
+                              + dispatcher.deferred)
+            deferred_before = dispatcher.deferred
+            list(pool.map(dispatcher.send, batch))
+            # Suppressed, uncertain, already-sent and deferred recipients were not sent now,
+            # so they don't use up the ramp allowance
+            skipped = (dispatcher.suppressed + dispatcher.uncertain + dispatcher.already_sent
+                       + dispatcher.deferred - skipped_before)
+            allowance -= len(batch) - skipped
+            print(f"  Batch {batches}: {len(batch)} messages "
+                  f"({dispatcher.sent} sent, {dispatcher.failed} failed, {dispatcher.suppressed} suppressed" +
+                  (f", {dispatcher.already_sent} already sent" if dispatcher.already_sent else "") +
+                  (f", {dispatcher.uncertain} uncertain" if dispatcher.uncertain else "") +
+                  (f", {dispatcher.deferred} deferred" if dispatcher.deferred else "") + ")")
+            if dispatcher.budget_stop is not None:
+                print(f"🛑 Stopped: {dispatcher.budget_stop} (unsent jobs stay queued)")
+                break
+            if dispatcher.deferred - deferred_before == len(batch):
+                print("🛑 Stopped: every message in the batch hit a temporary failure (deferred to the next run)")
+                break
+        dispatcher.close(pool)
+
+    elapsed = time.perf_counter() - start
+    metrics = {
+        "timestamp": datetime.now().isoformat(),
+        "campaign": args.campaign,
+        "domain": args.domain,
+        "smtp_host": f"{args.smtp_host}:{args.smtp_port}",
+        "workers": args.workers,
+        "rate_per_key": args.rate,
+        "batches": batches,
+        "sent": dispatcher.sent,
+        "failed": dispatcher.failed,
+        "suppressed": dispatcher.suppressed,
+        "already_sent": dispatcher.already_sent,
+        "uncertain": dispatcher.uncertain,
+        "deferred": dispatcher.deferred,
+        "budget_stop": str(dispatcher.budget_stop) if dispatcher.budget_stop else None,
+        "elapsed_sec": round(elapsed, 3),
+        "throughput_per_sec": round(dispatcher.sent / elapsed, 2) if elapsed else 0,
+        "latency_ms": {
+            "p50": round(percentile(dispatcher.latencies, 50) * 1000, 2),
+            "p95": round(percentile(dispatcher.latencies, 95) * 1000, 2),
+            "p99": round(percentile(dispatcher.latencies, 99) * 1000, 2),
+        },
+    }
+
+    Path(args.metrics_log).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.metrics_log, "a") as f:
+        f.write(json.dumps(metrics) + "\n")
+    return metrics
+
+
+# =============================================================================
+# LOCAL SMTP SINK
+# =============================================================================
+
+def run_sink(host: str, port: int) -> int:
+    """Accept and count messages locally so throughput can be measured safely."""
+    try:
+        from aiosmtpd.controller import Controller
+    except ImportError:
+        print("❌ aiosmtpd not installed. Run: pip install aiosmtpd")
+        return 1
+
+    class CountingHandler:
+        def __init__(self):
+            self.count = 0
+
+        async def handle_DATA(self, server, session, envelope):
+            self.count += 1
+            return "250 OK"
+
+    handler = CountingHandler()
+    controller = Controller(handler, hostname=host, port=port)
+    controller.start()
+    print(f"📭 SMTP sink listening on {host}:{port} (Ctrl+C to stop)")
+    try:
+        last = 0
+        while True:
+            time.sleep(1)
+            if handler.count != last:
+                print(f"  {handler.count} messages received (+{handler.count - last}/s)")
+                last = handler.count
+    except KeyboardInterrupt:
+        print(f"\n✅ Received {handler.count} messages")
+    finally:
+        controller.stop()
+    return 0
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def read_recipients(path: str) -> list[dict]:
+    """Read a Listmonk-format CSV (email,name,attributes) or one address per line."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        rows = [r for r in csv.reader(f) if r]
+    if rows and "email" in [c.strip().lower() for c in rows[0]]:
+        header = [c.strip().lower() for c in rows.pop(0)]
+        return [dict(zip(header, r)) for r in rows]
+    return [{"email": r[0].strip()} for r in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Queue and pace campaign sends with per-domain ramp-up and per-key rate limits.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--db", default=QUEUE_DB, help=f"Queue database (default: {QUEUE_DB})")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    enqueue_parser = subparsers.add_parser("enqueue", help="Queue recipients for a campaign")
+    enqueue_parser.add_argument("list", help="CSV (email,name,attributes) or one address per line")
+    enqueue_parser.add_argument("--campaign", required=True, help="Campaign name")
+
+    run_parser = subparsers.add_parser("run", help="Send today's allowance")
+    run_parser.add_argument("--campaign", required=True, help="Campaign name")
+    run_parser.add_argument("--from", dest="sender", required=True, help='From header, e.g. "Name <hello@mail.example.com>"')
+    run_parser.add_argument("--subject", required=True, help="Subject line")
+    run_parser.add_argument("--body", required=True, help="Body file (.html or .txt); {{name}} and Listmonk-style {{ .Subscriber.* }} tags are filled in")
+    run_parser.add_argument("--workers", type=int, default=4, help="Worker threads / SMTP connections (default: 4)")
+    run_parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help=f"Messages/sec per Resend key (default: {DEFAULT_RATE})")
+    run_parser.add_argument("--batch-size", type=int, default=100, help="Jobs claimed per batch (default: 100)")
+    run_parser.add_argument("--ramp", help="Comma-separated daily caps, e.g. 50,100,200 (default: built-in curve)")
+    run_parser.add_argument("--limit", type=int, help="Send at most this many now, even if the ramp allows more")
+    run_parser.add_argument("--smtp-host", default=SMTP_HOST, help=f"SMTP host (default: {SMTP_HOST})")
+    run_parser.add_argument("--smtp-port", type=int, default=SMTP_PORT, help=f"SMTP port (default: {SMTP_PORT})")
+    run_parser.add_argument("--no-tls", action="store_true", help="Plain SMTP (local sink only)")
+    run_parser.add_argument("--no-auth", action="store_true", help="Skip SMTP login (local sink only)")
+    run_parser.add_argument("--journal", default=JOURNAL_PATH, help=f"Send journal (default: {JOURNAL_PATH})")
+    run_parser.add_argument("--metrics-log", default=METRICS_LOG, help=f"Run metrics file (default: {METRICS_LOG})")
+    run_parser.add_argument("--resend-uncertain", action="store_true",
+                            help="Send again to recipients a crashed run may or may not have reached")
+
+    status_parser = subparsers.add_parser("status", help="Show queue progress and today's quota")
+    status_parser.add_argument("--campaign", required=True, help="Campaign name")
+    status_parser.add_argument("--domain", help="Sending domain to show quota for")
+    status_parser.add_argument("--ramp", help="Comma-separated daily caps (default: built-in curve)")
+
+    sink_parser = subparsers.add_parser("sink", help="Run a local SMTP sink for throughput tests")
+    sink_parser.add_argument("--host", default="localhost", help="Bind host (default: localhost)")
+    sink_parser.add_argument("--port", type=int, default=8025, help="Bind port (default: 8025)")
+
+    args = parser.parse_args()
+
+    if args.command == "sink":
+        return run_sink(args.host, args.port)
+
+    if not args.command:
+        parser.print_help()
+        return 0
+
+    print(f"[warmup_scheduler] v{DOE_VERSION}")
+    print()
+
+    try:
+        if args.command == "enqueue":
+            rows = [r for r in read_recipients(args.list) if r.get("email")]
+            added = SendQueue(args.db).enqueue(args.campaign, rows)
+            print(f"✅ Queued {added} new recipients for '{args.campaign}' ({len(rows) - added} already queued)")
+            return 0
+
+        if args.command == "status":
+            queue = SendQueue(args.db)
+            counts = queue.counts(args.campaign)
+            print(f"CAMPAIGN: {args.campaign}")
+            print("-" * 40)
+            for status in ("pending", "sending", "sent", "failed", "suppressed", "uncertain"):
+                print(f"  {status}: {counts.get(status, 0)}")
+            if args.domain:
+                ramp = [int(x) for x in args.ramp.split(",")] if args.ramp else DEFAULT_RAMP
+                day_index, sent_today = queue.domain_day(args.domain)
+                cap = daily_cap(ramp, day_index)
+                print()
+                print(f"  {args.domain}: ramp day {day_index}, {sent_today}/{cap} sent today")
+            return 0
+
+        # run
+        if not RESEND_API_KEYS and not args.no_auth:
+            print("ERROR: RESEND_API_KEY not set in .env (use --no-auth for a local sink)")
+            return 1
+
+        args.domain = parseaddr(args.sender)[1].rpartition("@")[2].lower()
+        if not args.domain:
+            print(f"ERROR: Could not read a sending domain from --from {args.sender!r}")
+            return 1
+        args.body_text = Path(args.body).read_text()
+        args.html = Path(args.body).suffix.lower() in (".html", ".htm")
+
+        metrics = run_campaign(args)
+
+        print()
+        print("RESULTS")
+        print("-" * 40)
+        print(f"  Sent: {metrics['sent']}  Failed: {metrics['failed']}  Suppressed: {metrics['suppressed']}")
+        if metrics["already_sent"] or metrics["uncertain"]:
+            print(f"  Already sent (journal): {metrics['already_sent']}  Uncertain (held): {metrics['uncertain']}")
+        if metrics["deferred"]:
+            print(f"  Deferred (retried next run): {metrics['deferred']}")
+        print(f"  Throughput: {metrics['throughput_per_sec']} msg/s")
+        print(f"  Latency p50/p95/p99: {metrics['latency_ms']['p50']} / "
+              f"{metrics['latency_ms']['p95']} / {metrics['latency_ms']['p99']} ms")
+        print()
+        print("✅ Done!")
+        return 0
+
+    except TemplateError as e:
+        print(f"❌ Template error: {e}")
+        return 1
+
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted (in-flight jobs will be retried on the next run)")
+        return 130
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,6 +12,22 @@ function Write-Log {
 
 Write-Log "=== Listmonk Watchdog Check Starting ==="
 
+# Prefer the event-driven startup: it waits only as long as Docker and each
+# service actually take. The fixed waits below are the fallback.
+if (Get-Command python -ErrorAction SilentlyContinue) {
+    Set-Location "$PSScriptRoot"
+    # Redirected output would otherwise use the ANSI code page, which can't encode the status emoji
+    $env:PYTHONUTF8 = "1"
+    [Console]::OutputEncoding = [System.Text.Encoding]::UTF8
+    python execution\stack.py up 2>&1 | ForEach-Object { Write-Log $_ }
+    if ($LASTEXITCODE -eq 0) {
+        Write-Log "=== Listmonk Watchdog Check Complete ==="
+        Write-Log ""
+        exit 0
+    }
+    Write-Log "WARNING: stack.py up failed (exit $LASTEXITCODE), falling back to the checks below"
+}
+
 # Check if Docker Desktop is running
 $dockerProcess = Get-Process "Docker Desktop" -ErrorAction SilentlyContinue
 if (-not $dockerProcess) {